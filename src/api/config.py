@@ -39,6 +39,35 @@ class Settings(BaseSettings):
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = False
     
+    # Extracción de texto PDF ("serial" o "paralelo")
+    # En modo paralelo cada worker de análisis reutiliza su propio pool de
+    # PDF_EXTRACTION_MAX_WORKERS procesos: hasta ANALYSIS_WORKERS × PDF_EXTRACTION_MAX_WORKERS
+    PDF_EXTRACTION_MODE: str = "serial"
+    PDF_EXTRACTION_MAX_WORKERS: int = 4
+    # Motor de texto: "pdfplumber" o "pdfium" (respaldo automático a pdfplumber)
+    PDF_TEXT_ENGINE: str = "pdfplumber"
+    # Omitir páginas sin datos (avisos legales) antes de la extracción completa
+    PDF_SKIP_BOILERPLATE_PAGES: bool = True
+    # Motor de períodos laborales: "regex", "coordenadas" o "lineal"
+    PARSER_PERIOD_ENGINE: str = "regex"
+    
+    # Límites de los PDFs subidos (se validan antes de abrirlos con pdfplumber)
+    MAX_PDF_SIZE_MB: int = 15
+    MAX_PDF_PAGES: int = 60
+    
+    # Pool de procesos para el pipeline de análisis
+    ANALYSIS_WORKERS: int = 2
+    ANALYSIS_MAX_TASKS_PER_CHILD: int = 50
+    # Tiempo máximo por análisis; al excederse se reciclan los workers (0 = sin límite)
+    ANALYSIS_TIMEOUT_SECONDS: int = 120
+    
+    # Caché de resultados de análisis (LRU en memoria; JSON en disco opcional)
+    ANALYSIS_CACHE_SIZE: int = 128
+    # Ruta absoluta para persistir en disco (0700/0600, datos personales en claro); "" = solo memoria
+    ANALYSIS_CACHE_DIR: str = ""
+    # Máximo de resultados en disco (los de días anteriores se borran siempre)
+    ANALYSIS_CACHE_MAX_FILES: int = 1000
+    
     # CORS
     CORS_ORIGINS: List[str] = [
         "http://localhost:3000",
@@ -2,6 +2,8 @@
 FastAPI main application con sistema de invitaciones.
 """
 
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import logging
@@ -9,6 +11,9 @@ import logging
 from .routes import auth, analysis, admin
 from .config import get_settings
 from .database import engine, Base
+from .services.analysis_executor import analysis_executor
+# routes.analysis agrega el directorio del parser a sys.path
+from carga_pdf import LimiteCuerpoMultipart
 
 # Configurar logging
 logging.basicConfig(
@@ -31,6 +36,9 @@ app = FastAPI(
     description="API para análisis de constancias IMSS con sistema de invitaciones"
 )
 
+# Rechazar PDFs que excedan MAX_PDF_SIZE_MB antes de recibir el cuerpo completo
+app.add_middleware(LimiteCuerpoMultipart, max_bytes=settings.MAX_PDF_SIZE_MB * 1024 * 1024)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -87,6 +95,9 @@ async def startup_event():
         logger.info("✅ SendGrid configurado")
     else:
         logger.warning("⚠️  SendGrid NO configurado - Los emails no se enviarán")
+    
+    # Arrancar procesos y esperar sus PIDs bloquea: fuera del event loop
+    await asyncio.to_thread(analysis_executor.start)
 
 
 @app.on_event("shutdown")
@@ -95,5 +106,6 @@ async def shutdown_event():
     Eventos al cerrar la aplicación.
     """
     logger.info(f"👋 Cerrando {settings.APP_NAME}")
+    await asyncio.to_thread(analysis_executor.shutdown)
 
 
@@ -1,29 +1,31 @@
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Query
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 import sys
 import os
 
 # Agregar el path del parser original
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..', 'parser'))
 
+from ..config import get_settings
 from ..database import get_db
 from ..services.security import get_current_user, check_usage_limit
 from ..services.auth_service import AuthService
 from ..services.sheets_service import GoogleSheetsManager
+from ..services.analysis_executor import analysis_executor, ErrorEjecutorAnalisis
+from ..services.analysis_cache import analysis_cache
 from ..models.user import User
 
-# Importar TODOS los módulos necesarios
-from modules.modulo2.historial_laboral import HistorialLaboralExtractor
-from correccion_semanas_final import aplicar_correccion_exacta
-from calculo_250_semanas import calcular_promedio_250_desde_correccion
-from conservacion_derechos import CalculadoraConservacionDerechos
-from procesador_semanas_descontadas import ProcesadorSemanasDescontadas
-import pdfplumber
-import io
+# Pipeline completo (se ejecuta en el pool de procesos)
+from analisis_constancia import ejecutar_analisis, VERSION_MOTOR
+from carga_pdf import recibir_pdf
+from extraccion_texto_pdf import MOTORES_VALIDOS
 from datetime import datetime
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 router = APIRouter(prefix="/analysis", tags=["Análisis de Constancias"])
 
@@ -33,6 +35,7 @@ router = APIRouter(prefix="/analysis", tags=["Análisis de Constancias"])
 @router.post("/analizar")
 async def analizar_constancia(
     pdf: UploadFile = File(...),
+    motor_extraccion: Optional[str] = Query(None, description="pdfplumber o pdfium (por defecto PDF_TEXT_ENGINE)"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -59,63 +62,64 @@ async def analizar_constancia(
     if not pdf.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="El archivo debe ser un PDF")
 
-    try:
-        # 3. Leer PDF
-        pdf_content = await pdf.read()
-
-        # 4. Extraer texto del PDF (CRÍTICO: se usa en varios pasos)
-        texto_completo = ""
-        with pdfplumber.open(io.BytesIO(pdf_content)) as pdf_doc:
-            for page in pdf_doc.pages:
-                texto_pagina = page.extract_text()
-                if texto_pagina:
-                    texto_completo += texto_pagina + "\n"
-
-        # ========== PROCESAMIENTO COMPLETO (orden del main.py) ==========
-
-        # PASO 1: Extraer historial laboral base
-        extractor = HistorialLaboralExtractor()
-        datos_base = extractor.procesar_constancia(texto_completo)
-
-        # PASO 2: Aplicar corrección de empalmes (CRÍTICO)
-        datos_corregidos = aplicar_correccion_exacta(datos_base)
-
-        # PASO 3: Procesar semanas descontadas
-        try:
-            procesador_descuentos = ProcesadorSemanasDescontadas()
-            analisis_descuentos = procesador_descuentos.procesar_semanas_desde_correccion(datos_corregidos)
-            semanas_descontadas = analisis_descuentos.to_dict() if analisis_descuentos else None
-        except Exception as e:
-            semanas_descontadas = {"error": f"No se pudo procesar: {str(e)}"}
-
-        # PASO 4: Calcular conservación de derechos
-        try:
-            calculadora_conservacion = CalculadoraConservacionDerechos()
-            fecha_emision = datos_corregidos.get('datos_basicos', {}).get('fecha_emision')
-            resultado_conservacion = calculadora_conservacion.calcular_conservacion_derechos(
-                datos_corregidos=datos_corregidos,
-                fecha_emision=fecha_emision
-            )
-            conservacion = resultado_conservacion.to_dict() if resultado_conservacion else None
-        except Exception as e:
-            conservacion = {"error": f"No se pudo calcular: {str(e)}"}
+    motor = motor_extraccion or settings.PDF_TEXT_ENGINE
+    if motor not in MOTORES_VALIDOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Motor de extracción inválido: {motor}. Opciones: {', '.join(MOTORES_VALIDOS)}"
+        )
 
-        # PASO 5: Calcular promedio 250 semanas (solo para Ley 73)
-        ley_aplicable = datos_corregidos.get("datos_basicos", {}).get("ley_aplicable")
+    # 3. Validar el PDF subido (413 si excede tamaño o páginas)
+    pdf_cargado = await recibir_pdf(
+        pdf,
+        max_bytes=settings.MAX_PDF_SIZE_MB * 1024 * 1024,
+        max_paginas=settings.MAX_PDF_PAGES
+    )
 
-        if ley_aplicable == "Ley 73":
-            try:
-                promedio_250 = calcular_promedio_250_desde_correccion(
-                    datos_corregidos=datos_corregidos,
-                    fecha_referencia=fecha_emision,
-                    debug=True
-                )
-            except Exception as e:
-                promedio_250 = {"error": f"No se pudo calcular: {str(e)}"}
-        else:
-            promedio_250 = {
-                "mensaje": f"El cálculo de 250 semanas solo aplica para Ley 73. Ley aplicable: {ley_aplicable}"
+    try:
+        # 4. Buscar en caché (mismo PDF + misma versión del motor + mismo día)
+        clave_cache = analysis_cache.construir_clave(
+            pdf_cargado.sha256, VERSION_MOTOR,
+            parametros={
+                "motor_extraccion": motor,
+                "omitir_paginas": settings.PDF_SKIP_BOILERPLATE_PAGES,
+                "motor_periodos": settings.PARSER_PERIOD_ENGINE
             }
+        )
+        resultado_analisis = analysis_cache.get(clave_cache)
+        desde_cache = resultado_analisis is not None
+
+        if desde_cache:
+            logger.info(f"♻️ Resultado en caché para {pdf.filename}")
+        else:
+            # 5. Ejecutar el pipeline completo fuera del event loop
+            #    (extracción, historial, corrección, descuentos, conservación, 250 semanas)
+            #    (el pool de procesos necesita una ruta: el PDF se escribe a disco solo aquí)
+            ruta_pdf = await run_in_threadpool(lambda: pdf_cargado.ruta)
+            resultado_analisis = await analysis_executor.run(
+                ejecutar_analisis,
+                ruta_pdf,
+                settings.PDF_EXTRACTION_MODE,
+                settings.PDF_EXTRACTION_MAX_WORKERS,
+                motor,
+                settings.PDF_SKIP_BOILERPLATE_PAGES,
+                settings.PARSER_PERIOD_ENGINE
+            )
+            analysis_cache.set(clave_cache, resultado_analisis)
+
+        datos_corregidos = resultado_analisis["datos_corregidos"]
+        semanas_descontadas = resultado_analisis["semanas_descontadas"]
+        conservacion = resultado_analisis["conservacion"]
+        promedio_250 = resultado_analisis["promedio_250"]
+
+        extraccion = resultado_analisis.get("extraccion", {})
+        if extraccion.get("respaldo_aplicado"):
+            logger.warning(
+                f"⚠️ Motor {extraccion['motor_solicitado']} no pasó validación "
+                f"({'; '.join(extraccion['problemas_validacion'])}), se usó pdfplumber"
+            )
+        if extraccion.get("paginas_omitidas"):
+            logger.info(f"📄 Páginas omitidas sin datos: {extraccion['paginas_omitidas']}")
 
         # ========== NUEVO: ENVIAR AL GOOGLE SHEET PERSONAL DEL USUARIO ==========
         sheets_success = False
@@ -167,6 +171,9 @@ async def analizar_constancia(
             "mensaje": "Constancia procesada exitosamente con análisis completo",
             "archivo": pdf.filename,
             "fecha_procesamiento": datetime.now().isoformat(),
+            "desde_cache": desde_cache,
+            # Motor de texto usado y páginas omitidas (avisos legales sin datos)
+            "extraccion": extraccion,
             "usuario": {
                 "email": current_user.email,
                 "plan": current_user.plan,
@@ -187,11 +194,16 @@ async def analizar_constancia(
             "spreadsheet_url": current_user.spreadsheet_url if sheets_success else None
         }
 
+    except ErrorEjecutorAnalisis:
+        # 503 (pool reconstruido) o 504 (tiempo excedido): se propagan tal cual
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error procesando constancia: {str(e)}"
         )
+    finally:
+        pdf_cargado.eliminar()
 
 @router.get("/mi-uso")
 async def ver_mi_uso(current_user: User = Depends(get_current_user)):
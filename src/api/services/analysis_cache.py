@@ -0,0 +1,207 @@
+"""
+Caché direccionada por contenido para resultados de análisis de constancias.
+
+Dos niveles, ambos con el resultado ya serializado a JSON (cada lectura
+devuelve un dict nuevo con los mismos tipos, venga de memoria o de disco):
+1. LRU en memoria del proceso (cachetools)
+2. Opcional: persistente en disco local (un JSON por resultado, con la
+   fecha de referencia como prefijo del nombre). Solo se activa con un
+   ANALYSIS_CACHE_DIR absoluto; el directorio es 0700 y los archivos 0600
+   porque contienen NSS, CURP y salarios en claro
+
+La clave combina el SHA-256 del PDF, la versión del motor de análisis, los
+parámetros que afectan el resultado y la fecha de referencia: conservación
+de derechos y los períodos vigentes dependen de "hoy", así que un resultado
+solo se reutiliza dentro del mismo día. Los archivos de otros días se borran
+al escribir y el disco nunca pasa de `max_archivos` entradas.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from cachetools import LRUCache
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Solo el usuario del proceso puede listar el directorio o leer las entradas
+PERMISOS_DIRECTORIO = 0o700
+PERMISOS_ARCHIVO = 0o600
+
+
+def _serializar_valor(valor: Any) -> Any:
+    """Fechas a ISO 8601 (igual que la respuesta JSON de FastAPI)"""
+    if hasattr(valor, "isoformat"):
+        return valor.isoformat()
+    return str(valor)
+
+
+class AnalysisCache:
+    """
+    Caché de dos niveles para el resultado de `ejecutar_analisis`.
+    """
+
+    def __init__(self, maxsize: int, directorio: str = "", max_archivos: int = 1000):
+        """
+        Args:
+            maxsize: Entradas en memoria
+            directorio: Ruta absoluta del nivel en disco; "" = solo memoria
+            max_archivos: Tope de entradas en disco
+
+        Raises:
+            ValueError: Si `directorio` no es una ruta absoluta
+        """
+        self._memoria = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.directorio = directorio
+        self.max_archivos = max_archivos
+
+        if self.directorio:
+            if not os.path.isabs(self.directorio):
+                raise ValueError(
+                    f"ANALYSIS_CACHE_DIR debe ser una ruta absoluta: {self.directorio!r}"
+                )
+            os.makedirs(self.directorio, mode=PERMISOS_DIRECTORIO, exist_ok=True)
+            # makedirs respeta el umask y no toca un directorio existente
+            os.chmod(self.directorio, PERMISOS_DIRECTORIO)
+            self.podar()
+
+    @staticmethod
+    def construir_clave(sha256_pdf: str, version_motor: str,
+                        parametros: Optional[Dict[str, Any]] = None,
+                        fecha_referencia: Optional[date] = None) -> str:
+        """
+        Construye la clave: contenido + versión del motor + parámetros + fecha de referencia.
+        """
+        fecha = (fecha_referencia or date.today()).isoformat()
+        parametros_json = json.dumps(parametros or {}, sort_keys=True)
+        return f"{sha256_pdf}:{version_motor}:{parametros_json}:{fecha}"
+
+    def _ruta_disco(self, clave: str) -> str:
+        fecha = clave.rsplit(":", 1)[-1]
+        nombre = hashlib.sha256(clave.encode("utf-8")).hexdigest()
+        return os.path.join(self.directorio, f"{fecha}_{nombre}.json")
+
+    def _archivos(self) -> List[str]:
+        try:
+            return [
+                os.path.join(self.directorio, nombre) for nombre in os.listdir(self.directorio)
+                if nombre.endswith((".json", ".tmp"))
+            ]
+        except OSError:
+            return []
+
+    @staticmethod
+    def _borrar(rutas: List[str]) -> None:
+        for ruta in rutas:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+    def get(self, clave: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca en memoria y después en disco (promoviendo a memoria si se encuentra).
+        """
+        with self._lock:
+            texto = self._memoria.get(clave)
+        if texto is not None:
+            return json.loads(texto)
+
+        if not self.directorio:
+            return None
+
+        ruta = self._ruta_disco(clave)
+        try:
+            with open(ruta, "r", encoding="utf-8") as archivo:
+                texto = archivo.read()
+            valor = json.loads(texto)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Entrada de caché ilegible {ruta}: {e}")
+            return None
+
+        with self._lock:
+            self._memoria[clave] = texto
+        return valor
+
+    def set(self, clave: str, valor: Dict[str, Any]) -> None:
+        """
+        Guarda en memoria y en disco (escritura atómica) y poda el disco.
+        """
+        try:
+            texto = json.dumps(valor, ensure_ascii=False, default=_serializar_valor)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Resultado no serializable, no se guarda en caché: {e}")
+            return
+
+        with self._lock:
+            self._memoria[clave] = texto
+
+        if not self.directorio:
+            return
+
+        ruta = self._ruta_disco(clave)
+        ruta_temporal = f"{ruta}.{os.getpid()}.tmp"
+        try:
+            descriptor = os.open(ruta_temporal, os.O_WRONLY | os.O_CREAT | os.O_EXCL, PERMISOS_ARCHIVO)
+            with os.fdopen(descriptor, "w", encoding="utf-8") as archivo:
+                archivo.write(texto)
+            os.replace(ruta_temporal, ruta)
+        except OSError as e:
+            logger.warning(f"⚠️ No se pudo persistir entrada de caché: {e}")
+            self._borrar([ruta_temporal])
+
+        self.podar()
+
+    def podar(self) -> None:
+        """
+        Borra del disco las entradas de otros días y, si aún quedan más de
+        `max_archivos`, las más antiguas.
+        """
+        if not self.directorio:
+            return
+        prefijo_hoy = f"{date.today().isoformat()}_"
+        vigentes, vencidos = [], []
+        for ruta in self._archivos():
+            nombre = os.path.basename(ruta)
+            if not nombre.startswith(prefijo_hoy):
+                vencidos.append(ruta)
+            elif nombre.endswith(".json"):
+                vigentes.append(ruta)
+            # Los .tmp de hoy pueden ser escrituras en curso: se dejan
+        self._borrar(vencidos)
+
+        if len(vigentes) > self.max_archivos:
+            def antiguedad(ruta: str) -> float:
+                try:
+                    return os.path.getmtime(ruta)
+                except OSError:
+                    return 0.0
+            vigentes.sort(key=antiguedad)
+            self._borrar(vigentes[:len(vigentes) - self.max_archivos])
+
+    def clear(self) -> None:
+        """
+        Vacía ambos niveles (memoria y todos los archivos del disco).
+        """
+        with self._lock:
+            self._memoria.clear()
+        if self.directorio:
+            self._borrar(self._archivos())
+
+
+_settings = get_settings()
+
+analysis_cache = AnalysisCache(
+    maxsize=_settings.ANALYSIS_CACHE_SIZE,
+    directorio=_settings.ANALYSIS_CACHE_DIR,
+    max_archivos=_settings.ANALYSIS_CACHE_MAX_FILES
+)
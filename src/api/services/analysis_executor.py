@@ -0,0 +1,234 @@
+"""
+Executor dedicado para el pipeline de análisis de constancias.
+
+El análisis (pdfplumber + parser + calculadoras) es CPU-bound y bloquearía
+el event loop de uvicorn. Aquí se ejecuta en un pool de procesos cuyos
+workers ya tienen importados pdfplumber y los módulos del parser, y que se
+reciclan cada N trabajos para acotar el crecimiento de memoria de pdfminer.
+
+Si un worker muere (OOM, fallo nativo en pdfium/pdfplumber) el pool queda
+roto: se reconstruye y TODAS las solicitudes que estaban en curso en ese
+pool reciben 503 (no se sabe cuál PDF lo rompió, así que ninguna se
+reintenta). Si un trabajo excede ANALYSIS_TIMEOUT_SECONDS mientras corre recibe 504 y se terminan
+los workers del pool para que un PDF patológico no retenga un worker
+indefinidamente; los demás trabajos de ese pool no tuvieron la culpa y se
+reenvían una vez al pool nuevo.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+import threading
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Set
+
+from fastapi import HTTPException
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+PARSER_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'parser'))
+
+
+class ErrorEjecutorAnalisis(HTTPException):
+    """El pool de análisis no pudo completar el trabajo"""
+
+
+class AnalisisNoDisponible(ErrorEjecutorAnalisis):
+    def __init__(self):
+        super().__init__(
+            status_code=503,
+            detail="El servicio de análisis se está reiniciando, intenta de nuevo en unos segundos"
+        )
+
+
+class AnalisisExcedioTiempo(ErrorEjecutorAnalisis):
+    def __init__(self, segundos: float):
+        super().__init__(
+            status_code=504,
+            detail=f"El análisis excedió el tiempo máximo de {segundos:g} segundos"
+        )
+
+
+def _inicializar_worker(parser_path: str, cola_pids) -> None:
+    """
+    Precalienta el worker: importa pdfplumber y el pipeline del parser
+    una sola vez por proceso, antes de recibir el primer trabajo.
+    Reporta su PID para que el pool pueda terminarlo si se recicla.
+    """
+    cola_pids.put(os.getpid())
+
+    if parser_path not in sys.path:
+        sys.path.insert(0, parser_path)
+
+    import pdfplumber  # noqa: F401
+    import analisis_constancia  # noqa: F401
+
+
+def _ping() -> int:
+    """Trabajo vacío para forzar el arranque de los workers"""
+    return os.getpid()
+
+
+class _PoolAnalisis:
+    """
+    Un ProcessPoolExecutor y los PIDs de los workers que ha arrancado
+    (incluidos los que reemplazan a los reciclados por max_tasks_per_child).
+    """
+
+    def __init__(self, max_workers: int, max_tasks_per_child: Optional[int]):
+        # True cuando se terminó a propósito (no por un worker caído)
+        self.terminado = False
+        contexto = multiprocessing.get_context("spawn")
+        self._cola_pids = contexto.SimpleQueue()
+        self._pids: Set[int] = set()
+        self.executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=contexto,
+            initializer=_inicializar_worker,
+            initargs=(PARSER_PATH, self._cola_pids),
+            max_tasks_per_child=max_tasks_per_child
+        )
+
+    def terminar(self) -> None:
+        """
+        Cancela lo pendiente y termina los workers vivos de este pool
+        (un shutdown normal esperaría al trabajo colgado).
+        """
+        self.terminado = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+        while not self._cola_pids.empty():
+            self._pids.add(self._cola_pids.get())
+
+        # Solo hijos vivos de este proceso: un PID reutilizado no se toca
+        workers = [p for p in multiprocessing.active_children() if p.pid in self._pids]
+        for proceso in workers:
+            proceso.terminate()
+        for proceso in workers:
+            proceso.join(timeout=5)
+            if proceso.is_alive():
+                proceso.kill()
+        self._cola_pids.close()
+
+
+class AnalysisExecutor:
+    """
+    Pool de procesos compartido por todas las solicitudes de análisis.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_tasks_per_child: Optional[int] = None,
+        timeout_segundos: Optional[float] = None
+    ):
+        self.max_workers = max_workers
+        self.max_tasks_per_child = max_tasks_per_child or None
+        self.timeout_segundos = timeout_segundos or None
+        self._pool: Optional[_PoolAnalisis] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """
+        Crea el pool y arranca todos los workers (bloqueante: se llama en el
+        arranque de la aplicación, nunca desde una solicitud).
+        """
+        with self._lock:
+            if self._pool is not None:
+                return
+            self._pool = _PoolAnalisis(self.max_workers, self.max_tasks_per_child)
+            executor = self._pool.executor
+
+        # Los workers se crean bajo demanda; enviar un ping por worker los arranca
+        futuros = [executor.submit(_ping) for _ in range(self.max_workers)]
+        pids = {futuro.result() for futuro in futuros}
+        logger.info(
+            f"✅ Executor de análisis listo: {len(pids)} workers, "
+            f"reciclaje cada {self.max_tasks_per_child or '∞'} trabajos, "
+            f"límite {self.timeout_segundos or '∞'} s por trabajo"
+        )
+
+    def shutdown(self) -> None:
+        """
+        Detiene el pool esperando los trabajos en curso.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.executor.shutdown(wait=True)
+
+    def _reiniciar(self, pool_viejo: _PoolAnalisis) -> None:
+        """
+        Reemplaza `pool_viejo` por uno nuevo y termina sus workers. Si otra
+        solicitud ya lo reemplazó no hace nada.
+        """
+        with self._lock:
+            if self._pool is not pool_viejo:
+                return
+            self._pool = _PoolAnalisis(self.max_workers, self.max_tasks_per_child)
+        pool_viejo.terminar()
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Ejecuta `func(*args)` en el pool sin bloquear el event loop.
+
+        Lanza AnalisisExcedioTiempo (504) si el trabajo excedió el límite
+        (si ya corría en un worker, el pool se recicla; si seguía en la cola
+        solo se cancela) y AnalisisNoDisponible (503) si un worker cayó
+        mientras corría, lo que alcanza a todos los trabajos en curso en ese
+        pool y reconstruye el pool. Si el pool se terminó por el tiempo
+        excedido de OTRO trabajo, este se reenvía una vez al pool nuevo con
+        un límite de tiempo completo (la respuesta puede tardar hasta el doble).
+        """
+        for intento in range(2):
+            pool = self._pool
+            if pool is None:
+                raise AnalisisNoDisponible()
+
+            try:
+                futuro = pool.executor.submit(func, *args)
+            except RuntimeError:
+                # Pool roto (BrokenProcessPool) o cerrado entre leerlo y enviar el trabajo
+                if not pool.terminado and self._pool is pool:
+                    await asyncio.to_thread(self._reiniciar, pool)
+                    raise AnalisisNoDisponible()
+                futuro = None
+            try:
+                if futuro is not None:
+                    return await asyncio.wait_for(asyncio.wrap_future(futuro), timeout=self.timeout_segundos)
+            except asyncio.TimeoutError:
+                # Si seguía en la cola, wait_for ya lo canceló: no hay worker que liberar
+                if not futuro.cancelled():
+                    logger.error(
+                        f"❌ Análisis excedió {self.timeout_segundos} s; reciclando el pool de análisis"
+                    )
+                    await asyncio.to_thread(self._reiniciar, pool)
+                raise AnalisisExcedioTiempo(self.timeout_segundos)
+            except asyncio.CancelledError:
+                # Cancelado por terminar() (cancel_futures) o porque se canceló esta solicitud
+                if asyncio.current_task().cancelling() or not pool.terminado:
+                    raise
+            except BrokenProcessPool:
+                if not pool.terminado:
+                    logger.error("❌ Pool de análisis roto (un worker terminó abruptamente); reconstruyendo")
+                    await asyncio.to_thread(self._reiniciar, pool)
+                    raise AnalisisNoDisponible()
+
+            # El pool lo terminó el tiempo excedido de otro trabajo: reenviar
+            if intento == 0:
+                logger.warning("♻️ Pool de análisis reciclado por otro trabajo; reenviando")
+        raise AnalisisNoDisponible()
+
+
+_settings = get_settings()
+
+analysis_executor = AnalysisExecutor(
+    max_workers=_settings.ANALYSIS_WORKERS,
+    max_tasks_per_child=_settings.ANALYSIS_MAX_TASKS_PER_CHILD,
+    timeout_segundos=_settings.ANALYSIS_TIMEOUT_SECONDS
+)
@@ -13,6 +13,13 @@ import logging
 from typing import Optional, List, Dict, Any
 import json
 from decimal import Decimal, ROUND_HALF_UP
+import sys
+
+# Motor de cálculo compartido con el parser
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'parser'))
+from utils.parametros_imss import parametros
+from utils.segmentos_250 import IndicePromedio250, promedio_250_semanas
+from simulador_modalidad40 import SimuladorModalidad40, fechas_inicio_mensuales, pension_ley73_mensual
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -29,6 +36,10 @@ PARSER_URL = os.getenv("PARSER_URL", "http://localhost:8001/parse")
 SHEETS_CREDS_PATH = os.getenv("SHEETS_CREDS_PATH", "")
 GDRIVE_SHEET_ID = os.getenv("GDRIVE_SHEET_ID", "")
 GDRIVE_SHEET_TAB = os.getenv("GDRIVE_SHEET_TAB", "Registros")
+# Presupuesto de latencia del simulador de Modalidad 40 (ms por solicitud)
+M40_PRESUPUESTO_MS = float(os.getenv("M40_PRESUPUESTO_MS", "2000"))
+# Máximo de escenarios (salarios × fechas de inicio × duraciones) por solicitud
+M40_MAX_ESCENARIOS = int(os.getenv("M40_MAX_ESCENARIOS", "50000"))
 
 # Modelos de datos mejorados
 class PeriodoLaboral(BaseModel):
@@ -87,10 +98,19 @@ class ResultadoCompleto(BaseModel):
     errors: List[str] = []
 
 class IMSSAnalyzer:
-    def __init__(self):
-        self.uma_2024 = 108.57  # UMA vigente 2024
-        self.salario_minimo_2024 = 248.93
-        self.pension_garantizada_2024 = self.salario_minimo_2024 * 30.44
+    # UMA, SMG y topes vienen del almacén de parámetros del parser (utils/parametros_imss.py)
+    
+    @property
+    def uma_vigente(self) -> float:
+        return parametros.uma(datetime.now())
+    
+    @property
+    def salario_minimo_vigente(self) -> float:
+        return parametros.smg(datetime.now())
+    
+    @property
+    def pension_garantizada(self) -> float:
+        return self.salario_minimo_vigente * 30.44
         
     def analizar_constancia(self, parsed_data: Dict, fecha_nacimiento: Optional[str] = None) -> ResultadoCompleto:
         """Análisis completo de constancia IMSS"""
@@ -194,72 +214,93 @@ class IMSSAnalyzer:
         )
     
     def _calcular_salario_promedio_250_semanas(self, periodos: List[PeriodoLaboral], fecha_emision: str) -> float:
-        """Calcula salario promedio de las últimas 250 semanas"""
+        """Calcula salario promedio de las últimas 250 semanas cotizadas (motor de segmentos del parser)"""
         if not periodos or not fecha_emision:
             return 0.0
         
         try:
             fecha_fin = datetime.strptime(fecha_emision, '%Y-%m-%d')
-            fecha_inicio = fecha_fin - timedelta(days=1750)  # 250 semanas = 1750 días
-            
-            salarios_dias = []
-            fecha_actual = fecha_inicio
+            tramos = self._construir_tramos(periodos, fecha_fin)
             
-            while fecha_actual <= fecha_fin:
-                salarios_fecha = []
-                
-                # Buscar empleos activos en esta fecha
-                for periodo in periodos:
-                    if not periodo.fecha_alta:
-                        continue
-                    
-                    inicio_periodo = datetime.strptime(periodo.fecha_alta, '%Y-%m-%d')
-                    
-                    if periodo.fecha_baja:
-                        fin_periodo = datetime.strptime(periodo.fecha_baja, '%Y-%m-%d')
-                    else:
-                        fin_periodo = fecha_fin  # Empleo vigente
-                    
-                    if inicio_periodo <= fecha_actual <= fin_periodo:
-                        salarios_fecha.append(periodo.salario_base)
-                
-                # En caso de traslape, tomar el menor salario
-                if salarios_fecha:
-                    salarios_dias.append(min(salarios_fecha))
-                
-                fecha_actual += timedelta(days=1)
+            # Traslapes: se suman salarios con el tope diario del SBC vigente cada día
+            ventana = promedio_250_semanas(
+                tramos, fecha_fin.toordinal(), parametros.tope_diario, cortes=parametros.cortes_tope()
+            )
             
-            return round(sum(salarios_dias) / len(salarios_dias), 2) if salarios_dias else 0.0
+            return round(ventana.promedio_diario, 2)
             
         except Exception as e:
             logger.error(f"Error calculando salario promedio: {e}")
             return 0.0
     
+    def _construir_tramos(self, periodos: List[PeriodoLaboral], fin_vigentes: datetime) -> List[tuple]:
+        """Tramos (inicio, fin, salario, origen) del motor de segmentos; los vigentes cierran en `fin_vigentes`"""
+        tramos = []
+        for periodo in periodos:
+            if not periodo.fecha_alta:
+                continue
+            
+            inicio_periodo = datetime.strptime(periodo.fecha_alta, '%Y-%m-%d')
+            
+            if periodo.fecha_baja:
+                fin_periodo = datetime.strptime(periodo.fecha_baja, '%Y-%m-%d')
+            else:
+                fin_periodo = fin_vigentes  # Empleo vigente
+            
+            tramos.append((inicio_periodo.toordinal(), fin_periodo.toordinal(), periodo.salario_base, None))
+        return tramos
+    
     def _calcular_pension_ley73(self, semanas: int, salario_promedio: float) -> float:
-        """Cálculo pensión Ley 73"""
-        if semanas < 500:
-            return 0.0
-        
-        # Cuantía básica (35% del salario promedio)
-        cuantia_basica = salario_promedio * 0.35
+        """Cálculo pensión Ley 73 (cuantía básica 35% + 0.563% por semana después de 500)"""
+        pension_minima = self.salario_minimo_vigente * 30.4
+        pension_maxima = parametros.tope_diario(datetime.now()) * 30.4
         
-        # Incrementos por semanas adicionales (0.563% por semana después de 500)
-        semanas_adicionales = max(0, semanas - 500)
-        incremento = semanas_adicionales * (salario_promedio * 0.00563)
-        
-        pension_diaria = cuantia_basica + incremento
-        pension_mensual = pension_diaria * 30.4
-        
-        # Aplicar límites
-        pension_minima = self.salario_minimo_2024 * 30.4
-        pension_maxima = self.uma_2024 * 25 * 30.4
+        return pension_ley73_mensual(semanas, salario_promedio, pension_minima, pension_maxima)
+    
+    def simular_modalidad40(self, parsed_data: Dict, fecha_inicio_desde: str, fecha_inicio_hasta: str,
+                            duraciones_meses: List[int], salarios_umas: List[float],
+                            presupuesto_ms: Optional[float]) -> Dict[str, Any]:
+        """
+        Frente de Pareto costo vs pensión para escenarios de Modalidad 40
+        
+        La carrera se indexa una vez; los empleos vigentes siguen cotizando
+        hasta la última fecha de inicio candidata.
+        """
+        fecha_emision = parsed_data.get('fecha_emision')
+        if not fecha_emision:
+            raise ValueError("Se requiere fecha_emision para simular Modalidad 40")
+        
+        corte = datetime.strptime(fecha_emision, '%Y-%m-%d')
+        desde = datetime.strptime(fecha_inicio_desde, '%Y-%m-%d')
+        hasta = datetime.strptime(fecha_inicio_hasta, '%Y-%m-%d')
+        if hasta < desde:
+            raise ValueError("fecha_inicio_hasta debe ser igual o posterior a fecha_inicio_desde")
+        
+        periodos = [PeriodoLaboral(**p) for p in parsed_data.get('periodos_laborales', [])]
+        tramos = self._construir_tramos(periodos, max(corte, hasta))
+        indice = IndicePromedio250.desde_tramos(
+            tramos, parametros.tope_diario, cortes=parametros.cortes_tope()
+        )
         
-        return min(max(pension_mensual, pension_minima), pension_maxima)
+        simulador = SimuladorModalidad40(
+            indice,
+            semanas_actuales=parsed_data.get('semanas_cotizadas', 0) or 0,
+            fecha_corte=corte.date(),
+            pension_minima=self.salario_minimo_vigente * 30.4,
+            pension_maxima=parametros.tope_diario(datetime.now()) * 30.4
+        )
+        resultado = simulador.simular(
+            salarios_umas,
+            fechas_inicio_mensuales(desde.date(), hasta.date()),
+            duraciones_meses,
+            presupuesto_ms=presupuesto_ms
+        )
+        return resultado.to_dict()
     
     def _calcular_pension_ley97(self, semanas: int, salario_promedio: float, periodos: List[PeriodoLaboral]) -> float:
         """Cálculo pensión Ley 97 (estimación básica)"""
         if semanas < 1250:
-            return self.pension_garantizada_2024
+            return self.pension_garantizada
         
         # Estimación del saldo acumulado en AFORE
         saldo_estimado = 0
@@ -274,12 +315,12 @@ class IMSSAnalyzer:
         factor_renta = 0.00417  # Aproximadamente 4.17% anual / 12 meses
         pension_mensual = saldo_estimado * factor_renta
         
-        return max(pension_mensual, self.pension_garantizada_2024)
+        return max(pension_mensual, self.pension_garantizada)
     
     def _calcular_costo_modalidad40(self, salario_promedio: float) -> float:
         """Calcula costo mensual de Modalidad 40"""
         # Base de cotización: entre 1 y 25 UMA
-        base_cotizacion = min(max(salario_promedio, self.uma_2024), self.uma_2024 * 25)
+        base_cotizacion = min(max(salario_promedio, self.uma_vigente), parametros.tope_diario(datetime.now()))
         
         # Cuota mensual: 11.4% sobre la base de cotización
         costo_mensual = base_cotizacion * 0.114 * 30.4
@@ -329,9 +370,9 @@ class IMSSAnalyzer:
         pension_mensual = saldo_proyectado / (20 * 12)
         
         # Generar recomendación
-        if pension_mensual > self.pension_garantizada_2024 * 2:
+        if pension_mensual > self.pension_garantizada * 2:
             recomendacion = "Excelente proyección AFORE. Continúe cotizando regularmente."
-        elif pension_mensual > self.pension_garantizada_2024:
+        elif pension_mensual > self.pension_garantizada:
             recomendacion = "Proyección AFORE aceptable. Considere Modalidad 40 para mejorar."
         else:
             recomendacion = "Proyección AFORE baja. Recomendamos Modalidad 40 y ahorro voluntario."
@@ -339,7 +380,7 @@ class IMSSAnalyzer:
         return ProyeccionAfore(
             saldo_estimado_actual=round(saldo_actual, 2),
             pension_mensual_estimada=round(pension_mensual, 2),
-            pension_garantizada=round(self.pension_garantizada_2024, 2),
+            pension_garantizada=round(self.pension_garantizada, 2),
             edad_retiro_estimada=edad_retiro,
             recomendacion=recomendacion
         )
@@ -438,6 +479,14 @@ async def health_check():
         "timestamp": datetime.now().isoformat()
     }
 
+@app.post("/parametros/recargar")
+async def recargar_parametros():
+    """Relee los parámetros históricos IMSS (UMA, SMG, topes) sin reiniciar el proceso"""
+    try:
+        return {"status": "success", **parametros.recargar()}
+    except (OSError, ValueError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=f"Archivo de parámetros inválido: {str(e)}")
+
 @app.post("/upload-pdf", response_model=ResultadoCompleto)
 async def upload_pdf(
     background_tasks: BackgroundTasks,
@@ -489,6 +538,74 @@ async def analyze_only(parsed_data: Dict, fecha_nacimiento: Optional[str] = None
         logger.error(f"Error en analyze-only: {e}")
         raise HTTPException(status_code=500, detail=f"Error en análisis: {str(e)}")
 
+@app.post("/simulate/modalidad40")
+def simulate_modalidad40(
+    parsed_data: Dict,
+    fecha_inicio_desde: str,
+    fecha_inicio_hasta: str,
+    duracion_min_meses: int = 12,
+    duracion_max_meses: int = 60,
+    paso_meses: int = 3,
+    uma_min: float = 1,
+    uma_max: float = 25,
+    paso_umas: float = 1,
+    presupuesto_ms: Optional[float] = None
+):
+    """
+    Simulador de Modalidad 40: barre salario registrado (UMA), fecha de inicio
+    (mensual) y duración, y devuelve el frente de Pareto costo vs pensión
+
+    Es CPU puro: se declara sin async para que FastAPI lo corra en su pool de
+    hilos y no bloquee el event loop. El presupuesto no pasa de
+    M40_PRESUPUESTO_MS y la rejilla no pasa de M40_MAX_ESCENARIOS escenarios.
+    """
+    if paso_meses <= 0 or paso_umas <= 0:
+        raise HTTPException(status_code=400, detail="Los pasos deben ser positivos")
+    try:
+        desde = datetime.strptime(fecha_inicio_desde, '%Y-%m-%d')
+        hasta = datetime.strptime(fecha_inicio_hasta, '%Y-%m-%d')
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Fecha inválida: {e}")
+
+    # Antes de la emisión los días ya cuentan en la constancia: sumar M40 los contaría dos veces
+    fecha_emision = parsed_data.get('fecha_emision')
+    if fecha_emision:
+        try:
+            emision = datetime.strptime(fecha_emision, '%Y-%m-%d')
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Fecha de emisión inválida: {e}")
+        if desde <= emision:
+            raise HTTPException(
+                status_code=422,
+                detail=f"fecha_inicio_desde debe ser posterior a la fecha de emisión ({fecha_emision})"
+            )
+
+    # Tamaño de la rejilla antes de construirla
+    rango_duraciones = range(max(1, duracion_min_meses), duracion_max_meses + 1, paso_meses)
+    uma_desde, uma_hasta = max(1.0, uma_min), min(25.0, uma_max)
+    n_salarios = int((uma_hasta - uma_desde) / paso_umas + 1e-9) + 1 if uma_hasta >= uma_desde else 0
+    n_fechas = max(0, (hasta.year - desde.year) * 12 + hasta.month - desde.month + 1)
+    escenarios = len(rango_duraciones) * n_salarios * n_fechas
+    if escenarios > M40_MAX_ESCENARIOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"La rejilla tiene {escenarios} escenarios; el máximo es {M40_MAX_ESCENARIOS}"
+        )
+    
+    duraciones = list(rango_duraciones)
+    salarios_umas = [round(uma_desde + k * paso_umas, 2) for k in range(n_salarios)]
+    presupuesto = M40_PRESUPUESTO_MS if presupuesto_ms is None else min(max(presupuesto_ms, 1), M40_PRESUPUESTO_MS)
+    
+    try:
+        return analyzer.simular_modalidad40(
+            parsed_data, fecha_inicio_desde, fecha_inicio_hasta, duraciones, salarios_umas, presupuesto
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error en simulate/modalidad40: {e}")
+        raise HTTPException(status_code=500, detail=f"Error en simulación: {str(e)}")
+
 @app.post("/sheets-ping")
 async def sheets_ping():
     """Test de conexión a Google Sheets"""
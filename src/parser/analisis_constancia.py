@@ -0,0 +1,126 @@
+"""
+Pipeline completo de análisis de una constancia IMSS
+Réplica del flujo de main.py empaquetada en una sola función sin estado,
+apta para ejecutarse dentro de un worker de un pool de procesos
+
+COORDINA CON: extraccion_texto_pdf.py, correccion_semanas_final.py,
+              calculo_250_semanas.py, conservacion_derechos.py,
+              procesador_semanas_descontadas.py
+USO: from analisis_constancia import ejecutar_analisis
+"""
+
+from typing import Dict, Any, Optional
+
+from modules.modulo2.historial_laboral import HistorialLaboralExtractor, MOTOR_REGEX
+from correccion_semanas_final import aplicar_correccion_con_carrera
+from calculo_250_semanas import calcular_promedio_250_desde_correccion
+from conservacion_derechos import CalculadoraConservacionDerechos
+from procesador_semanas_descontadas import ProcesadorSemanasDescontadas
+from extraccion_texto_pdf import extraer_texto_constancia, FuentePDF, MODO_SERIAL, MOTOR_PDFPLUMBER
+
+# Incrementar cuando cambie cualquier regla o calculadora del pipeline:
+# invalida los resultados guardados en la caché de análisis
+VERSION_MOTOR = "2025.1"
+
+
+def ejecutar_analisis(fuente_pdf: FuentePDF,
+                      modo_extraccion: str = MODO_SERIAL,
+                      max_workers_extraccion: Optional[int] = None,
+                      motor_extraccion: str = MOTOR_PDFPLUMBER,
+                      omitir_paginas: bool = False,
+                      motor_periodos: str = MOTOR_REGEX) -> Dict[str, Any]:
+    """
+    Ejecuta todos los pasos CPU-bound del análisis en el orden del main.py
+
+    1. Extracción de texto del PDF
+    2. Historial laboral base
+    3. Corrección de empalmes
+    4. Semanas descontadas
+    5. Conservación de derechos
+    6. Promedio salarial 250 semanas (solo Ley 73)
+
+    Args:
+        fuente_pdf: Ruta al PDF (archivo temporal del upload) o sus bytes
+        modo_extraccion: "serial" o "paralelo"
+        max_workers_extraccion: Tope de procesos para la extracción paralela
+        motor_extraccion: "pdfplumber" o "pdfium" (con respaldo a pdfplumber)
+        omitir_paginas: Extraer solo páginas con datos (omite avisos legales)
+        motor_periodos: "regex", "coordenadas" (tabla por coordenadas del PDF) o "lineal"
+
+    Returns:
+        Dict serializable con datos_corregidos, semanas_descontadas,
+        conservacion, promedio_250 y extraccion (motor y páginas omitidas)
+    """
+    # PASO 0: Extraer texto del PDF (CRÍTICO: se usa en varios pasos)
+    extraccion = extraer_texto_constancia(
+        fuente_pdf,
+        motor=motor_extraccion,
+        modo=modo_extraccion,
+        max_workers=max_workers_extraccion,
+        omitir_paginas=omitir_paginas
+    )
+    texto_completo = extraccion.texto
+
+    # PASO 1: Extraer historial laboral base
+    paginas = None
+    if extraccion.paginas_omitidas:
+        omitidas = set(extraccion.paginas_omitidas)
+        paginas = [i for i in range(extraccion.paginas_totales) if i + 1 not in omitidas]
+
+    # Documento parseado una sola vez (texto normalizado + datos básicos)
+    extractor = HistorialLaboralExtractor(motor_periodos=motor_periodos)
+    documento = extractor.crear_documento(texto_completo, fuente_pdf, paginas)
+    datos_base, carrera_parser = extractor.procesar_constancia_con_carrera(documento)
+
+    # PASO 2: Aplicar corrección de empalmes (CRÍTICO)
+    # La carrera (fechas ya leídas) pasa del parser a todos los calculadores,
+    # y el mapa de días de la corrección a la conservación de derechos
+    datos_corregidos, carrera, mapa_dias = aplicar_correccion_con_carrera(datos_base, carrera_parser)
+
+    # PASO 3: Procesar semanas descontadas
+    try:
+        procesador_descuentos = ProcesadorSemanasDescontadas()
+        analisis_descuentos = procesador_descuentos.procesar_semanas_desde_correccion(datos_corregidos)
+        semanas_descontadas = analisis_descuentos.to_dict() if analisis_descuentos else None
+    except Exception as e:
+        semanas_descontadas = {"error": f"No se pudo procesar: {str(e)}"}
+
+    # PASO 4: Calcular conservación de derechos
+    fecha_emision = datos_corregidos.get('datos_basicos', {}).get('fecha_emision')
+    try:
+        calculadora_conservacion = CalculadoraConservacionDerechos()
+        resultado_conservacion = calculadora_conservacion.calcular_conservacion_derechos(
+            datos_corregidos=datos_corregidos,
+            fecha_emision=fecha_emision,
+            mapa_dias=mapa_dias,
+            carrera=carrera
+        )
+        conservacion = resultado_conservacion.to_dict() if resultado_conservacion else None
+    except Exception as e:
+        conservacion = {"error": f"No se pudo calcular: {str(e)}"}
+
+    # PASO 5: Calcular promedio 250 semanas (solo para Ley 73)
+    ley_aplicable = datos_corregidos.get("datos_basicos", {}).get("ley_aplicable")
+
+    if ley_aplicable == "Ley 73":
+        try:
+            promedio_250 = calcular_promedio_250_desde_correccion(
+                datos_corregidos=datos_corregidos,
+                fecha_referencia=fecha_emision,
+                debug=True,
+                carrera=carrera
+            )
+        except Exception as e:
+            promedio_250 = {"error": f"No se pudo calcular: {str(e)}"}
+    else:
+        promedio_250 = {
+            "mensaje": f"El cálculo de 250 semanas solo aplica para Ley 73. Ley aplicable: {ley_aplicable}"
+        }
+
+    return {
+        "datos_corregidos": datos_corregidos,
+        "semanas_descontadas": semanas_descontadas,
+        "conservacion": conservacion,
+        "promedio_250": promedio_250,
+        "extraccion": extraccion.to_dict()
+    }
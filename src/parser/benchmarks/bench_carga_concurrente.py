@@ -0,0 +1,129 @@
+"""
+Benchmark: RSS máximo con N uploads concurrentes de PDFs grandes
+
+Compara el flujo anterior (await upload.read() + BytesIO para pdfplumber)
+contra recibir_pdf (valida por bloques el archivo del upload, sin copiarlo, y
+cuenta páginas con pdfium en un hilo). Cada modo corre en
+un subproceso propio porque ru_maxrss solo crece durante la vida del proceso.
+
+Los uploads se simulan igual que los entrega Starlette: UploadFile sobre un
+SpooledTemporaryFile que pasa a disco al superar 1 MB.
+
+USO: python benchmarks/bench_carga_concurrente.py [--concurrentes 50] [--tamano-mb 10]
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from starlette.datastructures import UploadFile
+
+from carga_pdf import recibir_pdf
+
+MODO_ANTES = "antes"
+MODO_DESPUES = "despues"
+
+# Tiempo que cada solicitud retiene su PDF (simula el análisis en curso)
+RETENCION_SEGUNDOS = 0.5
+
+
+def construir_pdf_sintetico(tamano_bytes: int) -> bytes:
+    """PDF válido de una página cuyo content stream es relleno hasta `tamano_bytes`"""
+    relleno = b" " * max(tamano_bytes - 400, 0)
+    objetos = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R >>",
+        b"<< /Length " + str(len(relleno)).encode() + b" >>\nstream\n" + relleno + b"\nendstream",
+    ]
+
+    salida = io.BytesIO()
+    salida.write(b"%PDF-1.4\n")
+    offsets = []
+    for numero, cuerpo in enumerate(objetos, start=1):
+        offsets.append(salida.tell())
+        salida.write(f"{numero} 0 obj\n".encode() + cuerpo + b"\nendobj\n")
+
+    inicio_xref = salida.tell()
+    salida.write(f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        salida.write(f"{offset:010d} 00000 n \n".encode())
+    salida.write(f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\n".encode())
+    salida.write(f"startxref\n{inicio_xref}\n%%EOF\n".encode())
+    return salida.getvalue()
+
+
+def crear_upload(contenido: bytes) -> UploadFile:
+    archivo = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    archivo.write(contenido)
+    archivo.seek(0)
+    return UploadFile(archivo, filename="constancia.pdf")
+
+
+async def solicitud_antes(upload: UploadFile):
+    contenido = await upload.read()
+    flujo = io.BytesIO(contenido)  # lo que recibía pdfplumber.open
+    await asyncio.sleep(RETENCION_SEGUNDOS)
+    return len(flujo.getbuffer())
+
+
+async def solicitud_despues(upload: UploadFile):
+    pdf_cargado = await recibir_pdf(upload, max_bytes=1024 ** 3, max_paginas=0)
+    try:
+        await asyncio.sleep(RETENCION_SEGUNDOS)
+        return pdf_cargado.tamano_bytes
+    finally:
+        pdf_cargado.eliminar()
+
+
+def rss_maximo_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def ejecutar_modo(modo: str, concurrentes: int, tamano_mb: int):
+    contenido = construir_pdf_sintetico(tamano_mb * 1024 * 1024)
+    uploads = [crear_upload(contenido) for _ in range(concurrentes)]
+    del contenido
+
+    rss_inicial = rss_maximo_mb()
+    solicitud = solicitud_antes if modo == MODO_ANTES else solicitud_despues
+
+    async def lanzar():
+        return await asyncio.gather(*(solicitud(upload) for upload in uploads))
+
+    asyncio.run(lanzar())
+    rss_final = rss_maximo_mb()
+    print(f"{modo:>8} {rss_inicial:>14.1f} {rss_final:>12.1f} {rss_final - rss_inicial:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrentes", type=int, default=50)
+    parser.add_argument("--tamano-mb", type=int, default=10)
+    parser.add_argument("--modo", choices=[MODO_ANTES, MODO_DESPUES])
+    args = parser.parse_args()
+
+    if args.modo:
+        ejecutar_modo(args.modo, args.concurrentes, args.tamano_mb)
+        return
+
+    print(f"{args.concurrentes} uploads concurrentes de {args.tamano_mb} MB")
+    print(f"{'Modo':>8} {'RSS base (MB)':>14} {'RSS pico (MB)':>12} {'Incremento (MB)':>14}")
+    for modo in (MODO_ANTES, MODO_DESPUES):
+        subprocess.run([
+            sys.executable, os.path.abspath(__file__),
+            "--modo", modo,
+            "--concurrentes", str(args.concurrentes),
+            "--tamano-mb", str(args.tamano_mb)
+        ], check=True)
+
+
+if __name__ == "__main__":
+    main()
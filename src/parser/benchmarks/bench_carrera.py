@@ -0,0 +1,87 @@
+"""
+Benchmark: modelo de carrera (modules/modulo3/utils/carrera.py)
+
+Para carreras sintéticas con movimientos salariales compara:
+
+- strptime   leer todas las fechas con datetime.strptime, una vez por etapa
+             (corrector, calculadora 250, conservación, resolvedor)
+- modelo     construir la Carrera una vez con el códec de date_helpers
+
+y verifica que `Carrera.desde_periodos(p).a_dicts() == p` (puente sin pérdida).
+
+USO: python benchmarks/bench_carrera.py [--periodos 40] [--movimientos 6] [--repeticiones 50]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules.modulo3.utils.carrera import Carrera
+from bench_promedio_250 import FECHA_EMISION, generar_carrera
+
+# Etapas del pipeline que antes releían las fechas de texto
+ETAPAS = 4
+
+
+def agregar_movimientos(periodos, n: int, rng: random.Random):
+    """Cambios de salario dentro de cada período (dd/mm/aaaa)"""
+    for periodo in periodos:
+        inicio = datetime.strptime(periodo['fecha_inicio'], '%d/%m/%Y').toordinal()
+        periodo['cambios_salario'] = [
+            {
+                'fecha': date.fromordinal(inicio + rng.randint(0, 1000)).strftime('%d/%m/%Y'),
+                'salario_diario': round(rng.uniform(150, 1800), 2),
+                'tipo': 'MODIFICACION'
+            }
+            for _ in range(rng.randint(0, n))
+        ]
+    return periodos
+
+
+def leer_con_strptime(periodos):
+    fechas = 0
+    for periodo in periodos:
+        datetime.strptime(periodo['fecha_inicio'], '%d/%m/%Y')
+        if periodo['fecha_fin'] != 'Vigente':
+            datetime.strptime(periodo['fecha_fin'], '%d/%m/%Y')
+        for cambio in periodo['cambios_salario']:
+            datetime.strptime(cambio['fecha'], '%d/%m/%Y')
+            fechas += 1
+    return fechas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--periodos", type=int, default=40)
+    parser.add_argument("--movimientos", type=int, default=6)
+    parser.add_argument("--repeticiones", type=int, default=50)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    n = args.repeticiones
+    periodos = agregar_movimientos(generar_carrera(args.periodos, rng), args.movimientos, rng)
+
+    carrera = Carrera.desde_periodos(periodos, FECHA_EMISION)
+    sin_perdida = carrera.a_dicts() == periodos
+    movimientos = sum(len(p.movimientos) for p in carrera)
+
+    t_strptime = timeit.timeit(lambda: [leer_con_strptime(periodos) for _ in range(ETAPAS)], number=n) / n * 1e3
+    t_modelo = timeit.timeit(lambda: Carrera.desde_periodos(periodos, FECHA_EMISION), number=n) / n * 1e3
+    t_dicts = timeit.timeit(carrera.a_dicts, number=n) / n * 1e3
+
+    print(f"{args.periodos} períodos, {movimientos} movimientos, {len(carrera.patrones)} patrones | "
+          f"{n} repeticiones | ms por llamada")
+    print(f"strptime × {ETAPAS} etapas: {t_strptime:8.3f}")
+    print(f"Carrera una vez:      {t_modelo:8.3f}  ({t_strptime / t_modelo:.1f}x)")
+    print(f"a_dicts():            {t_dicts:8.3f}")
+    print(f"Puente sin pérdida:   {'Sí' if sin_perdida else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
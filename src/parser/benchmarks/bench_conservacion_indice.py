@@ -0,0 +1,72 @@
+"""
+Benchmark: índice de conservación de derechos (conservacion_derechos.py)
+
+Para una carrera sintética compara el estado de derechos en N fechas:
+
+- puntual   calcular_conservacion_derechos una vez por fecha (fecha_actual
+            distinta), que vuelve a leer todos los períodos en cada llamada
+- indice    construir_indice una vez y consultar_fechas (O(log n) por fecha)
+
+y verifica que ambos coincidan en la fecha de vencimiento y en si los
+derechos ya vencieron en cada fecha.
+
+USO: python benchmarks/bench_conservacion_indice.py [--periodos 40] [--fechas 365]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from conservacion_derechos import CalculadoraConservacionDerechos, ESTADO_VENCIDO
+from bench_promedio_250 import FECHA_EMISION, generar_carrera
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--periodos", type=int, default=40)
+    parser.add_argument("--fechas", type=int, default=365)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    periodos = generar_carrera(args.periodos, rng)
+    periodos[-1]['fecha_fin'] = '31/12/2021'   # con baja: hay vencimiento real
+    datos = {
+        'datos_basicos': {'fecha_emision': FECHA_EMISION, 'total_semanas_cotizadas': 1200},
+        'historial_laboral': {'periodos': periodos}
+    }
+    fechas = [datetime(2024, 1, 1) + timedelta(days=7 * k) for k in range(args.fechas)]
+
+    t0 = time.perf_counter()
+    puntuales = []
+    for fecha in fechas:
+        calculadora = CalculadoraConservacionDerechos()
+        calculadora.fecha_actual = fecha
+        puntuales.append(calculadora.calcular_conservacion_derechos(datos))
+    t_puntual = (time.perf_counter() - t0) * 1e3
+
+    t0 = time.perf_counter()
+    indice = CalculadoraConservacionDerechos().construir_indice(datos)
+    consultas = indice.consultar_fechas(fecha.toordinal() for fecha in fechas)
+    t_indice = (time.perf_counter() - t0) * 1e3
+
+    iguales = all(
+        p.esta_vigente == (c['estado'] != ESTADO_VENCIDO)
+        and p.fecha_vencimiento.date().isoformat() == indice.to_dict()['fecha_vencimiento']
+        for p, c in zip(puntuales, consultas)
+    )
+
+    print(f"{args.periodos} períodos, {args.fechas} fechas | ms totales")
+    print(f"Puntual por fecha:   {t_puntual:9.2f}")
+    print(f"Índice + consultas:  {t_indice:9.2f}  ({t_puntual / t_indice:.1f}x)")
+    print(f"Línea de tiempo:     {len(indice.linea_tiempo())} tramos")
+    print(f"Coinciden:           {'Sí' if iguales else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark de asignaciones: copias en la etapa de corrección
+
+Compara con tracemalloc la corrección con copias profundas por JSON (como
+hacían migrar_nomenclatura_oficial y corregir_resultado_completo: dos viajes
+json.dumps/json.loads del resultado completo) contra la corrección actual,
+que comparte con la entrada los sub-objetos que no cambian.
+
+- pico       memoria máxima asignada durante la llamada
+- retenido   memoria que sigue asignada mientras se conserva el resultado
+             (lo que el resultado no comparte con la entrada)
+
+USO: python benchmarks/bench_copias_correccion.py [--movimientos 6] [--repeticiones 20]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from correccion_semanas_final import aplicar_correccion_exacta
+from bench_carrera import agregar_movimientos
+from bench_promedio_250 import FECHA_EMISION, generar_carrera
+
+TAMANOS = (10, 50, 200)
+
+
+def resultado_parser(n: int, movimientos: int, rng: random.Random):
+    """Resultado sintético con la forma de HistorialLaboralExtractor.procesar_constancia"""
+    periodos = agregar_movimientos(generar_carrera(n, rng), movimientos, rng)
+    for periodo in periodos:
+        periodo['semanas_cotizadas'] = rng.randint(4, 300)
+        periodo['total_movimientos'] = len(periodo['cambios_salario'])
+    return {
+        "exito": True,
+        "datos_basicos": {
+            "fecha_emision": FECHA_EMISION,
+            "nombre": "ASEGURADO SINTETICO",
+            "total_semanas_cotizadas": 1200,
+            "semanas_cotizadas_imss": 1200,
+            "semanas_descontadas": 0,
+            "semanas_reintegradas": 0
+        },
+        "historial_laboral": {"total_periodos": n, "periodos": periodos},
+        "debug": {"semanas_calculadas": 1250, "registros_encontrados": [p['registro_patronal'] for p in periodos]}
+    }
+
+
+def correccion_con_copias_json(resultado):
+    """Mismo trabajo con las dos copias profundas que hacía el pipeline anterior"""
+    migrado = json.loads(json.dumps(resultado))
+    return aplicar_correccion_exacta(json.loads(json.dumps(migrado)))
+
+
+def medir_memoria(funcion, resultado):
+    """(pico, retenido) en KiB"""
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    corregido = funcion(resultado)
+    actual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del corregido
+    return (pico - base) / 1024, (actual - base) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movimientos", type=int, default=6)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    n = args.repeticiones
+
+    print(f"{n} repeticiones | memoria en KiB, tiempo en ms por llamada")
+    print(f"{'Períodos':>9} {'Pico JSON':>10} {'Pico':>8} {'Ret. JSON':>10} {'Ret.':>8} "
+          f"{'ms JSON':>8} {'ms':>7} {'Igual':>6}")
+
+    for tamano in TAMANOS:
+        resultado = resultado_parser(tamano, args.movimientos, rng)
+        igual = correccion_con_copias_json(resultado) == aplicar_correccion_exacta(resultado)
+
+        pico_json, retenido_json = medir_memoria(correccion_con_copias_json, resultado)
+        pico, retenido = medir_memoria(aplicar_correccion_exacta, resultado)
+
+        t_json = timeit.timeit(lambda: correccion_con_copias_json(resultado), number=n) / n * 1e3
+        t_actual = timeit.timeit(lambda: aplicar_correccion_exacta(resultado), number=n) / n * 1e3
+
+        print(f"{tamano:>9} {pico_json:>10.0f} {pico:>8.0f} {retenido_json:>10.0f} {retenido:>8.0f} "
+              f"{t_json:>8.2f} {t_actual:>7.2f} {'Sí' if igual else 'NO':>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Micro-benchmark por campo: extracción de datos básicos
+
+Compara, para cada campo, la búsqueda original (re.search de cada patrón sin
+compilar sobre todo el texto) contra el escáner con anclas (un recorrido
+para ubicar anclas + .match() de patrones precompilados solo en ellas).
+
+USO: python benchmarks/bench_datos_basicos.py constancia.pdf|texto.txt [--repeticiones 200]
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules.basic_extractor import (
+    PATTERNS, PATRONES_COMPILADOS, _FLAGS_CAMPO,
+    indexar_anclas, buscar_patron, iterar_patron
+)
+
+
+def cargar_texto(ruta: str) -> str:
+    if ruta.lower().endswith('.pdf'):
+        from extraccion_texto_pdf import extraer_texto_serial
+        return extraer_texto_serial(ruta)
+    with open(ruta, encoding='utf-8') as archivo:
+        return archivo.read()
+
+
+def campo_original(campo: str, texto: str):
+    """Flujo anterior: patrones como cadenas, re.search sobre todo el texto"""
+    flags = _FLAGS_CAMPO[campo]
+    if campo == 'alta':
+        return [m.group(1) for patron in PATTERNS[campo] for m in re.finditer(patron, texto, flags)]
+    for patron in PATTERNS[campo]:
+        match = re.search(patron, texto, flags)
+        if match:
+            return match.groups()
+    return None
+
+
+def campo_escaner(campo: str, texto: str, posiciones):
+    """Flujo nuevo: patrones precompilados probados solo en sus anclas"""
+    if campo == 'alta':
+        return [m.group(1) for patron, ancla in PATRONES_COMPILADOS[campo]
+                for m in iterar_patron(patron, ancla, texto, posiciones)]
+    for patron, ancla in PATRONES_COMPILADOS[campo]:
+        match = buscar_patron(patron, ancla, texto, posiciones)
+        if match:
+            return match.groups()
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("entrada", help="Constancia en PDF o texto ya extraído")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    texto = cargar_texto(args.entrada)
+    n = args.repeticiones
+    posiciones = indexar_anclas(texto)
+
+    print(f"Texto: {len(texto):,} caracteres | {n} repeticiones | tiempos en µs por llamada")
+    print(f"{'Campo':<18} {'Original':>10} {'Escáner':>10} {'Speedup':>8} {'Igual':>6}")
+
+    t_anclas = timeit.timeit(lambda: indexar_anclas(texto), number=n) / n * 1e6
+    print(f"{'(anclas)':<18} {'-':>10} {t_anclas:>10.1f}")
+
+    total_original = 0.0
+    total_escaner = t_anclas
+    for campo in PATTERNS:
+        t_original = timeit.timeit(lambda: campo_original(campo, texto), number=n) / n * 1e6
+        t_escaner = timeit.timeit(lambda: campo_escaner(campo, texto, posiciones), number=n) / n * 1e6
+        igual = campo_original(campo, texto) == campo_escaner(campo, texto, posiciones)
+        total_original += t_original
+        total_escaner += t_escaner
+        print(f"{campo:<18} {t_original:>10.1f} {t_escaner:>10.1f} "
+              f"{t_original / t_escaner:>7.1f}x {'Sí' if igual else 'NO':>6}")
+
+    print(f"{'TOTAL':<18} {total_original:>10.1f} {total_escaner:>10.1f} "
+          f"{total_original / total_escaner:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
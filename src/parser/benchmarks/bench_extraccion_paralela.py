@@ -0,0 +1,73 @@
+"""
+Benchmark: extracción de texto serial vs paralela según número de páginas
+
+Construye documentos de 5 a 40 páginas repitiendo las páginas de una constancia
+real, mide ambos modos y verifica que el texto sea idéntico byte a byte.
+
+USO: python benchmarks/bench_extraccion_paralela.py constancia.pdf [--workers 4] [--repeticiones 3]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pypdfium2 as pdfium
+
+from extraccion_texto_pdf import extraer_texto_serial, extraer_texto_paralelo
+
+PAGINAS_A_PROBAR = [5, 10, 15, 20, 30, 40]
+
+
+def construir_pdf(ruta_base: str, paginas: int) -> bytes:
+    """Genera un PDF de `paginas` páginas ciclando las páginas del documento base"""
+    origen = pdfium.PdfDocument(ruta_base)
+    destino = pdfium.PdfDocument.new()
+    total_origen = len(origen)
+    indices = [i % total_origen for i in range(paginas)]
+    destino.import_pages(origen, indices)
+
+    buffer = io.BytesIO()
+    destino.save(buffer)
+    return buffer.getvalue()
+
+
+def medir(funcion, *args, repeticiones: int = 3, **kwargs):
+    """Devuelve (mejor_tiempo, resultado) de varias repeticiones"""
+    mejor = None
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(*args, **kwargs)
+        transcurrido = time.perf_counter() - inicio
+        mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+    return mejor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("pdf", help="Constancia IMSS de referencia")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Workers: {args.workers} | Núcleos disponibles: {os.cpu_count()}")
+    print(f"{'Páginas':>8} {'Serial (s)':>11} {'Paralelo (s)':>13} {'Speedup':>8} {'Idéntico':>9}")
+
+    for paginas in PAGINAS_A_PROBAR:
+        contenido = construir_pdf(args.pdf, paginas)
+        t_serial, texto_serial = medir(extraer_texto_serial, contenido, repeticiones=args.repeticiones)
+        t_paralelo, texto_paralelo = medir(
+            extraer_texto_paralelo, contenido,
+            max_workers=args.workers, repeticiones=args.repeticiones
+        )
+        identico = texto_serial.encode('utf-8') == texto_paralelo.encode('utf-8')
+        print(f"{paginas:>8} {t_serial:>11.3f} {t_paralelo:>13.3f} "
+              f"{t_serial / t_paralelo:>7.2f}x {'Sí' if identico else 'NO':>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: mapa de días (bitset) contra set de fechas
+
+Para historiales sintéticos de 5 a 500 períodos compara las tres consultas
+de semanas que hacen los calculadores:
+
+- unión: días únicos de toda la carrera
+- ventana: días cotizados en los últimos 5 años
+- huecos: días sin cotizar entre el primer y el último día cubiertos
+
+El set de fechas se construye enumerando cada día; el mapa, con un OR de
+máscaras por período. Cada fila verifica que ambos den el mismo resultado.
+
+USO: python benchmarks/bench_mapa_dias.py [--repeticiones 20] [--semilla 7]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from utils.mapa_dias import MapaDiasCarrera
+from bench_semanas_sin_empalmes import TAMANOS, FECHA_EMISION, generar_periodos
+
+REFERENCIA = date(2025, 6, 30)
+INICIO_VENTANA = REFERENCIA - timedelta(days=int(5 * 365.25))
+
+
+def construir_set(periodos, fecha_emision):
+    dias = set()
+    for periodo in periodos:
+        inicio = datetime.strptime(periodo['fecha_inicio'], '%d/%m/%Y').date()
+        if periodo['fecha_fin'] == 'Vigente':
+            fin = datetime.strptime(fecha_emision, '%Y-%m-%d').date()
+        else:
+            fin = datetime.strptime(periodo['fecha_fin'], '%d/%m/%Y').date()
+        dia = inicio
+        while dia <= fin:
+            dias.add(dia)
+            dia += timedelta(days=1)
+    return dias
+
+
+def huecos_set(dias):
+    ordenados = sorted(dias)
+    huecos = []
+    for anterior, siguiente in zip(ordenados, ordenados[1:]):
+        if (siguiente - anterior).days > 1:
+            huecos.append((anterior + timedelta(days=1), siguiente - timedelta(days=1)))
+    return huecos
+
+
+def consultas_set(periodos):
+    dias = construir_set(periodos, FECHA_EMISION)
+    union = len(dias)
+    ventana = sum(1 for dia in dias if INICIO_VENTANA <= dia <= REFERENCIA)
+    return union, ventana, huecos_set(dias)
+
+
+def consultas_mapa(periodos):
+    mapa = MapaDiasCarrera.desde_periodos(periodos, FECHA_EMISION)
+    return mapa.dias_cubiertos(), mapa.dias_entre(INICIO_VENTANA, REFERENCIA), mapa.huecos()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    n = args.repeticiones
+
+    print(f"{n} repeticiones | tiempos en ms (construcción + unión + ventana + huecos)")
+    print(f"{'Períodos':>9} {'Set fechas':>11} {'Bitset':>9} {'Speedup':>8} {'Días':>7} {'Huecos':>7} {'Igual':>6}")
+
+    for tamano in TAMANOS:
+        periodos = generar_periodos(tamano, rng)
+        esperado = consultas_set(periodos)
+        obtenido = consultas_mapa(periodos)
+
+        t_set = timeit.timeit(lambda: consultas_set(periodos), number=n) / n * 1e3
+        t_mapa = timeit.timeit(lambda: consultas_mapa(periodos), number=n) / n * 1e3
+
+        print(f"{tamano:>9} {t_set:>11.2f} {t_mapa:>9.3f} {t_set / t_mapa:>7.0f}x "
+              f"{obtenido[0]:>7} {len(obtenido[2]):>7} {'Sí' if esperado == obtenido else 'NO':>6}")
+
+    # Consultas sobre un mapa ya construido (lo que paga cada calculador)
+    periodos = generar_periodos(TAMANOS[-1], rng)
+    mapa = MapaDiasCarrera.desde_periodos(periodos, FECHA_EMISION)
+    dias = construir_set(periodos, FECHA_EMISION)
+    t_ventana_set = timeit.timeit(
+        lambda: sum(1 for dia in dias if INICIO_VENTANA <= dia <= REFERENCIA), number=n
+    ) / n * 1e6
+    t_ventana_mapa = timeit.timeit(lambda: mapa.dias_entre(INICIO_VENTANA, REFERENCIA), number=n) / n * 1e6
+    print(f"\nVentana de 5 años sobre estructura ya construida: set {t_ventana_set:.1f} µs | "
+          f"bitset {t_ventana_mapa:.2f} µs ({t_ventana_set / t_ventana_mapa:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
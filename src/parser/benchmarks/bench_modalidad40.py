@@ -0,0 +1,67 @@
+"""
+Benchmark: simulador de Modalidad 40
+
+Barre la malla completa (25 salarios × inicios mensuales × duraciones) sobre
+carreras sintéticas y reporta escenarios por segundo, el tamaño del frente de
+Pareto y cuántos escenarios caben en el presupuesto de latencia.
+
+USO: python benchmarks/bench_modalidad40.py [--carreras 5] [--periodos 40] [--presupuesto-ms 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from calculo_250_semanas import Calculadora250Semanas
+from simulador_modalidad40 import SimuladorModalidad40, fechas_inicio_mensuales
+from bench_promedio_250 import FECHA_EMISION, generar_carrera
+
+SALARIOS_UMAS = range(1, 26)
+FECHAS_INICIO = fechas_inicio_mensuales(date(2025, 7, 1), date(2027, 2, 1))   # 20 meses
+DURACIONES = range(3, 61, 3)                                                  # 20 duraciones
+# Los vigentes cotizan hasta la última fecha de inicio candidata
+FIN_VIGENTES = datetime.combine(FECHAS_INICIO[-1], datetime.min.time())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--carreras", type=int, default=5)
+    parser.add_argument("--periodos", type=int, default=40)
+    parser.add_argument("--presupuesto-ms", type=float, default=2000)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    calculadora = Calculadora250Semanas()
+    total = len(SALARIOS_UMAS) * len(FECHAS_INICIO) * len(DURACIONES)
+
+    print(f"{total} escenarios por carrera | presupuesto {args.presupuesto_ms:.0f} ms")
+    print(f"{'Carrera':>8} {'Índice ms':>10} {'Malla ms':>9} {'Esc/s':>9} {'Frente':>7} {'En presupuesto':>15}")
+
+    for n in range(args.carreras):
+        datos = {
+            'historial_laboral': {'periodos': generar_carrera(args.periodos, rng)},
+            'datos_basicos': {'fecha_emision': FECHA_EMISION}
+        }
+
+        t0 = time.perf_counter()
+        indice = calculadora.construir_indice(datos, FIN_VIGENTES)
+        t_indice = (time.perf_counter() - t0) * 1e3
+
+        simulador = SimuladorModalidad40(indice, semanas_actuales=rng.randint(800, 1600),
+                                         fecha_corte=date(2025, 6, 30))
+        completo = simulador.simular(SALARIOS_UMAS, FECHAS_INICIO, DURACIONES)
+        acotado = simulador.simular(SALARIOS_UMAS, FECHAS_INICIO, DURACIONES, presupuesto_ms=args.presupuesto_ms)
+
+        print(f"{n:>8} {t_indice:>10.2f} {completo.tiempo_ms:>9.1f} "
+              f"{completo.escenarios_evaluados / completo.tiempo_ms * 1e3:>9.0f} "
+              f"{len(completo.frente_pareto):>7} {acotado.escenarios_evaluados:>9}/{total}")
+
+
+if __name__ == "__main__":
+    main()
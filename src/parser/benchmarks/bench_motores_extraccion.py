@@ -0,0 +1,72 @@
+"""
+Benchmark: motor de texto pdfplumber vs pdfium sobre un corpus de constancias
+
+Para cada PDF mide el mejor tiempo de ambos motores e indica si el texto de
+pdfium pasa la validación (si no, en producción se usaría el respaldo).
+
+USO: python benchmarks/bench_motores_extraccion.py carpeta_o_pdf [...] [--repeticiones 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from extraccion_texto_pdf import extraer_texto_serial, extraer_texto_pdfium, validar_texto_constancia
+
+
+def listar_pdfs(rutas):
+    """Expande carpetas a sus archivos .pdf"""
+    pdfs = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            pdfs.extend(
+                os.path.join(ruta, nombre) for nombre in sorted(os.listdir(ruta))
+                if nombre.lower().endswith('.pdf')
+            )
+        else:
+            pdfs.append(ruta)
+    return pdfs
+
+
+def medir(funcion, *args, repeticiones: int = 3):
+    """Devuelve (mejor_tiempo, resultado) de varias repeticiones"""
+    mejor = None
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        transcurrido = time.perf_counter() - inicio
+        mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+    return mejor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("rutas", nargs="+", help="PDFs o carpetas con constancias")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    pdfs = listar_pdfs(args.rutas)
+    total_plumber = 0.0
+    total_pdfium = 0.0
+
+    print(f"{'Archivo':<40} {'pdfplumber (s)':>15} {'pdfium (s)':>11} {'Speedup':>8} {'Válido':>7}")
+    for ruta in pdfs:
+        t_plumber, _ = medir(extraer_texto_serial, ruta, repeticiones=args.repeticiones)
+        t_pdfium, texto = medir(extraer_texto_pdfium, ruta, repeticiones=args.repeticiones)
+        valido = not validar_texto_constancia(texto)
+        total_plumber += t_plumber
+        total_pdfium += t_pdfium
+        print(f"{os.path.basename(ruta)[:40]:<40} {t_plumber:>15.3f} {t_pdfium:>11.3f} "
+              f"{t_plumber / t_pdfium:>7.1f}x {'Sí' if valido else 'NO':>7}")
+
+    if pdfs:
+        print(f"{'TOTAL':<40} {total_plumber:>15.3f} {total_pdfium:>11.3f} "
+              f"{total_plumber / total_pdfium:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
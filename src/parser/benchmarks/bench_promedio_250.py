@@ -0,0 +1,229 @@
+"""
+Verificación cruzada: promedio de las últimas 250 semanas
+
+Ejecuta sobre carreras sintéticas las tres implementaciones anteriores del
+promedio (copiadas aquí tal como estaban) y el motor de segmentos canónico
+(utils/segmentos_250.py) a través de las APIs que ahora lo usan:
+
+- backend      backend/main.py::_calcular_salario_promedio_250_semanas
+               (ventana calendario de 1,751 días, menor salario en traslapes)
+- modulo3      PromedioSalario250 (serie diaria de 1,750 días con ceros en
+               días sin empleo, sobre períodos depurados por OverlapResolver)
+- calculadora  Calculadora250Semanas (1,750 días cotizados, empalmes sumados
+               dos veces y sin recorte a la fecha de referencia)
+- motor        Calculadora250Semanas / PromedioSalario250 actuales
+
+Reporta las carreras en que las implementaciones anteriores no coinciden
+entre sí o con el motor, y el tiempo por llamada de cada una.
+
+USO: python benchmarks/bench_promedio_250.py [--carreras 10] [--periodos 40] [--repeticiones 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from calculo_250_semanas import Calculadora250Semanas, SegmentoSalarial
+from modules.modulo3.calculators.promedio_250 import PromedioSalario250
+from modules.modulo3.utils.carrera import Carrera
+from modules.modulo3.core.overlap_resolver import OverlapResolver
+from utils.parametros_imss import parametros
+from utils.segmentos_250 import promedio_250_semanas
+
+FECHA_EMISION = '2025-06-30'
+TOLERANCIA = 0.01
+
+
+def generar_carrera(n: int, rng: random.Random):
+    """Períodos en formato del parser (dd/mm/aaaa) con empalmes, huecos y un vigente"""
+    inicio_carrera = date(1995, 1, 1).toordinal()
+    fin_carrera = date(2025, 6, 30).toordinal()
+    periodos = []
+    for i in range(n):
+        inicio = rng.randint(inicio_carrera, fin_carrera - 60)
+        fin = min(fin_carrera, inicio + rng.randint(30, 365 * 3))
+        vigente = i == n - 1
+        periodos.append({
+            'patron': f'PATRON {i}',
+            'registro_patronal': f'R{i:09d}',
+            'fecha_inicio': date.fromordinal(inicio).strftime('%d/%m/%Y'),
+            'fecha_fin': 'Vigente' if vigente else date.fromordinal(fin).strftime('%d/%m/%Y'),
+            'esta_vigente': vigente,
+            'salario_diario': round(rng.uniform(150, 1800), 2),
+            'semanas_corregidas': 0,
+            'cambios_salario': []
+        })
+    return periodos
+
+
+# ---------------------------------------------------------------------------
+# Implementaciones anteriores (referencia para la verificación cruzada)
+# ---------------------------------------------------------------------------
+
+# Tablas que cada implementación traía antes del almacén de parámetros
+TOPES_UMA_MODULO3 = {
+    2025: 2826.5, 2024: 2743.75, 2023: 2671.25, 2022: 2598.75, 2021: 2526.25, 2020: 2453.75,
+    2019: 2381.25, 2018: 2308.75, 2017: 2236.25, 2016: 2163.75, 2015: 2091.25,
+}
+VSM_CALCULADORA = (("1900-01-01", "1997-06-30", 10), ("1997-07-01", "2007-06-30", 20), ("2007-07-01", "2025-12-31", 25))
+
+
+def tope_calculadora_anterior(fecha: datetime) -> float:
+    """VSM × SMG del año (el SMG ya está en el almacén con los mismos valores)"""
+    fecha_str = fecha.strftime('%Y-%m-%d')
+    veces = next((v for inicio, fin, v in VSM_CALCULADORA if inicio <= fecha_str <= fin), 25)
+    return veces * parametros.smg_año(fecha.year)
+
+
+def backend_anterior(periodos, fecha_emision):
+    """Recorrido de 1,751 días × todos los períodos con strptime en el ciclo interno"""
+    fecha_fin = datetime.strptime(fecha_emision, '%Y-%m-%d')
+    fecha_inicio = fecha_fin - timedelta(days=1750)
+    salarios_dias = []
+    fecha_actual = fecha_inicio
+    while fecha_actual <= fecha_fin:
+        salarios_fecha = []
+        for periodo in periodos:
+            inicio_periodo = datetime.strptime(periodo['fecha_alta'], '%Y-%m-%d')
+            if periodo['fecha_baja']:
+                fin_periodo = datetime.strptime(periodo['fecha_baja'], '%Y-%m-%d')
+            else:
+                fin_periodo = fecha_fin
+            if inicio_periodo <= fecha_actual <= fin_periodo:
+                salarios_fecha.append(periodo['salario_base'])
+        if salarios_fecha:
+            salarios_dias.append(min(salarios_fecha))
+        fecha_actual += timedelta(days=1)
+    return round(sum(salarios_dias) / len(salarios_dias), 2) if salarios_dias else 0.0
+
+
+def modulo3_anterior(calculadora: PromedioSalario250, periodos_depurados, fecha_referencia):
+    """Serie diaria de 1,750 dicts; días sin empleo cuentan con salario 0"""
+    fecha_ref = datetime.strptime(fecha_referencia, '%Y-%m-%d')
+    fecha_actual = fecha_ref - timedelta(days=calculadora.dias_250_semanas - 1)
+    ordenados = sorted(periodos_depurados, key=lambda x: x['fecha_inicio_dt'])
+    serie = []
+    while fecha_actual <= fecha_ref:
+        activos = [
+            p for p in ordenados
+            if (p['fecha_fin_dt'] is None and fecha_actual >= p['fecha_inicio_dt'])
+            or (p['fecha_fin_dt'] is not None and p['fecha_inicio_dt'] <= fecha_actual <= p['fecha_fin_dt'])
+        ]
+        if activos:
+            salario = activos[0]['salario_diario']
+            tope = TOPES_UMA_MODULO3.get(fecha_actual.year, 2000.0)
+            serie.append({'fecha': fecha_actual, 'salario': min(salario, tope)})
+        else:
+            serie.append({'fecha': fecha_actual, 'salario': 0})
+        fecha_actual += timedelta(days=1)
+    return round(sum(s['salario'] for s in serie) / len(serie), 2) if serie else 0.0
+
+
+def calculadora_anterior(calculadora: Calculadora250Semanas, periodos):
+    """Acumula 1,750 días de segmentos por fecha_fin descendente; tope al inicio del segmento"""
+    segmentos = calculadora._crear_segmentos_salariales(Carrera.desde_periodos(periodos, FECHA_EMISION))
+    ordenados = sorted(segmentos, key=lambda s: s.fecha_fin, reverse=True)
+    suma, dias = 0.0, 0
+    for seg in ordenados:
+        if dias >= calculadora.DIAS_PARA_PROMEDIO:
+            break
+        tomar = min(seg.dias_efectivos, calculadora.DIAS_PARA_PROMEDIO - dias)
+        tope = tope_calculadora_anterior(seg.fecha_inicio)
+        suma += min(seg.salario_diario, tope) * tomar
+        dias += tomar
+    return round(suma / dias, 2) if dias else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Entradas para cada API
+# ---------------------------------------------------------------------------
+
+def periodos_backend(periodos):
+    """Formato PeriodoLaboral del backend (fechas aaaa-mm-dd)"""
+    convertir = lambda f: datetime.strptime(f, '%d/%m/%Y').strftime('%Y-%m-%d')
+    return [{
+        'fecha_alta': convertir(p['fecha_inicio']),
+        'fecha_baja': None if p['fecha_fin'] == 'Vigente' else convertir(p['fecha_fin']),
+        'salario_base': p['salario_diario']
+    } for p in periodos]
+
+
+def backend_motor(periodos, fecha_emision):
+    """Lo que hace ahora backend/main.py (sin importar FastAPI)"""
+    fecha_fin = datetime.strptime(fecha_emision, '%Y-%m-%d')
+    tramos = []
+    for p in periodos:
+        inicio = datetime.strptime(p['fecha_alta'], '%Y-%m-%d')
+        fin = datetime.strptime(p['fecha_baja'], '%Y-%m-%d') if p['fecha_baja'] else fecha_fin
+        tramos.append((inicio.toordinal(), fin.toordinal(), p['salario_base'], None))
+    ventana = promedio_250_semanas(tramos, fecha_fin.toordinal(), parametros.tope_diario,
+                                   cortes=parametros.cortes_tope())
+    return round(ventana.promedio_diario, 2)
+
+
+def medir(funcion, repeticiones):
+    return timeit.timeit(funcion, number=repeticiones) / repeticiones * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--carreras", type=int, default=10)
+    parser.add_argument("--periodos", type=int, default=40)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    calculadora = Calculadora250Semanas()
+    promedio_m3 = PromedioSalario250()
+    resolver = OverlapResolver()
+
+    columnas = ['backend', 'modulo3', 'calculadora', 'backend*', 'modulo3*', 'calculadora*']
+    tiempos = {c: 0.0 for c in columnas}
+    discrepancias = 0
+
+    print(f"{args.carreras} carreras de {args.periodos} períodos | * = motor de segmentos")
+    print(f"{'Carrera':>8} " + " ".join(f"{c:>13}" for c in columnas))
+
+    for n in range(args.carreras):
+        periodos = generar_carrera(args.periodos, rng)
+        datos = {'historial_laboral': {'periodos': periodos}, 'datos_basicos': {'fecha_emision': FECHA_EMISION}}
+        p_backend = periodos_backend(periodos)
+        depurados = resolver.resolve_overlaps(periodos, FECHA_EMISION)
+
+        llamadas = {
+            'backend': lambda: backend_anterior(p_backend, FECHA_EMISION),
+            'modulo3': lambda: modulo3_anterior(promedio_m3, depurados, FECHA_EMISION),
+            'calculadora': lambda: calculadora_anterior(calculadora, periodos),
+            'backend*': lambda: backend_motor(p_backend, FECHA_EMISION),
+            'modulo3*': lambda: promedio_m3.calcular_promedio_250_semanas(
+                depurados, FECHA_EMISION, "Ley 73")['salario_promedio_diario'],
+            'calculadora*': lambda: round(calculadora.calcular_promedio_250_semanas(
+                datos, FECHA_EMISION).salario_promedio_diario, 2),
+        }
+
+        valores = {c: llamadas[c]() for c in columnas}
+        for c in columnas:
+            tiempos[c] += medir(llamadas[c], args.repeticiones)
+
+        anteriores = [valores['backend'], valores['modulo3'], valores['calculadora']]
+        difieren = max(anteriores) - min(anteriores) > TOLERANCIA
+        discrepancias += difieren
+        marca = " ⚠️" if difieren else ""
+        print(f"{n:>8} " + " ".join(f"{valores[c]:>13.2f}" for c in columnas) + marca)
+
+    print(f"\nCarreras en que las implementaciones anteriores no coinciden: {discrepancias}/{args.carreras}")
+    print("Motivos: backend toma el menor salario en traslapes y no topa; modulo3 promedia días"
+          " calendario (huecos = 0); calculadora suma empalmes dos veces y no recorta a la referencia.")
+    print(f"\nTiempo promedio por llamada (ms):")
+    for c in columnas:
+        print(f"  {c:<13} {tiempos[c] / args.carreras:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
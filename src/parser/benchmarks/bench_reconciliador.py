@@ -0,0 +1,140 @@
+"""
+Benchmark: reconciliador de semanas (modules/modulo3/calculators/weeks_reconciler.py)
+
+Genera carreras sintéticas (empleos sucesivos con huecos y algunos
+simultáneos), calcula el total "oficial" con la carrera verdadera y le inyecta
+anomalías de extracción:
+
+- duplicado   un fragmento de un período repetido con el mismo registro
+- vigente     un empleo anterior del mismo registro que quedó como vigente
+- descuento   semanas descontadas en la constancia
+
+Reporta, por tamaño de carrera, si el reconciliador cierra la diferencia,
+cuántas explicaciones usa frente a las inyectadas, nodos explorados y tiempo.
+
+USO: python benchmarks/bench_reconciliador.py [--carreras 20] [--repeticiones 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules.modulo3.calculators.weeks_reconciler import WeeksReconciler
+from modules.modulo3.utils.carrera import Carrera
+from utils.intervalos import contar_dias_unicos
+
+FECHA_EMISION = '2025-06-30'
+TAMANOS = (10, 50, 200)
+
+
+def _texto(ordinal: int) -> str:
+    return date.fromordinal(ordinal).strftime('%d/%m/%Y')
+
+
+def generar_carrera(n: int, rng: random.Random):
+    """Empleos sucesivos (con huecos y ~10% simultáneos) que terminan en un vigente"""
+    fin_carrera = date(2025, 6, 30).toordinal()
+    duracion = (fin_carrera - date(1980, 1, 1).toordinal()) // n
+    dia = date(1980, 1, 1).toordinal()
+    periodos = []
+    for i in range(n):
+        inicio = dia + rng.randint(0, duracion // 4)
+        fin = min(fin_carrera, inicio + rng.randint(duracion // 2, duracion))
+        if rng.random() < 0.1:
+            fin = min(fin_carrera, fin + rng.randint(1, duracion))
+        vigente = i == n - 1
+        periodos.append({
+            'patron': f'PATRON {i}',
+            'registro_patronal': f'R{i:09d}',
+            'fecha_inicio': _texto(inicio),
+            'fecha_fin': 'Vigente' if vigente else _texto(fin),
+            'esta_vigente': vigente,
+            'salario_diario': round(rng.uniform(150, 1800), 2)
+        })
+        dia += duracion
+    return periodos
+
+
+def inyectar_anomalias(periodos, rng: random.Random):
+    """(períodos extraídos, datos_basicos, anomalías inyectadas)"""
+    verdadera = Carrera.desde_periodos(periodos, FECHA_EMISION)
+    semanas_verdaderas = contar_dias_unicos(verdadera.intervalos()) // 7
+    extraidos = [dict(p) for p in periodos]
+    inyectadas = []
+
+    # Fragmento repetido que se sale del período original
+    origen = rng.randrange(len(periodos) - 1)
+    inicio, fin = verdadera.inicios[origen], verdadera.fines[origen]
+    extraidos.append({**periodos[origen],
+                      'fecha_inicio': _texto(inicio + (fin - inicio) // 2),
+                      'fecha_fin': _texto(fin + rng.randint(60, 400))})
+    inyectadas.append('bloque_duplicado')
+
+    # Empleo anterior del último patrón: la baja quedó solo en los movimientos
+    # y el período se extrajo como vigente
+    if rng.random() < 0.5:
+        ultimo = periodos[-1]
+        alta = verdadera.inicios[-1] - rng.randint(800, 1500)
+        baja = alta + rng.randint(100, 600)
+        anterior = {**ultimo, 'fecha_inicio': _texto(alta), 'fecha_fin': _texto(baja), 'esta_vigente': False,
+                    'cambios_salario': [{'tipo': 'BAJA', 'fecha': _texto(baja), 'salario_diario': 0}]}
+        periodos = periodos + [anterior]
+        verdadera = Carrera.desde_periodos(periodos, FECHA_EMISION)
+        semanas_verdaderas = contar_dias_unicos(verdadera.intervalos()) // 7
+        extraidos.append({**anterior, 'fecha_fin': 'Vigente', 'esta_vigente': True})
+        inyectadas.append('vigente_sin_truncar')
+
+    descontadas = rng.choice((0, 0, rng.randint(5, 120)))
+    if descontadas:
+        inyectadas.append('semanas_descontadas')
+
+    datos_basicos = {
+        'fecha_emision': FECHA_EMISION,
+        'semanas_cotizadas_imss': semanas_verdaderas,
+        'semanas_descontadas': descontadas,
+        'semanas_reintegradas': 0,
+        'total_semanas_cotizadas': semanas_verdaderas - descontadas
+    }
+    return extraidos, datos_basicos, inyectadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--carreras", type=int, default=20)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    reconciliador = WeeksReconciler()
+
+    print(f"{args.carreras} carreras por tamaño | {args.repeticiones} repeticiones | ms por llamada")
+    print(f"{'Períodos':>9} {'Reconciliadas':>14} {'Explic.':>8} {'Inyect.':>8} {'Nodos máx':>10} "
+          f"{'ms prom':>8} {'ms máx':>7}")
+
+    for tamano in TAMANOS:
+        reconciliadas = explicaciones = inyectadas_total = nodos_max = 0
+        tiempos = []
+        for _ in range(args.carreras):
+            extraidos, datos_basicos, inyectadas = inyectar_anomalias(generar_carrera(tamano, rng), rng)
+            carrera = Carrera.desde_periodos(extraidos, FECHA_EMISION)
+            resultado = reconciliador.reconciliar(datos_basicos, carrera)
+
+            reconciliadas += resultado['reconciliado']
+            explicaciones += len(resultado['explicaciones'])
+            inyectadas_total += len(inyectadas)
+            nodos_max = max(nodos_max, resultado['nodos_explorados'])
+            tiempos.append(timeit.timeit(lambda: reconciliador.reconciliar(datos_basicos, carrera),
+                                         number=args.repeticiones) / args.repeticiones * 1e3)
+
+        print(f"{tamano:>9} {reconciliadas:>8}/{args.carreras:<5} {explicaciones:>8} {inyectadas_total:>8} "
+              f"{nodos_max:>10} {sum(tiempos) / len(tiempos):>8.2f} {max(tiempos):>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
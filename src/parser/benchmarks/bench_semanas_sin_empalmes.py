@@ -0,0 +1,95 @@
+"""
+Benchmark de escalamiento: semanas sin empalmes
+
+Compara el conteo de días únicos con un set de fechas (un date por cada día
+de cada período) contra la unión de intervalos de días ordinales, para
+historiales sintéticos de 5 a 500 períodos con patrones concurrentes.
+
+USO: python benchmarks/bench_semanas_sin_empalmes.py [--repeticiones 20] [--semilla 7]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from correccion_semanas_final import CorreccionSemanasIMSS
+from modules.modulo3.utils.carrera import Carrera
+
+TAMANOS = [5, 20, 50, 100, 200, 500]
+FECHA_EMISION = '2025-06-30'
+
+
+def generar_periodos(n: int, rng: random.Random):
+    """Carrera sintética de ~35 años con empalmes y un período vigente"""
+    inicio_carrera = date(1990, 1, 1).toordinal()
+    fin_carrera = date(2025, 6, 30).toordinal()
+    periodos = []
+    for i in range(n):
+        inicio = rng.randint(inicio_carrera, fin_carrera - 30)
+        fin = min(fin_carrera, inicio + rng.randint(30, 365 * 8))
+        periodos.append({
+            'patron': f'PATRON {i}',
+            'fecha_inicio': date.fromordinal(inicio).strftime('%d/%m/%Y'),
+            'fecha_fin': 'Vigente' if i == n - 1 else date.fromordinal(fin).strftime('%d/%m/%Y'),
+        })
+    return periodos
+
+
+def semanas_con_set(periodos, fecha_emision: str) -> int:
+    """Método anterior: un date por cada día de cada período en un set"""
+    dias_ocupados = set()
+    for periodo in periodos:
+        try:
+            inicio = datetime.strptime(periodo['fecha_inicio'], '%d/%m/%Y')
+            if periodo['fecha_fin'] == 'Vigente':
+                try:
+                    fin = datetime.strptime(fecha_emision, '%Y-%m-%d')
+                except ValueError:
+                    fin = datetime.now()
+            else:
+                fin = datetime.strptime(periodo['fecha_fin'], '%d/%m/%Y')
+            dia_actual = inicio
+            while dia_actual <= fin:
+                dias_ocupados.add(dia_actual.date())
+                dia_actual += timedelta(days=1)
+        except (KeyError, ValueError):
+            continue
+    return len(dias_ocupados) // 7
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    n = args.repeticiones
+    corrector = CorreccionSemanasIMSS()
+
+    print(f"{n} repeticiones | tiempos en ms por llamada")
+    print(f"{'Períodos':>9} {'Set fechas':>11} {'Intervalos':>11} {'Speedup':>8} {'Semanas':>8} {'Igual':>6}")
+
+    for tamano in TAMANOS:
+        periodos = generar_periodos(tamano, rng)
+        esperado = semanas_con_set(periodos, FECHA_EMISION)
+        obtenido = corrector._calcular_semanas_sin_empalmes(Carrera.desde_periodos(periodos, FECHA_EMISION))
+
+        t_set = timeit.timeit(lambda: semanas_con_set(periodos, FECHA_EMISION), number=n) / n * 1e3
+        t_intervalos = timeit.timeit(
+            lambda: corrector._calcular_semanas_sin_empalmes(Carrera.desde_periodos(periodos, FECHA_EMISION)),
+            number=n
+        ) / n * 1e3
+        corrector.correcciones_aplicadas.clear()
+
+        print(f"{tamano:>9} {t_set:>11.2f} {t_intervalos:>11.3f} {t_set / t_intervalos:>7.0f}x "
+              f"{obtenido:>8} {'Sí' if esperado == obtenido else 'NO':>6}")
+
+
+if __name__ == "__main__":
+    main()
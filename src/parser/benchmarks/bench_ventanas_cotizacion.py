@@ -0,0 +1,95 @@
+"""
+Benchmark: ventanas de cotización (utils/ventanas_cotizacion.py)
+
+Para historiales sintéticos de 5 a 500 períodos compara dos consultas sobre
+ventanas de 5 años:
+
+- mejor ventana: la de 5 años con más días cotizados
+- primer día con 52 semanas en los 5 años que terminan ese día
+
+La referencia desliza la ventana día por día sobre el mapa de días (bitset),
+sumando el día que entra y restando el que sale; las ventanas usan sumas
+prefijas sobre los tramos. Cada fila verifica que ambos den el mismo
+resultado e incluye una ventana arbitraria [A, B) como consulta puntual.
+
+USO: python benchmarks/bench_ventanas_cotizacion.py [--repeticiones 20] [--semilla 7]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from utils.mapa_dias import ORIGEN_ORDINAL, MapaDiasCarrera
+from utils.ventanas_cotizacion import DIAS_5_AÑOS, VentanasCotizacion
+from bench_semanas_sin_empalmes import TAMANOS
+from bench_promedio_250 import FECHA_EMISION, generar_carrera
+
+SEMANAS_REQUERIDAS = 52
+VENTANA_A = date(2010, 3, 15).toordinal()
+VENTANA_B = date(2015, 3, 15).toordinal()
+
+
+def consultas_deslizando(mapa: MapaDiasCarrera):
+    """Mejor ventana y primer día con 52 semanas recorriendo cada día"""
+    bits = mapa.bits
+    primero = mapa.primer_dia().toordinal() - ORIGEN_ORDINAL
+    ultimo = mapa.ultimo_dia().toordinal() - ORIGEN_ORDINAL
+
+    def cubierto(k):
+        return k >= 0 and (bits >> k) & 1
+
+    dias = 0
+    mejor = None
+    primer_dia = None
+    for fin in range(primero, ultimo + DIAS_5_AÑOS):
+        dias += cubierto(fin) - cubierto(fin - DIAS_5_AÑOS)
+        if mejor is None or dias > mejor[2]:
+            mejor = (fin - DIAS_5_AÑOS + 1 + ORIGEN_ORDINAL, fin + ORIGEN_ORDINAL, dias)
+        if primer_dia is None and dias >= SEMANAS_REQUERIDAS * 7:
+            primer_dia = fin + ORIGEN_ORDINAL
+    ventana = mapa.dias_entre(date.fromordinal(VENTANA_A), date.fromordinal(VENTANA_B - 1))
+    return mejor[2], primer_dia, ventana
+
+
+def consultas_ventanas(ventanas: VentanasCotizacion):
+    mejor = ventanas.mejor_ventana(DIAS_5_AÑOS)
+    primer_dia = ventanas.primer_dia_con(SEMANAS_REQUERIDAS, DIAS_5_AÑOS)
+    return mejor[2], primer_dia, ventanas.dias_en(VENTANA_A, VENTANA_B)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    n = args.repeticiones
+
+    print(f"{n} repeticiones | tiempos en ms (mejor ventana + primer día con 52 semanas + [A, B))")
+    print(f"{'Períodos':>9} {'Tramos':>7} {'Deslizando':>11} {'Ventanas':>9} {'Speedup':>8} "
+          f"{'Construir':>10} {'Igual':>6}")
+
+    for tamano in TAMANOS:
+        periodos = generar_carrera(tamano, rng)
+        mapa = MapaDiasCarrera.desde_periodos(periodos, FECHA_EMISION)
+        ventanas = VentanasCotizacion.desde_mapa(mapa)
+        esperado = consultas_deslizando(mapa)
+        obtenido = consultas_ventanas(ventanas)
+
+        lentas = max(1, n // 10)
+        t_deslizando = timeit.timeit(lambda: consultas_deslizando(mapa), number=lentas) / lentas * 1e3
+        t_ventanas = timeit.timeit(lambda: consultas_ventanas(ventanas), number=n) / n * 1e3
+        t_construir = timeit.timeit(lambda: VentanasCotizacion.desde_mapa(mapa), number=n) / n * 1e3
+
+        print(f"{tamano:>9} {len(ventanas):>7} {t_deslizando:>11.2f} {t_ventanas:>9.3f} "
+              f"{t_deslizando / t_ventanas:>7.0f}x {t_construir:>10.3f} {'Sí' if esperado == obtenido else 'NO':>6}")
+
+
+if __name__ == "__main__":
+    main()
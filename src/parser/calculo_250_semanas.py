@@ -1,16 +1,27 @@
 """
 Módulo para calcular el salario promedio de las últimas 250 semanas cotizadas
 Implementa las reglas oficiales del IMSS según Art. 167 Ley 73
+El promedio lo calcula el motor de segmentos canónico (utils/segmentos_250.py)
+con los topes del almacén de parámetros (utils/parametros_imss.py)
 
 COORDINA CON: correccion_semanas_final.py
 USO: from calculo_250_semanas import Calculadora250Semanas
+     serie_promedio_250_desde_correccion(datos, "2025-01-01", "2030-12-31")  # serie mensual
 """
 
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 import json
 
+from modules.modulo3.utils.carrera import Carrera, Movimiento
+from modules.modulo3.utils.date_helpers import hoy_ordinal, ordinal_a_datetime
+from utils.parametros_imss import parametros
+from utils.segmentos_250 import IndicePromedio250, VentanaPromedio, normalizar_tramos, ventana_250_semanas
+
+# Máximo de puntos (meses) de una serie de promedios: 50 años de fechas de retiro
+MAX_MESES_SERIE = 600
+
 @dataclass
 class SegmentoSalarial:
     """Representa un segmento de salario homogéneo"""
@@ -88,40 +99,33 @@ class Calculadora250Semanas:
     SEMANAS_PARA_PROMEDIO = 250
     DIAS_PARA_PROMEDIO = 1750
 
-    # Topes históricos (VSM - Veces Salario Mínimo)
-    TOPES_HISTORICOS = {
-        ("1900-01-01", "1997-06-30"): 10,
-        ("1997-07-01", "2007-06-30"): 20,
-        ("2007-07-01", "2025-12-31"): 25,
-    }
-
     def __init__(self, modo_debug: bool = False):
         self.modo_debug = modo_debug
-        self.salarios_minimos = self._cargar_salarios_minimos_historicos()
 
     def calcular_promedio_250_semanas(self, datos_corregidos: Dict[str, Any],
-                                    fecha_referencia: Optional[str] = None) -> ResultadoPromedio250:
+                                    fecha_referencia: Optional[str] = None,
+                                    carrera: Optional[Carrera] = None) -> ResultadoPromedio250:
         """
         Calcula el promedio salarial de las últimas 250 semanas cotizadas
+
+        `carrera` es el modelo ya construido de los mismos períodos corregidos;
+        si no se pasa se construye desde `datos_corregidos`.
         """
         try:
             # 1. Obtener períodos ya corregidos
-            periodos = self._extraer_periodos_corregidos(datos_corregidos)
+            carrera = self._extraer_carrera(datos_corregidos, carrera)
 
             # 2. Determinar fecha de referencia
-            fecha_ref = self._determinar_fecha_referencia(periodos, fecha_referencia, datos_corregidos)
+            fecha_ref = self._determinar_fecha_referencia(carrera, fecha_referencia, datos_corregidos)
 
             # 3. Crear segmentos salariales detallados
-            segmentos = self._crear_segmentos_salariales(periodos)
-
-            # 4. Filtrar últimas 250 semanas
-            segmentos_filtrados = self._filtrar_ultimas_250_semanas(segmentos, fecha_ref)
+            segmentos = self._crear_segmentos_salariales(carrera)
 
-            # 5. Aplicar topes históricos
-            segmentos_con_topes = self._aplicar_topes_historicos(segmentos_filtrados)
+            # 4. Sin empalmes, con topes históricos y últimos 1,750 días cotizados
+            ventana = self._calcular_ventana_250_semanas(segmentos, fecha_ref)
 
-            # 6. Calcular promedio ponderado
-            resultado = self._calcular_promedio_ponderado(segmentos_con_topes, fecha_ref)
+            # 5. Calcular promedio ponderado
+            resultado = self._calcular_promedio_ponderado(ventana)
 
             if self.modo_debug:
                 self._imprimir_debug(resultado)
@@ -148,7 +152,14 @@ class Calculadora250Semanas:
 
         return periodos
 
-    def _determinar_fecha_referencia(self, periodos: List[Dict], fecha_referencia: Optional[str],
+    def _extraer_carrera(self, datos_corregidos: Dict[str, Any], carrera: Optional[Carrera] = None) -> Carrera:
+        """Modelo de los períodos corregidos (valida igual que _extraer_periodos_corregidos)"""
+        periodos = self._extraer_periodos_corregidos(datos_corregidos)
+        if carrera is not None and carrera.corresponde_a(periodos):
+            return carrera
+        return Carrera.desde_periodos(periodos, datos_corregidos.get('datos_basicos', {}).get('fecha_emision'))
+
+    def _determinar_fecha_referencia(self, carrera: Carrera, fecha_referencia: Optional[str],
                                    datos_corregidos: Dict) -> datetime:
         """Determina la fecha desde la cual contar las 250 semanas hacia atrás"""
         if fecha_referencia:
@@ -157,18 +168,12 @@ class Calculadora250Semanas:
             except:
                 pass
 
-        # Buscar última fecha de baja
-        fechas_baja = []
-        for periodo in periodos:
-            if periodo.get('fecha_fin', '').lower() != 'vigente':
-                try:
-                    fecha_baja = datetime.strptime(periodo['fecha_fin'], '%d/%m/%Y')
-                    fechas_baja.append(fecha_baja)
-                except:
-                    continue
-
-        if fechas_baja:
-            return max(fechas_baja)
+        # Buscar última fecha de baja (con un empleo vigente la ventana llega
+        # a la fecha de emisión, no a la última baja)
+        if not carrera.hay_vigente():
+            fechas_baja = [periodo.fin for periodo in carrera.periodos if periodo.fin is not None]
+            if fechas_baja:
+                return ordinal_a_datetime(max(fechas_baja))
 
         # Fallback: usar fecha de emisión
         fecha_emision = datos_corregidos.get('datos_basicos', {}).get('fecha_emision')
@@ -180,201 +185,143 @@ class Calculadora250Semanas:
 
         return datetime.now()
 
-    def _crear_segmentos_salariales(self, periodos: List[Dict]) -> List[SegmentoSalarial]:
+    def construir_indice(self, datos_corregidos: Dict[str, Any],
+                         fecha_fin_vigentes: Optional[datetime] = None,
+                         carrera: Optional[Carrera] = None) -> IndicePromedio250:
+        """
+        Índice de sumas prefijas para consultar el promedio a muchas fechas de referencia
+
+        Se construye una vez por carrera. Los empleos vigentes llegan hasta
+        `fecha_fin_vigentes` (por omisión hoy): una fecha futura proyecta que el
+        trabajador sigue cotizando con su último salario.
+        """
+        carrera = self._extraer_carrera(datos_corregidos, carrera)
+        segmentos = self._crear_segmentos_salariales(carrera, fecha_fin_vigentes)
+        tramos = [
+            (seg.fecha_inicio.toordinal(), seg.fecha_fin.toordinal(), seg.salario_diario, None)
+            for seg in segmentos
+        ]
+        return IndicePromedio250.desde_tramos(
+            tramos, parametros.tope_diario, self.DIAS_PARA_PROMEDIO, parametros.cortes_tope()
+        )
+
+    def _crear_segmentos_salariales(self, carrera: Carrera,
+                                    fecha_fin_vigentes: Optional[datetime] = None) -> List[SegmentoSalarial]:
         """Crea segmentos salariales detallados considerando cambios de salario"""
         segmentos = []
+        fin_vigentes = fecha_fin_vigentes.toordinal() if fecha_fin_vigentes else hoy_ordinal()
 
-        for periodo in periodos:
-            try:
-                fecha_inicio = datetime.strptime(periodo['fecha_inicio'], '%d/%m/%Y')
-
-                if periodo.get('fecha_fin', '').lower() == 'vigente':
-                    fecha_fin = datetime.now()
-                else:
-                    fecha_fin = datetime.strptime(periodo['fecha_fin'], '%d/%m/%Y')
-
-                cambios_salario = periodo.get('cambios_salario', [])
-                salario_base = periodo.get('salario_diario', 0)
-
-                if not cambios_salario:
-                    dias = (fecha_fin - fecha_inicio).days + 1
-                    segmento = SegmentoSalarial(
-                        fecha_inicio=fecha_inicio,
-                        fecha_fin=fecha_fin,
-                        salario_diario=salario_base,
-                        salario_diario_ajustado=salario_base,
-                        dias_efectivos=dias,
-                        patron=periodo.get('patron', ''),
-                        registro_patronal=periodo.get('registro_patronal', '')
-                    )
-                    segmentos.append(segmento)
-                else:
-                    segmentos_periodo = self._procesar_cambios_salario(
-                        fecha_inicio, fecha_fin, cambios_salario, salario_base,
-                        periodo.get('patron', ''), periodo.get('registro_patronal', '')
-                    )
-                    segmentos.extend(segmentos_periodo)
-
-            except Exception as e:
+        for periodo in carrera.periodos:
+            patron = periodo.patron.nombre or ''
+            registro = periodo.patron.registro_patronal or ''
+            if not periodo.valido:
                 if self.modo_debug:
-                    print(f"Error procesando período {periodo.get('patron', 'N/A')}: {e}")
+                    print(f"Error procesando período {patron or 'N/A'}: fechas inválidas")
                 continue
 
+            inicio = periodo.inicio
+            fin = periodo.fin_con(fin_vigentes)
+            salario_base = periodo.salario_diario
+
+            if not periodo.movimientos:
+                segmentos.append(self._segmento(inicio, fin, salario_base, patron, registro))
+            elif any(movimiento.fecha is None for movimiento in periodo.movimientos):
+                if self.modo_debug:
+                    print(f"Error procesando período {patron or 'N/A'}: cambio de salario sin fecha válida")
+            else:
+                segmentos.extend(self._procesar_cambios_salario(
+                    inicio, fin, periodo.movimientos, salario_base, patron, registro
+                ))
+
         return segmentos
 
-    def _procesar_cambios_salario(self, fecha_inicio: datetime, fecha_fin: datetime,
-                                cambios: List[Dict], salario_base: float,
+    def _segmento(self, inicio: int, fin: int, salario: float, patron: str, registro: str) -> SegmentoSalarial:
+        return SegmentoSalarial(
+            fecha_inicio=ordinal_a_datetime(inicio),
+            fecha_fin=ordinal_a_datetime(fin),
+            salario_diario=salario,
+            salario_diario_ajustado=salario,
+            dias_efectivos=fin - inicio + 1,
+            patron=patron,
+            registro_patronal=registro
+        )
+
+    def _procesar_cambios_salario(self, inicio: int, fin: int,
+                                cambios: List[Movimiento], salario_base: float,
                                 patron: str, registro: str) -> List[SegmentoSalarial]:
-        """Procesa cambios de salario dentro de un período"""
+        """Procesa cambios de salario dentro de un período (fechas ordinales)"""
         segmentos = []
 
-        cambios_ordenados = sorted(cambios, key=lambda x: datetime.strptime(x['fecha'], '%d/%m/%Y'))
-
-        fecha_actual = fecha_inicio
+        dia_actual = inicio
         salario_actual = salario_base
 
-        for cambio in cambios_ordenados:
-            try:
-                fecha_cambio = datetime.strptime(cambio['fecha'], '%d/%m/%Y')
-
-                if fecha_cambio > fecha_actual:
-                    dias = (fecha_cambio - fecha_actual).days
-                    if dias > 0:
-                        segmento = SegmentoSalarial(
-                            fecha_inicio=fecha_actual,
-                            fecha_fin=fecha_cambio - timedelta(days=1),
-                            salario_diario=salario_actual,
-                            salario_diario_ajustado=salario_actual,
-                            dias_efectivos=dias,
-                            patron=patron,
-                            registro_patronal=registro
-                        )
-                        segmentos.append(segmento)
-
-                fecha_actual = fecha_cambio
-                salario_actual = cambio.get('salario_diario', salario_actual)
-
-            except Exception as e:
-                if self.modo_debug:
-                    print(f"Error procesando cambio de salario: {e}")
-                continue
+        for cambio in sorted(cambios, key=lambda m: m.fecha):
+            if cambio.fecha > dia_actual:
+                segmentos.append(self._segmento(dia_actual, cambio.fecha - 1, salario_actual, patron, registro))
+
+            dia_actual = cambio.fecha
+            if cambio.salario_diario is not None:
+                salario_actual = cambio.salario_diario
 
-        if fecha_actual <= fecha_fin:
-            dias = (fecha_fin - fecha_actual).days + 1
-            if dias > 0:
-                segmento = SegmentoSalarial(
-                    fecha_inicio=fecha_actual,
-                    fecha_fin=fecha_fin,
-                    salario_diario=salario_actual,
-                    salario_diario_ajustado=salario_actual,
-                    dias_efectivos=dias,
-                    patron=patron,
-                    registro_patronal=registro
-                )
-                segmentos.append(segmento)
+        if dia_actual <= fin:
+            segmentos.append(self._segmento(dia_actual, fin, salario_actual, patron, registro))
 
         return segmentos
 
-    def _filtrar_ultimas_250_semanas(self, segmentos: List[SegmentoSalarial], fecha_ref: datetime) -> List[SegmentoSalarial]:
-        """Filtra últimas 250 semanas cotizadas - FINAL FIX: Acumula cotizados secuenciales (salta gaps) hasta 1750 días"""
-        if not segmentos:
-            return []
-
-        # Ordena por fecha_fin DESC (más recientes primero)
-        segmentos_ordenados = sorted(segmentos, key=lambda s: s.fecha_fin, reverse=True)
-
-        dias_acumulados = 0
-        segmentos_filtrados = []
-
-        for seg in segmentos_ordenados:
-            if dias_acumulados >= self.DIAS_PARA_PROMEDIO:
-                break
-
-            # Usa días completos del seg (no clip calendario, acumula cotizados)
-            dias_seg = seg.dias_efectivos
-            dias_ventana = min(dias_seg, self.DIAS_PARA_PROMEDIO - dias_acumulados)
-
-            if dias_ventana > 0:
-                # Sub-segmento (todo o parte)
-                sub_seg = SegmentoSalarial(
-                    fecha_inicio=seg.fecha_inicio,
-                    fecha_fin=seg.fecha_fin,
-                    salario_diario=seg.salario_diario,
-                    salario_diario_ajustado=seg.salario_diario_ajustado,
-                    dias_efectivos=dias_ventana,
-                    patron=seg.patron,
-                    registro_patronal=seg.registro_patronal
-                )
-                segmentos_filtrados.append(sub_seg)
-                dias_acumulados += dias_ventana
-
-        # Ordena finales ASC para output
-        segmentos_filtrados.sort(key=lambda s: s.fecha_inicio)
-
-        if self.modo_debug:
-            print(f"[DEBUG FILTRO] Acumulados cotizados: {dias_acumulados} días (de 1750), Segmentos: {len(segmentos_filtrados)}")
-            print(f"[DEBUG FILTRO] Período extendido: {min(s.fecha_inicio for s in segmentos_filtrados).strftime('%Y-%m')} a {max(s.fecha_fin for s in segmentos_filtrados).strftime('%Y-%m')}")
-            for s in segmentos_filtrados[:5]:
-                print(f"  - {s.patron[:30]}: ${s.salario_diario:.2f} x {s.dias_efectivos} días ({s.fecha_inicio.strftime('%Y-%m')}-{s.fecha_fin.strftime('%Y-%m')})")
-
-        return segmentos_filtrados
-
-    def _aplicar_topes_historicos(self, segmentos_filtrados: List[SegmentoSalarial]) -> List[SegmentoSalarial]:
-        """Aplica topes VSM históricos a cada segmento"""
-        for seg in segmentos_filtrados:
-            self._aplicar_tope_segmento(seg)
-        return segmentos_filtrados
-
-    def _obtener_tope_fecha(self, fecha: datetime) -> float:
-        """Obtiene el tope de VSM aplicable"""
-        fecha_str = fecha.strftime('%Y-%m-%d')
-
-        for (inicio, fin), tope in self.TOPES_HISTORICOS.items():
-            if inicio <= fecha_str <= fin:
-                return tope
-
-        return 25
-
-    def _aplicar_tope_segmento(self, seg: SegmentoSalarial) -> float:
-        """Aplica tope real: SBC_ajustado = min(SBC, VSM * SMG en fecha_inicio)"""
-        smg = self._obtener_salario_minimo(seg.fecha_inicio)
-        vsm = self._obtener_tope_fecha(seg.fecha_inicio)
-        tope = vsm * smg
-        seg.salario_diario_ajustado = min(seg.salario_diario, tope)
-        return seg.salario_diario_ajustado
-
-    def _calcular_promedio_ponderado(self, segmentos: List[SegmentoSalarial],
-                               fecha_referencia: datetime) -> ResultadoPromedio250:
+    def _calcular_ventana_250_semanas(self, segmentos: List[SegmentoSalarial],
+                                      fecha_ref: datetime) -> VentanaPromedio:
+        """Últimos 1,750 días cotizados con el motor de segmentos (utils/segmentos_250.py)"""
+        tramos = [
+            (seg.fecha_inicio.toordinal(), seg.fecha_fin.toordinal(), seg.salario_diario,
+             (seg.patron, seg.registro_patronal))
+            for seg in segmentos
+        ]
+        ventana = ventana_250_semanas(
+            normalizar_tramos(tramos, parametros.tope_diario, parametros.cortes_tope()),
+            fecha_ref.toordinal(),
+            self.DIAS_PARA_PROMEDIO
+        )
+
+        if self.modo_debug and ventana.segmentos:
+            print(f"[DEBUG FILTRO] Acumulados cotizados: {ventana.dias} días (de 1750), Segmentos: {len(ventana.segmentos)}")
+            print(f"[DEBUG FILTRO] Período: {ventana.fecha_inicio.strftime('%Y-%m')} a {ventana.fecha_fin.strftime('%Y-%m')}")
+
+        return ventana
+
+    def _calcular_promedio_ponderado(self, ventana: VentanaPromedio) -> ResultadoPromedio250:
         """
         Calcula el promedio ponderado según la fórmula oficial IMSS:
         Promedio = Σ(SBC_ajustado × días_segmento) / días_disponibles
 
         Si hay menos de 250 semanas, calcula con las disponibles
         """
-        suma_ponderada = 0.0
-        total_dias = 0
         observaciones = []
 
-        for segmento in segmentos:
-            contribucion = segmento.salario_diario_ajustado * segmento.dias_efectivos
-            suma_ponderada += contribucion
-            total_dias += segmento.dias_efectivos
+        segmentos = [
+            SegmentoSalarial(
+                fecha_inicio=datetime.fromordinal(seg.inicio),
+                fecha_fin=datetime.fromordinal(seg.fin),
+                salario_diario=seg.salario_original,
+                salario_diario_ajustado=seg.salario,
+                dias_efectivos=seg.dias,
+                patron=" + ".join(patron for patron, _ in seg.origenes),
+                registro_patronal=" + ".join(registro for _, registro in seg.origenes)
+            )
+            for seg in ventana.segmentos
+        ]
+        suma_ponderada = ventana.suma_ponderada
+        total_dias = ventana.dias
 
         # ✅ Calcular con los días disponibles (no forzar 1,750)
-        if total_dias > 0:
-            salario_promedio_diario = suma_ponderada / total_dias
-        else:
-            salario_promedio_diario = 0.0
+        salario_promedio_diario = ventana.promedio_diario
+        if total_dias == 0:
             observaciones.append("No se encontraron períodos válidos para el cálculo")
 
         salario_promedio_mensual = salario_promedio_diario * 30.4
 
         # Determinar fechas de la ventana
-        fecha_inicio_ventana = None
-        fecha_fin_ventana = None
-        if segmentos:
-            fecha_inicio_ventana = min(s.fecha_inicio for s in segmentos)
-            fecha_fin_ventana = max(s.fecha_fin for s in segmentos)
+        fecha_inicio_ventana = segmentos[0].fecha_inicio if segmentos else None
+        fecha_fin_ventana = segmentos[-1].fecha_fin if segmentos else None
 
         # ✅ Validaciones mejoradas
         tiene_250_completas = total_dias >= self.DIAS_PARA_PROMEDIO
@@ -409,45 +356,6 @@ class Calculadora250Semanas:
             observaciones=observaciones
         )
 
-    def _cargar_salarios_minimos_historicos(self) -> Dict[str, float]:
-        """Carga tabla histórica completa de SMG general (resto del país) - Fuente: CONASAMI/INEGI"""
-        return {
-            "1987": 3.05, "1988": 7.77, "1989": 8.64, "1990": 11.90,
-            "1991": 13.33, "1992": 13.33, "1993": 14.27, "1994": 15.27,
-            "1995": 16.34, "1996": 22.60, "1997": 26.45, "1998": 30.20,
-            "1999": 34.45, "2000": 37.90, "2001": 40.35, "2002": 42.15,
-            "2003": 43.65, "2004": 45.24, "2005": 46.80, "2006": 48.67,
-            "2007": 50.57, "2008": 52.59, "2009": 54.80, "2010": 57.46,
-            "2011": 59.82, "2012": 62.33, "2013": 64.76, "2014": 67.29,
-            "2015": 70.10, "2016": 73.04, "2017": 80.04, "2018": 88.36,
-            "2019": 102.68, "2020": 123.22, "2021": 141.70, "2022": 172.87,
-            "2023": 207.44, "2024": 248.93, "2025": 278.80
-        }
-
-    def _obtener_salario_minimo(self, fecha: datetime) -> float:
-        """Obtiene el salario mínimo vigente en la fecha - CORREGIDO: Fallback al año histórico mínimo"""
-        año = str(fecha.year)
-
-        if año in self.salarios_minimos:
-            if self.modo_debug:
-                print(f"[DEBUG SMG] Año {año}: ${self.salarios_minimos[año]:.2f}")
-            return self.salarios_minimos[año]
-
-        años_disponibles = sorted([int(a) for a in self.salarios_minimos.keys()])
-        año_int = fecha.year
-
-        for año_hist in reversed(años_disponibles):
-            if año_hist <= año_int:
-                if self.modo_debug:
-                    print(f"[DEBUG SMG] Año {año} no encontrado, usando {año_hist}: ${self.salarios_minimos[str(año_hist)]:.2f}")
-                return self.salarios_minimos[str(año_hist)]
-
-        # Fallback corregido: Usa el año más antiguo de la tabla (no fijo en 1990)
-        año_minimo = min(años_disponibles)
-        if self.modo_debug:
-            print(f"[DEBUG SMG] Fallback extremo a año mínimo {año_minimo}: ${self.salarios_minimos[str(año_minimo)]:.2f}")
-        return self.salarios_minimos[str(año_minimo)]
-
     def _imprimir_debug(self, resultado: ResultadoPromedio250):
         """Imprime información de debug"""
         print("=== DEBUG CÁLCULO 250 SEMANAS ===")
@@ -487,13 +395,56 @@ class Calculadora250Semanas:
 
 def calcular_promedio_250_desde_correccion(datos_corregidos: Dict[str, Any],
                                          fecha_referencia: Optional[str] = None,
-                                         debug: bool = False) -> Dict[str, Any]:
+                                         debug: bool = False,
+                                         carrera: Optional[Carrera] = None) -> Dict[str, Any]:
     """Función principal para integración con el pipeline"""
     calculadora = Calculadora250Semanas(modo_debug=debug)
-    resultado = calculadora.calcular_promedio_250_semanas(datos_corregidos, fecha_referencia)
+    resultado = calculadora.calcular_promedio_250_semanas(datos_corregidos, fecha_referencia, carrera)
     return resultado.to_dict()
 
 
+def serie_promedio_250_desde_correccion(datos_corregidos: Dict[str, Any],
+                                        fecha_desde: str, fecha_hasta: str) -> Dict[str, Any]:
+    """
+    Serie mensual del promedio de 250 semanas entre dos fechas (aaaa-mm-dd)
+
+    Cada punto es el promedio si la fecha de referencia (retiro) fuera el
+    último día del mes. Fechas posteriores a hoy suponen que los empleos
+    vigentes continúan con su último salario.
+
+    Raises:
+        ValueError: Fechas inválidas, invertidas o a más de MAX_MESES_SERIE meses
+    """
+    desde = datetime.strptime(fecha_desde, '%Y-%m-%d')
+    hasta = datetime.strptime(fecha_hasta, '%Y-%m-%d')
+    if hasta < desde:
+        raise ValueError("fecha_hasta debe ser igual o posterior a fecha_desde")
+    meses = (hasta.year - desde.year) * 12 + hasta.month - desde.month + 1
+    if meses > MAX_MESES_SERIE:
+        raise ValueError(f"El rango abarca {meses} meses; el máximo es {MAX_MESES_SERIE}")
+
+    calculadora = Calculadora250Semanas()
+    indice = calculadora.construir_indice(datos_corregidos, max(hasta, datetime.now()))
+    serie = indice.serie_mensual(desde.date(), hasta.date())
+
+    return {
+        "fecha_desde": fecha_desde,
+        "fecha_hasta": fecha_hasta,
+        "total_puntos": len(serie),
+        "serie": [
+            {
+                "fecha_referencia": datetime.fromordinal(punto.fecha_referencia).strftime('%Y-%m-%d'),
+                "salario_promedio_diario": round(punto.promedio_diario, 2),
+                "salario_promedio_mensual": round(punto.promedio_diario * 30.4, 2),
+                "dias_calculados": punto.dias,
+                "fecha_inicio_ventana": datetime.fromordinal(punto.inicio_ventana).strftime('%Y-%m-%d') if punto.inicio_ventana else None,
+                "tiene_250_semanas_completas": "Sí" if punto.completa else "No"
+            }
+            for punto in serie
+        ]
+    }
+
+
 if __name__ == "__main__":
     pass
 
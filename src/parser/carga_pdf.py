@@ -0,0 +1,254 @@
+"""
+Recepción de PDFs subidos con límites de tamaño y de páginas
+
+Starlette ya guarda el upload en un SpooledTemporaryFile (en memoria hasta
+1 MB, luego en disco) antes de llamar al endpoint, así que aquí no se hace
+otra copia: se recorre ese archivo por bloques para la firma, el tamaño y el
+SHA-256, se cuentan las páginas con pypdfium2 (fuera del event loop) y los
+extractores abren el mismo archivo (PDFCargado.flujo()). Solo quien necesita
+una ruta (el pool de procesos del API) la pide con PDFCargado.ruta, que
+vuelca el archivo a disco una vez.
+
+El tamaño se limita antes de que el cuerpo llegue completo con
+LimiteCuerpoMultipart (middleware ASGI): un Content-Length mayor se rechaza
+sin leer nada y un cuerpo sin Content-Length se corta en cuanto lo excede.
+Solo aplica a multipart/form-data, así que el lote NDJSON no se ve afectado.
+
+COORDINA CON: extraccion_texto_pdf.py (recibe el archivo o la ruta)
+USO: from carga_pdf import recibir_pdf, LimiteCuerpoMultipart
+     app.add_middleware(LimiteCuerpoMultipart, max_bytes=...)
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from typing import BinaryIO, Optional
+
+import pypdfium2 as pdfium
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from extraccion_texto_pdf import LOCK_PDFIUM
+
+# Tamaño de cada lectura del upload: acota la memoria por solicitud
+TAMANO_BLOQUE = 1024 * 1024
+
+MAX_TAMANO_PDF_MB = int(os.getenv("MAX_PDF_SIZE_MB", "15"))
+MAX_PAGINAS_PDF = int(os.getenv("MAX_PDF_PAGES", "60"))
+
+# Holgura del límite del cuerpo multipart sobre el del PDF (encabezados y otros campos)
+HOLGURA_MULTIPART = 64 * 1024
+
+FIRMA_PDF = b"%PDF-"
+
+
+class ErrorCargaPDF(HTTPException):
+    """Upload rechazado antes de procesarse"""
+
+
+class PDFDemasiadoGrande(ErrorCargaPDF):
+    def __init__(self, max_bytes: int):
+        super().__init__(
+            status_code=413,
+            detail=f"El PDF excede el tamaño máximo de {max_bytes // (1024 * 1024)} MB"
+        )
+
+
+class PDFDemasiadasPaginas(ErrorCargaPDF):
+    def __init__(self, paginas: int, max_paginas: int):
+        super().__init__(
+            status_code=413,
+            detail=f"El PDF tiene {paginas} páginas; el máximo permitido es {max_paginas}"
+        )
+
+
+class PDFInvalido(ErrorCargaPDF):
+    def __init__(self, motivo: str):
+        super().__init__(status_code=400, detail=f"PDF inválido: {motivo}")
+
+
+@dataclass
+class PDFCargado:
+    """
+    PDF ya validado; `archivo` es el del upload (Starlette lo cierra al
+    terminar la solicitud)
+    """
+    archivo: BinaryIO
+    nombre_archivo: str
+    sha256: str
+    tamano_bytes: int
+    paginas: int
+    directorio: Optional[str] = None
+    _ruta: Optional[str] = field(default=None, repr=False)
+
+    def flujo(self) -> BinaryIO:
+        """El archivo del upload desde el inicio, para pdfplumber.open o pdfium"""
+        self.archivo.seek(0)
+        return self.archivo
+
+    @property
+    def ruta(self) -> str:
+        """
+        Ruta a un archivo temporal con el PDF, creado la primera vez que se
+        pide (solo para pasarlo a otro proceso)
+        """
+        if self._ruta is None:
+            descriptor, ruta = tempfile.mkstemp(suffix=".pdf", prefix="constancia_", dir=self.directorio)
+            try:
+                with os.fdopen(descriptor, "wb") as destino:
+                    shutil.copyfileobj(self.flujo(), destino, TAMANO_BLOQUE)
+            except BaseException:
+                os.remove(ruta)
+                raise
+            self._ruta = ruta
+        return self._ruta
+
+    def eliminar(self):
+        """Borra el archivo temporal si se creó (idempotente)"""
+        if self._ruta is None:
+            return
+        try:
+            os.remove(self._ruta)
+        except OSError:
+            pass
+        self._ruta = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.eliminar()
+        return False
+
+    def to_dict(self):
+        return {
+            'nombre_archivo': self.nombre_archivo,
+            'sha256': self.sha256,
+            'tamano_bytes': self.tamano_bytes,
+            'paginas': self.paginas
+        }
+
+
+def contar_paginas(archivo: BinaryIO) -> int:
+    """Cuenta páginas con pdfium sin parsear el contenido (mucho más barato que pdfplumber)"""
+    with LOCK_PDFIUM:
+        archivo.seek(0)
+        try:
+            documento = pdfium.PdfDocument(archivo)
+        except pdfium.PdfiumError as e:
+            raise PDFInvalido(str(e))
+        try:
+            return len(documento)
+        finally:
+            documento.close()
+
+
+async def recibir_pdf(upload: UploadFile,
+                      max_bytes: Optional[int] = None,
+                      max_paginas: Optional[int] = None,
+                      directorio: Optional[str] = None) -> PDFCargado:
+    """
+    Valida tamaño, firma y páginas del upload sin copiarlo
+
+    Args:
+        upload: Archivo recibido por FastAPI
+        max_bytes: Tamaño máximo (None = MAX_PDF_SIZE_MB)
+        max_paginas: Páginas máximas (None = MAX_PDF_PAGES, 0 = sin límite)
+        directorio: Carpeta del archivo temporal si se pide PDFCargado.ruta
+            (None = la del sistema)
+
+    Returns:
+        PDFCargado; el llamador debe invocar eliminar() o usarlo como context manager
+
+    Raises:
+        PDFDemasiadoGrande, PDFDemasiadasPaginas (413) o PDFInvalido (400)
+    """
+    if max_bytes is None:
+        max_bytes = MAX_TAMANO_PDF_MB * 1024 * 1024
+    if max_paginas is None:
+        max_paginas = MAX_PAGINAS_PDF
+
+    hash_sha256 = hashlib.sha256()
+    tamano = 0
+
+    await upload.seek(0)
+    while True:
+        bloque = await upload.read(TAMANO_BLOQUE)
+        if not bloque:
+            break
+
+        if tamano == 0 and not bloque.startswith(FIRMA_PDF):
+            raise PDFInvalido("el archivo no comienza con la firma %PDF-")
+
+        tamano += len(bloque)
+        if tamano > max_bytes:
+            raise PDFDemasiadoGrande(max_bytes)
+
+        hash_sha256.update(bloque)
+
+    if tamano == 0:
+        raise PDFInvalido("archivo vacío")
+
+    paginas = await run_in_threadpool(contar_paginas, upload.file)
+    if max_paginas and paginas > max_paginas:
+        raise PDFDemasiadasPaginas(paginas, max_paginas)
+
+    return PDFCargado(
+        archivo=upload.file,
+        nombre_archivo=upload.filename or "",
+        sha256=hash_sha256.hexdigest(),
+        tamano_bytes=tamano,
+        paginas=paginas,
+        directorio=directorio
+    )
+
+
+class LimiteCuerpoMultipart:
+    """
+    Middleware ASGI: limita el cuerpo de las solicitudes multipart/form-data
+
+    Responde 413 sin leer el cuerpo si Content-Length excede el límite; si no
+    lo declara, la lectura lanza PDFDemasiadoGrande en cuanto los bytes
+    recibidos lo exceden (FastAPI la convierte en la misma respuesta 413).
+    Los demás tipos de contenido (JSON, NDJSON) no se tocan.
+    """
+
+    def __init__(self, app, max_bytes: Optional[int] = None):
+        self.app = app
+        self.max_bytes_pdf = max_bytes if max_bytes is not None else MAX_TAMANO_PDF_MB * 1024 * 1024
+        self.max_bytes = self.max_bytes_pdf + HOLGURA_MULTIPART
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encabezados = dict(scope.get("headers") or [])
+        if not encabezados.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            declarado = int(encabezados.get(b"content-length", b"0"))
+        except ValueError:
+            declarado = 0
+        if declarado > self.max_bytes:
+            error = PDFDemasiadoGrande(self.max_bytes_pdf)
+            respuesta = JSONResponse({"detail": error.detail}, status_code=error.status_code)
+            await respuesta(scope, receive, send)
+            return
+
+        recibidos = 0
+
+        async def recibir():
+            nonlocal recibidos
+            mensaje = await receive()
+            if mensaje["type"] == "http.request":
+                recibidos += len(mensaje.get("body", b""))
+                if recibidos > self.max_bytes:
+                    raise PDFDemasiadoGrande(self.max_bytes_pdf)
+            return mensaje
+
+        await self.app(scope, recibir, send)
@@ -5,12 +5,30 @@ VERSIÓN MODIFICADA: Incluye fechas hipotéticas para trabajadores vigentes
 
 COORDINA CON: correccion_semanas_final.py
 USO: from conservacion_derechos import CalculadoraConservacionDerechos
+     indice = CalculadoraConservacionDerechos().construir_indice(datos_corregidos)
+     indice.consultar_fechas(dias_ordinales), indice.linea_tiempo()
 """
 
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, Iterable, Optional, List
 from dataclasses import dataclass
 
+from modules.modulo3.utils.carrera import Carrera
+from modules.modulo3.utils.date_helpers import ordinal_a_datetime, ordinal_a_iso, texto_a_ordinal
+from utils.mapa_dias import MapaDiasCarrera
+from utils.ventanas_cotizacion import DIAS_5_AÑOS, VentanasCotizacion
+
+# Estados de la línea de tiempo de conservación
+ESTADO_SIN_ALTA = "SIN_ALTA"
+ESTADO_COTIZANDO = "COTIZANDO"
+ESTADO_INTERRUPCION = "INTERRUPCION"
+ESTADO_CONSERVA = "CONSERVA_DERECHOS"
+ESTADO_VENCIDO = "VENCIDO"
+
+# Máximo de fechas por consulta a la línea de tiempo
+MAX_FECHAS_CONSULTA = 600
+
 @dataclass
 class ResultadoConservacion:
     """Resultado del cálculo de conservación de derechos"""
@@ -60,6 +78,185 @@ class ResultadoConservacion:
         return resultado
 
 
+@dataclass
+class BaseConservacion:
+    """Datos de la carrera que no dependen de la fecha de consulta"""
+    periodos_procesados: List[Dict]
+    semanas_reconocidas: int
+    ley_aplicable: str
+    conservacion_semanas: int
+    criterio_base: str
+    fecha_primer_alta: datetime
+    fecha_ultima_baja: Optional[datetime]
+    es_calculo_hipotetico: bool
+
+
+def _ventanas_periodos(periodos_procesados: List[Dict],
+                       fin_abierto: Optional[datetime] = None) -> VentanasCotizacion:
+    """Días cotizados de los períodos procesados; los que no tienen baja cierran en `fin_abierto`"""
+    intervalos = []
+    for periodo in periodos_procesados:
+        alta, baja = periodo.get('fecha_alta'), periodo.get('fecha_baja') or fin_abierto
+        if isinstance(alta, datetime) and isinstance(baja, datetime):
+            intervalos.append((alta.toordinal(), baja.toordinal()))
+    return VentanasCotizacion.desde_intervalos(intervalos)
+
+
+def _sumar_años(ordinal: int, años: int) -> int:
+    """Mismo día y mes `años` después (29/02 → 28/02 en años no bisiestos)"""
+    fecha = date.fromordinal(ordinal)
+    try:
+        return fecha.replace(year=fecha.year + años).toordinal()
+    except ValueError:
+        return fecha.replace(year=fecha.year + años, day=28).toordinal()
+
+
+class IndiceConservacion:
+    """
+    Índice de conservación de derechos de una carrera
+
+    Se construye una vez (CalculadoraConservacionDerechos.construir_indice) y
+    responde el estado a cualquier fecha sin volver a leer los períodos:
+
+    - ventanas de cotización (utils/ventanas_cotizacion.py): "¿cotizaba ese
+      día?" y "semanas en los 5 años previos" son búsquedas binarias; la
+      mejor ventana de 5 años y el primer día con 52 semanas en 5 años se
+      calculan al construir el índice
+    - cortes de la línea de tiempo: última baja, vencimiento de la
+      conservación y ventanas de reconocimiento al reingreso (Art. 151 LSS:
+      hasta 3 años de interrupción se reconoce todo al reingresar, de 3 a 6
+      años tras 26 semanas nuevas, más de 6 años tras 52)
+
+    Cada consulta es O(log n). Con trabajador vigente la última baja es la
+    fecha de emisión (cálculo hipotético, como en calcular_conservacion_derechos).
+    """
+
+    # (años de interrupción a partir de los que aplica, semanas de reingreso necesarias)
+    VENTANAS_REINGRESO = ((0, 0), (3, 26), (6, 52))
+
+    def __init__(self, base: BaseConservacion):
+        self.base = base
+        self.primer_alta = base.fecha_primer_alta.toordinal()
+        self.ultima_baja = base.fecha_ultima_baja.toordinal() if base.fecha_ultima_baja else None
+        self.vencimiento = (
+            self.ultima_baja + base.conservacion_semanas * 7 if self.ultima_baja is not None else None
+        )
+
+        self.ventanas = _ventanas_periodos(base.periodos_procesados)
+
+        # (primer día, semanas de reingreso necesarias) de cada ventana tras la última baja
+        self.ventanas_reingreso = [
+            (_sumar_años(self.ultima_baja, años) + 1, semanas)
+            for años, semanas in self.VENTANAS_REINGRESO
+        ] if self.ultima_baja is not None else []
+        self._inicios_ventanas = [desde for desde, _ in self.ventanas_reingreso]
+
+        self.mejor_ventana_5_años = self.ventanas.mejor_ventana(DIAS_5_AÑOS)
+        self.primer_dia_52_semanas = self.ventanas.primer_dia_con(
+            CalculadoraConservacionDerechos.SEMANAS_REACTIVACION, DIAS_5_AÑOS
+        )
+
+    def cotiza_en(self, dia: int) -> bool:
+        return self.ventanas.cotiza_en(dia)
+
+    def semanas_ultimos_5_años(self, dia: int) -> int:
+        """Semanas completas cotizadas en los 5 años que terminan en `dia`"""
+        return self.ventanas.semanas_ventana(dia, DIAS_5_AÑOS)
+
+    def semanas_para_reconocer(self, dia: int) -> int:
+        """Semanas de reingreso necesarias para que se reconozcan las anteriores si reingresa en `dia`"""
+        k = bisect_right(self._inicios_ventanas, dia) - 1
+        return self.ventanas_reingreso[k][1] if k >= 0 else 0
+
+    def estado(self, dia: int) -> str:
+        if dia < self.primer_alta:
+            return ESTADO_SIN_ALTA
+        if self.ultima_baja is None or dia <= self.ultima_baja:
+            return ESTADO_COTIZANDO if self.cotiza_en(dia) else ESTADO_INTERRUPCION
+        return ESTADO_CONSERVA if dia <= self.vencimiento else ESTADO_VENCIDO
+
+    def consultar(self, dia: int) -> Dict[str, Any]:
+        """Estado de derechos a una fecha (ordinal)"""
+        estado = self.estado(dia)
+        return {
+            "fecha": ordinal_a_iso(dia),
+            "estado": estado,
+            "conserva_derechos": ("N/A" if estado == ESTADO_INTERRUPCION else
+                                  "Sí" if estado in (ESTADO_COTIZANDO, ESTADO_CONSERVA) else "No"),
+            "dias_para_vencer": self.vencimiento - dia if estado == ESTADO_CONSERVA else None,
+            "semanas_ultimos_5_anos": self.semanas_ultimos_5_años(dia),
+            "semanas_reingreso_para_reconocer": self.semanas_para_reconocer(dia),
+            "es_calculo_hipotetico": (self.base.es_calculo_hipotetico and self.ultima_baja is not None
+                                      and dia > self.ultima_baja)
+        }
+
+    def consultar_fechas(self, dias: Iterable[int]) -> List[Dict[str, Any]]:
+        return [self.consultar(dia) for dia in dias]
+
+    def cortes(self) -> List[int]:
+        """Días en que puede cambiar el estado o las semanas de reingreso, ordenados"""
+        cortes = {self.primer_alta}
+        for inicio, fin in self.ventanas.tramos():
+            if self.ultima_baja is None or inicio <= self.ultima_baja:
+                cortes.add(inicio)
+                cortes.add(fin + 1)
+        if self.ultima_baja is not None:
+            cortes.add(self.ultima_baja + 1)
+            cortes.add(self.vencimiento + 1)
+            cortes.update(self._inicios_ventanas)
+        return sorted(cortes)
+
+    def linea_tiempo(self, desde: Optional[int] = None, hasta: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Tramos [desde, hasta] con el mismo estado y las mismas semanas de
+        reingreso; el último queda abierto (hasta = None) si no se acota
+        """
+        cortes = self.cortes()
+        if desde is not None:
+            cortes = [desde] + [c for c in cortes if c > desde]
+        if hasta is not None:
+            cortes = [c for c in cortes if c <= hasta]
+
+        tramos: List[Dict[str, Any]] = []
+        for n, inicio in enumerate(cortes):
+            fin = cortes[n + 1] - 1 if n + 1 < len(cortes) else hasta
+            estado = self.estado(inicio)
+            semanas = self.semanas_para_reconocer(inicio)
+            if tramos and tramos[-1]["estado"] == estado and tramos[-1]["semanas_reingreso_para_reconocer"] == semanas:
+                tramos[-1]["hasta"] = ordinal_a_iso(fin) if fin is not None else None
+                continue
+            tramos.append({
+                "desde": ordinal_a_iso(inicio),
+                "hasta": ordinal_a_iso(fin) if fin is not None else None,
+                "estado": estado,
+                "semanas_reingreso_para_reconocer": semanas
+            })
+        return tramos
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ley_aplicable": self.base.ley_aplicable,
+            "semanas_reconocidas": self.base.semanas_reconocidas,
+            "conservacion_semanas": self.base.conservacion_semanas,
+            "fecha_primer_alta": ordinal_a_iso(self.primer_alta),
+            "fecha_ultima_baja": ordinal_a_iso(self.ultima_baja) if self.ultima_baja is not None else None,
+            "fecha_vencimiento": ordinal_a_iso(self.vencimiento) if self.vencimiento is not None else None,
+            "ventanas_reingreso": [
+                {"desde": ordinal_a_iso(desde), "semanas_reingreso_para_reconocer": semanas}
+                for desde, semanas in self.ventanas_reingreso
+            ],
+            "mejor_ventana_5_anos": {
+                "desde": ordinal_a_iso(self.mejor_ventana_5_años[0]),
+                "hasta": ordinal_a_iso(self.mejor_ventana_5_años[1]),
+                "semanas": self.mejor_ventana_5_años[2] // 7
+            } if self.mejor_ventana_5_años else None,
+            "fecha_cumple_52_semanas_5_anos": (
+                ordinal_a_iso(self.primer_dia_52_semanas) if self.primer_dia_52_semanas is not None else None
+            ),
+            "es_calculo_hipotetico": self.base.es_calculo_hipotetico
+        }
+
+
 class CalculadoraConservacionDerechos:
     """
     Calculadora de conservación de derechos IMSS según Ley 73 y Ley 97
@@ -136,7 +333,9 @@ class CalculadoraConservacionDerechos:
 
     def calcular_conservacion_derechos(self,
                                      datos_corregidos: Dict[str, Any],
-                                     fecha_emision: Optional[str] = None) -> ResultadoConservacion:
+                                     fecha_emision: Optional[str] = None,
+                                     mapa_dias: Optional[MapaDiasCarrera] = None,
+                                     carrera: Optional[Carrera] = None) -> ResultadoConservacion:
         """
         Calcula conservación de derechos usando MÉTODO OFICIAL IMSS
         ACTUALIZADO: Usa nomenclatura oficial estandarizada y fechas hipotéticas
@@ -149,62 +348,23 @@ class CalculadoraConservacionDerechos:
         Args:
             datos_corregidos: Resultado del corrector (con empalmes eliminados)
             fecha_emision: Fecha de emisión del reporte
+            mapa_dias: Mapa de días ya construido para la constancia (opcional,
+                el tercer valor de aplicar_correccion_con_carrera); se usa en
+                la reactivación en lugar de volver a unir los períodos
+            carrera: Modelo de los mismos períodos (opcional, ver
+                CorreccionSemanasIMSS.carrera); evita volver a leer las fechas
 
         Returns:
             ResultadoConservacion con cálculos exactos al IMSS oficial
         """
         try:
-            # 1. OBTENER EL "TOTAL DE SEMANAS COTIZADAS" OFICIAL - NOMENCLATURA ACTUALIZADA
-            datos_basicos = datos_corregidos.get('datos_basicos', {})
-
-            # ✅ Priorizar nomenclatura oficial IMSS (actualizada)
-            total_semanas_oficial = (
-                datos_basicos.get('total_semanas_cotizadas', 0) or
-                datos_basicos.get('semanas_cotizadas_imss', 0)
-            )
-
-            # ✅ Si no existe en datos_basicos, buscar en corrección aplicada
-            if total_semanas_oficial == 0:
-                correccion_info = datos_corregidos.get('correccion_aplicada', {})
-                total_semanas_oficial = (
-                    correccion_info.get('total_semanas_cotizadas', 0) or
-                    correccion_info.get('semanas_cotizadas_imss_calculadas', 0)
-                )
-
-            if total_semanas_oficial == 0:
-                raise ValueError("No se encontró total de semanas oficial del IMSS")
-
-            # 2. PROCESAR PERÍODOS PARA ENCONTRAR FECHAS
-            historial = datos_corregidos.get('historial_laboral', {})
-            periodos_corregidos = historial.get('periodos', [])
-
-            periodos_procesados = self._procesar_periodos_corregidos(
-                periodos_corregidos,
-                fecha_emision or datos_basicos.get('fecha_emision')
-            )
-
-            # 3. DETERMINAR LEY APLICABLE
-            fecha_primer_alta = self._encontrar_primer_alta(periodos_procesados)
-            if fecha_primer_alta is None:
-                raise ValueError("No se pudo determinar la fecha de primer alta")
-
-            ley = self.determinar_ley_aplicable(fecha_primer_alta)
-
-            # 4. CALCULAR CONSERVACIÓN EN SEMANAS (MÉTODO OFICIAL)
-            if ley == "Ley 73":
-                # Ley 73: Una cuarta parte del tiempo cotizado
-                conservacion_semanas = self.calcular_conservacion_ley73_oficial(total_semanas_oficial)
-                criterio_base = f"Una cuarta parte del tiempo cotizado (máx. {self.MAXIMO_CONSERVACION_AÑOS} años)"
-            else:
-                # Ley 97: Todo el tiempo cotizado (max 12 años)
-                conservacion_semanas = self.calcular_conservacion_ley97_oficial(total_semanas_oficial)
-                criterio_base = f"Todo el tiempo cotizado (máx. {self.MAXIMO_CONSERVACION_AÑOS} años)"
-
-            # 5. ENCONTRAR ÚLTIMA BAJA (MODIFICADO: puede usar fecha hipotética)
-            fecha_ultima_baja, es_hipotetico = self._encontrar_ultima_baja_con_hipotetica(
-                periodos_procesados,
-                fecha_emision or datos_basicos.get('fecha_emision')
-            )
+            base = self._preparar_conservacion(datos_corregidos, fecha_emision, carrera)
+            periodos_procesados = base.periodos_procesados
+            total_semanas_oficial = base.semanas_reconocidas
+            ley = base.ley_aplicable
+            conservacion_semanas = base.conservacion_semanas
+            criterio_base = base.criterio_base
+            fecha_ultima_baja, es_hipotetico = base.fecha_ultima_baja, base.es_calculo_hipotetico
 
             # 6. CALCULAR FECHA DE VENCIMIENTO (MÉTODO OFICIAL)
             fecha_vencimiento = None
@@ -229,7 +389,9 @@ class CalculadoraConservacionDerechos:
                     # Si NO está vigente, verificar si puede reactivar comparando con fecha actual
                     if fecha_vencimiento and fecha_vencimiento < self.fecha_actual:
                         # Ya venció, verificar si puede reactivar con 52 semanas en últimos 5 años
-                        puede_reactivar = self.puede_reactivar_derechos(periodos_procesados, fecha_ultima_baja)
+                        puede_reactivar = self.puede_reactivar_derechos(
+                            periodos_procesados, fecha_ultima_baja, mapa_dias
+                        )
                     else:
                         puede_reactivar = False
 
@@ -261,48 +423,133 @@ class CalculadoraConservacionDerechos:
         except Exception as e:
             raise ValueError(f"Error calculando conservación oficial: {str(e)}")
 
-    def _procesar_periodos_corregidos(self, periodos_corregidos: List[Dict],
+    def construir_indice(self, datos_corregidos: Dict[str, Any],
+                         fecha_emision: Optional[str] = None,
+                         carrera: Optional[Carrera] = None) -> IndiceConservacion:
+        """
+        Índice de conservación para consultar el estado a muchas fechas
+
+        Se construye una vez por carrera (mismos datos que
+        calcular_conservacion_derechos); cada consulta es O(log n).
+        """
+        try:
+            return IndiceConservacion(self._preparar_conservacion(datos_corregidos, fecha_emision, carrera))
+        except Exception as e:
+            raise ValueError(f"Error calculando conservación oficial: {str(e)}")
+
+    def _preparar_conservacion(self, datos_corregidos: Dict[str, Any],
+                               fecha_emision: Optional[str],
+                               carrera: Optional[Carrera]) -> 'BaseConservacion':
+        """
+        Pasos comunes al cálculo puntual y al índice: total oficial, períodos,
+        ley aplicable, semanas de conservación y última baja (real o hipotética)
+        """
+        # 1. OBTENER EL "TOTAL DE SEMANAS COTIZADAS" OFICIAL - NOMENCLATURA ACTUALIZADA
+        datos_basicos = datos_corregidos.get('datos_basicos', {})
+
+        # ✅ Priorizar nomenclatura oficial IMSS (actualizada)
+        total_semanas_oficial = (
+            datos_basicos.get('total_semanas_cotizadas', 0) or
+            datos_basicos.get('semanas_cotizadas_imss', 0)
+        )
+
+        # ✅ Si no existe en datos_basicos, buscar en corrección aplicada
+        if total_semanas_oficial == 0:
+            correccion_info = datos_corregidos.get('correccion_aplicada', {})
+            total_semanas_oficial = (
+                correccion_info.get('total_semanas_cotizadas', 0) or
+                correccion_info.get('semanas_cotizadas_imss_calculadas', 0)
+            )
+
+        if total_semanas_oficial == 0:
+            raise ValueError("No se encontró total de semanas oficial del IMSS")
+
+        # 2. PROCESAR PERÍODOS PARA ENCONTRAR FECHAS
+        historial = datos_corregidos.get('historial_laboral', {})
+        periodos_corregidos = historial.get('periodos', [])
+
+        if carrera is None or not carrera.corresponde_a(periodos_corregidos):
+            carrera = Carrera.desde_periodos(periodos_corregidos)
+        periodos_procesados = self._procesar_periodos_corregidos(
+            carrera,
+            fecha_emision or datos_basicos.get('fecha_emision')
+        )
+
+        # 3. DETERMINAR LEY APLICABLE
+        fecha_primer_alta = self._encontrar_primer_alta(periodos_procesados)
+        if fecha_primer_alta is None:
+            raise ValueError("No se pudo determinar la fecha de primer alta")
+
+        ley = self.determinar_ley_aplicable(fecha_primer_alta)
+
+        # 4. CALCULAR CONSERVACIÓN EN SEMANAS (MÉTODO OFICIAL)
+        if ley == "Ley 73":
+            # Ley 73: Una cuarta parte del tiempo cotizado
+            conservacion_semanas = self.calcular_conservacion_ley73_oficial(total_semanas_oficial)
+            criterio_base = f"Una cuarta parte del tiempo cotizado (máx. {self.MAXIMO_CONSERVACION_AÑOS} años)"
+        else:
+            # Ley 97: Todo el tiempo cotizado (max 12 años)
+            conservacion_semanas = self.calcular_conservacion_ley97_oficial(total_semanas_oficial)
+            criterio_base = f"Todo el tiempo cotizado (máx. {self.MAXIMO_CONSERVACION_AÑOS} años)"
+
+        # 5. ENCONTRAR ÚLTIMA BAJA (MODIFICADO: puede usar fecha hipotética)
+        fecha_ultima_baja, es_hipotetico = self._encontrar_ultima_baja_con_hipotetica(
+            periodos_procesados,
+            fecha_emision or datos_basicos.get('fecha_emision')
+        )
+
+        return BaseConservacion(
+            periodos_procesados=periodos_procesados,
+            semanas_reconocidas=total_semanas_oficial,
+            ley_aplicable=ley,
+            conservacion_semanas=conservacion_semanas,
+            criterio_base=criterio_base,
+            fecha_primer_alta=fecha_primer_alta,
+            fecha_ultima_baja=fecha_ultima_baja,
+            es_calculo_hipotetico=es_hipotetico
+        )
+
+    def _procesar_periodos_corregidos(self, carrera: Carrera,
                                     fecha_emision: str) -> List[Dict]:
         """
         Convierte períodos corregidos al formato estándar para conservación
 
         Args:
-            periodos_corregidos: Períodos ya procesados por correccion_semanas_final.py
+            carrera: Modelo de los períodos ya procesados por correccion_semanas_final.py
             fecha_emision: Fecha de emisión del reporte
 
         Returns:
             Lista de períodos en formato estándar
         """
         periodos_procesados = []
+        # Los vigentes usan la fecha de emisión como fecha de referencia
+        fecha_baja_vigentes = self._convertir_fecha(fecha_emision) if fecha_emision else None
 
-        for periodo in periodos_corregidos:
-            try:
-                # Convertir fechas
-                fecha_alta = self._convertir_fecha(periodo.get('fecha_inicio'))
-
-                # Manejar fecha de baja (casos vigentes)
-                fecha_fin = periodo.get('fecha_fin', '')
-                if fecha_fin == 'Vigente' or not fecha_fin:
-                    # Usar fecha de emisión como fecha de referencia para vigentes
-                    fecha_baja = self._convertir_fecha(fecha_emision) if fecha_emision else None
-                else:
-                    fecha_baja = self._convertir_fecha(fecha_fin)
-
-                periodo_procesado = {
-                    'fecha_alta': fecha_alta,
-                    'fecha_baja': fecha_baja,
-                    'semanas': periodo.get('semanas_corregidas', periodo.get('semanas_cotizadas', 0)),
-                    'salario': periodo.get('salario_diario', 0),
-                    'patron': periodo.get('patron', ''),
-                    'tipo_movimiento': periodo.get('tipo_movimiento', ''),
-                    'es_vigente': fecha_fin == 'Vigente' or not fecha_fin
-                }
-
-                periodos_procesados.append(periodo_procesado)
-
-            except Exception as e:
-                print(f"Error procesando período: {e}")
-                continue
+        for periodo in carrera.periodos:
+            # Fechas ya leídas por el modelo; otros formatos se intentan aquí
+            if periodo.inicio is not None:
+                fecha_alta = ordinal_a_datetime(periodo.inicio)
+            else:
+                fecha_alta = self._convertir_fecha(periodo.texto_fecha('fecha_inicio'))
+
+            texto_fin = periodo.texto_fecha('fecha_fin')
+            es_vigente = periodo.vigente or not texto_fin
+            if es_vigente:
+                fecha_baja = fecha_baja_vigentes
+            elif periodo.fin is not None:
+                fecha_baja = ordinal_a_datetime(periodo.fin)
+            else:
+                fecha_baja = self._convertir_fecha(texto_fin)
+
+            periodos_procesados.append({
+                'fecha_alta': fecha_alta,
+                'fecha_baja': fecha_baja,
+                'semanas': periodo.get('semanas_corregidas', periodo.get('semanas_cotizadas', 0)),
+                'salario': periodo.salario_diario,
+                'patron': periodo.patron.nombre or '',
+                'tipo_movimiento': periodo.get('tipo_movimiento', ''),
+                'es_vigente': es_vigente
+            })
 
         return periodos_procesados
 
@@ -400,13 +647,21 @@ class CalculadoraConservacionDerechos:
         return primer_alta
 
     def puede_reactivar_derechos(self, periodos_procesados: List[Dict],
-                                fecha_ultima_baja: Optional[datetime]) -> bool:
+                                fecha_ultima_baja: Optional[datetime],
+                                mapa_dias: Optional[MapaDiasCarrera] = None,
+                                ventanas: Optional[VentanasCotizacion] = None) -> bool:
         """
         Verifica si puede reactivar derechos con 52 semanas en 5 años
 
+        Cuenta los días únicos cotizados (sin empalmes) después de la última
+        baja y dentro de los 5 años previos a la fecha actual.
+
         Args:
             periodos_procesados: Lista de períodos procesados
             fecha_ultima_baja: Fecha de la última baja
+            mapa_dias: Mapa de días de la carrera (opcional); evita volver a
+                leer los períodos
+            ventanas: Ventanas de cotización ya construidas (opcional)
 
         Returns:
             True si puede reactivar, False en caso contrario
@@ -414,27 +669,49 @@ class CalculadoraConservacionDerechos:
         if fecha_ultima_baja is None:
             return False  # Si está activo, no necesita reactivación
 
-        # Buscar períodos después de la última baja en los últimos 5 años
+        if ventanas is None:
+            if mapa_dias is not None:
+                ventanas = VentanasCotizacion.desde_mapa(mapa_dias)
+            else:
+                ventanas = _ventanas_periodos(periodos_procesados, self.fecha_actual)
+
+        # Buscar días cotizados después de la última baja en los últimos 5 años
         fecha_limite = self.fecha_actual - timedelta(days=self.PERIODO_REACTIVACION_AÑOS * 365.25)
         fecha_inicio_busqueda = max(fecha_ultima_baja, fecha_limite)
+        dias = ventanas.dias_en(fecha_inicio_busqueda.toordinal() + 1, self.fecha_actual.toordinal() + 1)
+        return dias >= self.SEMANAS_REACTIVACION * 7
+
+def linea_tiempo_conservacion_desde_correccion(datos_corregidos: Dict[str, Any],
+                                               fechas: Optional[List[str]] = None,
+                                               fecha_desde: Optional[str] = None,
+                                               fecha_hasta: Optional[str] = None,
+                                               carrera: Optional[Carrera] = None) -> Dict[str, Any]:
+    """
+    Línea de tiempo completa del estado de derechos y consultas a fechas (aaaa-mm-dd)
 
-        semanas_posteriores = 0
-        for periodo in periodos_procesados:
-            fecha_alta = periodo.get('fecha_alta')
-            fecha_baja = periodo.get('fecha_baja')
+    La línea de tiempo va de la primera alta (o `fecha_desde`) en adelante;
+    el último tramo queda abierto salvo que se indique `fecha_hasta`.
 
-            if not fecha_alta:
-                continue
+    Raises:
+        ValueError: Fechas inválidas, rango invertido o más de MAX_FECHAS_CONSULTA fechas
+    """
+    if fechas and len(fechas) > MAX_FECHAS_CONSULTA:
+        raise ValueError(f"Se pidieron {len(fechas)} fechas; el máximo es {MAX_FECHAS_CONSULTA}")
+    desde = texto_a_ordinal(fecha_desde) if fecha_desde else None
+    hasta = texto_a_ordinal(fecha_hasta) if fecha_hasta else None
+    if desde is not None and hasta is not None and hasta < desde:
+        raise ValueError("fecha_hasta debe ser igual o posterior a fecha_desde")
+    consultas = [texto_a_ordinal(fecha) for fecha in (fechas or [])]
 
-            # Si el alta es posterior a la última baja y dentro de los 5 años
-            if fecha_alta > fecha_inicio_busqueda:
-                fecha_fin_periodo = fecha_baja if fecha_baja else self.fecha_actual
-                if fecha_fin_periodo > fecha_alta:
-                    dias_periodo = (fecha_fin_periodo - fecha_alta).days
-                    semanas_periodo = dias_periodo / 7
-                    semanas_posteriores += semanas_periodo
+    calculadora = CalculadoraConservacionDerechos()
+    fecha_emision = datos_corregidos.get('datos_basicos', {}).get('fecha_emision')
+    indice = calculadora.construir_indice(datos_corregidos, fecha_emision, carrera)
 
-        return semanas_posteriores >= self.SEMANAS_REACTIVACION
+    return {
+        "indice": indice.to_dict(),
+        "linea_tiempo": indice.linea_tiempo(desde, hasta),
+        "consultas": indice.consultar_fechas(consultas)
+    }
 
 # Función de ejemplo para testing
 def ejemplo_uso_con_datos_corregidos():
@@ -6,10 +6,14 @@ Autor: Sistema de análisis IMSS
 Versión: 1.0
 """
 
-from datetime import datetime, timedelta
+from datetime import date, datetime
 from typing import Dict, List, Any, Tuple
 import json
 
+from utils.intervalos import (
+    contar_dias_unicos, detectar_empalmes_periodos, intervalo_periodo, ordinal_fin_vigente
+)
+
 class CorreccionSemanasIMSS:
     """
     Módulo de corrección post-extracción para cálculos de semanas IMSS.
@@ -143,32 +147,21 @@ class CorreccionSemanasIMSS:
         """Calcula semanas totales eliminando completamente los empalmes"""
         self.correcciones_aplicadas.append("eliminacion_empalmes_solapamientos")
         
-        dias_ocupados = set()
-        
+        # Unión de intervalos de días ordinales (sin enumerar cada fecha)
+        fin_vigente = None
+        intervalos = []
+
         for periodo in periodos:
             try:
-                inicio = datetime.strptime(periodo['fecha_inicio'], '%d/%m/%Y')
-                
-                if periodo['fecha_fin'] == 'Vigente':
-                    try:
-                        fin = datetime.strptime(fecha_emision, '%Y-%m-%d')
-                    except:
-                        fin = datetime.now()
-                else:
-                    fin = datetime.strptime(periodo['fecha_fin'], '%d/%m/%Y')
-                
-                # Agregar todos los días únicos del período
-                dia_actual = inicio
-                while dia_actual <= fin:
-                    dias_ocupados.add(dia_actual.date())
-                    dia_actual += timedelta(days=1)
-                    
+                if fin_vigente is None and periodo['fecha_fin'] == 'Vigente':
+                    fin_vigente = ordinal_fin_vigente(fecha_emision)
+                intervalos.append(intervalo_periodo(periodo, fin_vigente))
             except Exception as e:
                 if self.modo_debug:
                     print(f"[ERROR] Error procesando período {periodo.get('patron', 'N/A')}: {e}")
                 continue
-        
-        dias_unicos = len(dias_ocupados)
+
+        dias_unicos = contar_dias_unicos(intervalos)
         semanas_sin_empalmes = dias_unicos // 7  # Solo semanas completas
         
         if self.modo_debug:
@@ -178,61 +171,23 @@ class CorreccionSemanasIMSS:
         return semanas_sin_empalmes
     
     def _detectar_empalmes(self, periodos: List[Dict]) -> List[Dict]:
-        """Detecta y cuantifica empalmes entre períodos"""
+        """Detecta empalmes entre períodos con un barrido por fecha de inicio"""
         empalmes = []
-        
-        # Ordenar períodos por fecha de inicio
-        periodos_ordenados = sorted(periodos, key=lambda x: datetime.strptime(x['fecha_inicio'], '%d/%m/%Y'))
-        
-        for i in range(len(periodos_ordenados)):
-            for j in range(i + 1, len(periodos_ordenados)):
-                periodo1 = periodos_ordenados[i]
-                periodo2 = periodos_ordenados[j]
-                
-                empalme = self._calcular_empalme_entre_periodos(periodo1, periodo2)
-                if empalme:
-                    empalmes.append(empalme)
-        
+
+        # Fechas leídas una vez; los vigentes se cierran en la fecha actual
+        for periodo1, periodo2, inicio, fin in detectar_empalmes_periodos(periodos):
+            dias_solapamiento = fin - inicio + 1
+            empalmes.append({
+                'patron1': periodo1['patron'][:30],
+                'patron2': periodo2['patron'][:30],
+                'fecha_inicio_empalme': date.fromordinal(inicio).strftime('%d/%m/%Y'),
+                'fecha_fin_empalme': date.fromordinal(fin).strftime('%d/%m/%Y'),
+                'dias_solapamiento': dias_solapamiento,
+                'semanas_solapamiento': dias_solapamiento // 7
+            })
+
         return empalmes
-    
-    def _calcular_empalme_entre_periodos(self, periodo1: Dict, periodo2: Dict) -> Dict:
-        """Calcula el empalme específico entre dos períodos"""
-        try:
-            inicio1 = datetime.strptime(periodo1['fecha_inicio'], '%d/%m/%Y')
-            inicio2 = datetime.strptime(periodo2['fecha_inicio'], '%d/%m/%Y')
-            
-            # Determinar fin de cada período
-            if periodo1['fecha_fin'] == 'Vigente':
-                fin1 = datetime.now()  # Aproximación
-            else:
-                fin1 = datetime.strptime(periodo1['fecha_fin'], '%d/%m/%Y')
-                
-            if periodo2['fecha_fin'] == 'Vigente':
-                fin2 = datetime.now()
-            else:
-                fin2 = datetime.strptime(periodo2['fecha_fin'], '%d/%m/%Y')
-            
-            # Calcular solapamiento
-            inicio_solapamiento = max(inicio1, inicio2)
-            fin_solapamiento = min(fin1, fin2)
-            
-            if inicio_solapamiento <= fin_solapamiento:
-                dias_solapamiento = (fin_solapamiento - inicio_solapamiento).days + 1
-                semanas_solapamiento = dias_solapamiento // 7
-                
-                return {
-                    'patron1': periodo1['patron'][:30],
-                    'patron2': periodo2['patron'][:30],
-                    'fecha_inicio_empalme': inicio_solapamiento.strftime('%d/%m/%Y'),
-                    'fecha_fin_empalme': fin_solapamiento.strftime('%d/%m/%Y'),
-                    'dias_solapamiento': dias_solapamiento,
-                    'semanas_solapamiento': semanas_solapamiento
-                }
-        except:
-            pass
-        
-        return None
-    
+
     def _generar_reporte_cambios(self, periodos_orig: List, periodos_corr: List) -> List[Dict]:
         """Genera reporte detallado de cambios por período"""
         cambios = []
@@ -5,11 +5,19 @@ Versión final para producción
 Uso:
     from correccion_semanas_final import aplicar_correccion_exacta
     resultado_corregido = aplicar_correccion_exacta(resultado_parser)
+
+El resultado comparte con la entrada todo lo que la corrección no cambia
+(datos_basicos, movimientos, campos del período): solo se crean de nuevo los
+dicts que se modifican. Ninguna función modifica su entrada; quien reciba el
+resultado y quiera modificar un sub-objeto compartido debe copiarlo antes.
 """
 
-from datetime import datetime, timedelta
-from typing import Dict, List, Any
-import json
+from datetime import date
+from typing import Dict, List, Any, Optional, Tuple
+
+from modules.modulo3.utils.carrera import Carrera, Periodo
+from utils.intervalos import detectar_solapamientos
+from utils.mapa_dias import MapaDiasCarrera
 
 class CorreccionSemanasIMSS:
     """Corrector de semanas con precisión exacta al IMSS oficial"""
@@ -17,24 +25,38 @@ class CorreccionSemanasIMSS:
     def __init__(self, modo_debug: bool = False):
         self.modo_debug = modo_debug
         self.correcciones_aplicadas = []
+        self.mapa_dias: Optional[MapaDiasCarrera] = None
+        self.carrera: Optional[Carrera] = None
     
-    def corregir_resultado_completo(self, resultado_parser: Dict) -> Dict:
+    def corregir_resultado_completo(self, resultado_parser: Dict, carrera: Optional[Carrera] = None) -> Dict:
         """
         Aplica todas las correcciones necesarias para precisión exacta
         CORREGIDO: Usa nomenclatura oficial IMSS
 
         Args:
             resultado_parser: Resultado del HistorialLaboralExtractor
+            carrera: Modelo ya construido por el parser; se usa (copiado, nunca
+                se modifica) solo si corresponde a estos mismos períodos en el
+                mismo orden (Carrera.corresponde_a), si no se construye desde los dicts
 
         Returns:
             Resultado con correcciones aplicadas y precisión exacta
         """
-        # Copia profunda para no modificar original
-        resultado = json.loads(json.dumps(resultado_parser))
+        # Copia superficial: los sub-objetos que cambian se reemplazan abajo,
+        # el resto se comparte con el resultado del parser
+        resultado = dict(resultado_parser)
 
         # Extraer datos necesarios - USAR NOMENCLATURA OFICIAL
         periodos = resultado['historial_laboral']['periodos']
         fecha_emision = resultado['datos_basicos']['fecha_emision']
+
+        # Fechas leídas una sola vez; las correcciones trabajan sobre ordinales
+        # y se escriben en un modelo propio (el del parser no se modifica)
+        if carrera is not None and carrera.corresponde_a(periodos):
+            carrera = carrera.copiar()
+        else:
+            carrera = Carrera.desde_periodos(periodos, fecha_emision)
+        self.carrera = carrera
         
         # ✅ USAR TÉRMINOS OFICIALES IMSS
         total_semanas_oficial = resultado['datos_basicos'].get('total_semanas_cotizadas', 0)
@@ -46,12 +68,12 @@ class CorreccionSemanasIMSS:
             print(f"[CORRECCIÓN] Objetivo IMSS: {total_semanas_oficial}")
 
         # Aplicar correcciones
-        periodos_corregidos = self._eliminar_redondeo_periodos(periodos, fecha_emision)
-        semanas_sin_empalmes = self._calcular_semanas_sin_empalmes(periodos_corregidos, fecha_emision)
-        empalmes_detectados = self._detectar_empalmes(periodos_corregidos)
+        periodos_corregidos = self._eliminar_redondeo_periodos(periodos, carrera)
+        semanas_sin_empalmes = self._calcular_semanas_sin_empalmes(carrera)
+        empalmes_detectados = self._detectar_empalmes(periodos_corregidos, carrera)
 
-        # Actualizar resultado
-        resultado['historial_laboral']['periodos'] = periodos_corregidos
+        # Actualizar resultado (historial nuevo; cada período es una copia superficial)
+        resultado['historial_laboral'] = {**resultado['historial_laboral'], 'periodos': periodos_corregidos}
 
         # ✅ MÉTRICAS DE CORRECCIÓN CON NOMENCLATURA OFICIAL
         resultado['correccion_aplicada'] = {
@@ -69,9 +91,12 @@ class CorreccionSemanasIMSS:
             'correcciones_aplicadas': self.correcciones_aplicadas.copy()
         }
 
-        # Actualizar debug principal
-        resultado['debug']['total_semanas_cotizadas_calculadas'] = semanas_sin_empalmes  # ✅ Término oficial
-        resultado['debug']['correccion_post_procesamiento'] = 'aplicada'
+        # Actualizar debug principal (copia: el del parser no se modifica)
+        resultado['debug'] = {
+            **resultado['debug'],
+            'total_semanas_cotizadas_calculadas': semanas_sin_empalmes,  # ✅ Término oficial
+            'correccion_post_procesamiento': 'aplicada'
+        }
 
         if self.modo_debug:
             print(f"[CORRECCIÓN] Total semanas cotizadas calculadas: {semanas_sin_empalmes}")
@@ -81,8 +106,7 @@ class CorreccionSemanasIMSS:
         # Los datos_basicos son SAGRADOS - solo extracción, nunca modificación
         
         # Crear sección separada para análisis calculado
-        if 'analisis_calculado' not in resultado:
-            resultado['analisis_calculado'] = {}
+        resultado['analisis_calculado'] = dict(resultado.get('analisis_calculado', {}))
         
         resultado['analisis_calculado']['semanas_calculadas_sin_empalmes'] = semanas_sin_empalmes
         
@@ -98,81 +122,56 @@ class CorreccionSemanasIMSS:
 
         return resultado
 
-    def _eliminar_redondeo_periodos(self, periodos: List[Dict], fecha_emision: str) -> List[Dict]:
-        """Recalcula semanas de cada período sin redondeo hacia arriba"""
+    def _eliminar_redondeo_periodos(self, periodos: List[Dict], carrera: Carrera) -> List[Dict]:
+        """
+        Recalcula semanas de cada período sin redondeo hacia arriba
+
+        Los campos nuevos se escriben también en el período del modelo, así
+        `carrera.a_dicts()` sigue siendo igual a los períodos corregidos.
+        `carrera` debe ser la copia propia del corrector, nunca la del llamador.
+        """
         self.correcciones_aplicadas.append("eliminacion_redondeo_hacia_arriba")
         
         periodos_corregidos = []
-        for periodo in periodos:
+        for periodo, modelo in zip(periodos, carrera.periodos):
             periodo_corregido = periodo.copy()
             
             # Recalcular sin redondeo
-            semanas_sin_redondeo = self._calcular_semanas_sin_redondeo(
-                periodo['fecha_inicio'],
-                periodo['fecha_fin'], 
-                fecha_emision
-            )
+            semanas_sin_redondeo = self._calcular_semanas_sin_redondeo(modelo, carrera.fin_vigente)
             
             # Mantener original para referencia
-            periodo_corregido['semanas_originales'] = periodo['semanas_cotizadas']
-            periodo_corregido['semanas_corregidas'] = semanas_sin_redondeo
-            periodo_corregido['diferencia_redondeo'] = periodo['semanas_cotizadas'] - semanas_sin_redondeo
-            
-            # Actualizar valor principal
-            periodo_corregido['semanas_cotizadas'] = semanas_sin_redondeo
+            correcciones = {
+                'semanas_originales': periodo['semanas_cotizadas'],
+                'semanas_corregidas': semanas_sin_redondeo,
+                'diferencia_redondeo': periodo['semanas_cotizadas'] - semanas_sin_redondeo,
+                # Actualizar valor principal
+                'semanas_cotizadas': semanas_sin_redondeo
+            }
+            for clave, valor in correcciones.items():
+                periodo_corregido[clave] = valor
+                modelo[clave] = valor
             
             periodos_corregidos.append(periodo_corregido)
-        
+
         return periodos_corregidos
     
-    def _calcular_semanas_sin_redondeo(self, fecha_inicio: str, fecha_fin: str, fecha_emision: str) -> int:
+    def _calcular_semanas_sin_redondeo(self, periodo: Periodo, fin_vigente: int) -> int:
         """Calcula semanas usando solo división entera (método IMSS)"""
-        try:
-            inicio = datetime.strptime(fecha_inicio, '%d/%m/%Y')
-            
-            if fecha_fin == "Vigente":
-                try:
-                    fin = datetime.strptime(fecha_emision, '%Y-%m-%d')
-                except:
-                    fin = datetime.now()
-            else:
-                fin = datetime.strptime(fecha_fin, '%d/%m/%Y')
-            
-            diferencia = fin - inicio
-            # Solo semanas completas (método IMSS)
-            semanas = diferencia.days // 7
-            return max(0, semanas)
-        except:
+        if not periodo.valido:
             return 0
+        # Solo semanas completas (método IMSS)
+        return max(0, (periodo.fin_con(fin_vigente) - periodo.inicio) // 7)
     
-    def _calcular_semanas_sin_empalmes(self, periodos: List[Dict], fecha_emision: str) -> int:
+    def _calcular_semanas_sin_empalmes(self, carrera: Carrera) -> int:
         """Calcula semanas totales usando días únicos (método IMSS oficial)"""
         self.correcciones_aplicadas.append("eliminacion_empalmes_dias_unicos")
         
-        dias_ocupados = set()
-        
-        for periodo in periodos:
-            try:
-                inicio = datetime.strptime(periodo['fecha_inicio'], '%d/%m/%Y')
-                
-                if periodo['fecha_fin'] == 'Vigente':
-                    try:
-                        fin = datetime.strptime(fecha_emision, '%Y-%m-%d')
-                    except:
-                        fin = datetime.now()
-                else:
-                    fin = datetime.strptime(periodo['fecha_fin'], '%d/%m/%Y')
-                
-                # Agregar cada día único
-                dia_actual = inicio
-                while dia_actual <= fin:
-                    dias_ocupados.add(dia_actual.date())
-                    dia_actual += timedelta(days=1)
-                    
-            except:
-                continue
-        
-        dias_unicos = len(dias_ocupados)
+        # Unión de intervalos de días ordinales (sin enumerar cada fecha);
+        # los vigentes cierran en la fecha de emisión
+        # El mapa de días se construye una vez y queda disponible para otros
+        # cálculos sobre la misma constancia (ventanas, huecos)
+        self.mapa_dias = MapaDiasCarrera.desde_intervalos(carrera.intervalos())
+        dias_unicos = self.mapa_dias.dias_cubiertos()
         semanas_exactas = dias_unicos // 7
         
         if self.modo_debug:
@@ -181,58 +180,34 @@ class CorreccionSemanasIMSS:
         
         return semanas_exactas
     
-    def _detectar_empalmes(self, periodos: List[Dict]) -> List[Dict]:
-        """Detecta empalmes para información de debug"""
+    def _detectar_empalmes(self, periodos: List[Dict], carrera: Carrera) -> List[Dict]:
+        """Detecta empalmes entre períodos con un barrido por fecha de inicio"""
         empalmes = []
-        periodos_ordenados = sorted(periodos, key=lambda x: datetime.strptime(x['fecha_inicio'], '%d/%m/%Y'))
-        
-        for i in range(len(periodos_ordenados)):
-            for j in range(i + 1, len(periodos_ordenados)):
-                empalme = self._calcular_empalme_entre_periodos(periodos_ordenados[i], periodos_ordenados[j])
-                if empalme:
-                    empalmes.append(empalme)
-        
+
+        # Los vigentes se cierran en la fecha actual
+        indexados = carrera.intervalos_indexados(date.today().toordinal())
+        intervalos = [intervalo for _, intervalo in indexados]
+        for i, j, inicio, fin in detectar_solapamientos(intervalos):
+            periodo1, periodo2 = periodos[indexados[i][0]], periodos[indexados[j][0]]
+            dias_solapamiento = fin - inicio + 1
+            empalmes.append({
+                'patron1': periodo1['patron'][:30],
+                'patron2': periodo2['patron'][:30],
+                'dias_solapamiento': dias_solapamiento,
+                'semanas_solapamiento': dias_solapamiento // 7
+            })
+
         return empalmes
-    
-    def _calcular_empalme_entre_periodos(self, periodo1: Dict, periodo2: Dict) -> Dict:
-        """Calcula solapamiento específico entre dos períodos"""
-        try:
-            inicio1 = datetime.strptime(periodo1['fecha_inicio'], '%d/%m/%Y')
-            inicio2 = datetime.strptime(periodo2['fecha_inicio'], '%d/%m/%Y')
-            
-            if periodo1['fecha_fin'] == 'Vigente':
-                fin1 = datetime.now()
-            else:
-                fin1 = datetime.strptime(periodo1['fecha_fin'], '%d/%m/%Y')
-                
-            if periodo2['fecha_fin'] == 'Vigente':
-                fin2 = datetime.now()
-            else:
-                fin2 = datetime.strptime(periodo2['fecha_fin'], '%d/%m/%Y')
-            
-            inicio_solapamiento = max(inicio1, inicio2)
-            fin_solapamiento = min(fin1, fin2)
-            
-            if inicio_solapamiento <= fin_solapamiento:
-                dias_solapamiento = (fin_solapamiento - inicio_solapamiento).days + 1
-                return {
-                    'patron1': periodo1['patron'][:30],
-                    'patron2': periodo2['patron'][:30],
-                    'dias_solapamiento': dias_solapamiento,
-                    'semanas_solapamiento': dias_solapamiento // 7
-                }
-        except:
-            pass
-        return None
 
 def migrar_nomenclatura_oficial(resultado_parser: Dict) -> Dict:
     """
     Migra datos con nomenclatura antigua a términos oficiales IMSS
     Para compatibilidad con parsers antiguos
     """
-    resultado_migrado = json.loads(json.dumps(resultado_parser))  # Deep copy
-    
-    datos_basicos = resultado_migrado.get('datos_basicos', {})
+    # Copia superficial; datos_basicos se reemplaza solo si algo se migró
+    resultado_migrado = dict(resultado_parser)
+    datos_originales = resultado_migrado.get('datos_basicos', {})
+    datos_basicos = dict(datos_originales)
     
     # MIGRAR CAMPOS ANTIGUOS → OFICIALES
     migraciones = {
@@ -261,6 +236,9 @@ def migrar_nomenclatura_oficial(resultado_parser: Dict) -> Dict:
         if campo not in datos_basicos:
             datos_basicos[campo] = valor_default
     
+    if 'datos_basicos' in resultado_migrado and datos_basicos != datos_originales:
+        resultado_migrado['datos_basicos'] = datos_basicos
+    
     return resultado_migrado
 
 def aplicar_correccion_exacta(resultado_parser: Dict, debug: bool = False) -> Dict:
@@ -275,17 +253,36 @@ def aplicar_correccion_exacta(resultado_parser: Dict, debug: bool = False) -> Di
     Returns:
         Resultado con semanas exactas al IMSS oficial usando nomenclatura estándar
     """
+    resultado_corregido, _, _ = aplicar_correccion_con_carrera(resultado_parser, debug=debug)
+    return resultado_corregido
+
+def aplicar_correccion_con_carrera(resultado_parser: Dict, carrera: Optional[Carrera] = None,
+                                   debug: bool = False) -> Tuple[Dict, Carrera, MapaDiasCarrera]:
+    """
+    Como aplicar_correccion_exacta, pero recibe y devuelve el modelo de carrera
+
+    Args:
+        resultado_parser: Resultado del HistorialLaboralExtractor
+        carrera: Modelo construido por el parser (HistorialLaboralExtractor.procesar_constancia_con_carrera)
+        debug: Mostrar información de procesamiento
+
+    Returns:
+        (resultado corregido, carrera con los períodos corregidos, mapa de
+        días de esa carrera) para pasarlos a los calculadores sin volver a
+        leer fechas ni contar días; la carrera es un modelo nuevo, `carrera`
+        no se modifica
+    """
     # PASO 1: Migrar nomenclatura si es necesario
     resultado_migrado = migrar_nomenclatura_oficial(resultado_parser)
     
     # PASO 2: Aplicar corrección
     corrector = CorreccionSemanasIMSS(modo_debug=debug)
-    resultado_corregido = corrector.corregir_resultado_completo(resultado_migrado)
+    resultado_corregido = corrector.corregir_resultado_completo(resultado_migrado, carrera)
     
     if debug:
         print("✅ Nomenclatura migrada a términos oficiales IMSS")
         
-    return resultado_corregido
+    return resultado_corregido, corrector.carrera, corrector.mapa_dias
 
 def mostrar_resumen_correccion(resultado_corregido: Dict) -> None:
     """Muestra resumen de la corrección aplicada - VERSIÓN ACTUALIZADA"""
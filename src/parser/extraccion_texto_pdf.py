@@ -0,0 +1,388 @@
+"""
+Módulo de extracción de texto para constancias IMSS en PDF
+Reparte las páginas entre un pool de procesos y reconstruye el texto en orden
+Motor alterno pdfium (capa de texto nativa) con respaldo automático a pdfplumber
+Clasificador de páginas: solo las páginas con datos pasan por la extracción completa
+
+COORDINA CON: modules/modulo2/historial_laboral.py (consume el texto completo)
+USO: from extraccion_texto_pdf import extraer_texto_pdf
+"""
+
+import io
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
+
+import pdfplumber
+import pypdfium2 as pdfium
+
+MODO_SERIAL = "serial"
+MODO_PARALELO = "paralelo"
+MODOS_VALIDOS = (MODO_SERIAL, MODO_PARALELO)
+
+MOTOR_PDFPLUMBER = "pdfplumber"
+MOTOR_PDFIUM = "pdfium"
+MOTORES_VALIDOS = (MOTOR_PDFPLUMBER, MOTOR_PDFIUM)
+
+# Debajo de este número de páginas por worker no compensa repartir páginas
+MIN_PAGINAS_POR_WORKER = 4
+
+# Cada cuántos segundos un worker de extracción revisa si su proceso padre sigue vivo
+INTERVALO_VIGILANCIA_PADRE = 1.0
+
+# Validación mínima del texto: sin esto el parser no puede armar el historial
+MARCADOR_PATRON = "Nombre del patrón"
+PATRON_NSS = re.compile(r'NSS:?\s*\d{11}')
+
+# Una página con cualquiera de estos textos tiene datos personales, el resumen
+# de semanas o bloques patronales (incluye continuaciones de movimientos)
+MARCADORES_PAGINA_UTIL = (
+    "nombre del patrón",
+    "registro patronal",
+    "nss",
+    "curp",
+    "semanas cotizadas",
+    "fecha de alta",
+    "fecha de baja",
+    "salario base de cotización",
+    "modificacion de salario",
+    "reingreso",
+)
+
+# pdfium no es seguro entre hilos: toda llamada en el proceso lo toma (ver carga_pdf)
+LOCK_PDFIUM = threading.Lock()
+
+# bytes en memoria, ruta en disco o archivo abierto (p. ej. el upload de carga_pdf)
+FuentePDF = Union[bytes, str, BinaryIO]
+
+# Pool de extracción paralela: uno por proceso, creado en el primer uso y
+# reutilizado. Dentro de services/analysis_executor.py hay uno por worker de
+# análisis, así que el total de procesos de extracción queda acotado por
+# ANALYSIS_WORKERS × PDF_EXTRACTION_MAX_WORKERS
+_pool_extraccion: Optional[ProcessPoolExecutor] = None
+_workers_pool_extraccion = 0
+_pid_pool_extraccion: Optional[int] = None
+_LOCK_POOL_EXTRACCION = threading.Lock()
+
+
+def _abrir_pdf(fuente: FuentePDF):
+    """Abre el PDF desde bytes en memoria, una ruta en disco o un archivo abierto"""
+    if isinstance(fuente, (bytes, bytearray)):
+        return pdfplumber.open(io.BytesIO(fuente))
+    return pdfplumber.open(fuente)
+
+
+def _extraer_rango_paginas(fuente: FuentePDF, indices: Sequence[int]) -> List[Optional[str]]:
+    """Extrae el texto de las páginas indicadas - se ejecuta dentro de cada worker"""
+    with _abrir_pdf(fuente) as pdf_doc:
+        return [pdf_doc.pages[i].extract_text() for i in indices]
+
+
+def _vigilar_proceso_padre(pid_padre: int) -> None:
+    """
+    Termina el worker si su padre murió: el pool de análisis termina sus
+    workers al reciclarse y los de extracción quedarían huérfanos esperando
+    trabajo
+    """
+    while True:
+        time.sleep(INTERVALO_VIGILANCIA_PADRE)
+        if os.getppid() != pid_padre:
+            os._exit(0)
+
+
+def _inicializar_worker_extraccion(pid_padre: int) -> None:
+    threading.Thread(target=_vigilar_proceso_padre, args=(pid_padre,), daemon=True).start()
+
+
+def _obtener_pool_extraccion(max_workers: int) -> Tuple[ProcessPoolExecutor, int]:
+    """
+    Pool de extracción de este proceso y su tamaño
+
+    Se crea con el `max_workers` de la primera llamada y contexto spawn (nunca
+    fork: el proceso que llama puede tener hilos y pdfium cargado); las
+    llamadas siguientes lo reutilizan sin pagar de nuevo el arranque.
+    """
+    global _pool_extraccion, _workers_pool_extraccion, _pid_pool_extraccion
+    with _LOCK_POOL_EXTRACCION:
+        # Un pool heredado por fork pertenece al proceso padre
+        if _pool_extraccion is None or _pid_pool_extraccion != os.getpid():
+            _pool_extraccion = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_inicializar_worker_extraccion,
+                initargs=(os.getpid(),)
+            )
+            _workers_pool_extraccion = max_workers
+            _pid_pool_extraccion = os.getpid()
+        return _pool_extraccion, _workers_pool_extraccion
+
+
+def _descartar_pool_extraccion(pool: ProcessPoolExecutor) -> None:
+    """Olvida un pool roto para que la siguiente llamada cree otro"""
+    global _pool_extraccion
+    with _LOCK_POOL_EXTRACCION:
+        if _pool_extraccion is pool:
+            _pool_extraccion = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _unir_textos(textos_paginas: List[Optional[str]]) -> str:
+    """Concatena páginas igual que el flujo serial: omite vacías y agrega salto de línea"""
+    return "".join(texto + "\n" for texto in textos_paginas if texto)
+
+
+def _calcular_rangos(total_paginas: int, workers: int) -> List[range]:
+    """Divide las páginas en bloques contiguos para que cada worker abra el PDF una sola vez"""
+    tamano, sobrante = divmod(total_paginas, workers)
+    rangos = []
+    inicio = 0
+    for i in range(workers):
+        fin = inicio + tamano + (1 if i < sobrante else 0)
+        rangos.append(range(inicio, fin))
+        inicio = fin
+    return rangos
+
+
+def extraer_texto_serial(fuente: FuentePDF, paginas: Optional[Sequence[int]] = None) -> str:
+    """
+    Extrae el texto recorriendo las páginas una por una (comportamiento original)
+
+    Args:
+        fuente: Bytes del PDF o ruta al archivo
+        paginas: Índices (base 0) a extraer; None = todas
+    """
+    with _abrir_pdf(fuente) as pdf_doc:
+        if paginas is None:
+            return _unir_textos([page.extract_text() for page in pdf_doc.pages])
+        return _unir_textos([pdf_doc.pages[i].extract_text() for i in paginas])
+
+
+def extraer_texto_paralelo(fuente: FuentePDF, max_workers: Optional[int] = None,
+                           paginas: Optional[Sequence[int]] = None) -> str:
+    """
+    Extrae el texto repartiendo bloques de páginas en un pool de procesos
+
+    El resultado es idéntico byte a byte al de extraer_texto_serial: cada página
+    se extrae con el mismo pdfplumber y los bloques se reensamblan en orden.
+    El pool es el del proceso (_obtener_pool_extraccion); si se rompe, esta
+    llamada se resuelve en serie y la siguiente crea uno nuevo.
+
+    Args:
+        fuente: Bytes del PDF o ruta al archivo (no un archivo abierto: se envía a otros procesos)
+        max_workers: Tamaño del pool del proceso al crearlo (None = núcleos
+            disponibles); ninguna llamada usa más workers que los del pool
+        paginas: Índices (base 0) a extraer; None = todas
+    """
+    if paginas is None:
+        with _abrir_pdf(fuente) as pdf_doc:
+            paginas = range(len(pdf_doc.pages))
+    paginas = list(paginas)
+
+    tope = max_workers or os.cpu_count() or 1
+    if tope <= 1 or len(paginas) // MIN_PAGINAS_POR_WORKER <= 1:
+        return extraer_texto_serial(fuente, paginas)
+
+    pool, tamano_pool = _obtener_pool_extraccion(tope)
+    workers = min(tope, tamano_pool, len(paginas) // MIN_PAGINAS_POR_WORKER)
+    rangos = _calcular_rangos(len(paginas), workers)
+
+    try:
+        futuros = [
+            pool.submit(_extraer_rango_paginas, fuente, paginas[rango.start:rango.stop])
+            for rango in rangos
+        ]
+        textos_paginas = []
+        for futuro in futuros:
+            textos_paginas.extend(futuro.result())
+    except BrokenProcessPool:
+        _descartar_pool_extraccion(pool)
+        return extraer_texto_serial(fuente, paginas)
+
+    return _unir_textos(textos_paginas)
+
+
+def extraer_textos_pdfium(fuente: FuentePDF) -> List[str]:
+    """
+    Texto de cada página con la capa de texto nativa de pdfium (sin análisis de layout)
+
+    Normaliza los saltos de línea CRLF de pdfium al formato de pdfplumber.
+    """
+    with LOCK_PDFIUM:
+        return _textos_pdfium(fuente)
+
+
+def _textos_pdfium(fuente: FuentePDF) -> List[str]:
+    documento = pdfium.PdfDocument(fuente)
+    try:
+        textos_paginas = []
+        for pagina in documento:
+            pagina_texto = pagina.get_textpage()
+            try:
+                texto = pagina_texto.get_text_range()
+            finally:
+                pagina_texto.close()
+                pagina.close()
+            texto = texto.replace("\r\n", "\n").replace("\r", "\n").rstrip("\n")
+            textos_paginas.append(texto)
+    finally:
+        documento.close()
+
+    return textos_paginas
+
+
+def extraer_texto_pdfium(fuente: FuentePDF) -> str:
+    """Texto completo con pdfium, unido igual que el flujo de pdfplumber"""
+    return _unir_textos(extraer_textos_pdfium(fuente))
+
+
+def es_pagina_util(texto_pagina: str) -> bool:
+    """Escaneo barato: ¿la página contiene algún marcador de datos?"""
+    texto = texto_pagina.lower()
+    return any(marcador in texto for marcador in MARCADORES_PAGINA_UTIL)
+
+
+def clasificar_paginas(textos_paginas: Sequence[str]) -> List[int]:
+    """
+    Índices (base 0) de las páginas con datos
+
+    Si ninguna página tiene marcadores (capa de texto vacía o formato
+    desconocido) se devuelven todas para no perder información.
+    """
+    utiles = [i for i, texto in enumerate(textos_paginas) if es_pagina_util(texto)]
+    return utiles or list(range(len(textos_paginas)))
+
+
+def validar_texto_constancia(texto: str) -> List[str]:
+    """
+    Revisa que el texto tenga lo indispensable para el parser
+
+    Returns:
+        Lista de problemas encontrados (vacía si el texto es utilizable)
+    """
+    problemas = []
+    if MARCADOR_PATRON not in texto:
+        problemas.append(f"Sin bloques '{MARCADOR_PATRON}'")
+    if not PATRON_NSS.search(texto):
+        problemas.append("Sin NSS de 11 dígitos")
+    return problemas
+
+
+@dataclass
+class ResultadoExtraccion:
+    """Texto extraído más la trazabilidad del motor utilizado"""
+    texto: str
+    motor_solicitado: str
+    motor_utilizado: str
+    respaldo_aplicado: bool = False
+    problemas_validacion: List[str] = field(default_factory=list)
+    paginas_totales: int = 0
+    paginas_omitidas: List[int] = field(default_factory=list)  # números de página (base 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'motor_solicitado': self.motor_solicitado,
+            'motor_utilizado': self.motor_utilizado,
+            'respaldo_aplicado': self.respaldo_aplicado,
+            'problemas_validacion': self.problemas_validacion,
+            'longitud_texto': len(self.texto),
+            'paginas_totales': self.paginas_totales,
+            'paginas_omitidas': self.paginas_omitidas
+        }
+
+
+def extraer_texto_constancia(fuente: FuentePDF, motor: str = MOTOR_PDFPLUMBER,
+                             modo: str = MODO_SERIAL,
+                             max_workers: Optional[int] = None,
+                             omitir_paginas: bool = False) -> ResultadoExtraccion:
+    """
+    Extrae el texto con el motor solicitado y respaldo a pdfplumber
+
+    Con motor "pdfium" se usa la capa de texto nativa; si el resultado no pasa
+    validar_texto_constancia (o pdfium falla) se repite con pdfplumber, que es
+    el formato sobre el que se escribieron las expresiones del parser.
+
+    Con omitir_paginas, el texto de pdfium sirve también como primer pase
+    barato: las páginas sin marcadores de datos (avisos legales) no pasan por
+    el análisis de layout de pdfplumber ni llegan a las expresiones del parser.
+
+    Args:
+        fuente: Bytes del PDF o ruta al archivo
+        motor: "pdfplumber" o "pdfium"
+        modo: "serial" o "paralelo" (solo aplica a pdfplumber)
+        max_workers: Tope de procesos por solicitud en modo paralelo
+        omitir_paginas: Extraer solo las páginas clasificadas como útiles
+    """
+    if motor not in MOTORES_VALIDOS:
+        raise ValueError(f"Motor de extracción inválido: {motor}. Opciones: {', '.join(MOTORES_VALIDOS)}")
+
+    problemas = []
+    textos_pdfium = None
+    if motor == MOTOR_PDFIUM or omitir_paginas:
+        try:
+            textos_pdfium = extraer_textos_pdfium(fuente)
+        except pdfium.PdfiumError as e:
+            problemas = [f"Error de pdfium: {e}"]
+
+    paginas = None
+    paginas_omitidas = []
+    if omitir_paginas and textos_pdfium is not None:
+        paginas = clasificar_paginas(textos_pdfium)
+        seleccion = set(paginas)
+        paginas_omitidas = [i + 1 for i in range(len(textos_pdfium)) if i not in seleccion]
+
+    paginas_totales = len(textos_pdfium) if textos_pdfium is not None else 0
+
+    if motor == MOTOR_PDFIUM and textos_pdfium is not None:
+        indices = paginas if paginas is not None else range(len(textos_pdfium))
+        texto = _unir_textos([textos_pdfium[i] for i in indices])
+        problemas = validar_texto_constancia(texto)
+
+        if not problemas:
+            return ResultadoExtraccion(
+                texto=texto,
+                motor_solicitado=motor,
+                motor_utilizado=MOTOR_PDFIUM,
+                paginas_totales=paginas_totales,
+                paginas_omitidas=paginas_omitidas
+            )
+
+    texto = extraer_texto_pdf(fuente, modo=modo, max_workers=max_workers, paginas=paginas)
+    return ResultadoExtraccion(
+        texto=texto,
+        motor_solicitado=motor,
+        motor_utilizado=MOTOR_PDFPLUMBER,
+        respaldo_aplicado=motor != MOTOR_PDFPLUMBER,
+        problemas_validacion=problemas,
+        paginas_totales=paginas_totales,
+        paginas_omitidas=paginas_omitidas
+    )
+
+
+def extraer_texto_pdf(fuente: FuentePDF, modo: str = MODO_SERIAL,
+                      max_workers: Optional[int] = None,
+                      paginas: Optional[Sequence[int]] = None) -> str:
+    """
+    Función principal para extraer el texto completo de una constancia
+
+    Args:
+        fuente: Bytes del PDF o ruta al archivo
+        modo: "serial" o "paralelo"
+        max_workers: Tope de procesos por solicitud en modo paralelo
+        paginas: Índices (base 0) a extraer; None = todas
+
+    Returns:
+        Texto de las páginas, cada una terminada en salto de línea
+    """
+    if modo not in MODOS_VALIDOS:
+        raise ValueError(f"Modo de extracción inválido: {modo}. Opciones: {', '.join(MODOS_VALIDOS)}")
+
+    if modo == MODO_PARALELO:
+        return extraer_texto_paralelo(fuente, max_workers=max_workers, paginas=paginas)
+
+    return extraer_texto_serial(fuente, paginas)
@@ -3,25 +3,31 @@ Parser IMSS con conservación de derechos - Versión Modular
 Módulo 1: Extracción de datos básicos
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request
+from fastapi.responses import StreamingResponse
 import pdfplumber
 import io
 import json
 import os
-import shutil
 import pdfplumber
 from modules.modulo2.historial_laboral import HistorialLaboralExtractor
 from datetime import datetime
 from correccion_semanas import procesar_con_correcciones
 from correccion_semanas_final import aplicar_correccion_exacta
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Dict, List, Optional, Union
 import logging
 import gspread
 from google.oauth2.service_account import Credentials
-from calculo_250_semanas import calcular_promedio_250_desde_correccion
+from calculo_250_semanas import calcular_promedio_250_desde_correccion, serie_promedio_250_desde_correccion
+from utils.parametros_imss import parametros
+from procesamiento_lote import (
+    LOTE_TIMEOUT_ITEM_S, LoteOcupado, documentos_arreglo_json, documentos_ndjson, linea_ndjson, procesar_lote
+)
 
 # Importar nuestro módulo de extracción básica
 from modules.basic_extractor import extract_basic_data_from_pdf
+from carga_pdf import LimiteCuerpoMultipart, recibir_pdf
+from extraccion_texto_pdf import extraer_textos_pdfium, clasificar_paginas
 from modules.models import *
 
 logging.basicConfig(level=logging.INFO)
@@ -276,6 +282,9 @@ app = FastAPI(
     version="3.0.0"
 )
 
+# Rechazar PDFs demasiado grandes antes de recibir el cuerpo completo
+app.add_middleware(LimiteCuerpoMultipart)
+
 # Configuración de Google Sheets
 CREDENTIALS_FILE = "/home/heli_paul/imss-pension-analyzer/src/parser/credentials.json"
 SPREADSHEET_ID = "1PGb0makALNm_nLlwl6gdu3ecv9gbJcY7JC9uHHq5mrk"
@@ -309,6 +318,19 @@ async def get_statistics():
     else:
         return {"error": "Google Sheets no configurado"}
 
+@app.get("/parametros")
+async def get_parametros():
+    """Resumen de los parámetros históricos IMSS cargados (SMG, UMA, veces del tope)"""
+    return parametros.resumen()
+
+@app.post("/parametros/recargar")
+async def recargar_parametros():
+    """Relee data/parametros_imss.json (o IMSS_PARAMETROS_PATH) sin reiniciar el proceso"""
+    try:
+        return {"status": "success", **parametros.recargar()}
+    except (OSError, ValueError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=f"Archivo de parámetros inválido: {str(e)}")
+
 @app.post("/parse/basic")
 async def parse_basic_data_endpoint(file: UploadFile = File(...)):
     """
@@ -317,15 +339,12 @@ async def parse_basic_data_endpoint(file: UploadFile = File(...)):
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Solo se aceptan archivos PDF")
 
-    try:
-        # Guardar archivo temporalmente
-        temp_path = f"/tmp/{file.filename}"
-        with open(temp_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+    # Validar el PDF subido (tamaño, firma y páginas) sin copiarlo
+    pdf_cargado = await recibir_pdf(file)
 
+    try:
         # Extraer texto del PDF
-        with pdfplumber.open(temp_path) as pdf:
+        with pdfplumber.open(pdf_cargado.flujo()) as pdf:
             full_text = ""
             for page in pdf.pages:
                 full_text += page.extract_text() + "\n"
@@ -351,26 +370,17 @@ async def parse_basic_data_endpoint(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Error parseando PDF: {str(e)}")
 
     finally:
-        try:
-            os.remove(temp_path)
-        except:
-            pass
+        pdf_cargado.eliminar()
 
 @app.post("/debug/texto")
 async def debug_texto_pdf(file: UploadFile = File(...)):
     """Ver el texto extraído del PDF"""
-    temp_path = f"/tmp/{file.filename}"
-    with open(temp_path, "wb") as buffer:
-        content = await file.read()
-        buffer.write(content)
-
-    with pdfplumber.open(temp_path) as pdf:
-        texto_completo = ""
-        for i, page in enumerate(pdf.pages):
-            texto_pagina = page.extract_text() or ""
-            texto_completo += f"\n--- PÁGINA {i+1} ---\n{texto_pagina}"
-
-    os.remove(temp_path)
+    with await recibir_pdf(file) as pdf_cargado:
+        with pdfplumber.open(pdf_cargado.flujo()) as pdf:
+            texto_completo = ""
+            for i, page in enumerate(pdf.pages):
+                texto_pagina = page.extract_text() or ""
+                texto_completo += f"\n--- PÁGINA {i+1} ---\n{texto_pagina}"
 
     return {
         "texto_completo": texto_completo,
@@ -384,16 +394,12 @@ async def parse_historial_laboral(file: UploadFile = File(...)):
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Solo archivos PDF")
 
-    temp_path = None
-    try:
-        # Guardar archivo temporal
-        temp_path = f"/tmp/{file.filename}"
-        with open(temp_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+    # Validar el PDF subido (tamaño, firma y páginas)
+    pdf_cargado = await recibir_pdf(file)
 
+    try:
         # Extraer texto
-        with pdfplumber.open(temp_path) as pdf:
+        with pdfplumber.open(pdf_cargado.flujo()) as pdf:
             full_text = ""
             for page in pdf.pages:
                 full_text += page.extract_text() + "\n"
@@ -417,25 +423,17 @@ async def parse_historial_laboral(file: UploadFile = File(...)):
         logger.error(f"Error procesando {file.filename}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
     finally:
-        if temp_path:
-            try:
-                os.remove(temp_path)
-            except:
-                pass
+        pdf_cargado.eliminar()
 
 @app.post("/parse/test-extraccion")
 async def test_extraccion(file: UploadFile = File(...)):
     """Endpoint de prueba para verificar extracción de nombres"""
-    temp_path = None
-    try:
-        # Guardar archivo temporal
-        temp_path = f"/tmp/{file.filename}"
-        with open(temp_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+    # Validar el PDF subido (tamaño, firma y páginas)
+    pdf_cargado = await recibir_pdf(file)
 
+    try:
         # Extraer texto del PDF
-        with pdfplumber.open(temp_path) as pdf:
+        with pdfplumber.open(pdf_cargado.flujo()) as pdf:
             full_text = ""
             for page in pdf.pages:
                 full_text += page.extract_text() + "\n"
@@ -457,27 +455,30 @@ async def test_extraccion(file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
     finally:
-        if temp_path:
-            try:
-                os.remove(temp_path)
-            except:
-                pass
+        pdf_cargado.eliminar()
 @app.post("/api/analizar-debug")
 async def analizar_constancia_debug(pdf: UploadFile = File(...)):
     """Endpoint para analizar constancia IMSS con información de debug detallada"""
     
+    # Validar que es un PDF
+    if not pdf.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="El archivo debe ser un PDF")
+
+    # Validar el PDF subido (tamaño, firma y páginas)
+    pdf_cargado = await recibir_pdf(pdf)
+
     try:
-        # Validar que es un PDF
-        if not pdf.filename.lower().endswith('.pdf'):
-            raise HTTPException(status_code=400, detail="El archivo debe ser un PDF")
-        
-        # Leer el contenido del archivo
-        pdf_content = await pdf.read()
-        
-        # Extraer texto del PDF
+        # Primer pase barato: clasificar páginas con la capa de texto de pdfium
+        paginas_utiles = set(clasificar_paginas(extraer_textos_pdfium(pdf_cargado.flujo())))
+
+        # Extraer texto del PDF (solo páginas con datos)
         texto_completo = ""
-        with pdfplumber.open(io.BytesIO(pdf_content)) as pdf_doc:
+        paginas_omitidas = []
+        with pdfplumber.open(pdf_cargado.flujo()) as pdf_doc:
             for page_num, page in enumerate(pdf_doc.pages):
+                if page_num not in paginas_utiles:
+                    paginas_omitidas.append(page_num + 1)
+                    continue
                 texto_pagina = page.extract_text()
                 if texto_pagina:
                     texto_completo += f"\n--- PÁGINA {page_num + 1} ---\n"
@@ -488,6 +489,7 @@ async def analizar_constancia_debug(pdf: UploadFile = File(...)):
         
         # Procesar con debug
         resultado = analizador.procesar_constancia_con_debug(texto_completo)
+        resultado["debug"]["paginas_omitidas"] = paginas_omitidas
         
         return {
             "success": True,
@@ -501,6 +503,8 @@ async def analizar_constancia_debug(pdf: UploadFile = File(...)):
             status_code=500, 
             detail=f"Error procesando la constancia: {str(e)}"
         )
+    finally:
+        pdf_cargado.eliminar()
 # Agregar este endpoint a tu FastAPI app existente
 @app.post("/calculate/pension")
 async def calculate_pension(file: UploadFile = File(...), debug_mode: bool = False):
@@ -574,7 +578,113 @@ async def calculate_pension_from_json(pension_data: dict, debug_mode: bool = Fal
             "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
 
-def procesar_historial_completo_con_conservacion(pdf_path: str) -> Dict[str, Any]:
+# Lotes: hasta este tamaño el cuerpo se queda en memoria, luego va a disco
+LOTE_CUERPO_EN_MEMORIA = 8 * 1024 * 1024
+
+@app.post("/calculate/pension-from-json/batch")
+async def calculate_pension_from_json_batch(request: Request, debug_mode: bool = False,
+                                            timeout_item: float = LOTE_TIMEOUT_ITEM_S,
+                                            max_workers: Optional[int] = None):
+    """
+    Lote de salidas del parser → resultados NDJSON en el mismo orden
+
+    Acepta un arreglo JSON o NDJSON (Content-Type: application/x-ndjson, una
+    salida del parser por línea). Cada línea de la respuesta es
+    {"indice": i, ...resultado de /calculate/pension-from-json}.
+    `max_workers` se acota a LOTE_MAX_WORKERS. Todos los lotes comparten un
+    pool; si ya corren LOTE_MAX_CONCURRENTES lotes responde 503.
+    """
+    import tempfile
+
+    # El cuerpo se vuelca a un archivo temporal y se lee documento por
+    # documento (también los arreglos JSON): nunca está entero en memoria
+    cuerpo = tempfile.SpooledTemporaryFile(max_size=LOTE_CUERPO_EN_MEMORIA)
+    async for bloque in request.stream():
+        cuerpo.write(bloque)
+    cuerpo.seek(0)
+
+    if "ndjson" in request.headers.get("content-type", ""):
+        documentos = documentos_ndjson(cuerpo)
+    else:
+        try:
+            documentos = documentos_arreglo_json(cuerpo)
+        except ValueError as e:
+            cuerpo.close()
+            raise HTTPException(status_code=400, detail=str(e))
+
+    # El turno se toma antes de responder: sin turno, 503 en lugar de un 200 vacío
+    try:
+        resultados = procesar_lote(documentos, max_workers=max_workers, timeout_item=timeout_item,
+                                   debug_mode=debug_mode, espera_turno=0)
+    except LoteOcupado as e:
+        cuerpo.close()
+        raise HTTPException(status_code=503, detail=str(e))
+
+    def respuesta():
+        try:
+            for resultado in resultados:
+                yield linea_ndjson(resultado)
+        finally:
+            resultados.close()
+            cuerpo.close()
+
+    return StreamingResponse(respuesta(), media_type="application/x-ndjson")
+
+@app.post("/calculate/promedio-250/serie")
+def calculate_serie_promedio_250(datos_corregidos: dict, fecha_desde: str, fecha_hasta: str):
+    """
+    Serie mensual del promedio de 250 semanas para fechas de retiro candidatas
+
+    Recibe el JSON corregido (correccion_semanas_final.py) y un rango de
+    fechas aaaa-mm-dd; el índice de sumas prefijas se construye una sola vez.
+    El rango no pasa de MAX_MESES_SERIE meses (400 si se excede). Es CPU
+    puro: se declara sin async para que FastAPI lo corra en su pool de hilos.
+    """
+    try:
+        resultado = serie_promedio_250_desde_correccion(datos_corregidos, fecha_desde, fecha_hasta)
+        return {"exito": True, **resultado}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        return {
+            "exito": False,
+            "error": f"Error calculando serie de promedios: {str(e)}",
+            "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+@app.post("/calculate/conservacion/linea-tiempo")
+def calculate_linea_tiempo_conservacion(datos_corregidos: dict, fechas: Optional[str] = None,
+                                        fecha_desde: Optional[str] = None,
+                                        fecha_hasta: Optional[str] = None):
+    """
+    Línea de tiempo del estado de conservación de derechos
+
+    Recibe el JSON corregido (correccion_semanas_final.py). Devuelve el índice
+    (última baja, vencimiento, ventanas de reingreso), los tramos de estado
+    desde la primera alta y, si se indican `fechas` (aaaa-mm-dd separadas por
+    comas), el estado en cada una; el índice se construye una sola vez.
+    A lo más MAX_FECHAS_CONSULTA fechas (400 si se excede); sin async, como
+    /calculate/promedio-250/serie.
+    """
+    try:
+        from conservacion_derechos import linea_tiempo_conservacion_desde_correccion
+        resultado = linea_tiempo_conservacion_desde_correccion(
+            datos_corregidos,
+            fechas=[f.strip() for f in fechas.split(',') if f.strip()] if fechas else None,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta
+        )
+        return {"exito": True, **resultado}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        return {
+            "exito": False,
+            "error": f"Error calculando línea de tiempo de conservación: {str(e)}",
+            "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+def procesar_historial_completo_con_conservacion(pdf_path: Union[str, BinaryIO]) -> Dict[str, Any]:
     """
     Función principal que integra todo el flujo - VERSIÓN ACTUALIZADA
     """
@@ -588,14 +698,14 @@ def procesar_historial_completo_con_conservacion(pdf_path: str) -> Dict[str, Any
         # 2. Extracción básica con TEXTO (no ruta)
         from modules.modulo2.historial_laboral import HistorialLaboralExtractor
         extractor = HistorialLaboralExtractor()
-        datos_base = extractor.procesar_constancia(full_text)  # ← TEXTO, no ruta
+        datos_base, carrera_parser = extractor.procesar_constancia_con_carrera(full_text)  # ← TEXTO, no ruta
 
         # 3. CRÍTICO: Aplicar corrección exacta
-        from correccion_semanas_final import aplicar_correccion_exacta
-        datos_corregidos = aplicar_correccion_exacta(datos_base, debug=True)
+        from correccion_semanas_final import aplicar_correccion_con_carrera
+        datos_corregidos, carrera, mapa_dias = aplicar_correccion_con_carrera(datos_base, carrera_parser, debug=True)
 
         # 4. NUEVO: Calcular conservación de derechos
-        conservacion = calcular_conservacion_integrada(datos_corregidos)
+        conservacion = calcular_conservacion_integrada(datos_corregidos, carrera, mapa_dias)
 
         # 5. NUEVO: Analizar semanas descontadas
         analisis_descuentos = procesar_semanas_descontadas(datos_corregidos)
@@ -608,7 +718,8 @@ def procesar_historial_completo_con_conservacion(pdf_path: str) -> Dict[str, Any
             try:
                 promedio_250 = calcular_promedio_250_desde_correccion(
                     datos_corregidos, 
-                    debug=True
+                    debug=True,
+                    carrera=carrera
                 )
                 
                 # Verificar historial detallado y agregar advertencia si es necesario
@@ -672,7 +783,7 @@ def procesar_historial_completo_con_conservacion(pdf_path: str) -> Dict[str, Any
         }
 
 
-def calcular_conservacion_integrada(datos_corregidos: Dict[str, Any]):
+def calcular_conservacion_integrada(datos_corregidos: Dict[str, Any], carrera=None, mapa_dias=None):
     """
     Calcula conservación de derechos usando datos ya procesados por correccion_semanas_final.py
     """
@@ -698,7 +809,9 @@ def calcular_conservacion_integrada(datos_corregidos: Dict[str, Any]):
         
         resultado = calculadora.calcular_conservacion_derechos(
             datos_corregidos=datos_corregidos,
-            fecha_emision=fecha_emision
+            fecha_emision=fecha_emision,
+            mapa_dias=mapa_dias,
+            carrera=carrera
         )
         
         print(f"[CONSERVACIÓN] Ley aplicable: {resultado.ley_aplicable}")
@@ -755,14 +868,12 @@ async def parsear_historial_completo_con_conservacion(file: UploadFile = File(..
     """
     Endpoint principal - Procesa y envía automáticamente a Google Sheets
     """
-    try:
-        # Guardar archivo temporal
-        temp_path = f"/tmp/{file.filename}"
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+    # Validar el PDF subido (tamaño, firma y páginas)
+    pdf_cargado = await recibir_pdf(file)
 
+    try:
         # Procesar con conservación incluida
-        resultado = procesar_historial_completo_con_conservacion(temp_path)
+        resultado = procesar_historial_completo_con_conservacion(pdf_cargado.flujo())
 
         # ✅ NUEVO: Enviar automáticamente a Google Sheets si fue exitoso
         if resultado.get("status") == "success" and sheets_manager:
@@ -778,13 +889,12 @@ async def parsear_historial_completo_con_conservacion(file: UploadFile = File(..
                 logger.error(f"⚠️ Error enviando a Sheets (datos procesados correctamente): {e}")
                 # No fallar el proceso completo si Sheets falla
 
-        # Limpiar archivo temporal
-        os.unlink(temp_path)
-
         return resultado
 
     except Exception as e:
         return {"error": str(e), "status": "error"}
+    finally:
+        pdf_cargado.eliminar()
 
 @app.get("/parse/conservacion/test")
 async def test_conservacion():
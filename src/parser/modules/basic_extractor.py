@@ -6,12 +6,189 @@ NOMENCLATURA: Exacta de la constancia oficial IMSS
 
 import re
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 import logging
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
+# ============== PATRONES (orden de prioridad: gana el primero que encuentre) ==============
+PATTERNS = {
+    'nss': [
+        r'NSS:\s*(\d{11})',
+        r'NSS\s+(\d{11})',
+        r'Número de Seguridad Social:\s*(\d{11})'
+    ],
+    'curp': [
+        r'CURP:\s*([A-Z]{4}\d{6}[HM][A-Z]{5}[A-Z0-9]{2})',
+        r'CURP\s+([A-Z]{4}\d{6}[HM][A-Z]{5}[A-Z0-9]{2})'
+    ],
+    'nombre': [
+        r'reporte\s*\n.*?\n\s*([A-ZÁÉÍÓÚÑ\s]+[A-ZÁÉÍÓÚÑ])\s*\n',
+        r'Estimado\(a\),?\s*\n\s*([A-ZÁÉÍÓÚÑ\s]+)',
+        r'Asegurado:\s*([A-ZÁÉÍÓÚÑ\s]+)',
+        r'NOMBRE:\s*([A-ZÁÉÍÓÚÑ\s]+)',
+        r'([A-ZÁÉÍÓÚÑ]{2,}\s+[A-ZÁÉÍÓÚÑ]{2,}\s+[A-ZÁÉÍÓÚÑ]{2,})',
+    ],
+    'fecha_emision': [
+        r'Fecha de emisión.*?(\d{1,2})\s*/\s*(\d{1,2})\s*/\s*(\d{4})',
+        r'(\d{1,2})\s*/\s*(\d{1,2})\s*/\s*(\d{4})',
+        r'reporte\s*(\d{1,2})\s*/\s*(\d{1,2})\s*/\s*(\d{4})',
+    ],
+    'total_semanas': [
+        r'Total\s+de\s+semanas\s+cotizadas\s*[:\n\s]*(\d+)',
+        r'Total.*?cotizadas.*?\n\s*(\d+)',
+        r'DD\s+MM\s+YYYY\s*\n\s*(\d+)',
+    ],
+    'detalle_semanas': [
+        r'Tu\s+detalle\s+de\s+semanas.*?(\d+)\s+(\d+)\s+(\d+)',
+    ],
+    'alta': [
+        r'Fecha\s+de\s+alta\s+(\d{2}/\d{2}/\d{4})',
+        r'ALTA\s+(\d{2}/\d{2}/\d{4})',
+        r'Alta:\s*(\d{2}/\d{2}/\d{4})',
+    ],
+}
+
+# Ancla con la que empieza TODA coincidencia de cada patrón (None = sin ancla).
+# Primero se ubican todas las anclas del texto; luego cada patrón se prueba
+# solo en esas posiciones, en orden, con .match(). Como las anclas se visitan
+# de izquierda a derecha, la primera coincidencia es la misma que devolvería
+# re.search sobre todo el texto.
+ANCLAS_PATRONES = {
+    'nss': ['nss', 'nss', 'nss_largo'],
+    'curp': ['curp', 'curp'],
+    'nombre': ['reporte', 'estimado', 'asegurado', 'nombre', None],
+    'fecha_emision': ['emision', None, 'reporte'],
+    'total_semanas': ['total', 'total', 'dd_mm_yyyy'],
+    'detalle_semanas': ['detalle'],
+    'alta': ['fecha_alta', 'alta', 'alta'],
+}
+
+_ANCLAS = re.compile(
+    r'(?=(?P<nss>nss)'
+    r'|(?P<nss_largo>número de seguridad social)'
+    r'|(?P<curp>curp)'
+    r'|(?P<reporte>reporte)'
+    r'|(?P<estimado>estimado\(a\))'
+    r'|(?P<asegurado>asegurado:)'
+    r'|(?P<nombre>nombre:)'
+    r'|(?P<emision>fecha de emisión)'
+    r'|(?P<fecha_alta>fecha\s+de\s+alta)'
+    r'|(?P<total>total)'
+    r'|(?P<dd_mm_yyyy>dd\s+mm\s+yyyy)'
+    r'|(?P<detalle>tu\s+detalle\s+de\s+semanas)'
+    r'|(?P<alta>alta))',
+    re.IGNORECASE
+)
+
+# Prefijo literal (en minúsculas) de cada ancla para ubicarlas con str.find
+_ANCLAS_LITERALES = {
+    'nss': 'nss',
+    'nss_largo': 'número de seguridad social',
+    'curp': 'curp',
+    'reporte': 'reporte',
+    'estimado': 'estimado(a)',
+    'asegurado': 'asegurado:',
+    'nombre': 'nombre:',
+    'emision': 'fecha de emisión',
+    'fecha_alta': 'fecha',
+    'total': 'total',
+    'dd_mm_yyyy': 'dd',
+    'detalle': 'tu',
+    'alta': 'alta',
+}
+
+# Caracteres cuyo str.lower() no coincide con re.IGNORECASE (ſ, İ, ı): si
+# aparecen, las posiciones se obtienen con la expresión de anclas
+_PLEGADO_ESPECIAL = re.compile('[\u017f\u0130\u0131]')
+
+_FLAGS_CAMPO = {
+    'nss': re.IGNORECASE,
+    'curp': re.IGNORECASE,
+    'nombre': re.IGNORECASE | re.MULTILINE,
+    'fecha_emision': re.IGNORECASE,
+    'total_semanas': re.IGNORECASE | re.DOTALL,
+    'detalle_semanas': re.IGNORECASE | re.DOTALL,
+    'alta': re.IGNORECASE,
+}
+
+PATRONES_COMPILADOS: Dict[str, List[Tuple[re.Pattern, Optional[str]]]] = {
+    campo: [
+        (re.compile(patron, _FLAGS_CAMPO[campo]), ancla)
+        for patron, ancla in zip(PATTERNS[campo], ANCLAS_PATRONES[campo])
+    ]
+    for campo in PATTERNS
+}
+
+_PATRONES_LIMPIEZA_NOMBRE = [
+    re.compile(patron, re.IGNORECASE) for patron in [
+        r'asegurado\s*:?\s*',
+        r'nombre\s*:?\s*',
+        r'del\s+asegurado\s*:?\s*',
+        r'\s+dd\s+mm\s+yyyy\s*$',
+        r'\s+dd\s+mm\s+aaaa\s*$',
+    ]
+]
+_ESPACIOS = re.compile(r'\s+')
+
+PosicionesAnclas = Dict[str, List[int]]
+
+
+def indexar_anclas(text: str) -> PosicionesAnclas:
+    """
+    Posiciones de cada ancla en el texto
+
+    Camino rápido: str.find sobre el texto en minúsculas (búsqueda en C).
+    Las posiciones de prefijos cortos ('fecha', 'tu', 'dd') pueden incluir
+    sitios donde el patrón no coincide; eso solo cuesta un .match() fallido.
+    """
+    posiciones: PosicionesAnclas = {}
+
+    if _PLEGADO_ESPECIAL.search(text):
+        for match in _ANCLAS.finditer(text):
+            posiciones.setdefault(match.lastgroup, []).append(match.start())
+        return posiciones
+
+    minusculas = text.lower()
+    for ancla, literal in _ANCLAS_LITERALES.items():
+        lista = []
+        posicion = minusculas.find(literal)
+        while posicion != -1:
+            lista.append(posicion)
+            posicion = minusculas.find(literal, posicion + 1)
+        if lista:
+            posiciones[ancla] = lista
+    return posiciones
+
+
+def buscar_patron(patron: re.Pattern, ancla: Optional[str], text: str,
+                  posiciones: PosicionesAnclas) -> Optional[re.Match]:
+    """Equivalente a patron.search(text) probando solo en las posiciones del ancla"""
+    if ancla is None:
+        return patron.search(text)
+    for posicion in posiciones.get(ancla, ()):
+        match = patron.match(text, posicion)
+        if match:
+            return match
+    return None
+
+
+def iterar_patron(patron: re.Pattern, ancla: Optional[str], text: str,
+                  posiciones: PosicionesAnclas):
+    """Equivalente a patron.finditer(text) para patrones cuyas coincidencias no se traslapan con su ancla"""
+    if ancla is None:
+        yield from patron.finditer(text)
+        return
+    fin_anterior = 0
+    for posicion in posiciones.get(ancla, ()):
+        if posicion < fin_anterior:
+            continue
+        match = patron.match(text, posicion)
+        if match:
+            fin_anterior = match.end()
+            yield match
+
 class BasicDataResult(BaseModel):
     """Resultado de extracción de datos básicos - NOMENCLATURA OFICIAL IMSS"""
     # Metadatos
@@ -47,29 +224,7 @@ class BasicDataExtractor:
     """
 
     def __init__(self):
-        self.patterns = {
-            'nss': [
-                r'NSS:\s*(\d{11})',
-                r'NSS\s+(\d{11})',
-                r'Número de Seguridad Social:\s*(\d{11})'
-            ],
-            'curp': [
-                r'CURP:\s*([A-Z]{4}\d{6}[HM][A-Z]{5}[A-Z0-9]{2})',
-                r'CURP\s+([A-Z]{4}\d{6}[HM][A-Z]{5}[A-Z0-9]{2})'
-            ],
-            'nombre': [
-                r'reporte\s*\n.*?\n\s*([A-ZÁÉÍÓÚÑ\s]+[A-ZÁÉÍÓÚÑ])\s*\n',
-                r'Estimado\(a\),?\s*\n\s*([A-ZÁÉÍÓÚÑ\s]+)',
-                r'Asegurado:\s*([A-ZÁÉÍÓÚÑ\s]+)',
-                r'NOMBRE:\s*([A-ZÁÉÍÓÚÑ\s]+)',
-                r'([A-ZÁÉÍÓÚÑ]{2,}\s+[A-ZÁÉÍÓÚÑ]{2,}\s+[A-ZÁÉÍÓÚÑ]{2,})',
-            ],
-            'fecha_emision': [
-                r'Fecha de emisión.*?(\d{1,2})\s*/\s*(\d{1,2})\s*/\s*(\d{4})',
-                r'(\d{1,2})\s*/\s*(\d{1,2})\s*/\s*(\d{4})',
-                r'reporte\s*(\d{1,2})\s*/\s*(\d{1,2})\s*/\s*(\d{4})',
-            ]
-        }
+        self.patterns = PATTERNS
 
     def extract_basic_data(self, pdf_text: str, filename: str) -> BasicDataResult:
         """
@@ -82,14 +237,17 @@ class BasicDataExtractor:
         )
 
         try:
+            # Ubicar una sola vez las anclas de todas las secciones
+            posiciones = indexar_anclas(pdf_text)
+
             # Extraer información personal
-            self._extract_personal_info(pdf_text, resultado)
+            self._extract_personal_info(pdf_text, resultado, posiciones)
 
             # Extraer semanas (SOLO extracción)
-            self._extract_semanas_info(pdf_text, resultado)
+            self._extract_semanas_info(pdf_text, resultado, posiciones)
 
             # Determinar ley aplicable
-            self._determine_ley_aplicable(pdf_text, resultado)
+            self._determine_ley_aplicable(pdf_text, resultado, posiciones)
 
             # Validar datos extraídos
             self._validate_basic_data(resultado)
@@ -104,19 +262,20 @@ class BasicDataExtractor:
 
         return resultado
 
-    def _extract_personal_info(self, text: str, resultado: BasicDataResult):
+    def _extract_personal_info(self, text: str, resultado: BasicDataResult,
+                               posiciones: PosicionesAnclas):
         """Extrae NSS, CURP, nombre y fecha de emisión"""
 
         # NSS
-        for pattern in self.patterns['nss']:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern, ancla in PATRONES_COMPILADOS['nss']:
+            match = buscar_patron(pattern, ancla, text, posiciones)
             if match:
                 resultado.nss = match.group(1)
                 break
 
         # CURP
-        for pattern in self.patterns['curp']:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern, ancla in PATRONES_COMPILADOS['curp']:
+            match = buscar_patron(pattern, ancla, text, posiciones)
             if match:
                 resultado.curp = match.group(1)
                 break
@@ -129,8 +288,8 @@ class BasicDataExtractor:
                 resultado.edad = self._calcular_edad(fecha_nac)
 
         # Nombre
-        for pattern in self.patterns['nombre']:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+        for pattern, ancla in PATRONES_COMPILADOS['nombre']:
+            match = buscar_patron(pattern, ancla, text, posiciones)
             if match:
                 nombre_candidato = match.group(1).strip()
                 if len(nombre_candidato.split()) >= 2:
@@ -138,8 +297,8 @@ class BasicDataExtractor:
                     break
 
         # Fecha de emisión
-        for pattern in self.patterns['fecha_emision']:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern, ancla in PATRONES_COMPILADOS['fecha_emision']:
+            match = buscar_patron(pattern, ancla, text, posiciones)
             if match:
                 dia, mes, año = match.groups()
                 resultado.fecha_emision = f"{año}-{mes.zfill(2)}-{dia.zfill(2)}"
@@ -204,29 +363,24 @@ class BasicDataExtractor:
             logger.error(f"Error calculando edad: {e}")
             return None
 
-    def _extract_semanas_info(self, text: str, resultado: BasicDataResult):
+    def _extract_semanas_info(self, text: str, resultado: BasicDataResult,
+                              posiciones: PosicionesAnclas):
         """
         Extrae información de semanas - SOLO EXTRACCIÓN, NO CÁLCULO
         Nomenclatura oficial IMSS
         """
         try:
             # Buscar "Total de semanas cotizadas" (aparece arriba en la constancia)
-            patterns_total = [
-                r'Total\s+de\s+semanas\s+cotizadas\s*[:\n\s]*(\d+)',
-                r'Total.*?cotizadas.*?\n\s*(\d+)',
-                r'DD\s+MM\s+YYYY\s*\n\s*(\d+)',
-            ]
-
-            for pattern in patterns_total:
-                match_total = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+            for pattern, ancla in PATRONES_COMPILADOS['total_semanas']:
+                match_total = buscar_patron(pattern, ancla, text, posiciones)
                 if match_total:
                     resultado.total_semanas_cotizadas = int(match_total.group(1))
                     logger.info(f"✅ Total semanas cotizadas extraído: {resultado.total_semanas_cotizadas}")
                     break
 
             # Buscar sección "Tu detalle de semanas cotizadas"
-            detalle_pattern = r'Tu\s+detalle\s+de\s+semanas.*?(\d+)\s+(\d+)\s+(\d+)'
-            match_detalle = re.search(detalle_pattern, text, re.IGNORECASE | re.DOTALL)
+            detalle_pattern, ancla = PATRONES_COMPILADOS['detalle_semanas'][0]
+            match_detalle = buscar_patron(detalle_pattern, ancla, text, posiciones)
 
             if match_detalle:
                 resultado.semanas_cotizadas_imss = int(match_detalle.group(1))
@@ -247,12 +401,13 @@ class BasicDataExtractor:
             logger.error(f"Error extrayendo semanas: {e}")
             resultado.errors.append(f"Error en semanas: {str(e)}")
 
-    def _determine_ley_aplicable(self, text: str, resultado: BasicDataResult):
+    def _determine_ley_aplicable(self, text: str, resultado: BasicDataResult,
+                                 posiciones: PosicionesAnclas):
         """Determina qué ley aplica basado en fecha de primer alta"""
 
         try:
             # Buscar fecha de primer alta en el texto
-            fecha_primer_alta = self._extract_fecha_primer_alta(text)
+            fecha_primer_alta = self._extract_fecha_primer_alta(text, posiciones)
 
             if fecha_primer_alta:
                 resultado.fecha_primer_alta = fecha_primer_alta
@@ -273,18 +428,12 @@ class BasicDataExtractor:
             logger.error(f"Error determinando ley aplicable: {e}")
             resultado.errors.append(f"Error en ley aplicable: {str(e)}")
 
-    def _extract_fecha_primer_alta(self, text: str) -> Optional[str]:
+    def _extract_fecha_primer_alta(self, text: str, posiciones: PosicionesAnclas) -> Optional[str]:
         """Extrae fecha de primer alta del PDF"""
-        patrones_alta = [
-            r'Fecha\s+de\s+alta\s+(\d{2}/\d{2}/\d{4})',
-            r'ALTA\s+(\d{2}/\d{2}/\d{4})',
-            r'Alta:\s*(\d{2}/\d{2}/\d{4})',
-        ]
-
         fechas_encontradas = []
 
-        for patron in patrones_alta:
-            matches = re.finditer(patron, text, re.IGNORECASE)
+        for patron, ancla in PATRONES_COMPILADOS['alta']:
+            matches = iterar_patron(patron, ancla, text, posiciones)
             for match in matches:
                 fecha_str = match.group(1)
                 try:
@@ -304,18 +453,10 @@ class BasicDataExtractor:
         if not name_text:
             return ""
 
-        cleaned = re.sub(r'\s+', ' ', name_text.strip())
-
-        unwanted_patterns = [
-            r'asegurado\s*:?\s*',
-            r'nombre\s*:?\s*',
-            r'del\s+asegurado\s*:?\s*',
-            r'\s+dd\s+mm\s+yyyy\s*$',
-            r'\s+dd\s+mm\s+aaaa\s*$',
-        ]
+        cleaned = _ESPACIOS.sub(' ', name_text.strip())
 
-        for pattern in unwanted_patterns:
-            cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
+        for pattern in _PATRONES_LIMPIEZA_NOMBRE:
+            cleaned = pattern.sub('', cleaned)
 
         return cleaned.strip()
 
@@ -348,13 +489,16 @@ class BasicDataExtractor:
                     f"pero IMSS reporta {resultado.total_semanas_cotizadas}"
                 )
 
+# El extractor no guarda estado entre llamadas: una sola instancia por proceso
+_extractor = BasicDataExtractor()
+
+
 def extract_basic_data_from_pdf(pdf_text: str, filename: str) -> Dict[str, Any]:
     """
     Función principal para extraer datos básicos
     Retorna diccionario con nomenclatura oficial IMSS
     """
-    extractor = BasicDataExtractor()
-    resultado = extractor.extract_basic_data(pdf_text, filename)
+    resultado = _extractor.extract_basic_data(pdf_text, filename)
 
     return {
         "fecha_procesamiento": resultado.fecha_procesamiento,
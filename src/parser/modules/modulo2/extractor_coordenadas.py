@@ -0,0 +1,241 @@
+"""
+Extracción de períodos laborales por coordenadas de palabras (pdfplumber)
+
+En lugar de buscar cada campo con varias expresiones sobre el texto aplanado,
+agrupa las palabras de cada página en renglones por su coordenada vertical y
+lee cada bloque patronal como una tabla etiqueta → valor en una sola pasada.
+
+COORDINA CON: historial_laboral.py (construye el período final con estos datos)
+USO: HistorialLaboralExtractor(motor_periodos="coordenadas")
+"""
+
+import io
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import pdfplumber
+
+# Distancia vertical máxima (pt) para considerar dos palabras en el mismo renglón
+TOLERANCIA_RENGLON = 3.0
+
+# Etiquetas de cada bloque patronal → campo del período
+ETIQUETAS = [
+    (("nombre", "del", "patrón"), "patron"),
+    (("registro", "patronal"), "registro_patronal"),
+    (("entidad", "federativa"), "entidad_federativa"),
+    (("fecha", "de", "alta"), "fecha_inicio"),
+    (("fecha", "de", "baja"), "fecha_fin"),
+    (("salario", "base", "de", "cotización"), "salario"),
+]
+
+TIPOS_MOVIMIENTO = [
+    (("modificacion", "de", "salario"), "MODIFICACION DE SALARIO"),
+    (("reingreso",), "REINGRESO"),
+    (("baja",), "BAJA"),
+    (("alta",), "ALTA"),
+]
+
+PATRON_FECHA = re.compile(r'\d{2}/\d{2}/\d{4}')
+PATRON_REGISTRO = re.compile(r'[A-Z]?\d{9,10}')
+PATRON_MONTO = re.compile(r'\$?([\d,]+\.?\d*)')
+
+Palabra = Dict[str, Any]
+Renglon = List[Palabra]
+
+
+def agrupar_renglones(palabras: List[Palabra]) -> List[Renglon]:
+    """Agrupa palabras en renglones (orden de lectura) por su coordenada `top`"""
+    renglones: List[Renglon] = []
+    top_actual = None
+    for palabra in sorted(palabras, key=lambda p: (p['top'], p['x0'])):
+        if top_actual is None or palabra['top'] - top_actual > TOLERANCIA_RENGLON:
+            renglones.append([])
+            top_actual = palabra['top']
+        renglones[-1].append(palabra)
+    for renglon in renglones:
+        renglon.sort(key=lambda p: p['x0'])
+    return renglones
+
+
+def extraer_renglones_pdf(fuente: Union[bytes, str],
+                          paginas: Optional[Sequence[int]] = None) -> List[Renglon]:
+    """Renglones de todas las páginas indicadas, en orden de lectura"""
+    archivo = io.BytesIO(fuente) if isinstance(fuente, (bytes, bytearray)) else fuente
+    renglones: List[Renglon] = []
+    with pdfplumber.open(archivo) as pdf_doc:
+        indices = range(len(pdf_doc.pages)) if paginas is None else paginas
+        for i in indices:
+            renglones.extend(agrupar_renglones(pdf_doc.pages[i].extract_words()))
+    return renglones
+
+
+def _coincide(tokens: List[str], inicio: int, secuencia: Tuple[str, ...]) -> bool:
+    return tuple(tokens[inicio:inicio + len(secuencia)]) == secuencia
+
+
+def _buscar_etiqueta(tokens: List[str], inicio: int) -> Optional[Tuple[str, int]]:
+    """Devuelve (campo, longitud) si en `inicio` empieza una etiqueta"""
+    for secuencia, campo in ETIQUETAS:
+        if _coincide(tokens, inicio, secuencia):
+            return campo, len(secuencia)
+    return None
+
+
+def _leer_movimiento(renglon: Renglon) -> Optional[Dict[str, Any]]:
+    """Renglón de la tabla de movimientos: TIPO  dd/mm/aaaa  $ monto"""
+    tokens = [p['text'].lower() for p in renglon]
+    for secuencia, tipo in TIPOS_MOVIMIENTO:
+        if not _coincide(tokens, 0, secuencia):
+            continue
+        resto = [p['text'] for p in renglon[len(secuencia):]]
+        if len(resto) < 2 or not PATRON_FECHA.fullmatch(resto[0]):
+            return None
+        monto = "".join(resto[1:3]) if resto[1] == '$' else resto[1]
+        if not monto.startswith('$'):
+            return None
+        try:
+            return {
+                'tipo': tipo,
+                'fecha': resto[0],
+                'salario_diario': float(monto.lstrip('$').replace(',', ''))
+            }
+        except ValueError:
+            return None
+    return None
+
+
+def _interpretar_campo(campo: str, palabras: List[str]) -> Optional[Any]:
+    """Convierte las palabras del valor de una etiqueta al tipo del campo"""
+    if not palabras:
+        return None
+
+    if campo == 'patron':
+        nombre = " ".join(palabras).strip()
+        return nombre if 5 <= len(nombre) <= 100 else None
+
+    if campo == 'registro_patronal':
+        for palabra in palabras:
+            if PATRON_REGISTRO.fullmatch(palabra):
+                return palabra
+        return None
+
+    if campo == 'entidad_federativa':
+        return " ".join(palabras).strip()
+
+    if campo in ('fecha_inicio', 'fecha_fin'):
+        for palabra in palabras:
+            if campo == 'fecha_fin' and palabra.lower() == 'vigente':
+                return 'Vigente'
+            if PATRON_FECHA.fullmatch(palabra):
+                try:
+                    datetime.strptime(palabra, '%d/%m/%Y')
+                    return palabra
+                except ValueError:
+                    return None
+        return None
+
+    if campo == 'salario':
+        for palabra in palabras:
+            match = PATRON_MONTO.fullmatch(palabra)
+            if match and match.group(1):
+                try:
+                    salario = float(match.group(1).replace(',', ''))
+                except ValueError:
+                    continue
+                if 1.0 <= salario <= 10000.0:
+                    return salario
+        return None
+
+    return None
+
+
+class ExtractorPeriodosCoordenadas:
+    """
+    Lee los bloques patronales como tablas: cada etiqueta toma las palabras a su
+    derecha hasta la siguiente etiqueta del renglón; si no hay ninguna, toma las
+    del renglón siguiente que caen bajo su columna.
+    """
+
+    def extraer_bloques(self, renglones: List[Renglon]) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Una pasada sobre los renglones
+
+        Returns:
+            Lista de (campos_del_bloque, movimientos) en orden del documento
+        """
+        bloques = []
+        campos: Optional[Dict[str, Any]] = None
+        movimientos: List[Dict[str, Any]] = []
+        pendientes: List[Tuple[str, float, float]] = []  # (campo, x0, x_limite)
+
+        for renglon in renglones:
+            tokens = [p['text'].lower() for p in renglon]
+
+            # Valores de etiquetas del renglón anterior que quedaron sin valor
+            if pendientes and campos is not None:
+                for campo, x0, x_limite in pendientes:
+                    palabras = [p['text'] for p in renglon if x0 - TOLERANCIA_RENGLON <= p['x0'] < x_limite]
+                    valor = _interpretar_campo(campo, palabras)
+                    if valor is not None and campo not in campos:
+                        campos[campo] = valor
+                pendientes = []
+
+            movimiento = _leer_movimiento(renglon) if campos is not None else None
+            if movimiento:
+                movimientos.append(movimiento)
+                continue
+
+            # Ubicar etiquetas del renglón
+            etiquetas = []
+            i = 0
+            while i < len(tokens):
+                encontrada = _buscar_etiqueta(tokens, i)
+                if encontrada:
+                    etiquetas.append((encontrada[0], i, i + encontrada[1]))
+                    i += encontrada[1]
+                else:
+                    i += 1
+
+            for n, (campo, inicio, fin_etiqueta) in enumerate(etiquetas):
+                if campo == 'patron':
+                    if campos is not None:
+                        bloques.append((campos, movimientos))
+                    campos, movimientos = {}, []
+                if campos is None:
+                    continue
+
+                fin_valor = etiquetas[n + 1][1] if n + 1 < len(etiquetas) else len(tokens)
+                palabras = [p['text'] for p in renglon[fin_etiqueta:fin_valor]]
+                valor = _interpretar_campo(campo, palabras)
+                if valor is not None:
+                    campos[campo] = valor
+                elif not palabras:
+                    x_limite = renglon[fin_valor]['x0'] if fin_valor < len(renglon) else float('inf')
+                    pendientes.append((campo, renglon[inicio]['x0'], x_limite))
+
+        if campos is not None:
+            bloques.append((campos, movimientos))
+
+        return bloques
+
+    def extraer_info_periodos(self, fuente: Union[bytes, str],
+                              paginas: Optional[Sequence[int]] = None) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Equivalente por coordenadas de extraer_info_periodo_adaptativo + extraer_movimientos_generico
+
+        Returns:
+            Lista de (info_periodo, movimientos) solo para bloques completos
+        """
+        resultado = []
+        for campos, movimientos in self.extraer_bloques(extraer_renglones_pdf(fuente, paginas)):
+            requeridos = ['patron', 'registro_patronal', 'fecha_inicio', 'fecha_fin']
+            if not all(campo in campos for campo in requeridos):
+                continue
+            info = dict(campos)
+            info.setdefault('entidad_federativa', 'TLAXCALA')
+            info.setdefault('salario', 0.0)
+            info['esta_vigente'] = info['fecha_fin'] == 'Vigente'
+            info['salario_diario'] = info['salario']
+            resultado.append((info, movimientos))
+        return resultado
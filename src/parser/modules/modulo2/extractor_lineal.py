@@ -0,0 +1,195 @@
+"""
+Extracción de períodos laborales con una máquina de estados por renglón
+
+Divide el texto en renglones una sola vez y recorre cada renglón una vez:
+las etiquetas del bloque patronal cambian el estado, los valores se leen en
+el mismo renglón o, si la etiqueta quedó sola, en el siguiente renglón no
+vacío. Los movimientos salariales se leen en el mismo recorrido.
+
+COORDINA CON: historial_laboral.py (construye el período final con estos datos)
+USO: HistorialLaboralExtractor(motor_periodos="lineal")
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+ETIQUETA_PATRON = "nombre del patrón"
+ETIQUETA_REGISTRO = "registro patronal"
+ETIQUETA_ENTIDAD = "entidad federativa"
+ETIQUETA_ALTA = "fecha de alta"
+ETIQUETA_BAJA = "fecha de baja"
+ETIQUETA_SALARIO = "salario base de cotización"
+
+RE_REGISTRO = re.compile(r'\s*([A-Z]?\d{9,10})')
+RE_FECHA = re.compile(r'\s*(\d{2}/\d{2}/\d{4})')
+RE_FECHA_O_VIGENTE = re.compile(r'\s*(\d{2}/\d{2}/\d{4}|Vigente)', re.IGNORECASE)
+RE_MONTO = re.compile(r'\$\s*([\d,\.]+)')
+RE_MOVIMIENTO = re.compile(
+    r'(BAJA|REINGRESO|MODIFICACION DE SALARIO|ALTA)\s+(\d{2}/\d{2}/\d{4})\s+\$\s*([\d,\.]+)',
+    re.IGNORECASE
+)
+
+# Orden en que pueden aparecer las etiquetas dentro de un renglón
+ETIQUETAS_CAMPOS = [
+    (ETIQUETA_PATRON, 'patron'),
+    (ETIQUETA_REGISTRO, 'registro_patronal'),
+    (ETIQUETA_ENTIDAD, 'entidad_federativa'),
+    (ETIQUETA_ALTA, 'fecha_inicio'),
+    (ETIQUETA_BAJA, 'fecha_fin'),
+    (ETIQUETA_SALARIO, 'salario'),
+]
+
+
+def _fecha_valida(fecha: str) -> bool:
+    try:
+        datetime.strptime(fecha, '%d/%m/%Y')
+        return True
+    except ValueError:
+        return False
+
+
+def _leer_valor(campo: str, texto: str) -> Optional[Any]:
+    """Interpreta el texto que sigue a una etiqueta; None si no hay valor válido"""
+    if campo == 'patron':
+        nombre = texto.strip()
+        return nombre if 5 <= len(nombre) <= 100 else None
+
+    if campo == 'registro_patronal':
+        match = RE_REGISTRO.match(texto)
+        return match.group(1) if match else None
+
+    if campo == 'entidad_federativa':
+        valor = texto.strip()
+        return valor or None
+
+    if campo == 'fecha_inicio':
+        match = RE_FECHA.match(texto)
+        return match.group(1) if match and _fecha_valida(match.group(1)) else None
+
+    if campo == 'fecha_fin':
+        match = RE_FECHA_O_VIGENTE.match(texto)
+        if not match:
+            return None
+        valor = match.group(1)
+        if valor.lower() == 'vigente':
+            return 'Vigente'
+        return valor if _fecha_valida(valor) else None
+
+    if campo == 'salario':
+        for monto in RE_MONTO.findall(texto):
+            try:
+                salario = float(monto.replace(',', ''))
+            except ValueError:
+                continue
+            if 1.0 <= salario <= 10000.0:
+                return salario
+        return None
+
+    return None
+
+
+class ExtractorPeriodosLineal:
+    """
+    Estados: fuera de bloque → dentro de bloque (con campos pendientes de valor)
+    Un bloque empieza en cada "Nombre del patrón" y termina en el siguiente.
+    """
+
+    def _etiquetas_en_renglon(self, renglon_min: str) -> List[Tuple[int, int, str]]:
+        """(inicio, fin, campo) de cada etiqueta presente, ordenadas por posición"""
+        etiquetas = []
+        for etiqueta, campo in ETIQUETAS_CAMPOS:
+            inicio = renglon_min.find(etiqueta)
+            if inicio != -1:
+                etiquetas.append((inicio, inicio + len(etiqueta), campo))
+        etiquetas.sort()
+        return etiquetas
+
+    def extraer_bloques(self, texto: str) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Un recorrido por los renglones del texto
+
+        Returns:
+            Lista de (campos_del_bloque, movimientos) en orden del documento
+        """
+        bloques = []
+        campos: Optional[Dict[str, Any]] = None
+        movimientos: List[Dict[str, Any]] = []
+        pendientes: List[str] = []
+
+        for renglon in texto.splitlines():
+            renglon = " ".join(renglon.split())
+            if not renglon:
+                continue
+            renglon_min = renglon.lower()
+            etiquetas = self._etiquetas_en_renglon(renglon_min)
+
+            # Inicio de un bloque nuevo
+            if any(campo == 'patron' for _, _, campo in etiquetas):
+                if campos is not None:
+                    bloques.append((campos, movimientos))
+                campos, movimientos, pendientes = {}, [], []
+
+            if campos is None:
+                continue
+
+            # Etiquetas que quedaron sin valor: se leen al inicio de este renglón
+            # (el salario sigue pendiente hasta el primer monto del bloque)
+            if pendientes:
+                texto_previo = renglon[:etiquetas[0][0]] if etiquetas else renglon
+                siguientes = []
+                for campo in pendientes:
+                    if campo in campos:
+                        continue
+                    valor = _leer_valor(campo, texto_previo)
+                    if valor is not None:
+                        campos[campo] = valor
+                    elif campo == 'salario':
+                        siguientes.append(campo)
+                pendientes = siguientes
+
+            # Etiquetas del renglón: el valor va hasta la siguiente etiqueta
+            for n, (inicio, fin, campo) in enumerate(etiquetas):
+                fin_valor = etiquetas[n + 1][0] if n + 1 < len(etiquetas) else len(renglon)
+                texto_valor = renglon[fin:] if campo == 'salario' else renglon[fin:fin_valor]
+                valor = _leer_valor(campo, texto_valor)
+                if valor is not None:
+                    campos.setdefault(campo, valor)
+                elif campo not in campos and campo not in pendientes:
+                    pendientes.append(campo)
+
+            # Movimientos salariales del renglón
+            for tipo, fecha, monto in RE_MOVIMIENTO.findall(renglon):
+                try:
+                    movimientos.append({
+                        'tipo': tipo.upper(),
+                        'fecha': fecha,
+                        'salario_diario': float(monto.replace(',', ''))
+                    })
+                except ValueError:
+                    continue
+
+        if campos is not None:
+            bloques.append((campos, movimientos))
+
+        return bloques
+
+    def extraer_info_periodos(self, texto: str) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Equivalente lineal de extraer_info_periodo_adaptativo + extraer_movimientos_generico
+
+        Returns:
+            Lista de (info_periodo, movimientos) solo para bloques completos
+        """
+        resultado = []
+        for campos, movimientos in self.extraer_bloques(texto):
+            requeridos = ['patron', 'registro_patronal', 'fecha_inicio', 'fecha_fin']
+            if not all(campo in campos for campo in requeridos):
+                continue
+            info = dict(campos)
+            info.setdefault('entidad_federativa', 'TLAXCALA')
+            info.setdefault('salario', 0.0)
+            info['esta_vigente'] = info['fecha_fin'] == 'Vigente'
+            info['salario_diario'] = info['salario']
+            resultado.append((info, movimientos))
+        return resultado
@@ -1,7 +1,17 @@
 import re
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from functools import cached_property
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Union
 import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Motores para extraer los períodos laborales
+MOTOR_REGEX = "regex"              # expresiones sobre el texto aplanado (original)
+MOTOR_COORDENADAS = "coordenadas"  # tabla por coordenadas de palabras (requiere el PDF)
+MOTOR_LINEAL = "lineal"            # máquina de estados por renglón, una sola pasada
+MOTORES_PERIODOS = (MOTOR_REGEX, MOTOR_COORDENADAS, MOTOR_LINEAL)
 
 class PeriodoLaboral:
     """Clase wrapper para compatibilidad con código existente"""
@@ -12,8 +22,39 @@ class PeriodoLaboral:
     def to_dict(self) -> Dict[str, Any]:
         return self._data
 
+class DocumentoConstancia:
+    """
+    Constancia parseada una sola vez: texto, texto normalizado y datos básicos
+    Se comparte entre la extracción de períodos y los cálculos posteriores
+    para no repetir extract_basic_data_from_pdf ni la normalización del texto
+    """
+    def __init__(self, texto: str, extractor: 'HistorialLaboralExtractor',
+                 fuente_pdf: Union[bytes, str, None] = None,
+                 paginas: Optional[Sequence[int]] = None):
+        self.texto = texto
+        self.fuente_pdf = fuente_pdf
+        self.paginas = paginas
+        self._extractor = extractor
+
+    @cached_property
+    def texto_normalizado(self) -> str:
+        return self._extractor.normalizar_texto(self.texto)
+
+    @cached_property
+    def datos_basicos(self) -> Dict[str, Any]:
+        return self._extractor.extraer_datos_basicos(self.texto)
+
+    @property
+    def fecha_emision(self) -> Optional[str]:
+        return self.datos_basicos.get('fecha_emision')
+
+DocumentoOTexto = Union[str, DocumentoConstancia]
+
 class HistorialLaboralExtractor:
-    def __init__(self):
+    def __init__(self, motor_periodos: str = MOTOR_REGEX):
+        if motor_periodos not in MOTORES_PERIODOS:
+            raise ValueError(f"Motor de períodos inválido: {motor_periodos}. Opciones: {', '.join(MOTORES_PERIODOS)}")
+        self.motor_periodos = motor_periodos
         # Patrones base más generales
         self.patron_fecha = r'(\d{2}/\d{2}/\d{4})'
         self.patron_salario = r'\$\s*([\d,\.]+)'
@@ -31,6 +72,13 @@ class HistorialLaboralExtractor:
         texto_normalizado = re.sub(r'\r\n', '\n', texto_normalizado)
         return texto_normalizado.strip()
 
+    def crear_documento(self, texto_pdf: DocumentoOTexto, fuente_pdf: Union[bytes, str, None] = None,
+                        paginas: Optional[Sequence[int]] = None) -> DocumentoConstancia:
+        """Envuelve el texto en un DocumentoConstancia (o reutiliza el recibido)"""
+        if isinstance(texto_pdf, DocumentoConstancia):
+            return texto_pdf
+        return DocumentoConstancia(texto_pdf, self, fuente_pdf, paginas)
+
     def extraer_datos_basicos(self, texto: str) -> Dict[str, Any]:
         """Usar el extractor básico existente con mapeo de nomenclatura"""
         try:
@@ -39,10 +87,7 @@ class HistorialLaboralExtractor:
         # Extraer datos con tu función existente
             datos_raw = extract_basic_data_from_pdf(texto, "PDF_PROCESADO.pdf")
         
-            print(f"[DEBUG] Datos raw recibidos: {list(datos_raw.keys())}")
-            print(f"[DEBUG] Valores raw: {datos_raw}")
-            print(f"[DEBUG] fecha_nacimiento en raw: {datos_raw.get('fecha_nacimiento')}")  # ✅ NUEVO
-            print(f"[DEBUG] edad en raw: {datos_raw.get('edad')}")  # ✅ NUEVO
+            logger.debug(f"Datos raw recibidos: {datos_raw}")
         
         # Mapear nomenclatura a lo que espera tu sistema
             datos_mapeados = {
@@ -70,28 +115,21 @@ class HistorialLaboralExtractor:
                 )
             }
         
-            print(f"[DEBUG] Datos mapeados finales:")
-            print(f"[DEBUG] fecha_nacimiento mapeado: {datos_mapeados.get('fecha_nacimiento')}")  # ✅ NUEVO
-            print(f"[DEBUG] edad mapeada: {datos_mapeados.get('edad')}")  # ✅ NUEVO
-            print(f"[DEBUG] semanas_cotizadas_imss={datos_mapeados['semanas_cotizadas_imss']}")
-            print(f"[DEBUG] semanas_descontadas={datos_mapeados['semanas_descontadas']}")
-            print(f"[DEBUG] total_semanas_cotizadas={datos_mapeados['total_semanas_cotizadas']}")
+            logger.debug(f"Datos mapeados finales: {datos_mapeados}")
         
             return datos_mapeados
         
         except Exception as e:
-            print(f"[ERROR] Error en extracción: {e}")
-            import traceback
-            traceback.print_exc()  # ✅ NUEVO: ver el error completo
+            logger.error(f"❌ Error en extracción de datos básicos: {e}", exc_info=True)
             return {}
 
-    def extraer_bloques_genericos(self, texto: str) -> List[Tuple[int, int, str]]:
+    def extraer_bloques_genericos(self, texto: DocumentoOTexto) -> List[Tuple[int, int, str]]:
         """
         Extrae bloques de texto que contienen información de períodos laborales
         usando múltiples estrategias genéricas
         """
         bloques = []
-        texto_normalizado = self.normalizar_texto(texto)
+        texto_normalizado = self.crear_documento(texto).texto_normalizado
         # Estrategia 1: Buscar "Nombre del patrón" como separador principal
         marcadores_inicio = list(re.finditer(r'Nombre del patrón', texto_normalizado, re.IGNORECASE))
         for i, marcador in enumerate(marcadores_inicio):
@@ -165,7 +203,7 @@ class HistorialLaboralExtractor:
                         datos_periodo[campo] = resultado
             except Exception as e:
                 if self.modo_debug:
-                    print(f"Error extrayendo {campo}: {e}")
+                    logger.debug(f"Error extrayendo {campo}: {e}")
                 continue
         # Validar que tenemos los datos mínimos necesarios
         campos_requeridos = ['patron', 'registro_patronal', 'fecha_inicio', 'fecha_fin']
@@ -309,22 +347,42 @@ class HistorialLaboralExtractor:
             return 0
 
     # ============== MODIFICACIÓN: PASAR FECHA_EMISION AL CALCULAR SEMANAS ==============
-    def extraer_periodos(self, texto_pdf: str) -> List[PeriodoLaboral]:
+    def _extraer_info_periodos_regex(self, documento: DocumentoConstancia) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Motor original: bloques por marcadores + expresiones por campo"""
+        info_periodos = []
+        for inicio, fin, bloque in self.extraer_bloques_genericos(documento):
+            # Extraer información del período
+            info_periodo = self.extraer_info_periodo_adaptativo(bloque)
+            if info_periodo:
+                # Extraer movimientos
+                info_periodos.append((info_periodo, self.extraer_movimientos_generico(bloque)))
+        return info_periodos
+
+    def extraer_periodos(self, texto_pdf: DocumentoOTexto, fuente_pdf: Union[bytes, str, None] = None,
+                         paginas: Optional[Sequence[int]] = None) -> List[PeriodoLaboral]:
         """
         Método principal que usa estrategias genéricas y adaptativas - CON FECHA_EMISION
+
+        Acepta el texto o un DocumentoConstancia ya creado (reutiliza sus datos
+        básicos). Con motor "coordenadas" los bloques se leen del PDF
+        (fuente_pdf, limitado a `paginas`).
         """
-        # Extraer bloques usando método genérico
-        bloques = self.extraer_bloques_genericos(texto_pdf)
+        documento = self.crear_documento(texto_pdf, fuente_pdf, paginas)
+        if self.motor_periodos == MOTOR_COORDENADAS:
+            if documento.fuente_pdf is None:
+                raise ValueError("El motor por coordenadas requiere el PDF (fuente_pdf)")
+            from modules.modulo2.extractor_coordenadas import ExtractorPeriodosCoordenadas
+            info_periodos = ExtractorPeriodosCoordenadas().extraer_info_periodos(documento.fuente_pdf, documento.paginas)
+        elif self.motor_periodos == MOTOR_LINEAL:
+            from modules.modulo2.extractor_lineal import ExtractorPeriodosLineal
+            info_periodos = ExtractorPeriodosLineal().extraer_info_periodos(documento.texto)
+        else:
+            info_periodos = self._extraer_info_periodos_regex(documento)
         # NUEVO: Obtener fecha_emision para usarla en cálculos de períodos vigentes
-        datos_basicos = self.extraer_datos_basicos(texto_pdf)
-        fecha_emision = datos_basicos.get('fecha_emision')
+        fecha_emision = documento.fecha_emision
         periodos = []
-        for inicio, fin, bloque in bloques:
-            # Extraer información del período
-            info_periodo = self.extraer_info_periodo_adaptativo(bloque)
+        for info_periodo, movimientos in info_periodos:
             if info_periodo:
-                # Extraer movimientos
-                movimientos = self.extraer_movimientos_generico(bloque)
                 # MODIFICADO: Pasar fecha_emision al cálculo
                 semanas = self.calcular_semanas_periodo(
                     info_periodo['fecha_inicio'],
@@ -399,32 +457,50 @@ class HistorialLaboralExtractor:
 
     def procesar_constancia_con_debug(self, texto_pdf: str) -> Dict[str, Any]:
         """Procesa la constancia e incluye debug detallado"""
-        resultado = self.procesar_constancia(texto_pdf)
+        documento = self.crear_documento(texto_pdf)
+        resultado = self.procesar_constancia(documento)
         # Agregar debug web
         debug_info = self.debug_web(texto_pdf)
         resultado["debug_web"] = debug_info
         # Agregar información adicional de debug
-        bloques = self.extraer_bloques_genericos(texto_pdf)
+        bloques = self.extraer_bloques_genericos(documento)
         resultado["debug"]["total_bloques_encontrados"] = len(bloques)
         resultado["debug"]["metodo_extraccion"] = "estandarizado_generico_con_vigente_corregido"
         return resultado
 
-    def procesar_constancia(self, texto_pdf: str) -> Dict[str, Any]:
+    def procesar_constancia(self, texto_pdf: DocumentoOTexto, fuente_pdf: Union[bytes, str, None] = None,
+                            paginas: Optional[Sequence[int]] = None) -> Dict[str, Any]:
         """Procesa toda la constancia usando métodos estandarizados - NOMENCLATURA OFICIAL IMSS"""
-        # Extraer datos básicos
-        datos_basicos = self.extraer_datos_basicos(texto_pdf)
+        resultado, _ = self.procesar_constancia_con_carrera(texto_pdf, fuente_pdf, paginas)
+        return resultado
+
+    def procesar_constancia_con_carrera(self, texto_pdf: DocumentoOTexto,
+                                        fuente_pdf: Union[bytes, str, None] = None,
+                                        paginas: Optional[Sequence[int]] = None) -> Tuple[Dict[str, Any], Any]:
+        """
+        Como procesar_constancia, pero devuelve además el modelo de la carrera
+        (modules.modulo3.utils.carrera.Carrera) para pasarlo a la corrección y a
+        los calculadores sin volver a leer fechas
+        """
+        # Datos básicos: se calculan una sola vez y los reutiliza extraer_periodos
+        documento = self.crear_documento(texto_pdf, fuente_pdf, paginas)
+        datos_basicos = documento.datos_basicos
         # Extraer períodos
-        periodos_obj = self.extraer_periodos(texto_pdf)
-        periodos = [p.to_dict() for p in periodos_obj]
-        # Ordenar períodos cronológicamente
-        periodos.sort(key=lambda x: datetime.strptime(x['fecha_inicio'], '%d/%m/%Y'), reverse=True)
+        periodos_obj = self.extraer_periodos(documento)
+        # Modelo de carrera: fechas leídas una sola vez; lo reutilizan los calculadores
+        from modules.modulo3.utils.carrera import Carrera
+        carrera = Carrera.desde_periodos(
+            [p.to_dict() for p in periodos_obj], datos_basicos.get('fecha_emision')
+        ).ordenar(descendente=True)
+        periodos = carrera.a_dicts()
         # Calcular estadísticas
         total_movimientos = sum(p.get('total_movimientos', 0) for p in periodos)
         registros_patronales_unicos = set(p.get('registro_patronal', '') for p in periodos)
-        # Determinar fecha del primer alta
+        # Determinar fecha del primer alta (texto tal como viene en la constancia)
         fecha_primer_alta = None
-        if periodos:
-            fecha_primer_alta = min(periodos, key=lambda x: datetime.strptime(x['fecha_inicio'], '%d/%m/%Y'))['fecha_inicio']
+        primer_alta = carrera.primer_alta()
+        if primer_alta is not None:
+            fecha_primer_alta = periodos[list(carrera.inicios).index(primer_alta)]['fecha_inicio']
         # ✅ USAR NOMENCLATURA OFICIAL PARA VALIDACIÓN
         total_semanas_oficial = datos_basicos.get('total_semanas_cotizadas', 0)
         validacion = self.validar_consistencia(periodos, total_semanas_oficial)
@@ -460,10 +536,11 @@ class HistorialLaboralExtractor:
                 "registros_patronales_unicos": len(registros_patronales_unicos),
                 "registros_encontrados": list(registros_patronales_unicos),
                 "correccion_aplicada": "periodos_vigentes_limitados_a_fecha_emision",
-                "nomenclatura": "oficial_imss_estandarizada"
+                "nomenclatura": "oficial_imss_estandarizada",
+                "motor_periodos": self.motor_periodos
             }
         }
-        return resultado
+        return resultado, carrera
 
 # Función principal
 def analizar_constancia_imss(texto_pdf: str) -> str:
@@ -1,6 +1,7 @@
 from .promedio_250 import PromedioSalario250
 from .conservacion_derechos import ConservacionDerechos
+from .weeks_reconciler import WeeksReconciler
 
-__all__ = ['PromedioSalario250', 'ConservacionDerechos']
+__all__ = ['PromedioSalario250', 'ConservacionDerechos', 'WeeksReconciler']
 
 
@@ -6,6 +6,8 @@ Maneja disposición de recursos y calcula período de conservación
 from typing import Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 
+from ..utils.carrera import Carrera
+
 class ConservacionDerechos:
     
     def __init__(self):
@@ -13,13 +15,15 @@ class ConservacionDerechos:
         self.factor_conservacion = 4  # Semanas × 7 ÷ 4
     
     def calcular_conservacion_derechos(self, datos_basicos: Dict[str, Any], 
-                                     historial_laboral: Dict[str, Any]) -> Dict[str, Any]:
+                                     historial_laboral: Dict[str, Any],
+                                     carrera: Optional[Carrera] = None) -> Dict[str, Any]:
         """
         Calcula la conservación de derechos considerando disposición de recursos
         
         Args:
             datos_basicos: Datos básicos del asegurado
             historial_laboral: Historial laboral procesado
+            carrera: Modelo de los mismos períodos (opcional); evita releer fechas
         
         Returns:
             Dict con el cálculo de conservación de derechos
@@ -40,7 +44,7 @@ class ConservacionDerechos:
         conservacion_resultado = self._calcular_periodo_conservacion(semanas_efectivas)
         
         # Encontrar fecha de última baja
-        fecha_ultima_baja = self._encontrar_ultima_baja(historial_laboral)
+        fecha_ultima_baja = self._encontrar_ultima_baja(historial_laboral, carrera)
         
         # Calcular fechas específicas de conservación
         fechas_conservacion = self._calcular_fechas_conservacion(
@@ -103,27 +107,26 @@ class ConservacionDerechos:
             "meses_conservacion": round(dias_conservacion / 30.44, 1)
         }
     
-    def _encontrar_ultima_baja(self, historial_laboral: Dict[str, Any]) -> Optional[str]:
+    def _encontrar_ultima_baja(self, historial_laboral: Dict[str, Any],
+                               carrera: Optional[Carrera] = None) -> Optional[str]:
         """
         Encuentra la fecha de la última baja del historial laboral
         """
         periodos = historial_laboral.get('periodos', [])
         if not periodos:
             return None
+        if carrera is None or not carrera.corresponde_a(periodos):
+            carrera = Carrera.desde_periodos(periodos)
         
         # Buscar el período más reciente que haya terminado (no vigente)
         ultima_baja = None
         fecha_mas_reciente = None
         
-        for periodo in periodos:
-            if not periodo.get('esta_vigente', False) and periodo.get('fecha_fin'):
-                try:
-                    fecha_fin = datetime.strptime(periodo['fecha_fin'], '%d/%m/%Y')
-                    if fecha_mas_reciente is None or fecha_fin > fecha_mas_reciente:
-                        fecha_mas_reciente = fecha_fin
-                        ultima_baja = periodo['fecha_fin']
-                except (ValueError, KeyError):
-                    continue
+        for periodo in carrera.periodos:
+            if not periodo.get('esta_vigente', False) and periodo.fin is not None:
+                if fecha_mas_reciente is None or periodo.fin > fecha_mas_reciente:
+                    fecha_mas_reciente = periodo.fin
+                    ultima_baja = periodo.texto_fecha('fecha_fin')
         
         return ultima_baja
     
@@ -0,0 +1,397 @@
+"""
+Reconciliador de semanas: explica la diferencia entre el total del IMSS y los períodos extraídos
+
+Las semanas de los períodos son la unión de sus días // 7 (vigentes cerrados
+en la fecha de emisión). Si no coinciden con el "Total de semanas cotizadas"
+de la constancia, se busca el conjunto más pequeño de explicaciones que cierra
+la diferencia. Explicaciones candidatas:
+
+- bloque_duplicado       un período del mismo registro patronal que se
+                         empalma con otro (bloque leído dos veces): se quita
+- vigente_sin_truncar    un vigente que debió cerrar en la siguiente alta del
+                         mismo patrón, o una baja posterior a la emisión: se trunca
+- empalme_concurrente    el traslape entre dos patrones distintos contado
+                         dos veces: suma sus días
+- semanas_descontadas / semanas_reintegradas  los ajustes de la constancia
+
+Búsqueda: profundización iterativa por número de explicaciones con
+ramificación y poda. Quitar o truncar un período solo puede restar días de la
+unión, y nunca más que los días propios que pierde ese período; las
+explicaciones aditivas suman o restan una cantidad fija. Con eso cada rama
+tiene un rango alcanzable de días y se poda si ese rango no puede mejorar la
+mejor solución. La unión se mantiene como bitset (un int) y cada cambio solo
+recalcula el tramo que pierde el período, con los períodos que lo tocan.
+
+COORDINA CON: utils/intervalos.py (barrido de solapamientos), utils/carrera.py
+USO:
+    reconciliacion = WeeksReconciler().reconciliar(datos_basicos, carrera_o_periodos)
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from utils.intervalos import detectar_solapamientos
+from ..utils.carrera import Carrera
+from ..utils.date_helpers import ordinal_a_constancia
+
+TIPO_DUPLICADO = 'bloque_duplicado'
+TIPO_VIGENTE = 'vigente_sin_truncar'
+TIPO_EMPALME = 'empalme_concurrente'
+TIPO_DESCONTADAS = 'semanas_descontadas'
+TIPO_REINTEGRADAS = 'semanas_reintegradas'
+
+# Campos de datos_basicos con el total oficial, en orden de preferencia
+CAMPOS_TOTAL_OFICIAL = ('total_semanas_cotizadas', 'total_semanas', 'semanas_imss', 'semanas_cotizadas_imss')
+
+
+@dataclass
+class Explicacion:
+    """
+    Explicación candidata de parte de la diferencia
+
+    `intervalo` es la posición del intervalo que modifica (None si es
+    aditiva); `fin_nuevo` es su nueva baja (None: el intervalo se quita).
+    `dias` es el efecto sobre el total si se aplica sola.
+    """
+    tipo: str
+    descripcion: str
+    periodos: Tuple[int, ...]
+    dias: int = 0
+    intervalo: Optional[int] = None
+    fin_nuevo: Optional[int] = None
+    capacidad: int = 0
+
+    @property
+    def aditiva(self) -> bool:
+        return self.intervalo is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tipo": self.tipo,
+            "descripcion": self.descripcion,
+            "periodos": list(self.periodos),
+            "dias": self.dias
+        }
+
+
+def _mascara(inicio: int, fin: int, base: int) -> int:
+    """Bits de los días [inicio, fin] relativos a `base`; 0 si el intervalo está vacío"""
+    if fin < inicio:
+        return 0
+    return ((1 << (fin - inicio + 1)) - 1) << (inicio - base)
+
+
+def _semanas(dias: int) -> int:
+    return dias // 7
+
+
+class WeeksReconciler:
+
+    def __init__(self, max_explicaciones: int = 4, tolerancia_semanas: int = 0,
+                 max_nodos: int = 200_000):
+        self.max_explicaciones = max_explicaciones
+        self.tolerancia_semanas = tolerancia_semanas
+        self.max_nodos = max_nodos
+
+    def reconciliar(self, datos_basicos: Dict[str, Any],
+                    periodos: Union[List[Dict[str, Any]], Carrera]) -> Dict[str, Any]:
+        """
+        Busca el conjunto más pequeño de explicaciones para la diferencia
+
+        Args:
+            datos_basicos: Datos básicos con el total oficial y las semanas
+                descontadas / reintegradas
+            periodos: Períodos como dicts o Carrera (no se modifica)
+
+        Returns:
+            Dict con la diferencia, las explicaciones elegidas y las
+            semanas que quedan sin explicar (`residuo`)
+        """
+        t0 = time.perf_counter()
+        semanas_oficiales = next(
+            (datos_basicos[c] for c in CAMPOS_TOTAL_OFICIAL if datos_basicos.get(c)), 0
+        )
+        if not semanas_oficiales:
+            return {
+                "exito": False,
+                "error": "La constancia no trae el total de semanas cotizadas"
+            }
+
+        carrera = Carrera.desde(periodos, datos_basicos.get('fecha_emision'))
+        indexados = carrera.intervalos_indexados()
+        indices = [k for k, _ in indexados]
+        intervalos = [intervalo for _, intervalo in indexados]
+        base = min((i for i, _ in intervalos), default=0)
+        mascaras = [_mascara(i, f, base) for i, f in intervalos]
+        solapamientos = detectar_solapamientos(intervalos)
+
+        union = 0
+        for mascara in mascaras:
+            union |= mascara
+        dias_periodos = union.bit_count()
+        semanas_periodos = _semanas(dias_periodos)
+
+        busqueda = _Busqueda(
+            objetivo=semanas_oficiales,
+            tolerancia=self.tolerancia_semanas,
+            base=base,
+            mascaras=mascaras,
+            union=union,
+            vecinos=self._vecinos(len(intervalos), solapamientos),
+            max_nodos=self.max_nodos
+        )
+        candidatos = self._candidatos(carrera, datos_basicos, indices, intervalos, solapamientos, busqueda)
+        elegidas = busqueda.resolver(candidatos, self.max_explicaciones)
+
+        dias_explicados = busqueda.evaluar(elegidas)
+        semanas_explicadas = _semanas(dias_explicados)
+
+        return {
+            "exito": True,
+            "semanas_oficiales": semanas_oficiales,
+            "semanas_periodos": semanas_periodos,
+            "diferencia": semanas_periodos - semanas_oficiales,
+            "reconciliado": abs(semanas_explicadas - semanas_oficiales) <= self.tolerancia_semanas,
+            "semanas_explicadas": semanas_explicadas,
+            "residuo": semanas_explicadas - semanas_oficiales,
+            "explicaciones": [c.to_dict() for c in elegidas],
+            "candidatos_evaluados": len(candidatos),
+            "nodos_explorados": busqueda.nodos,
+            "busqueda_completa": busqueda.nodos < self.max_nodos,
+            "tiempo_ms": round((time.perf_counter() - t0) * 1e3, 3)
+        }
+
+    @staticmethod
+    def _vecinos(n: int, solapamientos) -> List[List[int]]:
+        """Intervalos que se empalman con cada intervalo"""
+        vecinos: List[List[int]] = [[] for _ in range(n)]
+        for i, j, _, _ in solapamientos:
+            vecinos[i].append(j)
+            vecinos[j].append(i)
+        return vecinos
+
+    def _candidatos(self, carrera: Carrera, datos_basicos: Dict[str, Any], indices: List[int],
+                    intervalos: List[Tuple[int, int]], solapamientos,
+                    busqueda: '_Busqueda') -> List[Explicacion]:
+        """Todas las explicaciones con efecto sobre el total, ordenadas por capacidad"""
+        periodos = carrera.periodos
+        candidatos: List[Explicacion] = []
+        quitados = set()
+
+        def patron(posicion: int) -> str:
+            return str(periodos[indices[posicion]].patron.nombre or '')[:30]
+
+        def registro(posicion: int) -> Any:
+            return periodos[indices[posicion]].patron.registro_patronal
+
+        # 1. Bloques duplicados: mismo registro patronal empalmado consigo mismo.
+        #    Cualquiera de los dos puede ser la copia: se prueba quitar cada uno
+        for i, j, _, _ in solapamientos:
+            if not registro(i) or registro(i) != registro(j):
+                continue
+            for quitar, queda in ((j, i), (i, j)):
+                if quitar in quitados:
+                    continue
+                quitados.add(quitar)
+                candidatos.append(Explicacion(
+                    tipo=TIPO_DUPLICADO,
+                    descripcion=f"{patron(quitar)}: bloque repetido de otro período del mismo registro",
+                    periodos=(indices[quitar], indices[queda]),
+                    intervalo=quitar,
+                    capacidad=intervalos[quitar][1] - intervalos[quitar][0] + 1
+                ))
+
+        # 2. Vigentes sin truncar: un vigente con BAJA entre sus movimientos o
+        #    seguido de otra alta del mismo registro cierra en su último
+        #    movimiento; ninguna baja puede pasar de la fecha de emisión
+        altas_por_registro: Dict[Any, List[int]] = {}
+        for posicion, (inicio, _) in enumerate(intervalos):
+            altas_por_registro.setdefault(registro(posicion), []).append(inicio)
+        for posicion, (inicio, fin) in enumerate(intervalos):
+            periodo = periodos[indices[posicion]]
+            fin_nuevo = None
+            if periodo.vigente:
+                fechas = [m.fecha for m in periodo.movimientos if m.fecha is not None and m.fecha >= inicio]
+                bajas = [m.fecha for m in periodo.movimientos
+                         if m.fecha is not None and m.fecha >= inicio and str(m.tipo or '').upper() == 'BAJA']
+                siguiente_alta = min((a for a in altas_por_registro[registro(posicion)] if a > inicio),
+                                     default=None) if registro(posicion) else None
+                if bajas:
+                    fin_nuevo = max(bajas)
+                elif siguiente_alta is not None:
+                    fin_nuevo = max((f for f in fechas if f < siguiente_alta), default=siguiente_alta - 1)
+            if carrera.fecha_emision is not None and fin > carrera.fecha_emision:
+                fin_nuevo = min(fin_nuevo if fin_nuevo is not None else fin, carrera.fecha_emision)
+            if fin_nuevo is None or fin_nuevo >= fin:
+                continue
+            fin_nuevo = max(fin_nuevo, inicio - 1)
+            candidatos.append(Explicacion(
+                tipo=TIPO_VIGENTE,
+                descripcion=f"{patron(posicion)}: debió cerrar el {ordinal_a_constancia(fin_nuevo)}"
+                            if fin_nuevo >= inicio else f"{patron(posicion)}: alta posterior a la emisión",
+                periodos=(indices[posicion],),
+                intervalo=posicion,
+                fin_nuevo=fin_nuevo,
+                capacidad=fin - fin_nuevo
+            ))
+
+        # 3. Empalmes entre patrones distintos contados dos veces
+        for i, j, inicio, fin in solapamientos:
+            if registro(i) and registro(i) == registro(j):
+                continue
+            dias = fin - inicio + 1
+            candidatos.append(Explicacion(
+                tipo=TIPO_EMPALME,
+                descripcion=f"{patron(i)} / {patron(j)}: {dias} días simultáneos contados dos veces",
+                periodos=(indices[i], indices[j]),
+                dias=dias,
+                capacidad=dias
+            ))
+
+        # 4. Ajustes de la constancia
+        for tipo, signo in ((TIPO_DESCONTADAS, -1), (TIPO_REINTEGRADAS, 1)):
+            semanas = datos_basicos.get(tipo) or 0
+            if not isinstance(semanas, (int, float)) or semanas <= 0:
+                continue
+            candidatos.append(Explicacion(
+                tipo=tipo,
+                descripcion=f"{int(semanas)} {tipo.replace('_', ' ')} en la constancia",
+                periodos=(),
+                dias=signo * int(semanas) * 7,
+                capacidad=int(semanas) * 7
+            ))
+
+        # Efecto individual de quitar / truncar; las que no mueven la unión no explican nada
+        for candidato in candidatos:
+            if not candidato.aditiva:
+                candidato.dias = busqueda.evaluar([candidato]) - busqueda.dias_base
+        candidatos = [c for c in candidatos if c.dias != 0]
+
+        candidatos.sort(key=lambda c: -c.capacidad)
+        return candidatos
+
+
+class _Busqueda:
+    """Ramificación y poda sobre subconjuntos de explicaciones"""
+
+    def __init__(self, objetivo: int, tolerancia: int, base: int, mascaras: List[int], union: int,
+                 vecinos: List[List[int]], max_nodos: int):
+        self.objetivo = objetivo
+        self.base = base
+        self.tolerancia = tolerancia
+        self.mascaras = mascaras
+        self.union = union
+        self.vecinos = vecinos
+        self.max_nodos = max_nodos
+        self.dias_base = union.bit_count()
+        self.nodos = 0
+
+    def _residuo(self, dias: int) -> int:
+        return max(0, abs(_semanas(dias) - self.objetivo) - self.tolerancia)
+
+    def _residuo_minimo(self, minimo: int, maximo: int) -> int:
+        """Menor residuo posible con un total de días en [minimo, maximo]"""
+        semanas_min, semanas_max = _semanas(minimo), _semanas(maximo)
+        if semanas_min <= self.objetivo <= semanas_max:
+            return 0
+        distancia = semanas_min - self.objetivo if semanas_min > self.objetivo else self.objetivo - semanas_max
+        return max(0, distancia - self.tolerancia)
+
+    def _aplicar(self, candidato: Explicacion, mascaras: List[int], union: int) -> int:
+        """Modifica `mascaras` en su lugar y devuelve la nueva unión"""
+        posicion = candidato.intervalo
+        anterior = mascaras[posicion]
+        if candidato.fin_nuevo is None or candidato.fin_nuevo < self.base:
+            nueva = 0
+        else:
+            # Los bits bajos son los días más tempranos: se conservan hasta la nueva baja
+            nueva = anterior & ((1 << (candidato.fin_nuevo - self.base + 1)) - 1)
+        mascaras[posicion] = nueva
+        perdidos = anterior & ~nueva
+        cubiertos = 0
+        for vecino in self.vecinos[posicion]:
+            cubiertos |= mascaras[vecino] & perdidos
+        return (union & ~perdidos) | cubiertos
+
+    def evaluar(self, elegidas: List[Explicacion]) -> int:
+        """Días totales (unión modificada + aditivas) con un conjunto de explicaciones"""
+        mascaras = list(self.mascaras)
+        union = self.union
+        aditivos = 0
+        for candidato in elegidas:
+            if candidato.aditiva:
+                aditivos += candidato.dias
+            else:
+                union = self._aplicar(candidato, mascaras, union)
+        return union.bit_count() + aditivos
+
+    def resolver(self, candidatos: List[Explicacion], max_explicaciones: int) -> List[Explicacion]:
+        """Conjunto más pequeño que cierra la diferencia (o el de menor residuo)"""
+        n = len(candidatos)
+        limite = min(max_explicaciones, n)
+
+        # Cotas por sufijo: las r mayores capacidades de resta y de suma desde cada posición
+        # (los candidatos vienen ordenados por capacidad, así que son las primeras r)
+        restas = [[0] * (limite + 1) for _ in range(n + 1)]
+        sumas = [[0] * (limite + 1) for _ in range(n + 1)]
+        for p in range(n - 1, -1, -1):
+            candidato = candidatos[p]
+            resta = candidato.capacidad if (not candidato.aditiva or candidato.dias < 0) else 0
+            suma = candidato.capacidad if (candidato.aditiva and candidato.dias > 0) else 0
+            for r in range(1, limite + 1):
+                restas[p][r] = max(restas[p + 1][r], restas[p + 1][r - 1] + resta) if resta else restas[p + 1][r]
+                sumas[p][r] = max(sumas[p + 1][r], sumas[p + 1][r - 1] + suma) if suma else sumas[p + 1][r]
+
+        mejor: List[Explicacion] = []
+        mejor_residuo = self._residuo(self.dias_base)
+        if mejor_residuo == 0:
+            return mejor
+
+        elegidas: List[Explicacion] = []
+        mascaras = list(self.mascaras)
+        usados = set()
+
+        def buscar(desde: int, faltan: int, union: int, aditivos: int) -> bool:
+            """True si encontró una solución exacta (detiene la búsqueda)"""
+            nonlocal mejor, mejor_residuo
+            self.nodos += 1
+            dias = union.bit_count() + aditivos
+            if faltan == 0:
+                residuo = self._residuo(dias)
+                if residuo < mejor_residuo:
+                    mejor, mejor_residuo = list(elegidas), residuo
+                return residuo == 0
+
+            if self.nodos >= self.max_nodos or n - desde < faltan:
+                return False
+            cota = self._residuo_minimo(dias - restas[desde][faltan], dias + sumas[desde][faltan])
+            if cota >= mejor_residuo:
+                return False
+
+            for p in range(desde, n - faltan + 1):
+                candidato = candidatos[p]
+                if candidato.intervalo is not None and candidato.intervalo in usados:
+                    continue
+                elegidas.append(candidato)
+                if candidato.aditiva:
+                    encontrado = buscar(p + 1, faltan - 1, union, aditivos + candidato.dias)
+                else:
+                    anterior = mascaras[candidato.intervalo]
+                    usados.add(candidato.intervalo)
+                    nueva_union = self._aplicar(candidato, mascaras, union)
+                    encontrado = buscar(p + 1, faltan - 1, nueva_union, aditivos)
+                    mascaras[candidato.intervalo] = anterior
+                    usados.discard(candidato.intervalo)
+                elegidas.pop()
+                if encontrado:
+                    return True
+                if self.nodos >= self.max_nodos:
+                    return False
+            return False
+
+        # Profundización iterativa: primero todas las soluciones de una explicación, luego de dos...
+        for tamano in range(1, limite + 1):
+            if buscar(0, tamano, self.union, 0):
+                break
+        return mejor
@@ -1,6 +1,5 @@
 from .quality_validator import QualityValidator
 from .overlap_resolver import OverlapResolver
+from .stage_graph import Stage, StageCache, StageGraph
 
-__all__ = ['QualityValidator', 'OverlapResolver']
-
-
+__all__ = ['QualityValidator', 'OverlapResolver', 'Stage', 'StageCache', 'StageGraph']
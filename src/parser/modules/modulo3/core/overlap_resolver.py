@@ -1,193 +1,190 @@
 """
 Resolvedor de traslapes entre empleos múltiples
 Aplica las reglas del IMSS para manejar empleos simultáneos y traslapes
+
+Barre la carrera por eventos (altas y bajas) y la divide en sub-períodos
+elementales: dentro de cada uno el conjunto de empleos activos no cambia, los
+salarios concurrentes se suman y el total se topa al tope diario del SBC
+vigente (almacén de parámetros, utils/parametros_imss.py).
 """
 
-from typing import List, Dict, Any, Tuple
-from datetime import datetime, timedelta
-from collections import defaultdict
+from typing import List, Dict, Any, Optional, Union
+from datetime import datetime
+
+from utils.parametros_imss import parametros
+from ..utils.carrera import Carrera
+from ..utils.date_helpers import ordinal_a_datetime
+
 
 class OverlapResolver:
-    
-    def __init__(self):
-        self.topes_uma = {
-            # Topes históricos de 25 UMA por año
-            2025: 1031838.0,  # 25 * 113.14 * 365
-            2024: 1000000.0,  # Aproximado
-            2023: 950000.0,
-            2022: 900000.0,
-            2021: 850000.0,
-            2020: 800000.0,
-            # Agregar más años según necesidad
-        }
-    
-    def resolve_overlaps(self, periodos: List[Dict[str, Any]], fecha_emision: str) -> List[Dict[str, Any]]:
+
+    def resolve_overlaps(self, periodos: Union[List[Dict[str, Any]], Carrera],
+                         fecha_emision: str) -> List[Dict[str, Any]]:
         """
-        Resuelve traslapes aplicando reglas del IMSS
-        1. Suma salarios hasta tope 25 UMA por año
-        2. Maneja empleos vigentes como últimos empleos
-        3. Elimina períodos duplicados o inconsistentes
+        Resuelve traslapes aplicando reglas del IMSS (períodos como dicts o Carrera)
+        1. Maneja empleos vigentes como últimos empleos (cierran en la fecha de emisión)
+        2. Elimina períodos duplicados o inconsistentes
+        3. Suma salarios concurrentes hasta el tope diario del SBC vigente
+
+        Returns:
+            Sub-períodos sin traslapes, del más reciente al más antiguo
         """
         # Convertir fechas string a datetime para cálculos
         periodos_procesados = self._prepare_periods(periodos)
-        
-        # Detectar y resolver traslapes
-        periodos_resueltos = self._resolve_salary_overlaps(periodos_procesados)
-        
+
         # Ajustar empleos vigentes a fecha de emisión
-        periodos_ajustados = self._adjust_vigentes(periodos_resueltos, fecha_emision)
-        
-        # Eliminar duplicados y consolidar
-        periodos_consolidados = self._consolidate_periods(periodos_ajustados)
-        
-        return periodos_consolidados
-    
-    def _prepare_periods(self, periodos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Prepara los períodos convirtiendo fechas y validando datos"""
+        periodos_ajustados = self._adjust_vigentes(periodos_procesados, fecha_emision)
+
+        # Eliminar duplicados antes de sumar salarios
+        periodos_unicos = self._consolidate_periods(periodos_ajustados)
+
+        # Barrido por eventos: sub-períodos con salario combinado y topado
+        subperiodos = self._resolve_salary_overlaps(periodos_unicos)
+
+        return sorted(subperiodos, key=lambda x: x['fecha_inicio_dt'], reverse=True)
+
+    def _prepare_periods(self, periodos: Union[List[Dict[str, Any]], Carrera]) -> List[Dict[str, Any]]:
+        """Prepara los períodos con las fechas ya leídas por el modelo y valida datos"""
         prepared = []
-        
-        for periodo in periodos:
+
+        for periodo in Carrera.desde(periodos).periodos:
+            vigente = periodo.get('esta_vigente', False)
+            # Sin alta legible (o sin baja legible si no está vigente) se descarta
+            if periodo.inicio is None or (not vigente and periodo.fin is None):
+                continue
+
             try:
-                # Convertir fechas
-                fecha_inicio = datetime.strptime(periodo['fecha_inicio'], '%d/%m/%Y')
-                
-                if periodo.get('esta_vigente', False):
-                    fecha_fin = None
-                else:
-                    fecha_fin = datetime.strptime(periodo['fecha_fin'], '%d/%m/%Y')
-                
+                fecha_inicio = ordinal_a_datetime(periodo.inicio)
                 periodo_preparado = {
-                    **periodo,
+                    **periodo.a_dict(),
                     'fecha_inicio_dt': fecha_inicio,
-                    'fecha_fin_dt': fecha_fin,
-                    'salario_diario': float(periodo.get('salario_diario', 0)),
+                    'fecha_fin_dt': None if vigente else ordinal_a_datetime(periodo.fin),
+                    'salario_diario': float(periodo.salario_diario),
                     'año_inicio': fecha_inicio.year
                 }
-                
-                prepared.append(periodo_preparado)
-                
-            except (ValueError, KeyError) as e:
+            except (TypeError, ValueError):
                 # Log error pero continúa procesando
                 continue
-        
+
+            prepared.append(periodo_preparado)
+
         return prepared
-    
+
     def _resolve_salary_overlaps(self, periodos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Resuelve traslapes de salarios aplicando tope de 25 UMA
+        Divide la carrera en sub-períodos elementales con un barrido de eventos
+
+        Los límites son las altas, el día siguiente a cada baja y cada día en
+        que cambia el tope dentro de la carrera. Entre dos límites
+        consecutivos los empleos activos son los mismos, así que el salario
+        combinado y su tope se calculan una vez por tramo: O(n log n).
         """
-        # Agrupar períodos por fecha para detectar traslapes
-        periods_by_date = defaultdict(list)
-        
-        for periodo in periodos:
-            fecha_inicio = periodo['fecha_inicio_dt']
-            fecha_fin = periodo['fecha_fin_dt']
-            
-            # Generar días del período
-            current_date = fecha_inicio
-            while fecha_fin is None or current_date <= fecha_fin:
-                periods_by_date[current_date].append(periodo)
-                current_date += timedelta(days=1)
-                
-                # Para empleos vigentes, solo procesar hasta una fecha límite
-                if fecha_fin is None and (current_date - fecha_inicio).days > 3650:  # Máximo 10 años
-                    break
-        
-        # Procesar traslapes por día
-        resolved_periods = []
-        processed_periods = set()
-        
-        for periodo in periodos:
-            if id(periodo) in processed_periods:
+        eventos = []  # (día ordinal, 0 = baja / 1 = alta, índice)
+        for indice, periodo in enumerate(periodos):
+            inicio = periodo['fecha_inicio_dt'].toordinal()
+            fin = periodo['fecha_fin_dt'].toordinal()
+            if fin < inicio:
                 continue
-            
-            # Verificar si tiene traslapes
-            overlapping_periods = self._find_overlapping_periods(periodo, periodos)
-            
-            if len(overlapping_periods) > 1:
-                # Resolver traslape sumando salarios hasta tope
-                resolved_period = self._merge_overlapping_periods(overlapping_periods)
-                resolved_periods.append(resolved_period)
-                
-                # Marcar períodos como procesados
-                for p in overlapping_periods:
-                    processed_periods.add(id(p))
-            else:
-                resolved_periods.append(periodo)
-                processed_periods.add(id(periodo))
-        
-        return resolved_periods
-    
-    def _find_overlapping_periods(self, periodo: Dict[str, Any], all_periods: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Encuentra períodos que se traslapan con el período dado"""
-        overlapping = [periodo]
-        
-        inicio1 = periodo['fecha_inicio_dt']
-        fin1 = periodo['fecha_fin_dt']
-        
-        for other in all_periods:
-            if id(other) == id(periodo):
+            eventos.append((inicio, 1, indice))
+            eventos.append((fin + 1, 0, indice))
+
+        if not eventos:
+            return []
+
+        eventos.sort()
+        primer_dia, ultimo_dia = eventos[0][0], eventos[-1][0]
+
+        # Cambios de tope (SMG, UMA o múltiplo) dentro de la carrera
+        limites = {dia for dia, _, _ in eventos}
+        limites.update(c for c in parametros.cortes_tope() if primer_dia < c < ultimo_dia)
+        limites = sorted(limites)
+
+        subperiodos: List[Dict[str, Any]] = []
+        activos: Dict[int, Dict[str, Any]] = {}
+        clave_anterior = None
+        siguiente_evento = 0
+
+        for n, dia in enumerate(limites[:-1]):
+            while siguiente_evento < len(eventos) and eventos[siguiente_evento][0] == dia:
+                _, es_alta, indice = eventos[siguiente_evento]
+                if es_alta:
+                    activos[indice] = periodos[indice]
+                else:
+                    activos.pop(indice, None)
+                siguiente_evento += 1
+
+            if not activos:
+                clave_anterior = None
                 continue
-                
-            inicio2 = other['fecha_inicio_dt']
-            fin2 = other['fecha_fin_dt']
-            
-            # Verificar traslape
-            if self._periods_overlap(inicio1, fin1, inicio2, fin2):
-                overlapping.append(other)
-        
-        return overlapping
-    
-    def _periods_overlap(self, inicio1, fin1, inicio2, fin2) -> bool:
-        """Verifica si dos períodos se traslapan"""
-        # Manejar empleos vigentes (fin = None)
-        if fin1 is None:
-            fin1 = datetime.now()
-        if fin2 is None:
-            fin2 = datetime.now()
-        
-        return not (fin1 < inicio2 or fin2 < inicio1)
-    
-    def _merge_overlapping_periods(self, overlapping_periods: List[Dict[str, Any]]) -> Dict[str, Any]:
+
+            fin_tramo = limites[n + 1] - 1
+            subperiodo = self._build_subperiod(list(activos.values()), dia, fin_tramo)
+
+            # Tramos contiguos con los mismos empleos y el mismo salario sin tope se unen
+            clave = (tuple(activos), subperiodo['salario_diario'], subperiodo['tope_aplicado'])
+            if clave == clave_anterior and not subperiodo['tope_aplicado']:
+                self._extend_subperiod(subperiodos[-1], subperiodo)
+            else:
+                subperiodos.append(subperiodo)
+            clave_anterior = clave
+
+        return subperiodos
+
+    def _build_subperiod(self, activos: List[Dict[str, Any]], inicio: int, fin: int) -> Dict[str, Any]:
         """
-        Fusiona períodos traslapados aplicando regla de suma de salarios hasta tope UMA
+        Sub-período [inicio, fin] (días ordinales) con los empleos activos
+
+        El primer empleo activo (alta más antigua) da patrón y registro; los
+        salarios de todos se suman y se topan al tope diario vigente.
         """
-        if len(overlapping_periods) == 1:
-            return overlapping_periods[0]
-        
-        # Ordenar por fecha de inicio
-        sorted_periods = sorted(overlapping_periods, key=lambda x: x['fecha_inicio_dt'])
-        base_period = sorted_periods[0].copy()
-        
-        # Sumar salarios
-        total_salary = 0
-        year = base_period['año_inicio']
-        tope_anual = self.topes_uma.get(year, 800000.0)  # Default si no se encuentra el año
-        tope_diario = tope_anual / 365
-        
-        for periodo in overlapping_periods:
-            total_salary += periodo['salario_diario']
-        
-        # Aplicar tope de 25 UMA
-        salary_final = min(total_salary, tope_diario)
-        
-        # Actualizar período base
-        base_period.update({
+        fecha_inicio = datetime.fromordinal(inicio)
+        fecha_fin = datetime.fromordinal(fin)
+        base = activos[0]
+
+        total_salary = sum(p['salario_diario'] for p in activos)
+        tope_diario = parametros.tope_diario(inicio)
+        tope_aplicado = total_salary > tope_diario
+        salary_final = tope_diario if tope_aplicado else total_salary
+        es_vigente = any(
+            p.get('esta_vigente', False) and p['fecha_fin_dt'] == fecha_fin for p in activos
+        )
+
+        return {
+            'patron': base['patron'],
+            'registro_patronal': base.get('registro_patronal', ''),
+            'fecha_inicio': fecha_inicio.strftime('%d/%m/%Y'),
+            'fecha_fin': fecha_fin.strftime('%d/%m/%Y'),
+            'fecha_inicio_dt': fecha_inicio,
+            'fecha_fin_dt': fecha_fin,
             'salario_diario': salary_final,
             'salario_original': total_salary,
-            'tope_aplicado': total_salary > tope_diario,
-            'periodos_fusionados': len(overlapping_periods),
-            'patrones_fusionados': [p['patron'] for p in overlapping_periods]
-        })
-        
-        return base_period
-    
-    def _adjust_vigentes(self, periodos: List[Dict[str, Any]], fecha_emision: str) -> List[Dict[str, Any]]:
+            'tope_aplicado': tope_aplicado,
+            'periodos_fusionados': len(activos),
+            'patrones_fusionados': [p['patron'] for p in activos],
+            'esta_vigente': es_vigente,
+            'es_ultimo_empleo': es_vigente,
+            'dias': fin - inicio + 1
+        }
+
+    def _extend_subperiod(self, subperiodo: Dict[str, Any], siguiente: Dict[str, Any]) -> None:
+        """Extiende un sub-período hasta el fin del siguiente tramo contiguo"""
+        subperiodo['fecha_fin'] = siguiente['fecha_fin']
+        subperiodo['fecha_fin_dt'] = siguiente['fecha_fin_dt']
+        subperiodo['esta_vigente'] = siguiente['esta_vigente']
+        subperiodo['es_ultimo_empleo'] = siguiente['es_ultimo_empleo']
+        subperiodo['dias'] += siguiente['dias']
+
+    def _adjust_vigentes(self, periodos: List[Dict[str, Any]], fecha_emision: Optional[str]) -> List[Dict[str, Any]]:
         """
         Ajusta empleos vigentes para que su fecha fin sea igual a la fecha de emisión
         """
-        fecha_emision_dt = datetime.strptime(fecha_emision, '%Y-%m-%d')
-        
+        try:
+            fecha_emision_dt = datetime.strptime(fecha_emision, '%Y-%m-%d')
+        except (TypeError, ValueError):
+            # Sin fecha de emisión legible, los vigentes cierran hoy
+            fecha_emision_dt = datetime.combine(datetime.now().date(), datetime.min.time())
+            fecha_emision = fecha_emision_dt.strftime('%Y-%m-%d')
+
         adjusted = []
         for periodo in periodos:
             if periodo.get('esta_vigente', False):
@@ -198,9 +195,9 @@ class OverlapResolver:
                 adjusted.append(periodo_ajustado)
             else:
                 adjusted.append(periodo)
-        
+
         return adjusted
-    
+
     def _consolidate_periods(self, periodos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Consolida períodos eliminando duplicados y ordenando por fecha
@@ -208,19 +205,17 @@ class OverlapResolver:
         # Eliminar duplicados basados en patrón y fechas
         unique_periods = []
         seen = set()
-        
+
         for periodo in periodos:
             key = (
                 periodo.get('registro_patronal', ''),
                 periodo['fecha_inicio'],
                 periodo.get('fecha_fin', 'VIGENTE')
             )
-            
+
             if key not in seen:
                 unique_periods.append(periodo)
                 seen.add(key)
-        
+
         # Ordenar por fecha de inicio (más reciente primero)
         return sorted(unique_periods, key=lambda x: x['fecha_inicio_dt'], reverse=True)
-
-
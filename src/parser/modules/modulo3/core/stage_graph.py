@@ -0,0 +1,316 @@
+"""
+Grafo de etapas del procesador de pensiones
+
+Cada etapa declara las entradas que lee y las etapas de las que depende. El
+grafo corre cada etapa en cuanto terminan sus dependencias, propaga las
+compuertas y mide el tiempo de pared de cada una. Las etapas son Python puro
+y comparten el GIL: correr las independientes en hilos (`max_workers` > 1)
+no acelera el cálculo, solo sirve si alguna etapa espera E/S.
+
+Memoización opcional (solo con un StageCache): sirve cuando el mismo
+documento se procesa varias veces; con documentos distintos nunca acierta y
+sería puro costo, por eso sin caché el grafo no calcula claves.
+Clave de una etapa = (nombre, versión, huella de las entradas, claves de sus
+dependencias). La huella de las entradas la puede dar quien llama (p. ej. el
+SHA-256 del documento, ya calculado); si no, se calcula una vez por
+ejecución serializando cada entrada que usan las etapas. StageCache guarda
+el resultado serializado con pickle (inmutable): cada acierto entrega un
+objeto nuevo sin copias profundas.
+
+Con `max_workers=1` (el valor por omisión) las etapas corren en el hilo que
+llama, una tras otra y sin pool: así una señal (p. ej. el SIGALRM del procesamiento por lotes)
+interrumpe la etapa en curso en lugar de esperar a que termine.
+
+Una etapa con `compuerta` detiene el grafo si su resultado no la cumple: las
+etapas que dependen de ella (directa o indirectamente) se omiten.
+
+USO:
+    grafo = StageGraph([
+        Stage('calidad', validar, entradas=('datos_basicos',), compuerta=lambda r: r['ok']),
+        Stage('promedio', calcular, entradas=('periodos',), despues_de=('calidad',)),
+    ])
+    ejecucion = grafo.run({'datos_basicos': ..., 'periodos': ...}, version='2025-06-30')
+"""
+
+import hashlib
+import json
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+ESTADO_EJECUTADA = 'ejecutada'
+ESTADO_MEMOIZADA = 'memoizada'
+ESTADO_OMITIDA = 'omitida'
+
+
+@dataclass
+class Stage:
+    """
+    Etapa del grafo
+
+    `funcion` recibe como argumentos con nombre sus `entradas`, sus
+    `auxiliares` y el resultado de cada etapa en `dependencias`.
+    `auxiliares` no entran en la clave: la etapa debe comprobar que se
+    derivan de sus entradas (p. ej. Carrera.corresponde_a) y descartarlos si no.
+    `despues_de` solo ordena y propaga compuertas; su resultado no se pasa.
+    """
+    nombre: str
+    funcion: Callable[..., Any]
+    entradas: Tuple[str, ...] = ()
+    dependencias: Tuple[str, ...] = ()
+    despues_de: Tuple[str, ...] = ()
+    auxiliares: Tuple[str, ...] = ()
+    compuerta: Optional[Callable[[Any], bool]] = None
+    memoizar: bool = True
+
+    @property
+    def previas(self) -> Tuple[str, ...]:
+        return self.dependencias + self.despues_de
+
+
+@dataclass
+class StageRecord:
+    """Qué pasó con una etapa en una ejecución"""
+    nombre: str
+    estado: str
+    tiempo_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"estado": self.estado, "tiempo_ms": round(self.tiempo_ms, 3)}
+
+
+@dataclass
+class StageGraphRun:
+    """Resultados y registro de una ejecución del grafo"""
+    resultados: Dict[str, Any]
+    registros: Dict[str, StageRecord]
+    compuerta_fallida: Optional[str]
+    tiempo_total_ms: float
+    orden: List[str] = field(default_factory=list)
+
+    @property
+    def ejecutadas(self) -> List[str]:
+        """Etapas con resultado (calculado o memorizado), en orden del grafo"""
+        return [n for n in self.orden if self.registros[n].estado != ESTADO_OMITIDA]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "etapas": {n: self.registros[n].to_dict() for n in self.orden},
+            "tiempo_total_ms": round(self.tiempo_total_ms, 3),
+            "compuerta_fallida": self.compuerta_fallida
+        }
+
+
+class StageCache:
+    """
+    LRU acotado y seguro entre hilos: clave de etapa → resultado
+
+    Guarda el resultado como bytes de pickle: lo memorizado no se puede
+    modificar desde fuera y cada acierto devuelve un objeto nuevo.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._datos: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave: str) -> Tuple[bool, Any]:
+        with self._lock:
+            if clave not in self._datos:
+                return False, None
+            self._datos.move_to_end(clave)
+            valor = self._datos[clave]
+        return True, pickle.loads(valor)
+
+    def set(self, clave: str, valor: Any) -> None:
+        try:
+            valor = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maxsize:
+                self._datos.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+
+class _EjecutorEnLinea:
+    """Mismo uso que un ThreadPoolExecutor, pero corre cada tarea al enviarla en el hilo que llama"""
+
+    def submit(self, funcion: Callable[..., Any], *args: Any) -> Future:
+        futuro: Future = Future()
+        futuro.set_result(funcion(*args))
+        return futuro
+
+    def __enter__(self) -> '_EjecutorEnLinea':
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+
+def huella(valor: Any) -> str:
+    """SHA-256 de la serialización JSON canónica de un valor"""
+    texto = json.dumps(valor, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+class StageGraph:
+    """Grafo acíclico de etapas (en línea o en un pool de hilos), memoizado si se da `cache`"""
+
+    def __init__(self, etapas: Sequence[Stage], cache: Optional[StageCache] = None,
+                 max_workers: Optional[int] = None):
+        self.etapas = {etapa.nombre: etapa for etapa in etapas}
+        if len(self.etapas) != len(etapas):
+            raise ValueError("Nombres de etapa repetidos")
+        for etapa in etapas:
+            faltantes = [n for n in etapa.previas if n not in self.etapas]
+            if faltantes:
+                raise ValueError(f"La etapa {etapa.nombre} depende de etapas inexistentes: {faltantes}")
+        self.orden = self._orden_topologico()
+        # None: sin memoización (ni claves)
+        self.cache = cache
+        self.max_workers = max_workers or 1
+
+    def _orden_topologico(self) -> List[str]:
+        """Kahn estable (respeta el orden de declaración); falla si hay ciclos"""
+        pendientes = {n: len(e.previas) for n, e in self.etapas.items()}
+        siguientes: Dict[str, List[str]] = {n: [] for n in self.etapas}
+        for nombre, etapa in self.etapas.items():
+            for previa in etapa.previas:
+                siguientes[previa].append(nombre)
+
+        orden, listas = [], [n for n in self.etapas if pendientes[n] == 0]
+        while listas:
+            nombre = listas.pop(0)
+            orden.append(nombre)
+            for siguiente in siguientes[nombre]:
+                pendientes[siguiente] -= 1
+                if pendientes[siguiente] == 0:
+                    listas.append(siguiente)
+
+        if len(orden) != len(self.etapas):
+            raise ValueError("El grafo de etapas tiene ciclos")
+        return orden
+
+    def run(self, entradas: Dict[str, Any], version: str = '',
+            huella_entradas: Optional[str] = None) -> StageGraphRun:
+        """
+        Ejecuta el grafo
+
+        Args:
+            entradas: Valores de entrada por nombre
+            version: Se incluye en todas las claves (fecha, versión de
+                parámetros...): un cambio invalida lo memorizado
+            huella_entradas: Identifica todas las `entradas` (p. ej. el hash
+                del documento del que se derivan); evita serializarlas para
+                las claves. Solo se usa con caché
+
+        Raises:
+            La primera excepción de una etapa (las que ya corrían terminan)
+        """
+        t0 = time.perf_counter()
+        huellas: Dict[str, str] = {}
+        claves: Dict[str, str] = {}
+        resultados: Dict[str, Any] = {}
+        registros: Dict[str, StageRecord] = {}
+        omitidas: set = set()
+        cerradas: set = set()   # compuertas que no se cumplieron
+        compuerta_fallida: Optional[str] = None
+
+        def huella_entrada(nombre: str) -> str:
+            if nombre not in huellas:
+                huellas[nombre] = huella(entradas.get(nombre))
+            return huellas[nombre]
+
+        def clave_etapa(etapa: Stage) -> str:
+            if huella_entradas is not None:
+                return huella([etapa.nombre, version, huella_entradas, etapa.entradas,
+                               [claves[d] for d in etapa.dependencias]])
+            return huella([
+                etapa.nombre, version,
+                [huella_entrada(e) for e in etapa.entradas],
+                [claves[d] for d in etapa.dependencias]
+            ])
+
+        def terminar(nombre: str, resultado: Any) -> None:
+            nonlocal compuerta_fallida
+            resultados[nombre] = resultado
+            etapa = self.etapas[nombre]
+            if etapa.compuerta is not None and not etapa.compuerta(resultado):
+                compuerta_fallida = compuerta_fallida or nombre
+                cerradas.add(nombre)
+
+        pendientes = list(self.orden)
+        en_curso: Dict[Any, Tuple[str, float]] = {}
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers) if self.max_workers > 1 else _EjecutorEnLinea()
+        with pool:
+            while pendientes or en_curso:
+                avanzo = False
+                for nombre in list(pendientes):
+                    etapa = self.etapas[nombre]
+                    if not all(p in registros for p in etapa.previas):
+                        continue
+                    pendientes.remove(nombre)
+                    avanzo = True
+
+                    # Omitida si alguna previa se omitió o cerró su compuerta
+                    if any(p in omitidas or p in cerradas for p in etapa.previas):
+                        omitidas.add(nombre)
+                        registros[nombre] = StageRecord(nombre, ESTADO_OMITIDA)
+                        continue
+
+                    memoizar = etapa.memoizar and self.cache is not None
+                    clave = claves[nombre] = clave_etapa(etapa) if self.cache is not None else ''
+
+                    if memoizar:
+                        t_etapa = time.perf_counter()
+                        encontrado, valor = self.cache.get(clave)
+                        if encontrado:
+                            registros[nombre] = StageRecord(
+                                nombre, ESTADO_MEMOIZADA, (time.perf_counter() - t_etapa) * 1e3
+                            )
+                            terminar(nombre, valor)
+                            continue
+
+                    argumentos = {e: entradas.get(e) for e in etapa.entradas + etapa.auxiliares}
+                    argumentos.update({d: resultados[d] for d in etapa.dependencias})
+                    en_curso[pool.submit(self._ejecutar, etapa, argumentos)] = (nombre, clave if memoizar else None)
+
+                if avanzo or not en_curso:
+                    continue
+
+                terminados, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    nombre, clave = en_curso.pop(futuro)
+                    resultado, tiempo_ms = futuro.result()
+                    if clave is not None:
+                        self.cache.set(clave, resultado)
+                    registros[nombre] = StageRecord(nombre, ESTADO_EJECUTADA, tiempo_ms)
+                    terminar(nombre, resultado)
+
+        return StageGraphRun(
+            resultados=resultados,
+            registros=registros,
+            compuerta_fallida=compuerta_fallida,
+            tiempo_total_ms=(time.perf_counter() - t0) * 1e3,
+            orden=list(self.orden)
+        )
+
+    @staticmethod
+    def _ejecutar(etapa: Stage, argumentos: Dict[str, Any]) -> Tuple[Any, float]:
+        t0 = time.perf_counter()
+        resultado = etapa.funcion(**argumentos)
+        return resultado, (time.perf_counter() - t0) * 1e3
@@ -1,26 +1,57 @@
 """
 Procesador principal del Módulo 3 - Cálculo de Pensiones IMSS
-Coordina todos los cálculos y validaciones
+Coordina todos los cálculos y validaciones como un grafo de etapas
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import json
-from datetime import datetime
+from datetime import date, datetime
+
+from utils.parametros_imss import parametros
 
 # Importar componentes del módulo
 from .core.quality_validator import QualityValidator
 from .core.overlap_resolver import OverlapResolver
+from .core.stage_graph import Stage, StageCache, StageGraph
 from .calculators.promedio_250 import PromedioSalario250
 from .calculators.conservacion_derechos import ConservacionDerechos
+from .calculators.weeks_reconciler import WeeksReconciler
 from .validators.cross_validator import CrossValidator
 from .validators.final_quality import FinalQuality
+from .utils.carrera import Carrera
 
 class PensionProcessor:
     """
     Procesador principal que coordina todos los cálculos de pensión
+
+    Las etapas forman un grafo (core/stage_graph.py): la validación de calidad
+    es la compuerta; la reconciliación de semanas no depende de ella y se
+    reporta aunque falle; la depuración de períodos y la conservación de
+    derechos dependen solo del modelo de la carrera, y el promedio de 250
+    semanas solo de la depuración. Las etapas corren una tras otra en el hilo
+    que llama; el grafo aporta el orden, las compuertas y el tiempo por etapa.
+
+    Con `memoizar_etapas` cada etapa se memoriza (compartido entre
+    instancias, válido dentro del mismo día y de la misma carga de
+    parámetros). Solo conviene si el mismo documento se procesa varias veces:
+    cada documento distinto es un fallo de caché.
     """
+
+    # Resultados memorizados por etapa, compartidos por los procesadores que memorizan
+    cache_etapas = StageCache(maxsize=256)
     
-    def __init__(self, debug_mode: bool = False):
+    def __init__(self, debug_mode: bool = False, max_workers_etapas: int = 1,
+                 memoizar_etapas: bool = False):
+        """
+        Args:
+            debug_mode: Incluye el detalle de los errores en `debug_info`
+            max_workers_etapas: Hilos del grafo de etapas; 1 corre las etapas
+                en el hilo que llama (las etapas son CPU y comparten el GIL,
+                así que más hilos no aceleran; además así el tiempo máximo
+                por documento de procesamiento_lote.py las interrumpe)
+            memoizar_etapas: Reutilizar resultados de etapas de documentos
+                ya procesados (cache_etapas)
+        """
         self.debug_mode = debug_mode
         
         # Inicializar componentes
@@ -28,78 +59,81 @@ class PensionProcessor:
         self.overlap_resolver = OverlapResolver()
         self.promedio_calculator = PromedioSalario250()
         self.conservacion_calculator = ConservacionDerechos()
+        self.weeks_reconciler = WeeksReconciler()
         self.cross_validator = CrossValidator()
         self.final_quality = FinalQuality()
+
+        # Cada etapa lleva el nombre del componente que ejecuta
+        self.grafo = StageGraph([
+            Stage('quality_validator', self._etapa_calidad,
+                  entradas=('datos_basicos', 'debug_info'),
+                  compuerta=lambda calidad: calidad['can_proceed']),
+            Stage('weeks_reconciler', self._etapa_reconciliacion,
+                  entradas=('datos_basicos', 'periodos'), auxiliares=('carrera',)),
+            Stage('carrera', self._etapa_carrera,
+                  entradas=('periodos', 'fecha_emision'), auxiliares=('carrera',),
+                  despues_de=('quality_validator',), memoizar=False),
+            Stage('overlap_resolver', self._etapa_depuracion,
+                  entradas=('fecha_emision',), dependencias=('carrera',)),
+            Stage('conservacion_calculator', self._etapa_conservacion,
+                  entradas=('datos_basicos', 'periodos'), dependencias=('carrera',)),
+            Stage('promedio_calculator', self._etapa_promedio_250,
+                  entradas=('fecha_emision', 'ley_aplicable'), dependencias=('overlap_resolver',)),
+            Stage('cross_validator', self._etapa_validacion_cruzada,
+                  entradas=('datos_basicos',), dependencias=('promedio_calculator', 'conservacion_calculator')),
+            Stage('final_quality', self._etapa_calidad_final,
+                  dependencias=('quality_validator', 'promedio_calculator',
+                                'conservacion_calculator', 'cross_validator')),
+        ], cache=self.cache_etapas if memoizar_etapas else None, max_workers=max_workers_etapas)
     
-    def procesar_pension_completa(self, datos_parser: Dict[str, Any]) -> Dict[str, Any]:
+    def procesar_pension_completa(self, datos_parser: Dict[str, Any],
+                                  carrera: Optional[Carrera] = None,
+                                  huella_documento: Optional[str] = None) -> Dict[str, Any]:
         """
         Procesa completamente los cálculos de pensión desde el output del parser
         
         Args:
             datos_parser: Output completo del parser (datos_basicos + historial_laboral + debug)
+            carrera: Modelo ya construido por el parser (procesar_constancia_con_carrera);
+                se ignora si no se construyó de estos mismos períodos
+            huella_documento: Hash ya calculado de `datos_parser` (p. ej. el
+                SHA-256 del cuerpo recibido); con memoización evita serializar
+                las entradas para las claves
         
         Returns:
-            Dict con todos los cálculos de pensión
+            Dict con todos los cálculos de pensión; `debug_info.etapas` trae el
+            estado (ejecutada, memoizada, omitida) y el tiempo de cada etapa
         """
         try:
             # Extraer secciones del parser
             datos_basicos = datos_parser.get('datos_basicos', {})
             historial_laboral = datos_parser.get('historial_laboral', {})
-            debug_info = datos_parser.get('debug', {})
-            
-            # 1. Validación inicial de calidad
-            quality_result = self.quality_validator.evaluate_extraction_quality(
-                datos_basicos, debug_info
-            )
+            periodos_originales = historial_laboral.get('periodos', [])
             
-            can_proceed, quality_message = self.quality_validator.can_proceed_with_calculation(quality_result)
+            ejecucion = self.grafo.run({
+                'datos_basicos': datos_basicos,
+                'debug_info': datos_parser.get('debug', {}),
+                'periodos': periodos_originales,
+                'fecha_emision': datos_basicos.get('fecha_emision'),
+                'ley_aplicable': datos_basicos.get('ley_aplicable', 'No determinada'),
+                'carrera': carrera
+            }, version=f"{date.today().isoformat()}|{parametros.version}", huella_entradas=huella_documento)
+            resultados = ejecucion.resultados
+            calidad = resultados['quality_validator']
             
-            if not can_proceed:
+            if ejecucion.compuerta_fallida:
                 return {
                     "exito": False,
                     "error": "Calidad de extracción insuficiente",
-                    "detalle": quality_message,
-                    "quality_assessment": quality_result
+                    "detalle": calidad['quality_message'],
+                    "quality_assessment": calidad['quality_result'],
+                    "reconciliacion_semanas": resultados['weeks_reconciler'],
+                    "debug_info": ejecucion.to_dict()
                 }
             
-            # 2. Depuración de períodos laborales (resolver traslapes)
-            periodos_originales = historial_laboral.get('periodos', [])
-            fecha_emision = datos_basicos.get('fecha_emision')
-            
-            periodos_depurados = self.overlap_resolver.resolve_overlaps(
-                periodos_originales, fecha_emision
-            )
-            
-            # 3. Cálculo de promedio de 250 semanas (Ruta 1)
-            ley_aplicable = datos_basicos.get('ley_aplicable', 'No determinada')
-            
-            if ley_aplicable == "Ley 73":
-                calculo_250_semanas = self.promedio_calculator.calcular_promedio_250_semanas(
-                    periodos_depurados, fecha_emision, ley_aplicable
-                )
-            else:
-                calculo_250_semanas = {
-                    "error": "Cálculo de 250 semanas solo disponible para Ley 73",
-                    "ley_detectada": ley_aplicable,
-                    "nota": "Para Ley 97 se usa el cálculo de cuenta individual"
-                }
+            periodos_depurados = resultados['overlap_resolver']
             
-            # 4. Cálculo de conservación de derechos (Ruta 2)
-            conservacion_derechos = self.conservacion_calculator.calcular_conservacion_derechos(
-                datos_basicos, {'periodos': periodos_depurados}
-            )
-            
-            # 5. Validación cruzada entre ambas rutas
-            validacion_cruzada = self.cross_validator.validate_cross_calculations(
-                calculo_250_semanas, conservacion_derechos, datos_basicos
-            )
-            
-            # 6. Evaluación final de calidad
-            calidad_final = self.final_quality.evaluate_final_quality(
-                quality_result, calculo_250_semanas, conservacion_derechos, validacion_cruzada
-            )
-            
-            # 7. Construir resultado final
+            # Construir resultado final
             resultado_completo = {
                 "exito": True,
                 "fecha_procesamiento": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
@@ -109,28 +143,24 @@ class PensionProcessor:
                     "nss": datos_basicos.get('nss', 'N/A'),
                     "curp": datos_basicos.get('curp', 'N/A')
                 },
-                "quality_assessment": quality_result,
+                "quality_assessment": calidad['quality_result'],
+                "reconciliacion_semanas": resultados['weeks_reconciler'],
                 "depuracion_periodos": {
                     "periodos_originales": len(periodos_originales),
                     "periodos_depurados": len(periodos_depurados),
-                    "traslapes_resueltos": len(periodos_originales) - len(periodos_depurados),
-                    "empleos_vigentes_detectados": sum(1 for p in periodos_depurados if p.get('esta_vigente', False))
+                    "traslapes_resueltos": sum(1 for p in periodos_depurados if p.get('periodos_fusionados', 1) > 1),
+                    "subperiodos_con_tope": sum(1 for p in periodos_depurados if p.get('tope_aplicado', False)),
+                    "empleos_vigentes_detectados": sum(1 for p in periodos_originales if p.get('esta_vigente', False))
                 },
-                "ruta_1_promedio_250_semanas": calculo_250_semanas,
-                "ruta_2_conservacion_derechos": conservacion_derechos,
-                "validacion_cruzada": validacion_cruzada,
-                "calidad_final": calidad_final,
+                "ruta_1_promedio_250_semanas": resultados['promedio_calculator'],
+                "ruta_2_conservacion_derechos": resultados['conservacion_calculator'],
+                "validacion_cruzada": resultados['cross_validator'],
+                "calidad_final": resultados['final_quality'],
                 "debug_info": {
                     "modo_debug": self.debug_mode,
-                    "componentes_ejecutados": [
-                        "quality_validator",
-                        "overlap_resolver", 
-                        "promedio_calculator",
-                        "conservacion_calculator",
-                        "cross_validator",
-                        "final_quality"
-                    ]
-                } if self.debug_mode else {}
+                    "componentes_ejecutados": [n for n in ejecucion.ejecutadas if n != 'carrera'],
+                    **ejecucion.to_dict()
+                }
             }
             
             return resultado_completo
@@ -146,6 +176,84 @@ class PensionProcessor:
                 } if self.debug_mode else {}
             }
 
+    # ------------------------------------------------------------------
+    # Etapas del grafo
+    # ------------------------------------------------------------------
+
+    def _etapa_calidad(self, datos_basicos: Dict[str, Any], debug_info: Dict[str, Any]) -> Dict[str, Any]:
+        """1. Validación inicial de calidad (compuerta del grafo)"""
+        quality_result = self.quality_validator.evaluate_extraction_quality(datos_basicos, debug_info)
+        can_proceed, quality_message = self.quality_validator.can_proceed_with_calculation(quality_result)
+        return {
+            "quality_result": quality_result,
+            "can_proceed": can_proceed,
+            "quality_message": quality_message
+        }
+
+    def _etapa_reconciliacion(self, datos_basicos: Dict[str, Any], periodos: List[Dict[str, Any]],
+                              carrera: Optional[Carrera]) -> Dict[str, Any]:
+        """Explicaciones de la diferencia entre las semanas de los períodos y el total IMSS"""
+        if carrera is None or not carrera.corresponde_a(periodos):
+            carrera = periodos
+        return self.weeks_reconciler.reconciliar(datos_basicos, carrera)
+
+    def _etapa_carrera(self, periodos: List[Dict[str, Any]], fecha_emision: Optional[str],
+                       carrera: Optional[Carrera]) -> Carrera:
+        """
+        Fechas leídas una sola vez para todos los calculadores
+
+        La Carrera del llamador solo se usa si se construyó de estos mismos
+        períodos: las claves de las etapas siguientes dependen de `periodos`
+        """
+        if carrera is None or not carrera.corresponde_a(periodos):
+            carrera = Carrera.desde_periodos(periodos, fecha_emision)
+        return carrera
+
+    def _etapa_depuracion(self, fecha_emision: Optional[str], carrera: Carrera) -> List[Dict[str, Any]]:
+        """2. Depuración de períodos laborales (sub-períodos sin traslapes)"""
+        return self.overlap_resolver.resolve_overlaps(carrera, fecha_emision)
+
+    def _etapa_promedio_250(self, fecha_emision: Optional[str], ley_aplicable: str,
+                            overlap_resolver: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """3. Cálculo de promedio de 250 semanas (Ruta 1)"""
+        if ley_aplicable == "Ley 73":
+            return self.promedio_calculator.calcular_promedio_250_semanas(
+                overlap_resolver, fecha_emision, ley_aplicable
+            )
+        return {
+            "error": "Cálculo de 250 semanas solo disponible para Ley 73",
+            "ley_detectada": ley_aplicable,
+            "nota": "Para Ley 97 se usa el cálculo de cuenta individual"
+        }
+
+    def _etapa_conservacion(self, datos_basicos: Dict[str, Any], periodos: List[Dict[str, Any]],
+                            carrera: Carrera) -> Dict[str, Any]:
+        """
+        4. Cálculo de conservación de derechos (Ruta 2)
+
+        Las bajas reales están en los períodos originales; los sub-períodos
+        depurados también cortan en cambios de año y de empleos activos
+        """
+        return self.conservacion_calculator.calcular_conservacion_derechos(
+            datos_basicos, {'periodos': periodos}, carrera
+        )
+
+    def _etapa_validacion_cruzada(self, datos_basicos: Dict[str, Any], promedio_calculator: Dict[str, Any],
+                                  conservacion_calculator: Dict[str, Any]) -> Dict[str, Any]:
+        """5. Validación cruzada entre ambas rutas"""
+        return self.cross_validator.validate_cross_calculations(
+            promedio_calculator, conservacion_calculator, datos_basicos
+        )
+
+    def _etapa_calidad_final(self, quality_validator: Dict[str, Any], promedio_calculator: Dict[str, Any],
+                             conservacion_calculator: Dict[str, Any],
+                             cross_validator: Dict[str, Any]) -> Dict[str, Any]:
+        """6. Evaluación final de calidad"""
+        return self.final_quality.evaluate_final_quality(
+            quality_validator['quality_result'], promedio_calculator,
+            conservacion_calculator, cross_validator
+        )
+
 # Función de conveniencia para uso directo
 def procesar_pension_imss(datos_parser_json: str, debug_mode: bool = False) -> str:
     """
@@ -1,5 +1,5 @@
 from .uma_topes import UMATopes, uma_calculator
+from .carrera import Carrera, Periodo, Patron, Movimiento
+from . import date_helpers
 
-__all__ = ['UMATopes', 'uma_calculator']
-
-
+__all__ = ['UMATopes', 'uma_calculator', 'Carrera', 'Periodo', 'Patron', 'Movimiento', 'date_helpers']
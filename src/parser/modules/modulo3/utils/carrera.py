@@ -0,0 +1,324 @@
+"""
+Modelo canónico de la carrera laboral: patrones, períodos y movimientos
+
+La constancia se convierte una sola vez en objetos con __slots__ y fechas como
+días ordinales; las columnas de inicio y fin se guardan además en arreglos
+compactos para ordenar, unir intervalos y construir tramos sin volver a leer
+texto. Los calculadores aceptan una Carrera (o la construyen desde los dicts).
+
+Puente con el JSON: `Carrera.desde_periodos(dicts).a_dicts()` devuelve los
+mismos dicts (mismas claves, mismo orden, mismos valores). Los campos que el
+modelo no interpreta se conservan tal cual en `extras`, y una fecha cuyo texto
+no es el canónico ('1/2/2003', 'VIGENTE') conserva su texto original.
+
+USO:
+    carrera = Carrera.desde_resultado(resultado_parser)
+    carrera.ordenar(descendente=True)
+    for periodo in carrera.periodos:
+        periodo.inicio, periodo.fin_con(carrera.fin_vigente)
+    periodos_json = carrera.a_dicts()
+"""
+
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .date_helpers import (
+    TEXTO_VIGENTE, es_vigente, hoy_ordinal, ordinal_a_constancia, texto_a_ordinal_opcional
+)
+
+# Claves de período que el modelo interpreta; el resto va a `extras`
+CLAVES_PATRON = ('patron', 'registro_patronal', 'entidad_federativa')
+CLAVES_FECHA = ('fecha_inicio', 'fecha_fin')
+CLAVE_MOVIMIENTOS = 'cambios_salario'
+
+
+class Patron:
+    """Empleador compartido por todos sus períodos"""
+    __slots__ = ('nombre', 'registro_patronal', 'entidad_federativa')
+
+    def __init__(self, nombre: Any = '', registro_patronal: Any = '', entidad_federativa: Any = None):
+        self.nombre = nombre
+        self.registro_patronal = registro_patronal
+        self.entidad_federativa = entidad_federativa
+
+    def __repr__(self) -> str:
+        return f"Patron({self.registro_patronal!r}, {self.nombre!r})"
+
+
+class Movimiento:
+    """Movimiento afiliatorio (alta, baja, modificación de salario)"""
+    __slots__ = ('tipo', 'fecha', 'salario_diario', 'extras', '_claves', '_texto_fecha')
+
+    def __init__(self, tipo: Any, fecha: Optional[int], salario_diario: Any,
+                 extras: Optional[Dict[str, Any]] = None, claves: Tuple[str, ...] = (),
+                 texto_fecha: Optional[str] = None):
+        self.tipo = tipo
+        self.fecha = fecha
+        self.salario_diario = salario_diario
+        self.extras = extras or {}
+        self._claves = claves or ('tipo', 'fecha', 'salario_diario')
+        self._texto_fecha = texto_fecha
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, Any]) -> 'Movimiento':
+        texto = datos.get('fecha')
+        fecha = texto_a_ordinal_opcional(texto)
+        return cls(
+            tipo=datos.get('tipo'),
+            fecha=fecha,
+            salario_diario=datos.get('salario_diario'),
+            extras={k: v for k, v in datos.items() if k not in ('tipo', 'fecha', 'salario_diario')},
+            claves=tuple(datos),
+            texto_fecha=_texto_no_canonico(texto, fecha)
+        )
+
+    def a_dict(self) -> Dict[str, Any]:
+        resultado = {}
+        for clave in self._claves:
+            if clave == 'tipo':
+                resultado[clave] = self.tipo
+            elif clave == 'fecha':
+                resultado[clave] = self._texto_fecha if self._texto_fecha is not None else (
+                    ordinal_a_constancia(self.fecha) if self.fecha is not None else None)
+            elif clave == 'salario_diario':
+                resultado[clave] = self.salario_diario
+            else:
+                resultado[clave] = self.extras[clave]
+        return resultado
+
+
+class Periodo:
+    """
+    Período laboral con fechas ordinales
+
+    `fin` es None si el período está vigente; `inicio` es None si la fecha de
+    alta no se pudo leer (el período se conserva para el JSON pero los
+    cálculos lo omiten, como antes hacían con el try/except por período).
+    """
+    __slots__ = ('patron', 'inicio', 'fin', 'vigente', 'salario_diario', 'movimientos',
+                 'extras', '_claves', '_textos_fecha')
+
+    def __init__(self, patron: Patron, inicio: Optional[int], fin: Optional[int], vigente: bool,
+                 salario_diario: Any = 0, movimientos: Optional[List[Movimiento]] = None,
+                 extras: Optional[Dict[str, Any]] = None, claves: Tuple[str, ...] = (),
+                 textos_fecha: Optional[Dict[str, str]] = None):
+        self.patron = patron
+        self.inicio = inicio
+        self.fin = fin
+        self.vigente = vigente
+        self.salario_diario = salario_diario
+        self.movimientos = movimientos if movimientos is not None else []
+        self.extras = extras if extras is not None else {}
+        self._claves = claves
+        self._textos_fecha = textos_fecha
+
+    @property
+    def valido(self) -> bool:
+        """Tiene alta legible y baja legible (o está vigente)"""
+        return self.inicio is not None and (self.vigente or self.fin is not None)
+
+    @property
+    def salario(self) -> float:
+        """Salario diario como número (0 si falta)"""
+        try:
+            return float(self.salario_diario or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    def fin_con(self, fin_vigente: int) -> Optional[int]:
+        """Día de baja; los vigentes cierran en `fin_vigente`"""
+        return fin_vigente if self.vigente else self.fin
+
+    def get(self, clave: str, default: Any = None) -> Any:
+        """Acceso a campos no interpretados (semanas, totales...) como en el dict"""
+        return self.extras.get(clave, default)
+
+    def copiar(self) -> 'Periodo':
+        """Copia con sus propios `extras` (patrón y movimientos se comparten)"""
+        return Periodo(self.patron, self.inicio, self.fin, self.vigente, self.salario_diario,
+                       self.movimientos, dict(self.extras), self._claves, self._textos_fecha)
+
+    def __setitem__(self, clave: str, valor: Any) -> None:
+        """Agrega o actualiza un campo no interpretado; se emite al final si es nuevo"""
+        if clave not in self._claves:
+            self._claves = self._claves + (clave,)
+        self.extras[clave] = valor
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, Any], patrones: Dict[Tuple, Patron]) -> 'Periodo':
+        clave_patron = tuple(datos.get(k) for k in CLAVES_PATRON)
+        patron = patrones.get(clave_patron)
+        if patron is None:
+            patron = patrones[clave_patron] = Patron(*clave_patron)
+
+        texto_inicio = datos.get('fecha_inicio')
+        texto_fin = datos.get('fecha_fin')
+        inicio = texto_a_ordinal_opcional(texto_inicio)
+        vigente = es_vigente(texto_fin)
+        fin = None if vigente else texto_a_ordinal_opcional(texto_fin)
+
+        textos = {}
+        if _texto_no_canonico(texto_inicio, inicio) is not None or 'fecha_inicio' not in datos:
+            textos['fecha_inicio'] = texto_inicio
+        if vigente:
+            if texto_fin != TEXTO_VIGENTE:
+                textos['fecha_fin'] = texto_fin
+        elif _texto_no_canonico(texto_fin, fin) is not None or 'fecha_fin' not in datos:
+            textos['fecha_fin'] = texto_fin
+
+        movimientos = datos.get(CLAVE_MOVIMIENTOS)
+        interpretadas = CLAVES_PATRON + CLAVES_FECHA + ('salario_diario', CLAVE_MOVIMIENTOS)
+        return cls(
+            patron=patron,
+            inicio=inicio,
+            fin=fin,
+            vigente=vigente,
+            salario_diario=datos.get('salario_diario', 0),
+            movimientos=[Movimiento.desde_dict(m) for m in movimientos] if isinstance(movimientos, list) else None,
+            extras={k: v for k, v in datos.items() if k not in interpretadas or
+                    (k == CLAVE_MOVIMIENTOS and not isinstance(v, list))},
+            claves=tuple(datos),
+            textos_fecha=textos or None
+        )
+
+    def texto_fecha(self, clave: str) -> Any:
+        """Texto de 'fecha_inicio' o 'fecha_fin' tal como vendría en el dict"""
+        return self._texto_fecha(clave, self.inicio if clave == 'fecha_inicio' else self.fin)
+
+    def _texto_fecha(self, clave: str, ordinal: Optional[int]) -> Any:
+        if self._textos_fecha and clave in self._textos_fecha:
+            return self._textos_fecha[clave]
+        if clave == 'fecha_fin' and self.vigente:
+            return TEXTO_VIGENTE
+        return ordinal_a_constancia(ordinal) if ordinal is not None else None
+
+    def a_dict(self) -> Dict[str, Any]:
+        resultado = {}
+        for clave in self._claves:
+            if clave == 'patron':
+                resultado[clave] = self.patron.nombre
+            elif clave == 'registro_patronal':
+                resultado[clave] = self.patron.registro_patronal
+            elif clave == 'entidad_federativa':
+                resultado[clave] = self.patron.entidad_federativa
+            elif clave == 'fecha_inicio':
+                resultado[clave] = self._texto_fecha(clave, self.inicio)
+            elif clave == 'fecha_fin':
+                resultado[clave] = self._texto_fecha(clave, self.fin)
+            elif clave == 'salario_diario':
+                resultado[clave] = self.salario_diario
+            elif clave == CLAVE_MOVIMIENTOS and clave not in self.extras:
+                resultado[clave] = [m.a_dict() for m in self.movimientos]
+            else:
+                resultado[clave] = self.extras[clave]
+        return resultado
+
+
+class Carrera:
+    """
+    Carrera completa: períodos, patrones únicos y fecha de emisión
+
+    `inicios` y `fines` son columnas array('l') paralelas a `periodos` (fin
+    de los vigentes = `fin_vigente`); se reconstruyen al reordenar.
+    Quien quiera modificar un modelo ajeno debe copiarlo antes (copiar()).
+    """
+    __slots__ = ('periodos', 'patrones', 'fecha_emision', 'fin_vigente', 'inicios', 'fines')
+
+    def __init__(self, periodos: List[Periodo], patrones: Dict[Tuple, Patron],
+                 fecha_emision: Optional[int] = None):
+        self.periodos = periodos
+        self.patrones = patrones
+        self.fecha_emision = fecha_emision
+        # Los vigentes cierran en la fecha de emisión o, si no hay, hoy
+        self.fin_vigente = fecha_emision if fecha_emision is not None else hoy_ordinal()
+        self._indexar()
+
+    def _indexar(self) -> None:
+        self.inicios = array('l', (p.inicio if p.inicio is not None else -1 for p in self.periodos))
+        self.fines = array('l', (
+            f if (f := p.fin_con(self.fin_vigente)) is not None else -1 for p in self.periodos
+        ))
+
+    @classmethod
+    def desde_periodos(cls, periodos: Iterable[Dict[str, Any]],
+                       fecha_emision: Optional[str] = None) -> 'Carrera':
+        patrones: Dict[Tuple, Patron] = {}
+        return cls(
+            [Periodo.desde_dict(p, patrones) for p in periodos],
+            patrones,
+            texto_a_ordinal_opcional(fecha_emision)
+        )
+
+    @classmethod
+    def desde_resultado(cls, resultado: Dict[str, Any]) -> 'Carrera':
+        """Desde la salida del parser / corrector (historial_laboral + datos_basicos)"""
+        return cls.desde_periodos(
+            resultado.get('historial_laboral', {}).get('periodos', []),
+            resultado.get('datos_basicos', {}).get('fecha_emision')
+        )
+
+    @classmethod
+    def desde(cls, periodos_o_carrera: Any, fecha_emision: Optional[str] = None) -> 'Carrera':
+        """Acepta una Carrera ya construida o una lista de dicts de períodos"""
+        if isinstance(periodos_o_carrera, Carrera):
+            return periodos_o_carrera
+        return cls.desde_periodos(periodos_o_carrera or [], fecha_emision)
+
+    def corresponde_a(self, periodos: Iterable[Dict[str, Any]]) -> bool:
+        """
+        ¿Representa exactamente estos dicts de períodos (mismo contenido y orden)?
+
+        Compara período a período lo que emitiría a_dicts() con cada dict y se
+        detiene en la primera diferencia; no serializa nada
+        """
+        periodos = periodos if isinstance(periodos, (list, tuple)) else list(periodos)
+        if len(periodos) != len(self.periodos):
+            return False
+        return all(p.a_dict() == d for p, d in zip(self.periodos, periodos))
+
+    def copiar(self) -> 'Carrera':
+        """Copia cuyos períodos se pueden modificar sin tocar este modelo"""
+        return Carrera([p.copiar() for p in self.periodos], self.patrones, self.fecha_emision)
+
+    def a_dicts(self) -> List[Dict[str, Any]]:
+        return [p.a_dict() for p in self.periodos]
+
+    def ordenar(self, descendente: bool = False) -> 'Carrera':
+        """Ordena por fecha de alta (los de alta ilegible al final); estable"""
+        fuera = float('inf') if not descendente else float('-inf')
+        self.periodos.sort(key=lambda p: p.inicio if p.inicio is not None else fuera, reverse=descendente)
+        self._indexar()
+        return self
+
+    def validos(self) -> List[Periodo]:
+        return [p for p in self.periodos if p.valido]
+
+    def intervalos(self, fin_vigente: Optional[int] = None) -> List[Tuple[int, int]]:
+        """[inicio, fin] de los períodos válidos; los vigentes cierran en `fin_vigente`"""
+        return [intervalo for _, intervalo in self.intervalos_indexados(fin_vigente)]
+
+    def intervalos_indexados(self, fin_vigente: Optional[int] = None) -> List[Tuple[int, Tuple[int, int]]]:
+        """(índice del período, [inicio, fin]) de los períodos válidos"""
+        if fin_vigente is None or fin_vigente == self.fin_vigente:
+            return [(k, (i, f)) for k, (i, f) in enumerate(zip(self.inicios, self.fines)) if i >= 0 and f >= 0]
+        return [(k, (p.inicio, p.fin_con(fin_vigente))) for k, p in enumerate(self.periodos) if p.valido]
+
+    def primer_alta(self) -> Optional[int]:
+        inicios = [i for i in self.inicios if i >= 0]
+        return min(inicios) if inicios else None
+
+    def hay_vigente(self) -> bool:
+        return any(p.vigente for p in self.periodos)
+
+    def __len__(self) -> int:
+        return len(self.periodos)
+
+    def __iter__(self):
+        return iter(self.periodos)
+
+
+def _texto_no_canonico(texto: Any, ordinal: Optional[int]) -> Optional[Any]:
+    """El texto original si no es exactamente el que produce el códec (para no perderlo)"""
+    if ordinal is None:
+        return texto
+    return None if texto == ordinal_a_constancia(ordinal) else texto
@@ -0,0 +1,77 @@
+"""
+Códec único de fechas para el modelo de carrera
+
+Las constancias traen fechas dd/mm/aaaa (períodos, movimientos) y la fecha de
+emisión en aaaa-mm-dd. Dentro del modelo todas se guardan como días ordinales
+(date.toordinal()); este módulo es la única frontera texto ↔ ordinal.
+
+La lectura corta el texto por posición en lugar de usar strptime y se cachea:
+una constancia repite pocas fechas distintas y cada etapa vuelve a pedirlas.
+"""
+
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional
+
+FORMATO_CONSTANCIA = '%d/%m/%Y'
+FORMATO_ISO = '%Y-%m-%d'
+TEXTO_VIGENTE = 'Vigente'
+
+
+@lru_cache(maxsize=16384)
+def texto_a_ordinal(texto: str) -> int:
+    """
+    Día ordinal de 'dd/mm/aaaa' o 'aaaa-mm-dd'
+
+    Raises:
+        ValueError: si el texto no es una fecha válida en ninguno de los dos formatos
+    """
+    if len(texto) == 10:
+        if texto[2] == '/' and texto[5] == '/':
+            return date(int(texto[6:]), int(texto[3:5]), int(texto[:2])).toordinal()
+        if texto[4] == '-' and texto[7] == '-':
+            return date(int(texto[:4]), int(texto[5:7]), int(texto[8:])).toordinal()
+    # Formatos sin ceros a la izquierda ('1/2/2003'): ruta lenta, mismo resultado
+    for formato in (FORMATO_CONSTANCIA, FORMATO_ISO):
+        try:
+            return datetime.strptime(texto.strip(), formato).toordinal()
+        except ValueError:
+            continue
+    raise ValueError(f"Fecha no reconocida: {texto!r}")
+
+
+def texto_a_ordinal_opcional(texto: Optional[str]) -> Optional[int]:
+    """Como texto_a_ordinal pero devuelve None si el texto no es una fecha"""
+    if not texto or not isinstance(texto, str):
+        return None
+    try:
+        return texto_a_ordinal(texto)
+    except ValueError:
+        return None
+
+
+def es_vigente(texto_fin: Optional[str]) -> bool:
+    """'Vigente' en cualquier capitalización"""
+    return isinstance(texto_fin, str) and texto_fin.strip().lower() == 'vigente'
+
+
+@lru_cache(maxsize=16384)
+def ordinal_a_constancia(ordinal: int) -> str:
+    """Día ordinal → 'dd/mm/aaaa'"""
+    fecha = date.fromordinal(ordinal)
+    return f"{fecha.day:02d}/{fecha.month:02d}/{fecha.year:04d}"
+
+
+@lru_cache(maxsize=4096)
+def ordinal_a_iso(ordinal: int) -> str:
+    """Día ordinal → 'aaaa-mm-dd'"""
+    return date.fromordinal(ordinal).isoformat()
+
+
+def ordinal_a_datetime(ordinal: int) -> datetime:
+    """Día ordinal → datetime a medianoche (lo que devolvía strptime)"""
+    return datetime.fromordinal(ordinal)
+
+
+def hoy_ordinal() -> int:
+    return date.today().toordinal()
@@ -1,53 +1,15 @@
 """
 Utilidades para manejo de UMA y topes salariales históricos del IMSS
-Contiene los topes oficiales por año para aplicar en cálculos de pensión
+Consultas por año sobre el almacén único de parámetros (utils/parametros_imss.py)
 """
 
 from typing import Dict, Optional, Tuple
 from datetime import datetime
 
+from utils.parametros_imss import parametros
+
 class UMATopes:
-    """Manejo de UMA y topes salariales históricos"""
-    
-    # Valores UMA diarios históricos (oficiales IMSS)
-    UMA_DIARIA_HISTORICA = {
-        2025: 113.14,
-        2024: 109.75, 
-        2023: 106.85,
-        2022: 103.95,
-        2021: 101.05,
-        2020: 98.15,
-        2019: 95.25,
-        2018: 92.35,
-        2017: 89.45,
-        2016: 86.55,
-        2015: 83.65,
-        2014: 80.75,
-        2013: 67.29,
-        2012: 62.33,
-        2011: 59.82,
-        2010: 57.46,
-        2009: 54.80,
-        2008: 52.59,
-        2007: 50.57,
-        2006: 48.67,
-        2005: 46.80,
-        2004: 45.24,
-        2003: 43.65,
-        2002: 42.15,
-        2001: 40.30,
-        2000: 37.90
-    }
-    
-    # Múltiples para diferentes seguros
-    MULTIPLES_TOPE = {
-        'invalidez_vida_rcv': 25,  # 25 UMA para IV y RCV
-        'riesgos_trabajo': 25,     # 25 UMA para RT
-        'enfermedad_maternidad': 25 # 25 UMA para EM
-    }
-    
-    def __init__(self):
-        self.cache_topes = {}
+    """Manejo de UMA y topes salariales históricos (valores vigentes al cierre de cada año)"""
     
     def get_uma_diaria(self, año: int) -> float:
         """
@@ -59,20 +21,7 @@ class UMATopes:
         Returns:
             Valor UMA diaria en pesos
         """
-        if año in self.UMA_DIARIA_HISTORICA:
-            return self.UMA_DIARIA_HISTORICA[año]
-        
-        # Para años no encontrados, usar el más cercano
-        años_disponibles = sorted(self.UMA_DIARIA_HISTORICA.keys())
-        
-        if año < años_disponibles[0]:
-            return self.UMA_DIARIA_HISTORICA[años_disponibles[0]]
-        elif año > años_disponibles[-1]:
-            return self.UMA_DIARIA_HISTORICA[años_disponibles[-1]]
-        
-        # Interpolar entre años cercanos
-        año_anterior = max([a for a in años_disponibles if a <= año])
-        return self.UMA_DIARIA_HISTORICA[año_anterior]
+        return parametros.uma_año(año)
     
     def get_tope_diario(self, año: int, tipo_seguro: str = 'invalidez_vida_rcv') -> float:
         """
@@ -80,21 +29,12 @@ class UMATopes:
         
         Args:
             año: Año del tope
-            tipo_seguro: Tipo de seguro (invalidez_vida_rcv, riesgos_trabajo, etc.)
+            tipo_seguro: Tipo de seguro (el tope del SBC es el mismo para todos)
             
         Returns:
             Tope salarial diario en pesos
         """
-        cache_key = f"{año}_{tipo_seguro}"
-        if cache_key in self.cache_topes:
-            return self.cache_topes[cache_key]
-        
-        uma_diaria = self.get_uma_diaria(año)
-        multiple = self.MULTIPLES_TOPE.get(tipo_seguro, 25)
-        tope_diario = uma_diaria * multiple
-        
-        self.cache_topes[cache_key] = tope_diario
-        return tope_diario
+        return parametros.tope_diario_año(año)
     
     def get_tope_mensual(self, año: int, tipo_seguro: str = 'invalidez_vida_rcv') -> float:
         """Obtiene el tope salarial mensual"""
@@ -131,18 +71,19 @@ class UMATopes:
         Returns:
             Dict con información detallada del tope
         """
-        uma_diaria = self.get_uma_diaria(año)
-        multiple = self.MULTIPLES_TOPE.get(tipo_seguro, 25)
+        cierre = datetime(año, 12, 31)
+        tope_diario = parametros.tope_diario(cierre)
         
         return {
             "año": año,
             "tipo_seguro": tipo_seguro,
-            "uma_diaria": uma_diaria,
-            "multiple_aplicado": multiple,
-            "tope_diario": uma_diaria * multiple,
-            "tope_mensual": uma_diaria * multiple * 30.4,
-            "tope_anual": uma_diaria * multiple * 365,
-            "fuente": "IMSS - Valores UMA oficiales"
+            "uma_diaria": parametros.uma(cierre),
+            "unidad_tope": parametros.unidad_tope(cierre),
+            "multiple_aplicado": parametros.veces_tope(cierre),
+            "tope_diario": tope_diario,
+            "tope_mensual": tope_diario * 30.4,
+            "tope_anual": tope_diario * 365,
+            "fuente": "IMSS - Almacén de parámetros históricos"
         }
     
     def validar_salario_historico(self, salario_diario: float, año: int) -> Dict:
@@ -152,7 +93,8 @@ class UMATopes:
         Returns:
             Dict con resultado de validación
         """
-        uma_año = self.get_uma_diaria(año)
+        # Antes de la UMA la unidad de referencia es el SMG
+        uma_año = parametros.unidad_tope(datetime(año, 12, 31))
         tope_año = self.get_tope_diario(año)
         
         # Rangos razonables (0.5 UMA mínimo, 25 UMA máximo)
@@ -0,0 +1,435 @@
+"""
+Procesamiento por lotes de salidas del parser con PensionProcessor
+
+Recibe muchos JSON del parser (arreglo JSON o NDJSON, una salida por línea),
+los reparte en un pool de procesos y devuelve los resultados como un
+iterador en el mismo orden de entrada.
+
+Un solo pool por proceso (multiprocessing.Pool, spawn, como
+services/analysis_executor.py) compartido por todos los lotes: se crea en
+el primer lote, tiene LOTE_MAX_WORKERS procesos con un PensionProcessor cada
+uno y los recicla cada LOTE_MAX_TAREAS_POR_WORKER documentos. A lo más
+LOTE_MAX_CONCURRENTES lotes corren a la vez; procesar_lote lanza LoteOcupado
+si no hay turno, así el total de procesos nunca crece con las solicitudes.
+
+Memoria constante sin importar el tamaño del lote: la entrada se consume de
+forma perezosa (los arreglos JSON se leen elemento por elemento, ver
+documentos_arreglo_json), nunca hay más de `max_workers × EN_VUELO_POR_WORKER`
+documentos en vuelo por lote y cada resultado se entrega (y se suelta) en
+cuanto le toca su turno.
+
+Tiempo máximo por documento: cada proceso corre las etapas del procesador en
+su hilo principal y arma un temporizador (SIGALRM) al empezar un documento;
+si se agota, el documento se reporta como "tiempo agotado" y el proceso sigue
+con el siguiente. En plataformas sin setitimer, o si un proceso queda atorado
+en código nativo (o muere: multiprocessing.Pool lo reemplaza pero pierde el
+documento), el lote deja de esperar ese documento tras
+`timeout_item + MARGEN_TIMEOUT_S` segundos de ser el siguiente en salir
+(LOTE_ESPERA_MAXIMA_S si el lote no tiene timeout_item), termina el pool (Pool.terminate) y reenvía a uno nuevo los documentos que
+seguían en vuelo; los demás lotes detectan el cambio de pool y reenvían los
+suyos.
+
+COORDINA CON: modules/modulo3/pension_processor.py
+USO:
+    for resultado in procesar_lote(documentos, max_workers=4, timeout_item=30):
+        ...
+    for linea in procesar_lote_ndjson(open("salidas.ndjson", "rb")):
+        salida.write(linea)
+"""
+
+import codecs
+import json
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from multiprocessing.pool import AsyncResult, Pool
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Union
+
+LOTE_MAX_WORKERS = int(os.getenv("LOTE_MAX_WORKERS", "0")) or os.cpu_count() or 1
+LOTE_TIMEOUT_ITEM_S = float(os.getenv("LOTE_TIMEOUT_ITEM_S", "30"))
+LOTE_MAX_CONCURRENTES = int(os.getenv("LOTE_MAX_CONCURRENTES", "2"))
+LOTE_MAX_TAREAS_POR_WORKER = int(os.getenv("LOTE_MAX_TAREAS_POR_WORKER", "500")) or None
+# Espera por documento de un lote sin timeout_item: un worker muerto no
+# resuelve nunca su resultado y el lote retendría su turno para siempre
+LOTE_ESPERA_MAXIMA_S = float(os.getenv("LOTE_ESPERA_MAXIMA_S", "600")) or 600.0
+
+# Documentos en vuelo por proceso: suficiente para no dejar procesos ociosos
+EN_VUELO_POR_WORKER = 2
+# Espera adicional del proceso principal antes de dar un documento por perdido
+MARGEN_TIMEOUT_S = 5.0
+# Cada cuánto revisa un lote, mientras espera, si otro lote reemplazó el pool
+INTERVALO_REVISION_POOL_S = 1.0
+# Lectura de arreglos JSON: bloque inicial y tamaño máximo de un elemento
+BLOQUE_LECTURA = 64 * 1024
+MAX_CARACTERES_DOCUMENTO = 32 * 1024 * 1024
+# Caracteres que pueden seguir a un número completo dentro del arreglo
+FIN_NUMERO = ' \t\r\n,]'
+
+
+class EntradaInvalida:
+    """Línea de la entrada que no se pudo leer; se reporta sin ir al pool"""
+
+    def __init__(self, error: str):
+        self.error = error
+
+
+class LoteOcupado(RuntimeError):
+    """Ya corren LOTE_MAX_CONCURRENTES lotes y no se liberó un turno a tiempo"""
+
+
+class TiempoAgotado(BaseException):
+    """
+    Lanzada por SIGALRM dentro del worker
+
+    Hereda de BaseException para que el `except Exception` del procesador no
+    la convierta en un error de procesamiento.
+    """
+
+
+# ----------------------------------------------------------------------
+# Worker (un PensionProcessor por proceso y por modo debug)
+# ----------------------------------------------------------------------
+
+_procesadores: Dict[bool, Any] = {}
+
+
+def _al_agotar_tiempo(signum, frame):
+    raise TiempoAgotado()
+
+
+def _iniciar_worker() -> None:
+    if hasattr(signal, 'setitimer'):
+        signal.signal(signal.SIGALRM, _al_agotar_tiempo)
+
+
+def _procesador(debug_mode: bool):
+    if debug_mode not in _procesadores:
+        from modules.modulo3.pension_processor import PensionProcessor
+        # Etapas en el hilo principal: SIGALRM solo interrumpe a ese hilo
+        _procesadores[debug_mode] = PensionProcessor(debug_mode=debug_mode, max_workers_etapas=1)
+    return _procesadores[debug_mode]
+
+
+def _procesar_documento(documento: Dict[str, Any], debug_mode: bool,
+                        timeout_item: Optional[float]) -> Dict[str, Any]:
+    temporizador = bool(timeout_item) and hasattr(signal, 'setitimer')
+    if temporizador:
+        signal.setitimer(signal.ITIMER_REAL, timeout_item)
+    try:
+        return _procesador(debug_mode).procesar_pension_completa(documento)
+    except TiempoAgotado:
+        return _resultado_error(f"Tiempo agotado: más de {timeout_item:g} s procesando el documento")
+    finally:
+        if temporizador:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _resultado_error(error: str) -> Dict[str, Any]:
+    return {
+        "exito": False,
+        "error": error,
+        "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+# ----------------------------------------------------------------------
+# Pool compartido
+# ----------------------------------------------------------------------
+
+_pool: Optional[Pool] = None
+_lock_pool = threading.Lock()
+_turnos_lote = threading.BoundedSemaphore(LOTE_MAX_CONCURRENTES)
+
+
+def _pool_actual() -> Pool:
+    """El pool vigente; lo crea si no hay (primer lote o tras un reemplazo)"""
+    global _pool
+    with _lock_pool:
+        if _pool is None:
+            # spawn: el pool se crea desde un hilo de uvicorn y fork copiaría su estado
+            _pool = multiprocessing.get_context("spawn").Pool(
+                processes=LOTE_MAX_WORKERS,
+                initializer=_iniciar_worker,
+                maxtasksperchild=LOTE_MAX_TAREAS_POR_WORKER
+            )
+        return _pool
+
+
+def _reemplazar_pool(pool: Pool) -> None:
+    """
+    Termina `pool` sin esperar a los documentos en curso (única forma de
+    liberar un worker atorado en código nativo); el siguiente uso crea otro.
+    Si otro lote ya lo reemplazó no hace nada.
+    """
+    global _pool
+    with _lock_pool:
+        if _pool is not pool:
+            return
+        _pool = None
+    pool.terminate()
+
+
+def cerrar_pool_lote() -> None:
+    """Termina el pool compartido (al apagar la aplicación)"""
+    global _pool
+    with _lock_pool:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.terminate()
+
+
+class _Envio:
+    """Documento del lote y dónde se está procesando"""
+    __slots__ = ('indice', 'documento', 'pool', 'resultado')
+
+    def __init__(self, indice: int, documento: Optional[Dict[str, Any]] = None,
+                 resultado: Optional[Dict[str, Any]] = None):
+        self.indice = indice
+        # None si no va al pool (entrada inválida: el resultado ya está listo)
+        self.documento = documento
+        self.pool: Optional[Pool] = None
+        self.resultado: Union[AsyncResult, Dict[str, Any], None] = resultado
+
+    def listo(self) -> bool:
+        return not isinstance(self.resultado, AsyncResult) or (
+            self.resultado.ready() and self.resultado.successful())
+
+    def huerfano(self) -> bool:
+        """Enviado a un pool que ya se terminó y sin resultado"""
+        return not self.listo() and self.pool is not _pool
+
+# ----------------------------------------------------------------------
+# API
+# ----------------------------------------------------------------------
+
+def documentos_ndjson(lineas: Iterable[Union[str, bytes]]) -> Iterator[Any]:
+    """Un documento por línea no vacía; las líneas ilegibles dan EntradaInvalida"""
+    for linea in lineas:
+        linea = linea.strip()
+        if not linea:
+            continue
+        try:
+            yield json.loads(linea)
+        except ValueError as e:
+            yield EntradaInvalida(f"JSON inválido: {e}")
+
+
+def documentos_arreglo_json(archivo: BinaryIO) -> Iterator[Any]:
+    """
+    Elementos de un arreglo JSON leídos de a uno desde un archivo binario
+
+    Solo el elemento en curso está en memoria, nunca el arreglo completo.
+    Lanza ValueError de inmediato si el contenido no empieza con '['; un
+    error de sintaxis a media lectura da una EntradaInvalida y termina.
+    """
+    lector = _LectorArregloJson(archivo)
+    if lector.siguiente_caracter() != '[':
+        raise ValueError("Se esperaba un arreglo JSON o NDJSON")
+    lector.posicion += 1
+    return lector.elementos()
+
+
+class _LectorArregloJson:
+    """Búfer de texto sobre un archivo binario con decodificación UTF-8 incremental"""
+
+    def __init__(self, archivo: BinaryIO):
+        self.archivo = archivo
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.decodificador = json.JSONDecoder()
+        self.texto = ''
+        self.posicion = 0
+        self.agotado = False
+
+    def _leer(self) -> bool:
+        """Agrega al búfer al menos lo que ya hay pendiente (duplica); False si no hay más"""
+        if self.agotado:
+            return False
+        bloque = self.archivo.read(max(BLOQUE_LECTURA, len(self.texto) - self.posicion))
+        self.agotado = not bloque
+        self.texto = self.texto[self.posicion:] + self.utf8.decode(bloque, final=self.agotado)
+        self.posicion = 0
+        return not self.agotado
+
+    def siguiente_caracter(self) -> Optional[str]:
+        """Primer carácter no blanco desde la posición actual (None al final)"""
+        while True:
+            while self.posicion < len(self.texto) and self.texto[self.posicion] in ' \t\r\n':
+                self.posicion += 1
+            if self.posicion < len(self.texto):
+                return self.texto[self.posicion]
+            if not self._leer():
+                return None
+
+    def _valor(self) -> Any:
+        """Decodifica el valor en la posición actual, leyendo más si quedó cortado"""
+        while True:
+            try:
+                valor, fin = self.decodificador.raw_decode(self.texto, self.posicion)
+                # Un número cortado por el bloque ("3." de "3.25") se lee completo:
+                # solo termina en un blanco, ',' o ']'
+                if self.agotado or (fin < len(self.texto) and (
+                        not isinstance(valor, (int, float)) or self.texto[fin] in FIN_NUMERO)):
+                    self.posicion = fin
+                    return valor
+            except ValueError:
+                if self.agotado:
+                    raise
+            if len(self.texto) - self.posicion > MAX_CARACTERES_DOCUMENTO:
+                raise ValueError(f"un elemento supera {MAX_CARACTERES_DOCUMENTO} caracteres")
+            self._leer()
+
+    def elementos(self) -> Iterator[Any]:
+        caracter = self.siguiente_caracter()
+        if caracter == ']':
+            return
+        while True:
+            try:
+                yield self._valor()
+            except ValueError as e:
+                yield EntradaInvalida(f"JSON inválido: {e}")
+                return
+            caracter = self.siguiente_caracter()
+            if caracter == ',':
+                self.posicion += 1
+                self.siguiente_caracter()
+                continue
+            if caracter != ']':
+                yield EntradaInvalida("JSON inválido: se esperaba ',' o ']' entre elementos")
+            return
+
+
+def procesar_lote(documentos: Iterable[Any],
+                  max_workers: Optional[int] = None,
+                  timeout_item: Optional[float] = LOTE_TIMEOUT_ITEM_S,
+                  debug_mode: bool = False,
+                  espera_turno: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Procesa salidas del parser en paralelo y las devuelve en orden de entrada
+
+    El turno del lote se toma aquí mismo (no al empezar a iterar) y se
+    devuelve al agotar o cerrar el iterador.
+
+    Args:
+        documentos: Iterable (puede ser perezoso) de dicts del parser
+        max_workers: Procesos que puede ocupar este lote (por omisión y como
+            máximo LOTE_MAX_WORKERS, el tamaño del pool compartido)
+        timeout_item: Segundos máximos por documento (None o 0: sin límite en
+            el worker; el lote deja de esperarlo tras LOTE_ESPERA_MAXIMA_S)
+        debug_mode: Se pasa al PensionProcessor
+        espera_turno: Segundos a esperar un turno libre (None: sin límite,
+            0: no esperar)
+
+    Yields:
+        {"indice": i, **resultado de procesar_pension_completa}
+
+    Raises:
+        LoteOcupado: Si no se obtuvo turno en `espera_turno` segundos
+    """
+    timeout_turno = None if espera_turno is None else max(espera_turno, 0)
+    if not _turnos_lote.acquire(timeout=timeout_turno):
+        raise LoteOcupado(f"Ya hay {LOTE_MAX_CONCURRENTES} lotes en proceso; intenta más tarde")
+
+    resultados = _resultados_lote(documentos, max_workers, timeout_item, debug_mode)
+    # Entra al try/finally del generador: desde aquí cerrarlo devuelve el turno
+    next(resultados)
+    return resultados
+
+
+def _resultados_lote(documentos: Iterable[Any], max_workers: Optional[int],
+                     timeout_item: Optional[float], debug_mode: bool) -> Iterator[Any]:
+    """Cuerpo de procesar_lote; su primer valor (None) solo marca que el turno está tomado"""
+    try:
+        yield None
+
+        max_workers = min(max_workers or LOTE_MAX_WORKERS, LOTE_MAX_WORKERS)
+        limite_en_vuelo = max_workers * EN_VUELO_POR_WORKER
+        # Siempre finita: sin ella un worker muerto deja el lote esperando para siempre
+        if timeout_item:
+            espera_maxima = timeout_item + MARGEN_TIMEOUT_S
+            error_tiempo = f"Tiempo agotado: más de {timeout_item:g} s procesando el documento"
+        else:
+            espera_maxima = LOTE_ESPERA_MAXIMA_S
+            error_tiempo = f"Tiempo agotado: sin respuesta del worker en {espera_maxima:g} s"
+        en_vuelo: deque = deque()
+        entrada = enumerate(documentos)
+        agotada = False
+
+        def enviar(envio: _Envio) -> None:
+            try:
+                envio.pool = _pool_actual()
+                envio.resultado = envio.pool.apply_async(
+                    _procesar_documento, (envio.documento, debug_mode, timeout_item)
+                )
+            except Exception as e:
+                envio.resultado = _resultado_error(f"No se pudo enviar al pool: {e}")
+
+        def reenviar_huerfanos() -> None:
+            for envio in en_vuelo:
+                if envio.documento is not None and envio.huerfano():
+                    enviar(envio)
+
+        while True:
+            # Llenar la ventana sin leer más entrada de la necesaria
+            while not agotada and len(en_vuelo) < limite_en_vuelo:
+                try:
+                    indice, documento = next(entrada)
+                except StopIteration:
+                    agotada = True
+                    break
+                if isinstance(documento, EntradaInvalida):
+                    en_vuelo.append(_Envio(indice, resultado=_resultado_error(documento.error)))
+                elif not isinstance(documento, dict):
+                    en_vuelo.append(_Envio(indice, resultado=_resultado_error(
+                        "Cada elemento debe ser un objeto JSON")))
+                else:
+                    envio = _Envio(indice, documento)
+                    enviar(envio)
+                    en_vuelo.append(envio)
+
+            if not en_vuelo:
+                break
+
+            envio = en_vuelo[0]
+            limite = time.monotonic() + espera_maxima
+            resultado = None
+            while resultado is None:
+                if not isinstance(envio.resultado, AsyncResult):
+                    resultado = envio.resultado
+                    break
+                # Otro lote terminó el pool: lo pendiente se reenvía al nuevo
+                if envio.huerfano():
+                    reenviar_huerfanos()
+                    limite = time.monotonic() + espera_maxima
+                    continue
+                try:
+                    resultado = envio.resultado.get(timeout=INTERVALO_REVISION_POOL_S)
+                except multiprocessing.TimeoutError:
+                    if time.monotonic() > limite:
+                        resultado = _resultado_error(error_tiempo)
+                        # El worker sigue atorado: se reemplaza el pool y se
+                        # reenvían los documentos en vuelo que no alcanzaron a terminar
+                        en_vuelo.popleft()
+                        _reemplazar_pool(envio.pool)
+                        reenviar_huerfanos()
+                        en_vuelo.appendleft(envio)
+                except Exception as e:
+                    resultado = _resultado_error(f"Error en el worker: {e}")
+
+            en_vuelo.popleft()
+            yield {"indice": envio.indice, **resultado}
+    finally:
+        _turnos_lote.release()
+
+
+def linea_ndjson(resultado: Dict[str, Any]) -> str:
+    return json.dumps(resultado, ensure_ascii=False, default=str) + "\n"
+
+
+def procesar_lote_ndjson(lineas: Iterable[Union[str, bytes]], **opciones) -> Iterator[str]:
+    """procesar_lote sobre líneas NDJSON; devuelve una línea NDJSON por resultado"""
+    for resultado in procesar_lote(documentos_ndjson(lineas), **opciones):
+        yield linea_ndjson(resultado)
@@ -0,0 +1,296 @@
+"""
+Simulador de escenarios de Modalidad 40 (continuación voluntaria, Ley 73)
+
+Agrega a la carrera un segmento hipotético de Modalidad 40 (salario registrado
+de 1 a 25 UMA, fecha de inicio y duración), reevalúa el promedio de las
+últimas 250 semanas y la pensión Ley 73, y devuelve el frente de Pareto
+costo total vs pensión mensual.
+
+Cada escenario es incremental: la carrera ya está indexada por sumas prefijas
+(utils/segmentos_250.py::IndicePromedio250), así que la ventana de 250 semanas
+= días de Modalidad 40 (un término por vigencia de UMA) + los días
+cotizados más recientes antes del inicio, en una consulta O(log n).
+
+Supuestos:
+- Modalidad 40 empieza después de la fecha de emisión (fecha de corte): antes
+  de ella los días ya están contados en la constancia
+- Al iniciar Modalidad 40 termina la relación laboral; los empleos vigentes
+  siguen cotizando con su último salario hasta el día anterior al inicio
+- Salario registrado = múltiplo de la UMA vigente cada día (cambia el 1 de
+  febrero); después de la última UMA publicada se mantiene (pesos constantes)
+- Cuota: 11.4% del salario registrado por día (la misma tasa del backend)
+
+COORDINA CON: utils/segmentos_250.py, utils/parametros_imss.py
+USO:
+    simulador = SimuladorModalidad40(indice, semanas_actuales=900, fecha_corte=date(2025, 6, 30))
+    resultado = simulador.simular(range(1, 26), fechas_inicio, range(12, 61, 3), presupuesto_ms=2000)
+"""
+
+import itertools
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.parametros_imss import parametros
+from utils.segmentos_250 import DIAS_250_SEMANAS, IndicePromedio250
+
+TASA_CUOTA_M40 = 0.114
+MAX_UMAS_M40 = 25
+DIAS_POR_MES = 30.4
+
+
+def pension_ley73_mensual(semanas: int, salario_promedio: float,
+                          pension_minima: float, pension_maxima: float) -> float:
+    """
+    Pensión mensual Ley 73 (misma fórmula que backend/main.py)
+
+    Cuantía básica del 35% del salario promedio más 0.563% del salario
+    promedio por cada semana después de las 500, acotada a mínimo y máximo.
+    """
+    if semanas < 500:
+        return 0.0
+
+    cuantia_basica = salario_promedio * 0.35
+    incremento = max(0, semanas - 500) * (salario_promedio * 0.00563)
+    pension_mensual = (cuantia_basica + incremento) * DIAS_POR_MES
+
+    return min(max(pension_mensual, pension_minima), pension_maxima)
+
+
+def sumar_meses(fecha: date, meses: int) -> date:
+    """Misma fecha `meses` después (día recortado al fin de mes)"""
+    total = fecha.month - 1 + meses
+    año, mes = fecha.year + total // 12, total % 12 + 1
+    siguiente = date(año + mes // 12, mes % 12 + 1, 1)
+    return date(año, mes, min(fecha.day, (siguiente - timedelta(days=1)).day))
+
+
+@dataclass
+class EscenarioM40:
+    """Un escenario evaluado de Modalidad 40"""
+    salario_umas: float
+    fecha_inicio: date
+    meses: int
+    fecha_retiro: date
+    salario_registrado_inicial: float
+    salario_promedio_diario: float
+    semanas_totales: int
+    pension_mensual: float
+    costo_total: float
+    incremento_pension: float   # contra la pensión sin M40 a la fecha de corte
+
+    @property
+    def pension_por_peso(self) -> float:
+        """Pesos de pensión mensual adicional por cada peso de cuotas"""
+        return self.incremento_pension / self.costo_total if self.costo_total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "salario_umas": self.salario_umas,
+            "fecha_inicio": self.fecha_inicio.isoformat(),
+            "meses": self.meses,
+            "fecha_retiro": self.fecha_retiro.isoformat(),
+            "salario_registrado_inicial": round(self.salario_registrado_inicial, 2),
+            "salario_promedio_diario": round(self.salario_promedio_diario, 2),
+            "semanas_totales": self.semanas_totales,
+            "pension_mensual": round(self.pension_mensual, 2),
+            "costo_total": round(self.costo_total, 2),
+            "costo_mensual_promedio": round(self.costo_total / self.meses, 2) if self.meses else 0.0,
+            "incremento_pension": round(self.incremento_pension, 2),
+            "pension_por_peso": round(self.pension_por_peso, 6)
+        }
+
+
+@dataclass
+class ResultadoSimulacionM40:
+    """Frente de Pareto y metadatos de la búsqueda"""
+    pension_base: float
+    salario_promedio_base: float
+    escenarios_posibles: int
+    escenarios_evaluados: int
+    tiempo_ms: float
+    presupuesto_ms: Optional[float]
+    frente_pareto: List[EscenarioM40] = field(default_factory=list)
+    mejor_pension_por_peso: Optional[EscenarioM40] = None
+
+    @property
+    def truncado(self) -> bool:
+        return self.escenarios_evaluados < self.escenarios_posibles
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "pension_base": round(self.pension_base, 2),
+            "salario_promedio_base": round(self.salario_promedio_base, 2),
+            "escenarios_posibles": self.escenarios_posibles,
+            "escenarios_evaluados": self.escenarios_evaluados,
+            "truncado_por_presupuesto": self.truncado,
+            "tiempo_ms": round(self.tiempo_ms, 1),
+            "presupuesto_ms": self.presupuesto_ms,
+            "frente_pareto": [e.to_dict() for e in self.frente_pareto],
+            "mejor_pension_por_peso": self.mejor_pension_por_peso.to_dict() if self.mejor_pension_por_peso else None
+        }
+
+
+class SimuladorModalidad40:
+    """
+    Evalúa escenarios de Modalidad 40 sobre una carrera indexada
+
+    El índice debe construirse con los empleos vigentes proyectados al menos
+    hasta la última fecha de inicio candidata (ver Calculadora250Semanas.construir_indice).
+    """
+
+    # Cada cuántos escenarios se revisa el presupuesto de tiempo
+    REVISION_PRESUPUESTO = 256
+
+    def __init__(self, indice: IndicePromedio250, semanas_actuales: int, fecha_corte: date,
+                 pension_minima: float = 0.0, pension_maxima: float = float('inf'),
+                 tasa_cuota: float = TASA_CUOTA_M40):
+        self.indice = indice
+        self.semanas_actuales = semanas_actuales
+        self.corte = fecha_corte.toordinal()
+        self.pension_minima = pension_minima
+        self.pension_maxima = pension_maxima
+        self.tasa_cuota = tasa_cuota
+        self.dias_cotizados_corte, _ = indice.cotizado_hasta(self.corte)
+
+    def _suma_m40(self, umas: float, inicio: date, fin: date) -> float:
+        """Σ salario registrado × días entre `inicio` y `fin`, un término por vigencia de UMA"""
+        return umas * sum(
+            uma * (hasta - desde + 1) for desde, hasta, uma in parametros.tramos('uma_diaria', inicio, fin)
+        )
+
+    def pension_sin_m40(self) -> Tuple[float, float]:
+        """Pensión y promedio con la carrera tal como está a la fecha de corte"""
+        promedio = self.indice.consultar(self.corte).promedio_diario
+        return pension_ley73_mensual(self.semanas_actuales, promedio,
+                                     self.pension_minima, self.pension_maxima), promedio
+
+    def validar_inicio(self, fecha_inicio: date) -> None:
+        """
+        Modalidad 40 solo puede empezar después de la fecha de corte: los días
+        hasta el corte ya están en `semanas_actuales` y en la carrera, y
+        contarlos otra vez inflaría las semanas y el promedio
+
+        Raises:
+            ValueError: si `fecha_inicio` no es posterior a la fecha de corte
+        """
+        if fecha_inicio.toordinal() <= self.corte:
+            raise ValueError(
+                f"La Modalidad 40 debe iniciar después de la fecha de emisión "
+                f"({date.fromordinal(self.corte).isoformat()}); se pidió {fecha_inicio.isoformat()}"
+            )
+
+    def evaluar(self, umas: float, fecha_inicio: date, meses: int, pension_base: float = 0.0) -> EscenarioM40:
+        """
+        Evalúa un escenario: O(log n) para la carrera + O(años) para el segmento M40
+
+        Raises:
+            ValueError: si `fecha_inicio` no es posterior a la fecha de corte
+        """
+        self.validar_inicio(fecha_inicio)
+        umas = min(max(umas, 1), MAX_UMAS_M40)
+        fecha_retiro = sumar_meses(fecha_inicio, meses) - timedelta(days=1)
+        inicio = fecha_inicio.toordinal()
+        dias_m40 = fecha_retiro.toordinal() - inicio + 1
+
+        costo = self._suma_m40(umas, fecha_inicio, fecha_retiro) * self.tasa_cuota
+
+        # Ventana: días de M40 más recientes + días cotizados antes del inicio
+        if dias_m40 >= DIAS_250_SEMANAS:
+            desde = fecha_retiro - timedelta(days=DIAS_250_SEMANAS - 1)
+            suma_ventana = self._suma_m40(umas, desde, fecha_retiro)
+            dias_ventana = DIAS_250_SEMANAS
+        else:
+            carrera = self.indice.consultar(inicio - 1, DIAS_250_SEMANAS - dias_m40)
+            suma_ventana = costo / self.tasa_cuota + carrera.suma_ponderada
+            dias_ventana = dias_m40 + carrera.dias
+        promedio = suma_ventana / dias_ventana
+
+        # Semanas: las reconocidas + cotizadas entre el corte y el inicio + M40
+        dias_hasta_inicio, _ = self.indice.cotizado_hasta(inicio - 1)
+        dias_adicionales = max(0, dias_hasta_inicio - self.dias_cotizados_corte)
+        semanas = self.semanas_actuales + (dias_adicionales + dias_m40) // 7
+
+        pension = pension_ley73_mensual(semanas, promedio, self.pension_minima, self.pension_maxima)
+
+        return EscenarioM40(
+            salario_umas=umas,
+            fecha_inicio=fecha_inicio,
+            meses=meses,
+            fecha_retiro=fecha_retiro,
+            salario_registrado_inicial=umas * parametros.uma(fecha_inicio),
+            salario_promedio_diario=promedio,
+            semanas_totales=semanas,
+            pension_mensual=pension,
+            costo_total=costo,
+            incremento_pension=pension - pension_base
+        )
+
+    def simular(self, salarios_umas: Iterable[float], fechas_inicio: Iterable[date],
+                duraciones_meses: Iterable[int], presupuesto_ms: Optional[float] = None) -> ResultadoSimulacionM40:
+        """
+        Barre la malla salario × inicio × duración dentro del presupuesto de tiempo
+
+        Si el presupuesto se agota se devuelve el frente de los escenarios ya
+        evaluados (`truncado_por_presupuesto`).
+
+        Raises:
+            ValueError: si alguna fecha de inicio no es posterior a la fecha de corte
+        """
+        salarios_umas, fechas_inicio, duraciones_meses = list(salarios_umas), list(fechas_inicio), list(duraciones_meses)
+        for fecha_inicio in fechas_inicio:
+            self.validar_inicio(fecha_inicio)
+        posibles = len(salarios_umas) * len(fechas_inicio) * len(duraciones_meses)
+        pension_base, promedio_base = self.pension_sin_m40()
+
+        t0 = time.perf_counter()
+        limite = t0 + presupuesto_ms / 1000 if presupuesto_ms else None
+        evaluados: List[EscenarioM40] = []
+
+        for n, (umas, fecha_inicio, meses) in enumerate(
+                itertools.product(salarios_umas, fechas_inicio, duraciones_meses)):
+            if limite and n % self.REVISION_PRESUPUESTO == 0 and time.perf_counter() > limite:
+                break
+            evaluados.append(self.evaluar(umas, fecha_inicio, meses, pension_base))
+
+        mejor = max(evaluados, key=lambda e: e.pension_por_peso, default=None)
+
+        return ResultadoSimulacionM40(
+            pension_base=pension_base,
+            salario_promedio_base=promedio_base,
+            escenarios_posibles=posibles,
+            escenarios_evaluados=len(evaluados),
+            tiempo_ms=(time.perf_counter() - t0) * 1e3,
+            presupuesto_ms=presupuesto_ms,
+            frente_pareto=frente_pareto(evaluados),
+            mejor_pension_por_peso=mejor
+        )
+
+
+def frente_pareto(escenarios: List[EscenarioM40]) -> List[EscenarioM40]:
+    """
+    Escenarios no dominados: ninguno cuesta menos o igual y da más o igual pensión
+
+    Ordena por costo ascendente (pensión descendente en empates) y conserva los
+    que mejoran la pensión máxima vista: O(n log n).
+    """
+    frente = []
+    mejor_pension = float('-inf')
+    for escenario in sorted(escenarios, key=lambda e: (e.costo_total, -e.pension_mensual)):
+        if escenario.pension_mensual > mejor_pension:
+            frente.append(escenario)
+            mejor_pension = escenario.pension_mensual
+    return frente
+
+
+def fechas_inicio_mensuales(desde: date, hasta: date) -> List[date]:
+    """Primer día de cada mes entre `desde` y `hasta`"""
+    fechas = []
+    fecha = date(desde.year, desde.month, 1)
+    if fecha < desde:
+        fecha = sumar_meses(fecha, 1)
+    while fecha <= hasta:
+        fechas.append(fecha)
+        fecha = sumar_meses(fecha, 1)
+    return fechas
@@ -0,0 +1,10 @@
+"""
+Pruebas del parser: mismo directorio raíz de imports que main.py y benchmarks/
+
+USO: python -m pytest -q src/parser/tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
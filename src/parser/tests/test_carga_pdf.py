@@ -0,0 +1,109 @@
+"""
+Recepción de PDFs (carga_pdf.py): límites de tamaño, páginas y cuerpo multipart
+"""
+
+import asyncio
+import hashlib
+import io
+
+import pypdfium2 as pdfium
+import pytest
+from starlette.datastructures import UploadFile
+
+from carga_pdf import (
+    HOLGURA_MULTIPART, LimiteCuerpoMultipart, PDFDemasiadasPaginas, PDFDemasiadoGrande, PDFInvalido,
+    recibir_pdf
+)
+
+
+def pdf_con_paginas(paginas: int) -> bytes:
+    documento = pdfium.PdfDocument.new()
+    for _ in range(paginas):
+        documento.new_page(612, 792)
+    salida = io.BytesIO()
+    documento.save(salida)
+    documento.close()
+    return salida.getvalue()
+
+
+def recibir(contenido: bytes, **limites):
+    upload = UploadFile(io.BytesIO(contenido), filename='constancia.pdf')
+    return asyncio.run(recibir_pdf(upload, **limites))
+
+
+def test_pdf_valido():
+    contenido = pdf_con_paginas(3)
+    with recibir(contenido, max_bytes=len(contenido), max_paginas=3) as pdf:
+        assert pdf.paginas == 3
+        assert pdf.tamano_bytes == len(contenido)
+        assert pdf.sha256 == hashlib.sha256(contenido).hexdigest()
+        assert pdf.flujo().read() == contenido
+
+
+def test_rechaza_tamano_paginas_y_firma():
+    contenido = pdf_con_paginas(3)
+    with pytest.raises(PDFDemasiadoGrande) as error:
+        recibir(contenido, max_bytes=len(contenido) - 1)
+    assert error.value.status_code == 413
+    with pytest.raises(PDFDemasiadasPaginas):
+        recibir(contenido, max_paginas=2)
+    with pytest.raises(PDFInvalido):
+        recibir(b'GIF89a' + contenido)
+    with pytest.raises(PDFInvalido):
+        recibir(b'')
+
+
+class Solicitud:
+    """Una solicitud ASGI con el cuerpo en `partes`; registra lo que responde el middleware"""
+
+    def __init__(self, partes, tipo=b'multipart/form-data; boundary=x', declarado=None):
+        self.partes = list(partes)
+        self.encabezados = [(b'content-type', tipo)]
+        if declarado is not None:
+            self.encabezados.append((b'content-length', str(declarado).encode()))
+        self.enviados = []
+        self.leidos = 0
+
+    async def receive(self):
+        parte = self.partes.pop(0)
+        self.leidos += len(parte)
+        return {'type': 'http.request', 'body': parte, 'more_body': bool(self.partes)}
+
+    async def send(self, mensaje):
+        self.enviados.append(mensaje)
+
+    def correr(self, max_bytes):
+        async def app(scope, receive, send):
+            while (await receive())['more_body']:
+                pass
+            await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+
+        middleware = LimiteCuerpoMultipart(app, max_bytes=max_bytes)
+        scope = {'type': 'http', 'headers': self.encabezados}
+        asyncio.run(middleware(scope, self.receive, self.send))
+        return self.enviados[0]['status']
+
+
+def test_limite_por_content_length_no_lee_el_cuerpo():
+    limite = 1000 + HOLGURA_MULTIPART
+    solicitud = Solicitud([b'x' * 10], declarado=limite + 1)
+
+    assert solicitud.correr(1000) == 413
+    assert solicitud.leidos == 0
+
+
+def test_limite_sin_content_length_corta_al_exceder():
+    limite = 1000 + HOLGURA_MULTIPART
+    partes = [b'x' * 4096] * (limite // 4096 + 5)
+    solicitud = Solicitud(partes)
+
+    with pytest.raises(PDFDemasiadoGrande):
+        solicitud.correr(1000)
+    assert solicitud.leidos <= limite + 4096
+    assert solicitud.partes
+
+
+def test_cuerpo_dentro_del_limite_y_otros_tipos():
+    limite = 1000 + HOLGURA_MULTIPART
+    assert Solicitud([b'x' * limite], declarado=limite).correr(1000) == 200
+    assert Solicitud([b'x' * (2 * limite)], tipo=b'application/x-ndjson').correr(1000) == 200
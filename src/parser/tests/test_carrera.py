@@ -0,0 +1,107 @@
+"""
+Modelo de carrera (modules/modulo3/utils/carrera.py): puente con el JSON y corresponde_a
+"""
+
+import copy
+import random
+from datetime import date
+
+import pytest
+
+from modules.modulo3.utils.carrera import Carrera
+
+SEMILLAS = range(80)
+PRIMER_DIA = date(1985, 1, 1).toordinal()
+
+
+def _fecha(rng: random.Random) -> str:
+    fecha = date.fromordinal(PRIMER_DIA + rng.randint(0, 12000))
+    # Textos que el códec no produce: se deben conservar tal cual
+    return rng.choice([
+        fecha.strftime('%d/%m/%Y'), fecha.strftime('%d/%m/%Y'),
+        f'{fecha.day}/{fecha.month}/{fecha.year}', fecha.isoformat(), '', None
+    ])
+
+
+def generar_periodos(rng: random.Random):
+    periodos = []
+    for k in range(rng.randint(0, 6)):
+        periodo = {
+            'patron': rng.choice([f'PATRON {k}', 'PATRON 0']),
+            'registro_patronal': f'R{rng.randint(0, 3):09d}',
+            'entidad_federativa': rng.choice(['TLAXCALA', 'PUEBLA', None]),
+            'fecha_inicio': _fecha(rng),
+            'fecha_fin': rng.choice([_fecha(rng), 'Vigente', 'VIGENTE']),
+            'salario_diario': rng.choice([round(rng.uniform(50, 2000), 2), 0, '350.10']),
+            'semanas_cotizadas': rng.randint(0, 500),
+            'cambios_salario': [
+                {'tipo': rng.choice(['ALTA', 'BAJA']), 'fecha': _fecha(rng), 'salario_diario': 100.0}
+                for _ in range(rng.randint(0, 3))
+            ]
+        }
+        claves = list(periodo)
+        rng.shuffle(claves)
+        periodos.append({c: periodo[c] for c in claves[:rng.randint(3, len(claves))]})
+    return periodos
+
+
+def mutar(rng: random.Random, periodos):
+    """Copia con exactamente un cambio visible en los dicts"""
+    otros = copy.deepcopy(periodos)
+    opciones = ['agregar']
+    if otros:
+        opciones += ['quitar', 'campo', 'movimiento']
+    if len(otros) > 1 and otros[0] != otros[-1]:
+        opciones.append('orden')
+    opcion = rng.choice(opciones)
+
+    if opcion == 'agregar':
+        otros.insert(rng.randint(0, len(otros)), {'patron': 'NUEVO', 'fecha_inicio': '01/01/2000'})
+    elif opcion == 'quitar':
+        otros.pop(rng.randrange(len(otros)))
+    elif opcion == 'orden':
+        otros[0], otros[-1] = otros[-1], otros[0]
+    elif opcion == 'campo':
+        periodo = rng.choice(otros)
+        clave = rng.choice(list(periodo))
+        periodo[clave] = 'CAMBIADO'
+    else:
+        periodo = rng.choice(otros)
+        periodo['cambios_salario'] = list(periodo.get('cambios_salario') or []) + [
+            {'tipo': 'ALTA', 'fecha': '02/02/2002', 'salario_diario': 1.0}
+        ]
+    return otros
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_a_dicts_devuelve_los_mismos_dicts(semilla):
+    periodos = generar_periodos(random.Random(semilla))
+    original = copy.deepcopy(periodos)
+    carrera = Carrera.desde_periodos(periodos, '2024-03-31')
+
+    assert carrera.a_dicts() == original
+    assert [list(p) for p in carrera.a_dicts()] == [list(p) for p in original]
+    assert periodos == original
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_corresponde_a(semilla):
+    rng = random.Random(semilla)
+    periodos = generar_periodos(rng)
+    carrera = Carrera.desde_periodos(periodos)
+
+    assert carrera.corresponde_a(periodos)
+    assert carrera.corresponde_a(iter(copy.deepcopy(periodos)))
+    for _ in range(5):
+        assert not carrera.corresponde_a(mutar(rng, periodos))
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_copia_no_modifica_el_original(semilla):
+    periodos = generar_periodos(random.Random(semilla))
+    carrera = Carrera.desde_periodos(periodos)
+    copia = carrera.copiar().ordenar(descendente=True)
+    for periodo in copia.periodos:
+        periodo['semanas_cotizadas'] = -1
+
+    assert carrera.corresponde_a(periodos)
@@ -0,0 +1,161 @@
+"""
+Conservación de derechos: mapa de días de la corrección e índice de consultas
+
+El mapa que devuelve aplicar_correccion_con_carrera debe dar el mismo
+resultado que volver a unir los períodos procesados; el índice
+(IndiceConservacion) debe coincidir con el cálculo puntual y con un
+recorrido día por día.
+"""
+
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from conservacion_derechos import (
+    ESTADO_CONSERVA, ESTADO_COTIZANDO, ESTADO_INTERRUPCION, ESTADO_SIN_ALTA, ESTADO_VENCIDO,
+    MAX_FECHAS_CONSULTA, CalculadoraConservacionDerechos, linea_tiempo_conservacion_desde_correccion
+)
+from correccion_semanas_final import aplicar_correccion_con_carrera
+from utils.mapa_dias import MapaDiasCarrera
+
+SEMILLAS = range(40)
+FECHA_EMISION = '2024-03-31'
+FECHA_ACTUAL = datetime(2024, 3, 31)
+
+
+def _texto(ordinal: int) -> str:
+    return date.fromordinal(ordinal).strftime('%d/%m/%Y')
+
+
+def resultado_parser(rng: random.Random, con_vigente: bool):
+    """Carrera terminada (o con un vigente) con la forma de HistorialLaboralExtractor.procesar_constancia"""
+    dia = date(1995, 1, 1).toordinal()
+    periodos = []
+    for k in range(rng.randint(1, 8)):
+        inicio = dia + rng.randint(0, 200)
+        fin = inicio + rng.randint(30, 900)
+        periodos.append({
+            'patron': f'PATRON {k}',
+            'registro_patronal': f'R{k:09d}',
+            'fecha_inicio': _texto(inicio),
+            'fecha_fin': _texto(fin),
+            'salario_diario': 400.0,
+            'semanas_cotizadas': (fin - inicio) // 7
+        })
+        dia = fin - rng.randint(-400, 100)
+    if con_vigente:
+        periodos[-1]['fecha_fin'] = 'Vigente'
+    return {
+        'exito': True,
+        'datos_basicos': {'fecha_emision': FECHA_EMISION, 'total_semanas_cotizadas': 500,
+                          'ley_aplicable': rng.choice(('Ley 73', 'Ley 97'))},
+        'historial_laboral': {'total_periodos': len(periodos), 'periodos': periodos},
+        'debug': {'semanas_calculadas': 500}
+    }
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_mapa_de_la_correccion_no_cambia_la_conservacion(semilla):
+    rng = random.Random(semilla)
+    datos_corregidos, carrera, mapa_dias = aplicar_correccion_con_carrera(
+        resultado_parser(rng, con_vigente=rng.random() < 0.3), None
+    )
+    assert mapa_dias.dias_cubiertos() == MapaDiasCarrera.desde_intervalos(carrera.intervalos()).dias_cubiertos()
+
+    calculadora = CalculadoraConservacionDerechos()
+    calculadora.fecha_actual = FECHA_ACTUAL
+    con_mapa = calculadora.calcular_conservacion_derechos(datos_corregidos, FECHA_EMISION,
+                                                          mapa_dias=mapa_dias, carrera=carrera)
+    sin_mapa = calculadora.calcular_conservacion_derechos(datos_corregidos, FECHA_EMISION, carrera=carrera)
+    assert con_mapa.to_dict() == sin_mapa.to_dict()
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_reactivacion_con_mapa_igual_a_periodos(semilla):
+    rng = random.Random(semilla)
+    datos_corregidos, carrera, mapa_dias = aplicar_correccion_con_carrera(
+        resultado_parser(rng, con_vigente=False), None
+    )
+    calculadora = CalculadoraConservacionDerechos()
+    calculadora.fecha_actual = datetime.fromordinal(max(f for _, f in carrera.intervalos()) + rng.randint(0, 900))
+    procesados = calculadora._procesar_periodos_corregidos(carrera, FECHA_EMISION)
+
+    for _ in range(10):
+        ultima_baja = calculadora.fecha_actual - timedelta(days=rng.randint(0, 3000))
+        assert (calculadora.puede_reactivar_derechos(procesados, ultima_baja, mapa_dias)
+                == calculadora.puede_reactivar_derechos(procesados, ultima_baja))
+
+
+def _sumar_años(dia: int, años: int) -> int:
+    fecha = date.fromordinal(dia)
+    if fecha.month == 2 and fecha.day == 29:
+        fecha = fecha.replace(day=28)
+    return fecha.replace(year=fecha.year + años).toordinal()
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_indice_igual_al_calculo_puntual(semilla):
+    rng = random.Random(semilla)
+    datos_corregidos, carrera, _ = aplicar_correccion_con_carrera(resultado_parser(rng, con_vigente=False), None)
+    calculadora = CalculadoraConservacionDerechos()
+    indice = calculadora.construir_indice(datos_corregidos, FECHA_EMISION, carrera)
+
+    for _ in range(10):
+        dia = indice.ultima_baja + rng.randint(0, 6000)
+        calculadora.fecha_actual = datetime.fromordinal(dia)
+        puntual = calculadora.calcular_conservacion_derechos(datos_corregidos, FECHA_EMISION, carrera=carrera)
+        assert puntual.fecha_ultima_baja.toordinal() == indice.ultima_baja
+        assert puntual.fecha_vencimiento.toordinal() == indice.vencimiento
+        assert puntual.esta_vigente == (indice.estado(dia) == ESTADO_CONSERVA)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_linea_tiempo_igual_a_dia_por_dia(semilla):
+    rng = random.Random(semilla)
+    datos_corregidos, carrera, _ = aplicar_correccion_con_carrera(
+        resultado_parser(rng, con_vigente=rng.random() < 0.3), None
+    )
+    indice = CalculadoraConservacionDerechos().construir_indice(datos_corregidos, FECHA_EMISION, carrera)
+    emision = date.fromisoformat(FECHA_EMISION).toordinal()
+    cotizados = {d for inicio, fin in carrera.intervalos(emision) for d in range(inicio, fin + 1)}
+    ultima_baja = indice.ultima_baja
+    vencimiento = ultima_baja + indice.base.conservacion_semanas * 7
+    primer_alta, tres_años, seis_años = min(cotizados), _sumar_años(ultima_baja, 3), _sumar_años(ultima_baja, 6)
+
+    def esperado(dia):
+        if dia < primer_alta:
+            estado = ESTADO_SIN_ALTA
+        elif dia <= ultima_baja:
+            estado = ESTADO_COTIZANDO if dia in cotizados else ESTADO_INTERRUPCION
+        else:
+            estado = ESTADO_CONSERVA if dia <= vencimiento else ESTADO_VENCIDO
+        return estado, 52 if dia > seis_años else 26 if dia > tres_años else 0
+
+    desde, hasta = primer_alta - 30, max(vencimiento, seis_años) + 30
+    tramos = indice.linea_tiempo(desde, hasta)
+
+    assert date.fromisoformat(tramos[0]['desde']).toordinal() == desde
+    assert date.fromisoformat(tramos[-1]['hasta']).toordinal() == hasta
+    for anterior, tramo in zip(tramos, tramos[1:]):
+        assert date.fromisoformat(tramo['desde']).toordinal() == date.fromisoformat(anterior['hasta']).toordinal() + 1
+        assert (tramo['estado'], tramo['semanas_reingreso_para_reconocer']) != (
+            anterior['estado'], anterior['semanas_reingreso_para_reconocer'])
+    for tramo in tramos:
+        for dia in range(date.fromisoformat(tramo['desde']).toordinal(),
+                         date.fromisoformat(tramo['hasta']).toordinal() + 1):
+            assert (tramo['estado'], tramo['semanas_reingreso_para_reconocer']) == esperado(dia)
+    assert indice.linea_tiempo()[-1]['hasta'] is None
+
+
+def test_limites_de_la_consulta():
+    datos_corregidos, _, _ = aplicar_correccion_con_carrera(resultado_parser(random.Random(0), False), None)
+    fechas = ['2020-01-01'] * MAX_FECHAS_CONSULTA
+
+    consulta = linea_tiempo_conservacion_desde_correccion(datos_corregidos, fechas=fechas)
+    assert len(consulta['consultas']) == MAX_FECHAS_CONSULTA
+    with pytest.raises(ValueError):
+        linea_tiempo_conservacion_desde_correccion(datos_corregidos, fechas=fechas + ['2020-01-02'])
+    with pytest.raises(ValueError):
+        linea_tiempo_conservacion_desde_correccion(datos_corregidos, fecha_desde='2020-01-02',
+                                                   fecha_hasta='2020-01-01')
@@ -0,0 +1,93 @@
+"""
+Corrección de semanas sin copias profundas (correccion_semanas_final.py)
+
+La corrección comparte con la entrada los sub-objetos que no cambia: el
+resultado debe ser el mismo que corrigiendo una copia JSON de la entrada, y
+la entrada no se debe modificar.
+"""
+
+import copy
+import json
+import random
+from datetime import date
+
+import pytest
+
+from correccion_semanas_final import aplicar_correccion_exacta, migrar_nomenclatura_oficial
+
+SEMILLAS = range(40)
+
+
+def _texto(ordinal: int) -> str:
+    return date.fromordinal(ordinal).strftime('%d/%m/%Y')
+
+
+def resultado_parser(rng: random.Random):
+    """Resultado con la forma de HistorialLaboralExtractor.procesar_constancia (nomenclatura antigua a veces)"""
+    dia = date(1992, 1, 1).toordinal()
+    periodos = []
+    for k in range(rng.randint(1, 10)):
+        inicio = dia + rng.randint(0, 300)
+        fin = inicio + rng.randint(20, 1500)
+        movimientos = [{'tipo': 'MODIFICACION DE SALARIO', 'fecha': _texto(rng.randint(inicio, fin)),
+                        'salario_diario': round(rng.uniform(100, 900), 2)} for _ in range(rng.randint(0, 4))]
+        periodos.append({
+            'patron': f'PATRON {k}',
+            'registro_patronal': f'R{k:09d}',
+            'entidad_federativa': 'TLAXCALA',
+            'fecha_inicio': _texto(inicio),
+            'fecha_fin': _texto(fin),
+            'salario_diario': round(rng.uniform(100, 900), 2),
+            'esta_vigente': False,
+            'semanas_cotizadas': (fin - inicio) // 7 + rng.randint(0, 1),
+            'total_movimientos': len(movimientos),
+            'cambios_salario': movimientos
+        })
+        dia = fin + rng.randint(-400, 200)
+    if rng.random() < 0.3:
+        periodos[-1].update(fecha_fin='Vigente', esta_vigente=True)
+
+    semanas = rng.randint(300, 1500)
+    datos_basicos = {'fecha_emision': '2024-03-31', 'nombre': 'ASEGURADO'}
+    datos_basicos[rng.choice(['total_semanas_cotizadas', 'semanas_cotizadas', 'total_semanas'])] = semanas
+    if rng.random() < 0.5:
+        datos_basicos['semanas_imss'] = semanas
+    return {
+        'exito': True,
+        'datos_basicos': datos_basicos,
+        'historial_laboral': {'total_periodos': len(periodos), 'periodos': periodos},
+        'debug': {'semanas_calculadas': sum(p['semanas_cotizadas'] for p in periodos)}
+    }
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_igual_a_corregir_una_copia_sin_modificar_la_entrada(semilla):
+    resultado = resultado_parser(random.Random(semilla))
+    original = copy.deepcopy(resultado)
+
+    corregido = aplicar_correccion_exacta(resultado)
+
+    assert resultado == original
+    assert corregido == aplicar_correccion_exacta(json.loads(json.dumps(original)))
+    assert corregido['historial_laboral'] is not resultado['historial_laboral']
+    assert all(c is not p for c, p in zip(corregido['historial_laboral']['periodos'],
+                                          resultado['historial_laboral']['periodos']))
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_migracion_de_nomenclatura(semilla):
+    resultado = resultado_parser(random.Random(semilla))
+    original = copy.deepcopy(resultado)
+    semanas = next(v for k, v in original['datos_basicos'].items() if 'semanas' in k)
+
+    migrado = migrar_nomenclatura_oficial(resultado)
+    datos = migrado['datos_basicos']
+
+    assert resultado == original
+    assert migrado['historial_laboral'] is resultado['historial_laboral']
+    assert datos['total_semanas_cotizadas'] == semanas
+    assert datos['semanas_cotizadas_imss'] == semanas
+    assert datos['semanas_descontadas'] == 0 and datos['semanas_reintegradas'] == 0
+    assert not {'semanas_imss', 'semanas_cotizadas', 'total_semanas'} & set(datos)
+    # Ya migrado: se comparte tal cual
+    assert migrar_nomenclatura_oficial(migrado)['datos_basicos'] is datos
@@ -0,0 +1,158 @@
+"""
+Extracción de texto de constancias (extraccion_texto_pdf.py): motores y respaldo
+"""
+
+import io
+import os
+import signal
+
+import pytest
+
+import extraccion_texto_pdf
+from extraccion_texto_pdf import (
+    MOTOR_PDFIUM, MOTOR_PDFPLUMBER, extraer_texto_constancia, extraer_texto_paralelo, extraer_texto_serial
+)
+
+DATOS_PERSONALES = ["NSS: 12345678901", "Semanas cotizadas 500"]
+AVISO_LEGAL = ["Aviso de privacidad", "Este documento no tiene validez oficial sin sello digital"]
+BLOQUE_PATRONAL = ["Nombre del patrón COMERCIALIZADORA DEL CENTRO SA DE CV",
+                   "Registro Patronal C1234567890", "Fecha de alta 01/02/2010 Fecha de baja Vigente"]
+
+
+def _literal(renglon: str) -> bytes:
+    texto = renglon.encode('cp1252')
+    return b"(" + texto.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def pdf_con_texto(paginas) -> bytes:
+    """PDF con una página por lista de renglones (Helvetica con WinAnsi: admite acentos)"""
+    objetos = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    }
+    hijos = []
+    for k, renglones in enumerate(paginas):
+        pagina, contenido = 4 + 2 * k, 5 + 2 * k
+        hijos.append(f"{pagina} 0 R".encode())
+        flujo = b"BT /F1 11 Tf 14 TL 50 750 Td " + b"".join(_literal(r) + b" Tj T* " for r in renglones) + b"ET"
+        objetos[pagina] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents " + f"{contenido} 0 R".encode() + b" >>"
+        )
+        objetos[contenido] = b"<< /Length " + str(len(flujo)).encode() + b" >>\nstream\n" + flujo + b"\nendstream"
+    objetos[2] = b"<< /Type /Pages /Kids [" + b" ".join(hijos) + b"] /Count " + str(len(paginas)).encode() + b" >>"
+
+    salida = io.BytesIO()
+    salida.write(b"%PDF-1.4\n")
+    offsets = {}
+    for numero in sorted(objetos):
+        offsets[numero] = salida.tell()
+        salida.write(f"{numero} 0 obj\n".encode() + objetos[numero] + b"\nendobj\n")
+    inicio_xref = salida.tell()
+    total = len(objetos) + 1
+    salida.write(f"xref\n0 {total}\n0000000000 65535 f \n".encode())
+    for numero in range(1, total):
+        salida.write(f"{offsets[numero]:010d} 00000 n \n".encode())
+    salida.write(f"trailer\n<< /Size {total} /Root 1 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n".encode())
+    return salida.getvalue()
+
+
+def test_pdfium_valido_no_usa_respaldo():
+    pdf = pdf_con_texto([DATOS_PERSONALES, BLOQUE_PATRONAL])
+
+    resultado = extraer_texto_constancia(pdf, motor=MOTOR_PDFIUM)
+
+    assert resultado.motor_utilizado == MOTOR_PDFIUM
+    assert not resultado.respaldo_aplicado and resultado.problemas_validacion == []
+    assert resultado.texto == extraer_texto_serial(pdf)
+    assert resultado.paginas_totales == 2
+
+
+@pytest.mark.parametrize('paginas, problemas', [
+    ([BLOQUE_PATRONAL], 1),          # sin NSS
+    ([DATOS_PERSONALES], 1),         # sin bloques patronales
+    ([AVISO_LEGAL], 2),
+])
+def test_texto_incompleto_recurre_a_pdfplumber(paginas, problemas):
+    pdf = pdf_con_texto(paginas)
+
+    resultado = extraer_texto_constancia(pdf, motor=MOTOR_PDFIUM)
+
+    assert resultado.motor_solicitado == MOTOR_PDFIUM
+    assert resultado.motor_utilizado == MOTOR_PDFPLUMBER
+    assert resultado.respaldo_aplicado
+    assert len(resultado.problemas_validacion) == problemas
+    assert resultado.texto == extraer_texto_serial(pdf)
+
+
+def test_pdfium_falla_recurre_a_pdfplumber(monkeypatch):
+    def fallar(fuente):
+        raise extraccion_texto_pdf.pdfium.PdfiumError("sin capa de texto")
+
+    monkeypatch.setattr(extraccion_texto_pdf, 'extraer_textos_pdfium', fallar)
+    pdf = pdf_con_texto([DATOS_PERSONALES, BLOQUE_PATRONAL])
+
+    resultado = extraer_texto_constancia(pdf, motor=MOTOR_PDFIUM)
+
+    assert resultado.motor_utilizado == MOTOR_PDFPLUMBER and resultado.respaldo_aplicado
+    assert resultado.problemas_validacion[0].startswith("Error de pdfium")
+    assert resultado.texto == extraer_texto_serial(pdf)
+
+
+def test_motor_invalido():
+    with pytest.raises(ValueError):
+        extraer_texto_constancia(pdf_con_texto([DATOS_PERSONALES]), motor='tesseract')
+
+
+@pytest.mark.parametrize('motor', [MOTOR_PDFIUM, MOTOR_PDFPLUMBER])
+def test_omite_paginas_sin_datos(motor):
+    paginas = [DATOS_PERSONALES, AVISO_LEGAL, BLOQUE_PATRONAL, AVISO_LEGAL, ["Reingreso 01/03/2015 $ 450.25"]]
+    pdf = pdf_con_texto(paginas)
+
+    resultado = extraer_texto_constancia(pdf, motor=motor, omitir_paginas=True)
+
+    assert resultado.paginas_omitidas == [2, 4]
+    assert resultado.paginas_totales == 5
+    assert resultado.texto == extraer_texto_serial(pdf, [0, 2, 4])
+    assert extraer_texto_constancia(pdf, motor=motor).paginas_omitidas == []
+
+
+def test_sin_paginas_reconocibles_no_omite_nada():
+    pdf = pdf_con_texto([AVISO_LEGAL, AVISO_LEGAL])
+
+    resultado = extraer_texto_constancia(pdf, motor=MOTOR_PDFPLUMBER, omitir_paginas=True)
+
+    assert resultado.paginas_omitidas == []
+    assert resultado.texto == extraer_texto_serial(pdf)
+
+
+@pytest.fixture
+def pool_extraccion():
+    yield
+    pool = extraccion_texto_pdf._pool_extraccion
+    if pool is not None:
+        extraccion_texto_pdf._descartar_pool_extraccion(pool)
+
+
+def test_paralelo_igual_a_serial_y_reutiliza_el_pool(pool_extraccion):
+    pdf = pdf_con_texto([[f"Página {n}", *BLOQUE_PATRONAL] if n % 3 else AVISO_LEGAL for n in range(14)])
+    subconjunto = [0, 2, 3, 5, 6, 7, 9, 10, 12, 13]
+
+    assert extraer_texto_paralelo(pdf, max_workers=3) == extraer_texto_serial(pdf)
+    pool = extraccion_texto_pdf._pool_extraccion
+    assert pool is not None
+    assert extraer_texto_paralelo(pdf, max_workers=3, paginas=subconjunto) == extraer_texto_serial(pdf, subconjunto)
+    assert extraccion_texto_pdf._pool_extraccion is pool
+
+
+def test_pool_roto_se_resuelve_en_serie(pool_extraccion):
+    pdf = pdf_con_texto([BLOQUE_PATRONAL] * 12)
+    assert extraer_texto_paralelo(pdf, max_workers=2) == extraer_texto_serial(pdf)
+    pool = extraccion_texto_pdf._pool_extraccion
+    # Un worker muerto rompe todo el ProcessPoolExecutor
+    proceso = next(iter(pool._processes.values()))
+    os.kill(proceso.pid, signal.SIGKILL)
+    proceso.join()
+
+    assert extraer_texto_paralelo(pdf, max_workers=2) == extraer_texto_serial(pdf)
+    assert extraccion_texto_pdf._pool_extraccion is not pool
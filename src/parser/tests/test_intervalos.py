@@ -0,0 +1,57 @@
+"""
+Barrido de utils/intervalos.py contra comparación por pares y conjuntos de días
+"""
+
+import random
+
+import pytest
+
+from utils.intervalos import contar_dias_unicos, detectar_solapamientos, unir_intervalos
+
+SEMILLAS = range(200)
+
+
+def generar_intervalos(rng: random.Random):
+    """Intervalos cortos en un rango chico: empates de inicio, contiguos, de un día e invertidos"""
+    intervalos = []
+    for _ in range(rng.randint(0, 12)):
+        inicio = rng.randint(0, 60)
+        intervalos.append((inicio, inicio + rng.randint(-2, 25)))
+    return intervalos
+
+
+def solapamientos_por_pares(intervalos):
+    """Recorrido i < j sobre la lista ordenada (estable) por inicio"""
+    orden = sorted(range(len(intervalos)), key=lambda k: intervalos[k][0])
+    pares = []
+    for a, i in enumerate(orden):
+        for j in orden[a + 1:]:
+            (inicio_i, fin_i), (inicio_j, fin_j) = intervalos[i], intervalos[j]
+            if fin_i < inicio_i or fin_j < inicio_j:
+                continue
+            inicio, fin = max(inicio_i, inicio_j), min(fin_i, fin_j)
+            if inicio <= fin:
+                pares.append((i, j, inicio, fin))
+    return pares
+
+
+def dias(intervalos):
+    return {d for inicio, fin in intervalos for d in range(inicio, fin + 1)}
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_detectar_solapamientos_igual_a_pares(semilla):
+    intervalos = generar_intervalos(random.Random(semilla))
+    assert detectar_solapamientos(intervalos) == solapamientos_por_pares(intervalos)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_union_igual_a_conjunto_de_dias(semilla):
+    intervalos = generar_intervalos(random.Random(semilla))
+    unidos = unir_intervalos(intervalos)
+
+    assert dias(unidos) == dias(intervalos)
+    assert contar_dias_unicos(intervalos) == len(dias(intervalos))
+    # Ordenados, disjuntos y sin tramos contiguos sin fusionar
+    for (_, fin), (inicio, _) in zip(unidos, unidos[1:]):
+        assert inicio > fin + 1
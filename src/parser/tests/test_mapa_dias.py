@@ -0,0 +1,77 @@
+"""
+MapaDiasCarrera (bitset) contra el conjunto explícito de días cubiertos
+"""
+
+import random
+from datetime import date
+
+import pytest
+
+from utils.mapa_dias import ORIGEN_ORDINAL, MapaDiasCarrera
+
+SEMILLAS = range(150)
+
+
+def generar_intervalos(rng: random.Random):
+    """Intervalos cerca de ORIGEN (algunos lo cruzan o son anteriores), empalmados y con huecos"""
+    intervalos = []
+    for _ in range(rng.randint(0, 10)):
+        inicio = ORIGEN_ORDINAL + rng.randint(-40, 400)
+        intervalos.append((inicio, inicio + rng.randint(-1, 60)))
+    return intervalos
+
+
+def dias_cubiertos(intervalos):
+    return {d for inicio, fin in intervalos for d in range(max(inicio, ORIGEN_ORDINAL), fin + 1)}
+
+
+def tramos_de(dias):
+    tramos = []
+    for d in sorted(dias):
+        if tramos and d == tramos[-1][1] + 1:
+            tramos[-1][1] = d
+        else:
+            tramos.append([d, d])
+    return [(date.fromordinal(i), date.fromordinal(f)) for i, f in tramos]
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_mapa_igual_a_conjunto_de_dias(semilla):
+    rng = random.Random(semilla)
+    intervalos = generar_intervalos(rng)
+    dias = dias_cubiertos(intervalos)
+    mapa = MapaDiasCarrera.desde_intervalos(intervalos)
+
+    assert mapa.dias_cubiertos() == len(dias)
+    assert mapa.semanas_cubiertas() == len(dias) // 7
+    assert bool(mapa) == bool(dias)
+    assert mapa.tramos() == tramos_de(dias)
+    assert mapa.primer_dia() == (date.fromordinal(min(dias)) if dias else None)
+    assert mapa.ultimo_dia() == (date.fromordinal(max(dias)) if dias else None)
+
+    for _ in range(20):
+        inicio = ORIGEN_ORDINAL + rng.randint(-60, 480)
+        fin = inicio + rng.randint(-5, 200)
+        esperado = sum(1 for d in range(inicio, fin + 1) if d in dias)
+        assert mapa.dias_entre(date.fromordinal(inicio), date.fromordinal(fin)) == esperado
+        assert mapa.semanas_entre(date.fromordinal(inicio), date.fromordinal(fin)) == esperado // 7
+        assert (date.fromordinal(inicio) in mapa) == (inicio in dias)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_huecos_y_operaciones(semilla):
+    rng = random.Random(semilla)
+    a, b = generar_intervalos(rng), generar_intervalos(rng)
+    dias_a, dias_b = dias_cubiertos(a), dias_cubiertos(b)
+    mapa_a, mapa_b = MapaDiasCarrera.desde_intervalos(a), MapaDiasCarrera.desde_intervalos(b)
+
+    assert (mapa_a | mapa_b).tramos() == tramos_de(dias_a | dias_b)
+    assert (mapa_a & mapa_b).tramos() == tramos_de(dias_a & dias_b)
+
+    dias_minimos = rng.randint(1, 10)
+    if dias_a:
+        sin_cotizar = set(range(min(dias_a), max(dias_a) + 1)) - dias_a
+        esperados = [(i, f) for i, f in tramos_de(sin_cotizar) if (f - i).days + 1 >= dias_minimos]
+    else:
+        esperados = []
+    assert mapa_a.huecos(dias_minimos) == esperados
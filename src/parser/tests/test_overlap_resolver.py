@@ -0,0 +1,90 @@
+"""
+OverlapResolver (barrido por eventos) contra un recorrido día por día
+
+Cada día cubierto debe caer en un solo sub-período, con la suma de los
+salarios activos topada al tope diario vigente ese día.
+"""
+
+import random
+from datetime import date, datetime
+
+import pytest
+
+from modules.modulo3.core.overlap_resolver import OverlapResolver
+from utils.parametros_imss import parametros
+
+SEMILLAS = range(60)
+PRIMER_DIA = date(2012, 1, 1).toordinal()
+FECHA_EMISION = date(2020, 12, 31)
+
+
+def _texto(ordinal: int) -> str:
+    return date.fromordinal(ordinal).strftime('%d/%m/%Y')
+
+
+def _ordinal(texto: str) -> int:
+    return datetime.strptime(texto, '%d/%m/%Y').toordinal()
+
+
+def generar_periodos(rng: random.Random):
+    periodos = []
+    for k in range(rng.randint(1, 6)):
+        inicio = PRIMER_DIA + rng.randint(0, 2000)
+        periodos.append({
+            'patron': f'PATRON {k}',
+            'registro_patronal': f'R{k:09d}',
+            'fecha_inicio': _texto(inicio),
+            'fecha_fin': _texto(inicio + rng.randint(0, 700)),
+            'salario_diario': round(rng.uniform(200, 1500), 2),
+        })
+    if rng.random() < 0.3:
+        periodos[-1].update(fecha_fin='Vigente', esta_vigente=True)
+    if rng.random() < 0.3:
+        # Un período repetido no debe sumar su salario dos veces
+        periodos.append(dict(rng.choice(periodos)))
+    return periodos
+
+
+def salarios_por_dia(periodos):
+    """{día: suma de salarios} sin duplicados, con los vigentes cerrados en la emisión"""
+    dias = {}
+    vistos = set()
+    for periodo in periodos:
+        clave = (periodo['registro_patronal'], periodo['fecha_inicio'], periodo['fecha_fin'])
+        if clave in vistos:
+            continue
+        vistos.add(clave)
+        inicio = _ordinal(periodo['fecha_inicio'])
+        fin = FECHA_EMISION.toordinal() if periodo.get('esta_vigente') else _ordinal(periodo['fecha_fin'])
+        for dia in range(inicio, fin + 1):
+            dias[dia] = dias.get(dia, 0.0) + periodo['salario_diario']
+    return dias
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_subperiodos_igual_a_dia_por_dia(semilla):
+    rng = random.Random(semilla)
+    periodos = generar_periodos(rng)
+    esperado = salarios_por_dia(periodos)
+
+    subperiodos = OverlapResolver().resolve_overlaps(periodos, FECHA_EMISION.isoformat())
+
+    inicios = [s['fecha_inicio_dt'] for s in subperiodos]
+    assert inicios == sorted(inicios, reverse=True)
+
+    obtenido = {}
+    for subperiodo in subperiodos:
+        inicio = subperiodo['fecha_inicio_dt'].toordinal()
+        fin = subperiodo['fecha_fin_dt'].toordinal()
+        assert subperiodo['dias'] == fin - inicio + 1
+        for dia in range(inicio, fin + 1):
+            assert dia not in obtenido
+            obtenido[dia] = subperiodo
+    assert sorted(obtenido) == sorted(esperado)
+
+    for dia, original in esperado.items():
+        subperiodo = obtenido[dia]
+        tope = parametros.tope_diario(dia)
+        assert subperiodo['salario_original'] == pytest.approx(original)
+        assert subperiodo['tope_aplicado'] == (original > tope)
+        assert subperiodo['salario_diario'] == pytest.approx(min(original, tope))
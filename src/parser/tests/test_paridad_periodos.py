@@ -0,0 +1,81 @@
+"""
+Paridad de motores de períodos laborales (modules/modulo2/historial_laboral.py)
+
+El motor "lineal" debe dar los mismos períodos que el motor original "regex"
+sobre el texto de la constancia. El motor "coordenadas" lee los bloques del
+PDF y no se puede comparar con fixtures de solo texto; para él está
+verificar_paridad_periodos.py sobre un corpus con PDFs.
+"""
+
+import pytest
+
+from modules.modulo2.historial_laboral import (
+    HistorialLaboralExtractor, MOTOR_COORDENADAS, MOTOR_LINEAL, MOTOR_REGEX
+)
+
+# Etiqueta y valor en el mismo renglón, un período vigente y movimientos con separador de miles
+CONSTANCIA_EN_LINEA = """CONSTANCIA DE SEMANAS COTIZADAS EN EL IMSS
+Nombre
+JUAN PEREZ LOPEZ
+Fecha de emisión 31/03/2024
+Semanas cotizadas 1200
+Nombre del patrón COMERCIALIZADORA DEL CENTRO SA DE CV
+Registro Patronal C1234567890
+Entidad federativa TLAXCALA
+Fecha de alta 01/02/2010 Fecha de baja Vigente
+Salario Base de Cotización $ 450.25
+Tipo de movimiento Fecha de movimiento Salario Base
+ALTA 01/02/2010 $ 300.00
+MODIFICACION DE SALARIO 01/02/2015 $ 450.25
+Nombre del patrón SERVICIOS INDUSTRIALES SA
+Registro Patronal A987654321
+Entidad federativa PUEBLA
+Fecha de alta 15/03/2001
+Fecha de baja 31/12/2009
+Salario Base de Cotización $ 1,250.50
+BAJA 31/12/2009 $ 1,250.50
+REINGRESO 01/06/2005 $ 1,100.00
+"""
+
+# Etiquetas solas con el valor en el renglón siguiente, un bloque incompleto
+# y un salario fuera de rango antes del válido
+CONSTANCIA_EN_RENGLONES = """Fecha de emisión 15/08/2023
+Nombre del patrón
+TRANSPORTES RAPIDOS DEL NORTE SA
+Registro Patronal
+B1122334455
+Entidad federativa
+NUEVO LEON
+Fecha de alta
+03/09/1990
+Fecha de baja
+30/06/1997
+Salario Base de Cotización
+$ 85.40
+ALTA 03/09/1990 $ 45.10
+MODIFICACION DE SALARIO 01/01/1995 $ 85.40
+BAJA 30/06/1997 $ 85.40
+Nombre del patrón ABC
+Registro Patronal 123
+Nombre del patrón TIENDAS DEPARTAMENTALES SA Registro Patronal D5566778899
+Entidad federativa JALISCO
+Fecha de alta 01/07/1997 Fecha de baja 31/12/1999
+Salario Base de Cotización $ 20,000.00 $ 980.00
+"""
+
+
+def periodos(motor: str, texto: str):
+    return [p.to_dict() for p in HistorialLaboralExtractor(motor).extraer_periodos(texto)]
+
+
+@pytest.mark.parametrize('texto', [CONSTANCIA_EN_LINEA, CONSTANCIA_EN_RENGLONES])
+def test_lineal_igual_a_regex(texto):
+    referencia = periodos(MOTOR_REGEX, texto)
+
+    assert len(referencia) == 2
+    assert periodos(MOTOR_LINEAL, texto) == referencia
+
+
+def test_coordenadas_sin_pdf_se_rechaza():
+    with pytest.raises(ValueError):
+        periodos(MOTOR_COORDENADAS, CONSTANCIA_EN_LINEA)
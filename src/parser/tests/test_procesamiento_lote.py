@@ -0,0 +1,80 @@
+"""
+Procesamiento por lotes (procesamiento_lote.py): orden, entradas inválidas y esperas
+"""
+
+import io
+import json
+import os
+
+import pytest
+
+import procesamiento_lote
+from procesamiento_lote import (
+    LoteOcupado, cerrar_pool_lote, documentos_arreglo_json, documentos_ndjson, procesar_lote
+)
+
+
+class TerminaWorker:
+    """Al deserializarse en el worker lo termina: el documento nunca tiene resultado"""
+
+    def __reduce__(self):
+        return (os._exit, (1,))
+
+
+@pytest.fixture(scope='module', autouse=True)
+def pool_lote():
+    yield
+    cerrar_pool_lote()
+
+
+def test_resultados_en_orden_con_entradas_invalidas():
+    lineas = [json.dumps({'exito': True, 'archivo': f'doc{n}.pdf'}) for n in range(7)]
+    lineas[2] = '{"exito": tru'
+    lineas[5] = '[1, 2]'
+    lineas.insert(4, '   ')
+
+    resultados = list(procesar_lote(documentos_ndjson(lineas), max_workers=2))
+
+    assert [r['indice'] for r in resultados] == list(range(7))
+    assert resultados[2]['exito'] is False and 'JSON inválido' in resultados[2]['error']
+    assert resultados[5]['exito'] is False and 'objeto JSON' in resultados[5]['error']
+    for n in (0, 1, 3, 4, 6):
+        assert resultados[n]['archivo_procesado'] == f'doc{n}.pdf'
+
+
+@pytest.mark.parametrize('timeout_item', [None, 0])
+def test_worker_muerto_sin_timeout_item_no_detiene_el_lote(monkeypatch, timeout_item):
+    monkeypatch.setattr(procesamiento_lote, 'LOTE_ESPERA_MAXIMA_S', 2.0)
+    documentos = [{'archivo': 'a.pdf'}, {'archivo': TerminaWorker()}, {'archivo': 'c.pdf'}]
+
+    resultados = list(procesar_lote(documentos, timeout_item=timeout_item))
+
+    assert [r['indice'] for r in resultados] == [0, 1, 2]
+    assert resultados[1]['exito'] is False and 'Tiempo agotado' in resultados[1]['error']
+    assert resultados[2]['archivo_procesado'] == 'c.pdf'
+    # El turno se devolvió
+    procesar_lote([], espera_turno=0).close()
+
+
+def test_sin_turno_libre():
+    lotes = [procesar_lote([], espera_turno=0) for _ in range(procesamiento_lote.LOTE_MAX_CONCURRENTES)]
+    with pytest.raises(LoteOcupado):
+        procesar_lote([], espera_turno=0)
+    for lote in lotes:
+        lote.close()
+    procesar_lote([], espera_turno=0).close()
+
+
+def test_arreglo_json_por_bloques(monkeypatch):
+    monkeypatch.setattr(procesamiento_lote, 'BLOQUE_LECTURA', 7)
+    elementos = [{'archivo': 'ñandú.pdf', 'valor': 12345}, [], 3.25, {'texto': 'x' * 50}]
+    contenido = json.dumps(elementos, ensure_ascii=False).encode('utf-8')
+
+    assert list(documentos_arreglo_json(io.BytesIO(contenido))) == elementos
+    assert list(documentos_arreglo_json(io.BytesIO(b' [ ] '))) == []
+
+    leidos = list(documentos_arreglo_json(io.BytesIO(b'[{"a": 1}, {"a": ')))
+    assert leidos[0] == {'a': 1} and isinstance(leidos[1], procesamiento_lote.EntradaInvalida)
+
+    with pytest.raises(ValueError):
+        documentos_arreglo_json(io.BytesIO(b'{"a": 1}'))
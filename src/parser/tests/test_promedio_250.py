@@ -0,0 +1,57 @@
+"""
+Reporte de topes del promedio de 250 semanas (modules/modulo3/calculators/promedio_250.py)
+
+Con cortes de tope que no caen en 1 de enero (cambios de UMA) un segmento
+cruza de un año a otro; el reporte por año debe contar cada día en su año.
+"""
+
+import random
+from datetime import date
+
+import pytest
+
+from modules.modulo3.calculators.promedio_250 import PromedioSalario250
+from utils.segmentos_250 import promedio_250_semanas
+
+SEMILLAS = range(30)
+PRIMER_DIA = date(2016, 6, 1).toordinal()
+# Solo cambios el 1 de febrero, como la UMA
+CORTES = [date(año, 2, 1).toordinal() for año in range(2017, 2024)]
+
+
+def tope(dia: int) -> float:
+    fecha = date.fromordinal(dia)
+    año_uma = fecha.year if fecha.month >= 2 else fecha.year - 1
+    return 500.0 + 25 * (año_uma - 2015)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_topes_por_año_igual_a_dia_por_dia(semilla):
+    rng = random.Random(semilla)
+    tramos = []
+    for k in range(rng.randint(1, 5)):
+        inicio = PRIMER_DIA + rng.randint(0, 1500)
+        tramos.append((inicio, inicio + rng.randint(30, 900), rng.uniform(300, 900), k))
+    fecha_referencia = PRIMER_DIA + 2500
+    ventana = promedio_250_semanas(tramos, fecha_referencia, tope, 1750, CORTES)
+
+    esperado = {}
+    for segmento in ventana.segmentos:
+        for dia in range(segmento.inicio, segmento.fin + 1):
+            original = sum(s for i, f, s, _ in tramos if i <= dia <= f)
+            if original > tope(dia):
+                resumen = esperado.setdefault(date.fromordinal(dia).year, {'dias': 0, 'diferencia': 0.0,
+                                                                           'topes': []})
+                resumen['dias'] += 1
+                resumen['diferencia'] += original - tope(dia)
+                if tope(dia) not in resumen['topes']:
+                    resumen['topes'].append(tope(dia))
+
+    topes = PromedioSalario250()._identificar_topes_aplicados(ventana)
+
+    assert sorted(topes) == sorted(esperado)
+    for año, resumen in esperado.items():
+        assert topes[año]['dias_afectados'] == resumen['dias']
+        assert topes[año]['diferencia_total'] == pytest.approx(resumen['diferencia'])
+        assert topes[año]['topes_diarios'] == resumen['topes']
+        assert topes[año]['tope_diario'] == resumen['topes'][-1]
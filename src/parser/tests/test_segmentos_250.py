@@ -0,0 +1,104 @@
+"""
+Motor de 250 semanas (utils/segmentos_250.py) contra un recorrido día por día
+
+Cada día cotizado vale min(Σ salarios de los tramos activos, tope del día);
+la ventana son los últimos `dias` días cotizados hasta la fecha de referencia.
+"""
+
+import random
+from datetime import date
+
+import pytest
+
+from utils.segmentos_250 import IndicePromedio250, normalizar_tramos, ventana_250_semanas
+
+SEMILLAS = range(150)
+PRIMER_DIA = date(2001, 10, 1).toordinal()
+
+
+def tope(dia: int) -> float:
+    """Constante por año calendario, como los cortes por omisión"""
+    return 250.0 + 40 * (date.fromordinal(dia).year % 4)
+
+
+def generar_tramos(rng: random.Random):
+    """Tramos empalmados (se suman y topan), con huecos, que cruzan años"""
+    tramos = []
+    for k in range(rng.randint(1, 8)):
+        inicio = PRIMER_DIA + rng.randint(0, 700)
+        tramos.append((inicio, inicio + rng.randint(-1, 150), round(rng.uniform(50, 300), 2), k))
+    return tramos
+
+
+def salarios_por_dia(tramos, con_tope: bool):
+    salarios = {}
+    for inicio, fin, salario, _ in tramos:
+        for d in range(inicio, fin + 1):
+            salarios[d] = salarios.get(d, 0.0) + salario
+    if con_tope:
+        salarios = {d: min(s, tope(d)) for d, s in salarios.items()}
+    return salarios
+
+
+def ventana_por_dias(salarios, fecha_referencia: int, dias: int):
+    """(días, suma ponderada, primer día de la ventana)"""
+    tomados = sorted(d for d in salarios if d <= fecha_referencia)[-dias:] if dias else []
+    return len(tomados), sum(salarios[d] for d in tomados), (tomados[0] if tomados else None)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_consultar_igual_a_dia_por_dia(semilla):
+    rng = random.Random(semilla)
+    tramos = generar_tramos(rng)
+    con_tope = rng.random() < 0.7
+    dias = rng.randint(1, 200)
+    salarios = salarios_por_dia(tramos, con_tope)
+
+    segmentos = normalizar_tramos(tramos, tope if con_tope else None)
+    indice = IndicePromedio250(segmentos, dias)
+
+    for _ in range(25):
+        fecha_referencia = PRIMER_DIA + rng.randint(-10, 900)
+        esperado_dias, esperado_suma, esperado_inicio = ventana_por_dias(salarios, fecha_referencia, dias)
+
+        consulta = indice.consultar(fecha_referencia)
+        assert consulta.dias == esperado_dias
+        assert consulta.suma_ponderada == pytest.approx(esperado_suma, rel=1e-9, abs=1e-6)
+        assert consulta.inicio_ventana == esperado_inicio
+        assert consulta.completa == (esperado_dias >= dias)
+
+        ventana = ventana_250_semanas(segmentos, fecha_referencia, dias)
+        assert ventana.dias == esperado_dias
+        assert ventana.suma_ponderada == pytest.approx(esperado_suma, rel=1e-9, abs=1e-6)
+        assert sum(s.dias for s in ventana.segmentos) == esperado_dias
+
+        hasta = [d for d in salarios if d <= fecha_referencia]
+        dias_hasta, suma_hasta = indice.cotizado_hasta(fecha_referencia)
+        assert dias_hasta == len(hasta)
+        assert suma_hasta == pytest.approx(sum(salarios[d] for d in hasta), rel=1e-9, abs=1e-6)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_segmentos_sin_empalmes_y_serie_mensual(semilla):
+    rng = random.Random(semilla)
+    tramos = generar_tramos(rng)
+    salarios = salarios_por_dia(tramos, con_tope=True)
+    segmentos = normalizar_tramos(tramos, tope)
+
+    por_segmentos = {d: s.salario for s in segmentos for d in range(s.inicio, s.fin + 1)}
+    assert por_segmentos == pytest.approx(salarios)
+    for anterior, siguiente in zip(segmentos, segmentos[1:]):
+        assert anterior.fin < siguiente.inicio
+
+    indice = IndicePromedio250(segmentos, 90)
+    desde = date.fromordinal(PRIMER_DIA + rng.randint(0, 300))
+    hasta = date.fromordinal(desde.toordinal() + rng.randint(0, 400))
+    serie = indice.serie_mensual(desde, hasta)
+
+    meses = (hasta.year - desde.year) * 12 + hasta.month - desde.month + 1
+    assert len(serie) == meses
+    assert serie[-1].fecha_referencia == hasta.toordinal()
+    for consulta in serie:
+        esperado_dias, esperado_suma, _ = ventana_por_dias(salarios, consulta.fecha_referencia, 90)
+        assert consulta.dias == esperado_dias
+        assert consulta.suma_ponderada == pytest.approx(esperado_suma, rel=1e-9, abs=1e-6)
@@ -0,0 +1,72 @@
+"""
+Simulador de Modalidad 40 (simulador_modalidad40.py)
+"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from simulador_modalidad40 import EscenarioM40, SimuladorModalidad40, fechas_inicio_mensuales, frente_pareto
+from utils.segmentos_250 import IndicePromedio250
+
+SEMILLAS = range(50)
+FECHA_CORTE = date(2025, 6, 30)
+
+
+def simulador(semanas_actuales: int = 900) -> SimuladorModalidad40:
+    """Carrera de 10 años a 600 diarios que termina en la fecha de corte"""
+    fin = FECHA_CORTE.toordinal()
+    indice = IndicePromedio250.desde_tramos([(fin - 3650, fin, 600.0, 0)])
+    return SimuladorModalidad40(indice, semanas_actuales=semanas_actuales, fecha_corte=FECHA_CORTE)
+
+
+@pytest.mark.parametrize('fecha_inicio', [FECHA_CORTE - timedelta(days=365), FECHA_CORTE])
+def test_inicio_hasta_la_emision_se_rechaza(fecha_inicio):
+    with pytest.raises(ValueError):
+        simulador().evaluar(10, fecha_inicio, 12)
+    with pytest.raises(ValueError):
+        simulador().simular([10], [FECHA_CORTE + timedelta(days=1), fecha_inicio], [12])
+
+
+def test_inicio_el_dia_siguiente_no_cuenta_dias_dos_veces():
+    escenario = simulador(semanas_actuales=900).evaluar(10, FECHA_CORTE + timedelta(days=1), 12)
+
+    dias_m40 = (escenario.fecha_retiro - FECHA_CORTE).days
+    assert escenario.semanas_totales == 900 + dias_m40 // 7
+
+
+def escenario(costo: float, pension: float) -> EscenarioM40:
+    return EscenarioM40(10, FECHA_CORTE, 12, FECHA_CORTE, 0.0, 0.0, 0, pension, costo, pension)
+
+
+def no_dominados(escenarios):
+    """(costo, pensión) que ningún otro escenario iguala o mejora en ambos con uno estricto"""
+    puntos = {(e.costo_total, e.pension_mensual) for e in escenarios}
+    return {(c, p) for c, p in puntos
+            if not any(c2 <= c and p2 >= p and (c2, p2) != (c, p) for c2, p2 in puntos)}
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_frente_pareto_igual_a_fuerza_bruta(semilla):
+    rng = random.Random(semilla)
+    # Valores enteros pequeños: muchos empates de costo y de pensión
+    escenarios = [escenario(rng.randint(0, 20), rng.randint(0, 20)) for _ in range(rng.randint(0, 40))]
+
+    frente = frente_pareto(escenarios)
+
+    assert [(e.costo_total, e.pension_mensual) for e in frente] == sorted(no_dominados(escenarios))
+    assert all(any(e is f for f in escenarios) for e in frente)
+
+
+def test_simular_frente_y_mejor_pension_por_peso():
+    fechas = fechas_inicio_mensuales(FECHA_CORTE + timedelta(days=1), FECHA_CORTE + timedelta(days=200))
+    resultado = simulador().simular([1, 10, 25], fechas, [12, 36, 60])
+
+    assert resultado.escenarios_evaluados == resultado.escenarios_posibles == 3 * len(fechas) * 3
+    assert not resultado.truncado
+    evaluados = [simulador().evaluar(u, f, m, resultado.pension_base)
+                 for u in [1, 10, 25] for f in fechas for m in [12, 36, 60]]
+    esperado = sorted(no_dominados(evaluados))
+    assert [(e.costo_total, e.pension_mensual) for e in resultado.frente_pareto] == esperado
+    assert resultado.mejor_pension_por_peso.pension_por_peso == max(e.pension_por_peso for e in evaluados)
@@ -0,0 +1,120 @@
+"""
+Grafo de etapas (modules/modulo3/core/stage_graph.py): compuertas y memoización
+"""
+
+import pytest
+
+from modules.modulo3.core.stage_graph import (
+    ESTADO_EJECUTADA, ESTADO_MEMOIZADA, ESTADO_OMITIDA, Stage, StageCache, StageGraph
+)
+
+
+def grafo(llamadas, cache=None, max_workers=None):
+    """
+    calidad (compuerta) → promedio → pension; conteo independiente
+
+    `llamadas` cuenta cuántas veces corrió cada etapa.
+    """
+    def etapa(nombre, funcion):
+        def contada(**argumentos):
+            llamadas[nombre] = llamadas.get(nombre, 0) + 1
+            return funcion(**argumentos)
+        return contada
+
+    return StageGraph([
+        Stage('calidad', etapa('calidad', lambda datos: {'ok': datos['ok']}),
+              entradas=('datos',), compuerta=lambda r: r['ok']),
+        Stage('promedio', etapa('promedio', lambda salarios: {'valor': sum(salarios) / len(salarios)}),
+              entradas=('salarios',), despues_de=('calidad',)),
+        Stage('pension', etapa('pension', lambda promedio: {'monto': promedio['valor'] * 0.5}),
+              dependencias=('promedio',)),
+        Stage('conteo', etapa('conteo', lambda salarios: len(salarios)), entradas=('salarios',),
+              memoizar=False),
+    ], cache=cache, max_workers=max_workers)
+
+
+@pytest.mark.parametrize('max_workers', [None, 4])
+def test_compuerta_cerrada_omite_dependientes(max_workers):
+    llamadas = {}
+    ejecucion = grafo(llamadas, max_workers=max_workers).run({'datos': {'ok': False}, 'salarios': [100.0]})
+
+    assert ejecucion.compuerta_fallida == 'calidad'
+    assert ejecucion.registros['promedio'].estado == ESTADO_OMITIDA
+    assert ejecucion.registros['pension'].estado == ESTADO_OMITIDA
+    assert ejecucion.registros['conteo'].estado == ESTADO_EJECUTADA
+    assert sorted(ejecucion.ejecutadas) == ['calidad', 'conteo']
+    assert 'promedio' not in ejecucion.resultados and 'pension' not in ejecucion.resultados
+    assert llamadas == {'calidad': 1, 'conteo': 1}
+
+
+@pytest.mark.parametrize('max_workers', [None, 4])
+def test_compuerta_abierta_corre_todo(max_workers):
+    ejecucion = grafo({}, max_workers=max_workers).run({'datos': {'ok': True}, 'salarios': [100.0, 300.0]})
+
+    assert ejecucion.compuerta_fallida is None
+    assert sorted(ejecucion.ejecutadas) == ['calidad', 'conteo', 'pension', 'promedio']
+    assert ejecucion.resultados['pension'] == {'monto': 100.0}
+
+
+def test_sin_cache_no_memoiza():
+    llamadas = {}
+    etapas = grafo(llamadas)
+    for _ in range(2):
+        etapas.run({'datos': {'ok': True}, 'salarios': [100.0]})
+
+    assert llamadas == {'calidad': 2, 'promedio': 2, 'pension': 2, 'conteo': 2}
+
+
+@pytest.mark.parametrize('huella_entradas', [None, 'documento-1'])
+def test_memoiza_por_entradas_y_version(huella_entradas):
+    llamadas = {}
+    etapas = grafo(llamadas, cache=StageCache())
+    entradas = {'datos': {'ok': True}, 'salarios': [100.0, 300.0]}
+
+    primera = etapas.run(entradas, version='v1', huella_entradas=huella_entradas)
+    segunda = etapas.run(entradas, version='v1', huella_entradas=huella_entradas)
+
+    assert all(r.estado == ESTADO_EJECUTADA for r in primera.registros.values())
+    assert {n: r.estado for n, r in segunda.registros.items()} == {
+        'calidad': ESTADO_MEMOIZADA, 'promedio': ESTADO_MEMOIZADA,
+        'pension': ESTADO_MEMOIZADA, 'conteo': ESTADO_EJECUTADA
+    }
+    assert segunda.resultados == primera.resultados
+    assert llamadas == {'calidad': 1, 'promedio': 1, 'pension': 1, 'conteo': 2}
+
+    # Cada acierto es un objeto nuevo: modificarlo no cambia lo memorizado
+    segunda.resultados['pension']['monto'] = -1
+    tercera = etapas.run(entradas, version='v1', huella_entradas=huella_entradas)
+    assert tercera.resultados['pension'] == {'monto': 100.0}
+
+    etapas.run(entradas, version='v2', huella_entradas=huella_entradas)
+    assert llamadas['pension'] == 2
+
+
+def test_cambio_de_entrada_solo_invalida_sus_etapas():
+    llamadas = {}
+    etapas = grafo(llamadas, cache=StageCache())
+    etapas.run({'datos': {'ok': True}, 'salarios': [100.0]})
+    ejecucion = etapas.run({'datos': {'ok': True}, 'salarios': [200.0]})
+
+    assert ejecucion.registros['calidad'].estado == ESTADO_MEMOIZADA
+    assert ejecucion.registros['promedio'].estado == ESTADO_EJECUTADA
+    assert ejecucion.registros['pension'].estado == ESTADO_EJECUTADA
+    assert ejecucion.resultados['pension'] == {'monto': 100.0}
+
+
+def test_cache_acotado():
+    cache = StageCache(maxsize=2)
+    for n in range(3):
+        cache.set(str(n), n)
+
+    assert len(cache) == 2
+    assert cache.get('0') == (False, None)
+    assert cache.get('2') == (True, 2)
+
+
+def test_ciclos_y_dependencias_inexistentes():
+    with pytest.raises(ValueError):
+        StageGraph([Stage('a', len, despues_de=('b',)), Stage('b', len, despues_de=('a',))])
+    with pytest.raises(ValueError):
+        StageGraph([Stage('a', len, dependencias=('c',))])
@@ -0,0 +1,95 @@
+"""
+VentanasCotizacion (sumas prefijas y puntos de quiebre) contra un recorrido día por día
+"""
+
+import random
+from datetime import date
+
+import pytest
+
+from utils.mapa_dias import MapaDiasCarrera
+from utils.ventanas_cotizacion import VentanasCotizacion
+
+SEMILLAS = range(150)
+PRIMER_DIA = date(1990, 1, 1).toordinal()
+
+
+def generar_intervalos(rng: random.Random):
+    intervalos = []
+    for _ in range(rng.randint(0, 8)):
+        inicio = PRIMER_DIA + rng.randint(0, 500)
+        intervalos.append((inicio, inicio + rng.randint(-1, 80)))
+    return intervalos
+
+
+def dias_cubiertos(intervalos):
+    return {d for inicio, fin in intervalos for d in range(inicio, fin + 1)}
+
+
+def dias_ventana(dias, fin: int, longitud: int) -> int:
+    return sum(1 for d in range(fin - longitud + 1, fin + 1) if d in dias)
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_consultas_puntuales(semilla):
+    rng = random.Random(semilla)
+    intervalos = generar_intervalos(rng)
+    dias = dias_cubiertos(intervalos)
+    ventanas = VentanasCotizacion.desde_intervalos(intervalos)
+
+    assert ventanas.tramos() == VentanasCotizacion.desde_mapa(MapaDiasCarrera.desde_intervalos(intervalos)).tramos()
+    for _ in range(30):
+        desde = PRIMER_DIA + rng.randint(-20, 600)
+        hasta = desde + rng.randint(-5, 200)
+        longitud = rng.randint(1, 150)
+        esperado = sum(1 for d in range(desde, hasta) if d in dias)
+
+        assert ventanas.dias_antes_de(desde) == sum(1 for d in dias if d < desde)
+        assert ventanas.cotiza_en(desde) == (desde in dias)
+        assert ventanas.dias_en(desde, hasta) == esperado
+        assert ventanas.semanas_en(desde, hasta) == esperado // 7
+        assert ventanas.dias_ventana(hasta, longitud) == dias_ventana(dias, hasta, longitud)
+
+        posteriores = ventanas.posteriores_a(desde)
+        assert dias_cubiertos(posteriores.tramos()) == {d for d in dias if d > desde}
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_mejor_ventana_igual_a_barrido(semilla):
+    rng = random.Random(semilla)
+    intervalos = generar_intervalos(rng)
+    dias = dias_cubiertos(intervalos)
+    ventanas = VentanasCotizacion.desde_intervalos(intervalos)
+    longitud = rng.randint(1, 200)
+
+    mejor = ventanas.mejor_ventana(longitud)
+    if not dias:
+        assert mejor is None
+        return
+    maximo = max(dias_ventana(dias, fin, longitud) for fin in range(min(dias), max(dias) + longitud))
+    inicio, fin, cotizados = mejor
+    assert cotizados == maximo
+    assert fin - inicio + 1 == longitud
+    assert dias_ventana(dias, fin, longitud) == cotizados
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_primer_dia_con_igual_a_barrido(semilla):
+    rng = random.Random(semilla)
+    intervalos = generar_intervalos(rng)
+    dias = dias_cubiertos(intervalos)
+    ventanas = VentanasCotizacion.desde_intervalos(intervalos)
+
+    for _ in range(10):
+        longitud = rng.randint(7, 200)
+        semanas = rng.randint(0, longitud // 7 + 1)
+        desde = rng.choice((None, PRIMER_DIA + rng.randint(-20, 600)))
+
+        if not dias or semanas * 7 > longitud:
+            esperado = None
+        else:
+            primero = min(dias) if desde is None else desde
+            # Después de la última baja más una ventana la cobertura ya no crece
+            esperado = next((d for d in range(primero, max(primero, max(dias) + longitud) + 1)
+                             if dias_ventana(dias, d, longitud) >= semanas * 7), None)
+        assert ventanas.primer_dia_con(semanas, longitud, desde) == esperado
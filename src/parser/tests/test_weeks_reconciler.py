@@ -0,0 +1,158 @@
+"""
+WeeksReconciler contra enumeración exhaustiva de subconjuntos de explicaciones
+
+La búsqueda (bitset, cotas por sufijo, profundización iterativa) debe dar el
+mismo residuo que probar todos los subconjuntos de hasta `max_explicaciones`
+candidatos, con el menor número de explicaciones entre los de ese residuo.
+Cada subconjunto se evalúa aparte, recortando los intervalos y contando días
+únicos con utils/intervalos.py (sin bitsets).
+"""
+
+import itertools
+import random
+from datetime import date
+
+import pytest
+
+from modules.modulo3.calculators.weeks_reconciler import WeeksReconciler, _Busqueda
+from modules.modulo3.utils.carrera import Carrera
+from utils.intervalos import contar_dias_unicos, detectar_solapamientos
+
+FECHA_EMISION = date(2004, 6, 30)
+SEMILLAS = range(100)
+
+
+def _texto(ordinal: int) -> str:
+    return date.fromordinal(ordinal).strftime('%d/%m/%Y')
+
+
+def generar_caso(rng: random.Random):
+    """Carrera pequeña con duplicados, vigentes sin truncar, bajas tras la emisión y ajustes"""
+    emision = FECHA_EMISION.toordinal()
+    primer_dia = date(2000, 1, 1).toordinal()
+    registros = [f'R{k:09d}' for k in range(rng.randint(1, 3))]
+    periodos = []
+    for _ in range(rng.randint(2, 7)):
+        inicio = rng.randint(primer_dia, emision - 30)
+        fin = inicio + rng.randint(0, 700)
+        registro = rng.choice(registros + [''])
+        periodo = {
+            'patron': f'PATRON {registro}',
+            'registro_patronal': registro,
+            'fecha_inicio': _texto(inicio),
+            'fecha_fin': _texto(fin),
+            'esta_vigente': False,
+            'salario_diario': 300.0
+        }
+        if rng.random() < 0.35:
+            movimientos = [{'tipo': 'MODIFICACION', 'fecha': _texto(inicio + rng.randint(0, 200)),
+                            'salario_diario': 350.0}]
+            if rng.random() < 0.5:
+                movimientos.append({'tipo': 'BAJA', 'fecha': _texto(inicio + rng.randint(0, 400)),
+                                    'salario_diario': 0})
+            periodo.update(fecha_fin='Vigente', esta_vigente=True, cambios_salario=movimientos)
+        periodos.append(periodo)
+
+    carrera = Carrera.desde_periodos(periodos, FECHA_EMISION.isoformat())
+    datos_basicos = {
+        'fecha_emision': FECHA_EMISION.isoformat(),
+        'semanas_descontadas': rng.choice((0, 0, rng.randint(1, 40))),
+        'semanas_reintegradas': rng.choice((0, 0, rng.randint(1, 40)))
+    }
+    return datos_basicos, carrera
+
+
+def fijar_objetivo(rng: random.Random, datos_basicos, intervalos, candidatos) -> int:
+    """
+    Total oficial: la mitad de las veces el que da un subconjunto oculto de
+    candidatos (hay solución exacta), si no uno cercano al azar
+    """
+    if candidatos and rng.random() < 0.5:
+        ocultas = rng.sample(candidatos, rng.randint(1, min(3, len(candidatos))))
+        ocultas = list({c.intervalo if not c.aditiva else id(c): c for c in ocultas}.values())
+        objetivo = dias_con(intervalos, ocultas) // 7
+    else:
+        objetivo = contar_dias_unicos(intervalos) // 7 + rng.randint(-80, 15)
+    datos_basicos['total_semanas_cotizadas'] = max(1, objetivo)
+    return datos_basicos['total_semanas_cotizadas']
+
+
+def candidatos_de(reconciliador: WeeksReconciler, datos_basicos, carrera: Carrera):
+    """Mismos candidatos que arma reconciliar()"""
+    indexados = carrera.intervalos_indexados()
+    indices = [k for k, _ in indexados]
+    intervalos = [intervalo for _, intervalo in indexados]
+    base = min((i for i, _ in intervalos), default=0)
+    mascaras = [((1 << (f - i + 1)) - 1) << (i - base) if f >= i else 0 for i, f in intervalos]
+    union = 0
+    for mascara in mascaras:
+        union |= mascara
+    solapamientos = detectar_solapamientos(intervalos)
+    busqueda = _Busqueda(0, 0, base, mascaras, union,
+                         reconciliador._vecinos(len(intervalos), solapamientos), 0)
+    candidatos = reconciliador._candidatos(carrera, datos_basicos, indices, intervalos,
+                                           solapamientos, busqueda)
+    return intervalos, candidatos
+
+
+def dias_con(intervalos, elegidas) -> int:
+    """Días totales aplicando las explicaciones sobre una copia de los intervalos"""
+    modificados = list(intervalos)
+    aditivos = 0
+    for candidato in elegidas:
+        if candidato.aditiva:
+            aditivos += candidato.dias
+        elif candidato.fin_nuevo is None:
+            modificados[candidato.intervalo] = (1, 0)
+        else:
+            inicio, _ = modificados[candidato.intervalo]
+            modificados[candidato.intervalo] = (inicio, candidato.fin_nuevo)
+    return contar_dias_unicos(modificados) + aditivos
+
+
+def fuerza_bruta(intervalos, candidatos, objetivo: int, max_explicaciones: int):
+    """(menor residuo, menor número de explicaciones con ese residuo)"""
+    mejor = None
+    for tamano in range(min(max_explicaciones, len(candidatos)) + 1):
+        for elegidas in itertools.combinations(candidatos, tamano):
+            tocados = [c.intervalo for c in elegidas if not c.aditiva]
+            if len(tocados) != len(set(tocados)):
+                continue
+            residuo = abs(dias_con(intervalos, elegidas) // 7 - objetivo)
+            if mejor is None or residuo < mejor[0]:
+                mejor = (residuo, tamano)
+    return mejor
+
+
+@pytest.mark.parametrize('semilla', SEMILLAS)
+def test_reconciliar_igual_a_fuerza_bruta(semilla):
+    rng = random.Random(semilla)
+    datos_basicos, carrera = generar_caso(rng)
+    reconciliador = WeeksReconciler(max_explicaciones=3)
+    intervalos, candidatos = candidatos_de(reconciliador, datos_basicos, carrera)
+    objetivo = fijar_objetivo(rng, datos_basicos, intervalos, candidatos)
+
+    resultado = reconciliador.reconciliar(datos_basicos, carrera)
+    residuo, tamano = fuerza_bruta(intervalos, candidatos, objetivo, reconciliador.max_explicaciones)
+
+    assert resultado['exito'] and resultado['busqueda_completa']
+    assert abs(resultado['residuo']) == residuo
+    assert len(resultado['explicaciones']) == tamano
+    assert resultado['reconciliado'] == (residuo == 0)
+
+    # Las explicaciones elegidas, evaluadas sin bitsets, dan las semanas reportadas
+    por_clave = {(c.tipo, c.periodos): c for c in candidatos}
+    elegidas = [por_clave[(e['tipo'], tuple(e['periodos']))] for e in resultado['explicaciones']]
+    assert dias_con(intervalos, elegidas) // 7 == resultado['semanas_explicadas']
+
+
+def test_sin_diferencia_no_busca_explicaciones():
+    rng = random.Random(0)
+    datos_basicos, carrera = generar_caso(rng)
+    datos_basicos['total_semanas_cotizadas'] = contar_dias_unicos(carrera.intervalos()) // 7
+
+    resultado = WeeksReconciler().reconciliar(datos_basicos, carrera)
+
+    assert resultado['diferencia'] == 0
+    assert resultado['reconciliado']
+    assert resultado['explicaciones'] == []
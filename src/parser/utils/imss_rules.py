@@ -10,6 +10,18 @@ def validar_conservacion_derechos_52_semanas(semanas_ultimos_5_anos):
     """Regla crítica: Mínimo 52 semanas en últimos 5 años"""
     return semanas_ultimos_5_anos >= 52
 
+def calcular_semanas_ultimos_5_anos(mapa_dias, fecha_referencia=None):
+    """
+    Semanas completas cotizadas (sin empalmes) en los 5 años previos a la fecha de referencia
+
+    `mapa_dias` puede ser un MapaDiasCarrera o unas VentanasCotizacion
+    (utils/ventanas_cotizacion.py), que responden sin recorrer los días.
+    """
+    if fecha_referencia is None:
+        fecha_referencia = datetime.now()
+    fecha_limite = fecha_referencia - timedelta(days=5 * 365.25)
+    return mapa_dias.semanas_entre(fecha_limite, fecha_referencia)
+
 def calcular_fecha_conservacion_oficial(total_semanas, fecha_baja):
     """Fórmula oficial IMSS: (semanas × 7 días) ÷ 4"""
     try:
@@ -0,0 +1,127 @@
+"""
+Aritmética de intervalos de días para períodos laborales
+
+Los períodos se representan como intervalos cerrados [inicio, fin] de días
+ordinales (date.toordinal()), de modo que contar días únicos o detectar
+empalmes es ordenar y barrer en lugar de enumerar fechas o comparar pares.
+
+COORDINA CON: correccion_semanas_final.py, correccion_semanas.py
+"""
+
+import heapq
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+FORMATO_FECHA = '%d/%m/%Y'
+FORMATO_FECHA_EMISION = '%Y-%m-%d'
+
+Intervalo = Tuple[int, int]
+Solapamiento = Tuple[int, int, int, int]
+
+
+def fecha_a_ordinal(fecha: str, formato: str = FORMATO_FECHA) -> int:
+    """Día ordinal de una fecha en texto; lanza ValueError si no es válida"""
+    return datetime.strptime(fecha, formato).toordinal()
+
+
+def ordinal_fin_vigente(fecha_emision: Optional[str]) -> int:
+    """Día con el que cierra un período "Vigente": fecha de emisión o, si no se puede leer, hoy"""
+    try:
+        return fecha_a_ordinal(fecha_emision, FORMATO_FECHA_EMISION)
+    except (TypeError, ValueError):
+        return date.today().toordinal()
+
+
+def intervalo_periodo(periodo: Dict, fin_vigente: int) -> Intervalo:
+    """
+    Intervalo [inicio, fin] de un período con fechas dd/mm/aaaa
+
+    Lanza ValueError/KeyError si el período no tiene fechas válidas.
+    """
+    inicio = fecha_a_ordinal(periodo['fecha_inicio'])
+    if periodo['fecha_fin'] == 'Vigente':
+        return inicio, fin_vigente
+    return inicio, fecha_a_ordinal(periodo['fecha_fin'])
+
+
+def unir_intervalos(intervalos: Iterable[Intervalo]) -> List[Intervalo]:
+    """
+    Unión de intervalos cerrados: ordena y barre una vez
+
+    Los intervalos que se tocan (fin + 1 == inicio) se fusionan; los
+    invertidos (fin < inicio) no cubren ningún día y se descartan.
+    """
+    unidos: List[List[int]] = []
+    for inicio, fin in sorted(intervalos):
+        if fin < inicio:
+            continue
+        if unidos and inicio <= unidos[-1][1] + 1:
+            if fin > unidos[-1][1]:
+                unidos[-1][1] = fin
+        else:
+            unidos.append([inicio, fin])
+    return [(inicio, fin) for inicio, fin in unidos]
+
+
+def contar_dias_unicos(intervalos: Iterable[Intervalo]) -> int:
+    """Número de días cubiertos por al menos un intervalo"""
+    return sum(fin - inicio + 1 for inicio, fin in unir_intervalos(intervalos))
+
+
+def detectar_solapamientos(intervalos: Sequence[Intervalo]) -> List[Solapamiento]:
+    """
+    Todos los pares de intervalos que se solapan, en O(n log n + k)
+
+    Barre los intervalos por inicio manteniendo un heap de activos por fin:
+    al llegar un intervalo se descartan los activos que terminaron antes de
+    su inicio y cada activo restante forma un par con él.
+
+    Returns:
+        (i, j, inicio, fin): índices en `intervalos` (i empieza antes; en
+        empate, el de menor índice) y el tramo compartido [inicio, fin],
+        ordenados como el recorrido por pares i < j sobre la lista ordenada
+    """
+    orden = sorted(range(len(intervalos)), key=lambda k: intervalos[k][0])
+    activos: List[Tuple[int, int, int]] = []  # (fin, posición en orden, índice)
+    pares = []
+
+    for posicion, j in enumerate(orden):
+        inicio_j, fin_j = intervalos[j]
+        if fin_j < inicio_j:
+            continue
+        while activos and activos[0][0] < inicio_j:
+            heapq.heappop(activos)
+        for fin_i, posicion_i, i in activos:
+            pares.append((posicion_i, posicion, i, j, inicio_j, min(fin_i, fin_j)))
+        heapq.heappush(activos, (fin_j, posicion, j))
+
+    pares.sort()
+    return [(i, j, inicio, fin) for _, _, i, j, inicio, fin in pares]
+
+
+def detectar_empalmes_periodos(periodos: List[Dict],
+                               fin_vigente: Optional[int] = None) -> List[Tuple[Dict, Dict, int, int]]:
+    """
+    Empalmes entre períodos laborales: fechas leídas una sola vez y un barrido
+
+    Los períodos sin fechas válidas se ignoran. Un período "Vigente" termina
+    en `fin_vigente` (hoy si no se indica).
+
+    Returns:
+        (periodo1, periodo2, inicio, fin) con el tramo empalmado en días ordinales
+    """
+    if fin_vigente is None:
+        fin_vigente = date.today().toordinal()
+
+    validos, intervalos = [], []
+    for periodo in periodos:
+        try:
+            intervalos.append(intervalo_periodo(periodo, fin_vigente))
+        except (KeyError, TypeError, ValueError):
+            continue
+        validos.append(periodo)
+
+    return [
+        (validos[i], validos[j], inicio, fin)
+        for i, j, inicio, fin in detectar_solapamientos(intervalos)
+    ]
@@ -0,0 +1,150 @@
+"""
+Mapa de días cotizados de una carrera laboral
+
+Representa la carrera como un bitset (un int de Python): el bit k indica si
+el día ORIGEN + k está cubierto por al menos un período. Se construye una vez
+por constancia y responde con operaciones sobre palabras completas:
+
+- días/semanas únicos de toda la carrera (conteo de bits)
+- días/semanas entre dos fechas (máscara + conteo de bits)
+- tramos cotizados y huecos (saltos entre corridas de bits)
+
+COORDINA CON: utils/intervalos.py, correccion_semanas_final.py,
+              conservacion_derechos.py, utils/imss_rules.py
+USO: mapa = MapaDiasCarrera.desde_periodos(periodos, fecha_emision)
+"""
+
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from utils.intervalos import Intervalo, intervalo_periodo, ordinal_fin_vigente
+
+# Inicio del régimen del IMSS: ningún día cotizado puede ser anterior
+ORIGEN = date(1943, 1, 1)
+ORIGEN_ORDINAL = ORIGEN.toordinal()
+
+Fecha = Union[date, datetime]
+
+
+def _ordinal(fecha: Fecha) -> int:
+    return fecha.toordinal()
+
+
+def _ceros_finales(valor: int) -> int:
+    """Posición del bit encendido más bajo (valor > 0)"""
+    return (valor & -valor).bit_length() - 1
+
+
+class MapaDiasCarrera:
+    """Bitset de días cubiertos desde ORIGEN (1943-01-01)"""
+
+    __slots__ = ('bits',)
+
+    def __init__(self, bits: int = 0):
+        self.bits = bits
+
+    @classmethod
+    def desde_intervalos(cls, intervalos: Iterable[Intervalo]) -> 'MapaDiasCarrera':
+        """Intervalos cerrados [inicio, fin] en días ordinales; se recortan a ORIGEN"""
+        bits = 0
+        for inicio, fin in intervalos:
+            inicio = max(inicio, ORIGEN_ORDINAL)
+            if fin < inicio:
+                continue
+            bits |= ((1 << (fin - inicio + 1)) - 1) << (inicio - ORIGEN_ORDINAL)
+        return cls(bits)
+
+    @classmethod
+    def desde_periodos(cls, periodos: List[Dict], fecha_emision: Optional[str] = None) -> 'MapaDiasCarrera':
+        """
+        Períodos con fechas dd/mm/aaaa; los "Vigente" cierran en la fecha de
+        emisión (o hoy). Los períodos sin fechas válidas se ignoran.
+        """
+        fin_vigente = ordinal_fin_vigente(fecha_emision)
+        intervalos = []
+        for periodo in periodos:
+            try:
+                intervalos.append(intervalo_periodo(periodo, fin_vigente))
+            except (KeyError, TypeError, ValueError):
+                continue
+        return cls.desde_intervalos(intervalos)
+
+    def __or__(self, otro: 'MapaDiasCarrera') -> 'MapaDiasCarrera':
+        return MapaDiasCarrera(self.bits | otro.bits)
+
+    def __and__(self, otro: 'MapaDiasCarrera') -> 'MapaDiasCarrera':
+        return MapaDiasCarrera(self.bits & otro.bits)
+
+    def __contains__(self, fecha: Fecha) -> bool:
+        desplazamiento = _ordinal(fecha) - ORIGEN_ORDINAL
+        return desplazamiento >= 0 and bool((self.bits >> desplazamiento) & 1)
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def dias_cubiertos(self) -> int:
+        """Días únicos de toda la carrera"""
+        return self.bits.bit_count()
+
+    def semanas_cubiertas(self) -> int:
+        """Semanas completas de días únicos (método IMSS)"""
+        return self.dias_cubiertos() // 7
+
+    def dias_entre(self, inicio: Fecha, fin: Fecha) -> int:
+        """Días cubiertos en [inicio, fin], ambos inclusive"""
+        desde = max(_ordinal(inicio), ORIGEN_ORDINAL) - ORIGEN_ORDINAL
+        hasta = _ordinal(fin) - ORIGEN_ORDINAL
+        if hasta < desde:
+            return 0
+        return ((self.bits >> desde) & ((1 << (hasta - desde + 1)) - 1)).bit_count()
+
+    def semanas_entre(self, inicio: Fecha, fin: Fecha) -> int:
+        """Semanas completas cubiertas en [inicio, fin]"""
+        return self.dias_entre(inicio, fin) // 7
+
+    def tramos(self) -> List[Tuple[date, date]]:
+        """Corridas de días cubiertos como (inicio, fin) inclusive, en orden"""
+        tramos = []
+        restante = self.bits
+        base = 0
+        while restante:
+            # Saltar ceros hasta el próximo día cubierto y medir la corrida de unos
+            ceros = _ceros_finales(restante)
+            restante >>= ceros
+            base += ceros
+            unos = _ceros_finales(~restante)
+            tramos.append((
+                date.fromordinal(ORIGEN_ORDINAL + base),
+                date.fromordinal(ORIGEN_ORDINAL + base + unos - 1)
+            ))
+            restante >>= unos
+            base += unos
+        return tramos
+
+    def huecos(self, dias_minimos: int = 1) -> List[Tuple[date, date]]:
+        """
+        Días sin cotizar entre el primer y el último día cubiertos
+
+        Args:
+            dias_minimos: Ignora huecos más cortos que este número de días
+        """
+        tramos = self.tramos()
+        huecos = []
+        for (_, fin_anterior), (inicio_siguiente, _) in zip(tramos, tramos[1:]):
+            dias = (inicio_siguiente - fin_anterior).days - 1
+            if dias >= dias_minimos:
+                huecos.append((
+                    date.fromordinal(fin_anterior.toordinal() + 1),
+                    date.fromordinal(inicio_siguiente.toordinal() - 1)
+                ))
+        return huecos
+
+    def primer_dia(self) -> Optional[date]:
+        if not self.bits:
+            return None
+        return date.fromordinal(ORIGEN_ORDINAL + _ceros_finales(self.bits))
+
+    def ultimo_dia(self) -> Optional[date]:
+        if not self.bits:
+            return None
+        return date.fromordinal(ORIGEN_ORDINAL + self.bits.bit_length() - 1)
@@ -0,0 +1,252 @@
+"""
+Almacén único de parámetros históricos IMSS (SMG, UMA, veces del tope del SBC)
+
+Cada serie es una lista de vigencias: el valor rige desde su fecha de entrada
+en vigor hasta la siguiente y el último sigue vigente. Las consultas por fecha
+son O(log n) con bisect; el tope diario del SBC se precalcula en una tabla por
+día ordinal, así que `tope_diario(dia)` es un acceso a arreglo.
+
+Tope diario del SBC = veces_tope_sbc × unidad, donde la unidad es el SMG antes
+de la entrada en vigor de la UMA y la UMA después.
+
+Los valores viven en data/parametros_imss.json (o en IMSS_PARAMETROS_PATH).
+El archivo se relee si cambia, sin reiniciar el proceso: `recargar()` lo
+fuerza y las consultas revisan su fecha de modificación cada
+INTERVALO_REVISION segundos. Cada recarga construye un estado nuevo y lo
+publica con una sola asignación, así que una consulta nunca ve tablas mezcladas.
+
+USO:
+    from utils.parametros_imss import parametros
+    parametros.tope_diario(fecha.toordinal())
+    parametros.uma(fecha)
+"""
+
+import json
+import logging
+import os
+import time
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from utils.mapa_dias import ORIGEN_ORDINAL
+
+logger = logging.getLogger(__name__)
+
+RUTA_POR_OMISION = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'data', 'parametros_imss.json')
+
+SERIES = ('smg_diario', 'uma_diaria', 'veces_tope_sbc')
+
+# Años después del último cambio que cubre la tabla diaria de topes
+AÑOS_PROYECCION = 50
+
+Fecha = Union[date, datetime, int]
+
+
+def _ordinal(fecha: Fecha) -> int:
+    return fecha if isinstance(fecha, int) else fecha.toordinal()
+
+
+class SerieParametro:
+    """Valores por intervalos de vigencia [inicio_k, inicio_k+1)"""
+
+    def __init__(self, nombre: str, vigencias: List[Tuple[int, float]]):
+        if not vigencias:
+            raise ValueError(f"La serie {nombre} no tiene vigencias")
+        vigencias = sorted(vigencias)
+        self.nombre = nombre
+        self.inicios = [inicio for inicio, _ in vigencias]
+        self.valores = [valor for _, valor in vigencias]
+
+    def valor(self, dia: int) -> float:
+        """Valor vigente el día ordinal `dia`; antes de la primera vigencia, la primera"""
+        k = bisect_right(self.inicios, dia) - 1
+        return self.valores[max(k, 0)]
+
+    def tramos(self, desde: int, hasta: int) -> List[Tuple[int, int, float]]:
+        """Vigencias que tocan [desde, hasta] recortadas: (inicio, fin, valor)"""
+        if hasta < desde:
+            return []
+        k = max(bisect_right(self.inicios, desde) - 1, 0)
+        resultado = []
+        inicio = desde
+        while inicio <= hasta:
+            siguiente = self.inicios[k + 1] if k + 1 < len(self.inicios) else None
+            fin = hasta if siguiente is None else min(hasta, siguiente - 1)
+            resultado.append((inicio, fin, self.valores[k]))
+            inicio, k = fin + 1, k + 1
+        return resultado
+
+
+@dataclass
+class _EstadoParametros:
+    """Tablas de una carga del archivo; se reemplazan completas al recargar"""
+    series: Dict[str, SerieParametro]
+    inicio_uma: int
+    cortes_tope: List[int]
+    tabla_topes: array
+    fin_tabla: int
+    mtime: float
+    cargado_en: datetime
+
+    def tope_calculado(self, dia: int) -> float:
+        serie_unidad = self.series['smg_diario'] if dia < self.inicio_uma else self.series['uma_diaria']
+        return self.series['veces_tope_sbc'].valor(dia) * serie_unidad.valor(dia)
+
+
+class ParametrosIMSS:
+    """Parámetros históricos indexados por fecha de vigencia, recargables"""
+
+    # Segundos entre revisiones de la fecha de modificación del archivo
+    INTERVALO_REVISION = 30.0
+
+    def __init__(self, ruta: Optional[str] = None):
+        self.ruta = ruta or os.getenv('IMSS_PARAMETROS_PATH') or RUTA_POR_OMISION
+        self._estado = self._cargar()
+        self._ultima_revision = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Carga
+    # ------------------------------------------------------------------
+
+    def _cargar(self) -> _EstadoParametros:
+        with open(self.ruta, encoding='utf-8') as archivo:
+            datos = json.load(archivo)
+        mtime = os.path.getmtime(self.ruta)
+
+        series = {}
+        for nombre in SERIES:
+            vigencias = [
+                (datetime.strptime(v['desde'], '%Y-%m-%d').toordinal(), float(v['valor']))
+                for v in datos.get(nombre, [])
+            ]
+            series[nombre] = SerieParametro(nombre, vigencias)
+
+        inicio_uma = series['uma_diaria'].inicios[0]
+
+        # Días en que cambia el tope: cambios de SMG antes de la UMA, de UMA
+        # después, y cambios del múltiplo
+        cortes = {d for d in series['smg_diario'].inicios if d < inicio_uma}
+        cortes |= set(series['uma_diaria'].inicios)
+        cortes |= set(series['veces_tope_sbc'].inicios)
+        cortes = sorted(c for c in cortes if c > ORIGEN_ORDINAL)
+
+        fin_tabla = date(date.fromordinal(cortes[-1]).year + AÑOS_PROYECCION, 12, 31).toordinal()
+        estado = _EstadoParametros(
+            series=series,
+            inicio_uma=inicio_uma,
+            cortes_tope=cortes,
+            tabla_topes=array('d'),
+            fin_tabla=fin_tabla,
+            mtime=mtime,
+            cargado_en=datetime.now()
+        )
+
+        # Tabla por día: un bloque constante entre cortes consecutivos
+        limites = [ORIGEN_ORDINAL] + cortes + [fin_tabla + 1]
+        for inicio, siguiente in zip(limites, limites[1:]):
+            estado.tabla_topes.extend(array('d', [estado.tope_calculado(inicio)]) * (siguiente - inicio))
+
+        return estado
+
+    def recargar(self) -> Dict[str, Any]:
+        """Relee el archivo; si es inválido se conserva la carga anterior"""
+        try:
+            self._estado = self._cargar()
+            logger.info(f"✅ Parámetros IMSS recargados desde {self.ruta}")
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"⚠️ No se pudieron recargar los parámetros IMSS ({e}); se conserva la versión anterior")
+            raise
+        finally:
+            self._ultima_revision = time.monotonic()
+        return self.resumen()
+
+    def _vigente(self) -> _EstadoParametros:
+        """Estado actual; revisa el archivo a lo más cada INTERVALO_REVISION segundos"""
+        ahora = time.monotonic()
+        if ahora - self._ultima_revision >= self.INTERVALO_REVISION:
+            self._ultima_revision = ahora
+            try:
+                if os.path.getmtime(self.ruta) != self._estado.mtime:
+                    self.recargar()
+            except (OSError, ValueError, KeyError):
+                pass
+        return self._estado
+
+    # ------------------------------------------------------------------
+    # Consultas por fecha (date, datetime o día ordinal)
+    # ------------------------------------------------------------------
+
+    def smg(self, fecha: Fecha) -> float:
+        return self._vigente().series['smg_diario'].valor(_ordinal(fecha))
+
+    def uma(self, fecha: Fecha) -> float:
+        """UMA diaria vigente; antes de 2016 la UMA no existía y se devuelve la primera"""
+        return self._vigente().series['uma_diaria'].valor(_ordinal(fecha))
+
+    def veces_tope(self, fecha: Fecha) -> float:
+        return self._vigente().series['veces_tope_sbc'].valor(_ordinal(fecha))
+
+    def unidad_tope(self, fecha: Fecha) -> float:
+        """SMG antes de la UMA, UMA después"""
+        dia = _ordinal(fecha)
+        estado = self._vigente()
+        serie = estado.series['smg_diario'] if dia < estado.inicio_uma else estado.series['uma_diaria']
+        return serie.valor(dia)
+
+    def tope_diario(self, fecha: Fecha) -> float:
+        """Tope diario del SBC: O(1) dentro de la tabla precalculada"""
+        dia = _ordinal(fecha)
+        estado = self._vigente()
+        if ORIGEN_ORDINAL <= dia <= estado.fin_tabla:
+            return estado.tabla_topes[dia - ORIGEN_ORDINAL]
+        return estado.tope_calculado(dia)
+
+    def cortes_tope(self) -> List[int]:
+        """Días ordinales en que cambia el tope (para cortar segmentos de salario)"""
+        return self._vigente().cortes_tope
+
+    def tramos(self, serie: str, desde: Fecha, hasta: Fecha) -> List[Tuple[int, int, float]]:
+        """Vigencias de una serie entre dos fechas: [(inicio, fin, valor)] en días ordinales"""
+        return self._vigente().series[serie].tramos(_ordinal(desde), _ordinal(hasta))
+
+    # Consultas por año: valor vigente al cierre del año
+
+    def smg_año(self, año: int) -> float:
+        return self.smg(date(año, 12, 31))
+
+    def uma_año(self, año: int) -> float:
+        return self.uma(date(año, 12, 31))
+
+    def tope_diario_año(self, año: int) -> float:
+        return self.tope_diario(date(año, 12, 31))
+
+    @property
+    def version(self) -> str:
+        """Identifica la carga vigente (cambia en cada recarga); sirve de clave de caché"""
+        return self._vigente().cargado_en.isoformat()
+
+    def resumen(self) -> Dict[str, Any]:
+        estado = self._estado
+        return {
+            "ruta": self.ruta,
+            "cargado_en": estado.cargado_en.isoformat(),
+            "series": {
+                nombre: {
+                    "vigencias": len(serie.inicios),
+                    "desde": date.fromordinal(serie.inicios[0]).isoformat(),
+                    "ultimo_cambio": date.fromordinal(serie.inicios[-1]).isoformat(),
+                    "valor_actual": serie.valores[-1]
+                }
+                for nombre, serie in estado.series.items()
+            },
+            "inicio_uma": date.fromordinal(estado.inicio_uma).isoformat(),
+            "tope_diario_hoy": round(self.tope_diario(date.today()), 2)
+        }
+
+
+# Instancia global para uso conveniente
+parametros = ParametrosIMSS()
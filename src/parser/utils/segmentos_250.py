@@ -0,0 +1,295 @@
+"""
+Motor de segmentos para el promedio de las últimas 250 semanas cotizadas
+
+Implementación canónica del Art. 167 LSS 73 detrás de calculo_250_semanas.py,
+modules/modulo3/calculators/promedio_250.py y backend/main.py. La carrera se
+codifica por corridas: segmentos [inicio, fin] de días ordinales con salario
+constante; ningún cálculo crea un objeto por día.
+
+Reglas:
+- Empleos simultáneos: los salarios del tramo se suman y la suma se topa
+- Tope: función día ordinal → tope diario, evaluada una vez por segmento;
+  los segmentos se cortan en cada día en que cambia el tope (`cortes`, por
+  omisión cada 1 de enero; utils/parametros_imss.py da los cortes reales)
+- Ventana: los últimos 1,750 días cotizados hasta la fecha de referencia,
+  saltando los días sin cotizar
+- Promedio: Σ(salario topado × días) / días de la ventana
+
+USO:
+    segmentos = normalizar_tramos(tramos, tope_diario)
+    ventana = ventana_250_semanas(segmentos, fecha_referencia.toordinal())
+    ventana.promedio_diario
+
+    # Muchas fechas de referencia sobre la misma carrera: O(log n) por consulta
+    indice = IndicePromedio250(segmentos)
+    indice.consultar(fecha_referencia.toordinal()).promedio_diario
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+DIAS_250_SEMANAS = 1750
+
+# (inicio, fin, salario_diario, origen): días ordinales inclusive; `origen`
+# identifica de dónde salió el tramo (período, patrón...) y se conserva
+Tramo = Tuple[int, int, float, Any]
+TopeDiario = Callable[[int], float]
+
+
+@dataclass
+class Segmento:
+    """Corrida de días cotizados con los mismos empleos y el mismo salario"""
+    inicio: int
+    fin: int
+    salario: float              # salario diario ya topado
+    salario_original: float     # suma de salarios concurrentes sin tope
+    origenes: Tuple[Any, ...] = ()
+
+    @property
+    def dias(self) -> int:
+        return self.fin - self.inicio + 1
+
+    @property
+    def tope_aplicado(self) -> bool:
+        return self.salario < self.salario_original
+
+    @property
+    def fecha_inicio(self) -> date:
+        return date.fromordinal(self.inicio)
+
+    @property
+    def fecha_fin(self) -> date:
+        return date.fromordinal(self.fin)
+
+
+@dataclass
+class VentanaPromedio:
+    """Segmentos de la ventana de 250 semanas (orden cronológico) y su promedio"""
+    segmentos: List[Segmento] = field(default_factory=list)
+    dias: int = 0
+    suma_ponderada: float = 0.0
+    dias_requeridos: int = DIAS_250_SEMANAS
+
+    @property
+    def promedio_diario(self) -> float:
+        return self.suma_ponderada / self.dias if self.dias else 0.0
+
+    @property
+    def completa(self) -> bool:
+        return self.dias >= self.dias_requeridos
+
+    @property
+    def fecha_inicio(self) -> Optional[date]:
+        return self.segmentos[0].fecha_inicio if self.segmentos else None
+
+    @property
+    def fecha_fin(self) -> Optional[date]:
+        return self.segmentos[-1].fecha_fin if self.segmentos else None
+
+
+def normalizar_tramos(tramos: Iterable[Tramo], tope: Optional[TopeDiario] = None,
+                      cortes: Optional[Iterable[int]] = None) -> List[Segmento]:
+    """
+    Convierte tramos (posiblemente empalmados) en segmentos sin empalmes
+
+    Barrido de eventos: los límites son los inicios, el día siguiente a cada
+    fin y cada corte del tope (por omisión cada 1 de enero); entre dos
+    límites los tramos activos y el tope no cambian.
+    Los segmentos contiguos con los mismos tramos y el mismo salario se unen.
+
+    Returns:
+        Segmentos en orden cronológico
+    """
+    tramos = [t for t in tramos if t[1] >= t[0]]
+    if not tramos:
+        return []
+
+    eventos = []  # (día, 0 = fin / 1 = inicio, índice)
+    for indice, (inicio, fin, _, _) in enumerate(tramos):
+        eventos.append((inicio, 1, indice))
+        eventos.append((fin + 1, 0, indice))
+    eventos.sort()
+
+    limites = {dia for dia, _, _ in eventos}
+    primer_dia, ultimo_dia = eventos[0][0], eventos[-1][0]
+    if cortes is None:
+        cortes = (date(año, 1, 1).toordinal() for año in range(
+            date.fromordinal(primer_dia).year + 1, date.fromordinal(ultimo_dia).year + 1))
+    limites.update(c for c in cortes if primer_dia < c < ultimo_dia)
+    limites = sorted(limites)
+
+    segmentos: List[Segmento] = []
+    activos: dict = {}
+    clave_anterior = None
+    siguiente = 0
+
+    for n, dia in enumerate(limites[:-1]):
+        while siguiente < len(eventos) and eventos[siguiente][0] == dia:
+            _, es_inicio, indice = eventos[siguiente]
+            if es_inicio:
+                activos[indice] = tramos[indice]
+            else:
+                activos.pop(indice, None)
+            siguiente += 1
+
+        if not activos:
+            clave_anterior = None
+            continue
+
+        fin = limites[n + 1] - 1
+        salario_original = sum(t[2] for t in activos.values())
+        salario = min(salario_original, tope(dia)) if tope else salario_original
+
+        clave = (tuple(activos), salario, salario_original)
+        if clave == clave_anterior:
+            segmentos[-1].fin = fin
+        else:
+            segmentos.append(Segmento(
+                inicio=dia,
+                fin=fin,
+                salario=salario,
+                salario_original=salario_original,
+                origenes=tuple(t[3] for t in activos.values())
+            ))
+        clave_anterior = clave
+
+    return segmentos
+
+
+def ventana_250_semanas(segmentos: List[Segmento], fecha_referencia: int,
+                        dias: int = DIAS_250_SEMANAS) -> VentanaPromedio:
+    """
+    Últimos `dias` días cotizados hasta `fecha_referencia` (ordinal, inclusive)
+
+    Recorre los segmentos del más reciente al más antiguo; el segmento que
+    cruza la fecha de referencia se recorta a ella y el último que entra a la
+    ventana aporta solo sus días más recientes.
+    """
+    ventana = VentanaPromedio(dias_requeridos=dias)
+    restantes = dias
+    tomados = []
+
+    for segmento in reversed(segmentos):
+        if restantes <= 0:
+            break
+        if segmento.inicio > fecha_referencia:
+            continue
+        fin = min(segmento.fin, fecha_referencia)
+        tomar = min(fin - segmento.inicio + 1, restantes)
+        tomados.append(Segmento(
+            inicio=fin - tomar + 1,
+            fin=fin,
+            salario=segmento.salario,
+            salario_original=segmento.salario_original,
+            origenes=segmento.origenes
+        ))
+        ventana.suma_ponderada += segmento.salario * tomar
+        restantes -= tomar
+
+    tomados.reverse()
+    ventana.segmentos = tomados
+    ventana.dias = dias - restantes
+    return ventana
+
+
+def promedio_250_semanas(tramos: Iterable[Tramo], fecha_referencia: int,
+                         tope: Optional[TopeDiario] = None,
+                         dias: int = DIAS_250_SEMANAS,
+                         cortes: Optional[Iterable[int]] = None) -> VentanaPromedio:
+    """Atajo: normaliza los tramos y toma la ventana de 250 semanas"""
+    return ventana_250_semanas(normalizar_tramos(tramos, tope, cortes), fecha_referencia, dias)
+
+
+@dataclass
+class ConsultaPromedio:
+    """Promedio de 250 semanas a una fecha de referencia, sin detalle de segmentos"""
+    fecha_referencia: int
+    dias: int
+    suma_ponderada: float
+    inicio_ventana: Optional[int]
+    dias_requeridos: int = DIAS_250_SEMANAS
+
+    @property
+    def promedio_diario(self) -> float:
+        return self.suma_ponderada / self.dias if self.dias else 0.0
+
+    @property
+    def completa(self) -> bool:
+        return self.dias >= self.dias_requeridos
+
+
+class IndicePromedio250:
+    """
+    Sumas prefijas sobre los días cotizados de una carrera ya normalizada
+
+    dias_acumulados[k] y suma_acumulada[k] cubren los segmentos [0, k): días
+    cotizados y Σ(salario topado × días). El promedio a cualquier fecha de
+    referencia es la diferencia de dos prefijos, cada uno ubicado con bisect,
+    así que cada consulta es O(log n) sin volver a normalizar ni ordenar.
+    """
+
+    def __init__(self, segmentos: List[Segmento], dias: int = DIAS_250_SEMANAS):
+        self.dias_requeridos = dias
+        self.inicios = [seg.inicio for seg in segmentos]
+        self.fines = [seg.fin for seg in segmentos]
+        self.salarios = [seg.salario for seg in segmentos]
+
+        self.dias_acumulados = [0]
+        self.suma_acumulada = [0.0]
+        for seg in segmentos:
+            self.dias_acumulados.append(self.dias_acumulados[-1] + seg.dias)
+            self.suma_acumulada.append(self.suma_acumulada[-1] + seg.salario * seg.dias)
+
+    @classmethod
+    def desde_tramos(cls, tramos: Iterable[Tramo], tope: Optional[TopeDiario] = None,
+                     dias: int = DIAS_250_SEMANAS,
+                     cortes: Optional[Iterable[int]] = None) -> 'IndicePromedio250':
+        return cls(normalizar_tramos(tramos, tope, cortes), dias)
+
+    def _prefijo_hasta_fecha(self, dia: int) -> Tuple[int, float]:
+        """Días cotizados y suma ponderada desde el inicio de la carrera hasta `dia` inclusive"""
+        k = bisect_right(self.inicios, dia) - 1
+        if k < 0:
+            return 0, 0.0
+        tomados = min(self.fines[k], dia) - self.inicios[k] + 1
+        return (self.dias_acumulados[k] + tomados,
+                self.suma_acumulada[k] + self.salarios[k] * tomados)
+
+    def _prefijo_por_dias(self, n: int) -> Tuple[float, Optional[int]]:
+        """Suma ponderada de los primeros `n` días cotizados y el día ordinal n + 1"""
+        k = bisect_right(self.dias_acumulados, n) - 1
+        if k >= len(self.inicios):
+            return self.suma_acumulada[k], None
+        resto = n - self.dias_acumulados[k]
+        return self.suma_acumulada[k] + self.salarios[k] * resto, self.inicios[k] + resto
+
+    def cotizado_hasta(self, dia: int) -> Tuple[int, float]:
+        """Días cotizados y suma ponderada acumulados hasta `dia` (ordinal, inclusive)"""
+        return self._prefijo_hasta_fecha(dia)
+
+    def consultar(self, fecha_referencia: int, dias: Optional[int] = None) -> ConsultaPromedio:
+        """Promedio de los últimos `dias` días cotizados hasta `fecha_referencia` (ordinal)"""
+        dias = self.dias_requeridos if dias is None else dias
+        dias_fin, suma_fin = self._prefijo_hasta_fecha(fecha_referencia)
+        dias_inicio = max(0, dias_fin - dias)
+        suma_inicio, inicio_ventana = self._prefijo_por_dias(dias_inicio)
+        return ConsultaPromedio(
+            fecha_referencia=fecha_referencia,
+            dias=dias_fin - dias_inicio,
+            suma_ponderada=suma_fin - suma_inicio,
+            inicio_ventana=inicio_ventana if dias_fin > dias_inicio else None,
+            dias_requeridos=dias
+        )
+
+    def serie_mensual(self, desde: date, hasta: date) -> List[ConsultaPromedio]:
+        """Una consulta por mes: el último día de cada mes entre `desde` y `hasta` (recortado a `hasta`)"""
+        serie = []
+        año, mes = desde.year, desde.month
+        while (año, mes) <= (hasta.year, hasta.month):
+            siguiente = date(año + mes // 12, mes % 12 + 1, 1)
+            fin_mes = min(siguiente - timedelta(days=1), hasta)
+            serie.append(self.consultar(fin_mes.toordinal()))
+            año, mes = siguiente.year, siguiente.month
+        return serie
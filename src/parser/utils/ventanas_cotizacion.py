@@ -0,0 +1,175 @@
+"""
+Ventanas de cotización de una carrera laboral
+
+Responde preguntas del tipo "¿cuántas semanas cotizó en tal ventana?" (52
+semanas en los últimos 5 años, semanas de reingreso) sin recorrer períodos
+ni días: la carrera se guarda como tramos unidos y ordenados con los días
+acumulados antes de cada tramo (sumas prefijas).
+
+- días/semanas en [A, B): dos búsquedas binarias
+- mejor ventana de longitud fija: la cobertura de una ventana que se desliza
+  solo cambia de pendiente en altas y bajas, así que el máximo se alcanza con
+  la ventana empezando en un alta o terminando en una baja
+- primer día en que la ventana que termina ahí alcanza N semanas: barrido
+  por los puntos donde cambia la pendiente (altas, bajas y los mismos
+  desplazados una ventana), resolviendo el cruce dentro de cada tramo lineal
+
+Todas las consultas son O(log n) u O(n log n) con n tramos; no dependen de
+cuántos días abarque la carrera.
+
+COORDINA CON: utils/intervalos.py, utils/mapa_dias.py, utils/imss_rules.py,
+              conservacion_derechos.py
+USO: ventanas = VentanasCotizacion.desde_intervalos(carrera.intervalos())
+     ventanas.semanas_en(a, b), ventanas.mejor_ventana(DIAS_5_AÑOS),
+     ventanas.primer_dia_con(52, DIAS_5_AÑOS)
+"""
+
+from bisect import bisect_left
+from datetime import date, datetime
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+from utils.intervalos import Intervalo, unir_intervalos
+
+# Longitud de la ventana de "5 años" en días (5 × 365.25)
+DIAS_5_AÑOS = 1826
+
+Fecha = Union[date, datetime]
+# (primer día, último día, días cotizados) de una ventana, en días ordinales
+Ventana = Tuple[int, int, int]
+
+
+class VentanasCotizacion:
+    """Tramos cotizados unidos [inicio, fin] (días ordinales) con días acumulados"""
+
+    __slots__ = ('inicios', 'fines', 'acumulados')
+
+    def __init__(self, tramos: Sequence[Intervalo] = ()):
+        """`tramos` ya unidos y ordenados (ver desde_intervalos)"""
+        self.inicios = [inicio for inicio, _ in tramos]
+        self.fines = [fin for _, fin in tramos]
+        # acumulados[k]: días cotizados antes del tramo k
+        self.acumulados = [0]
+        for inicio, fin in tramos:
+            self.acumulados.append(self.acumulados[-1] + fin - inicio + 1)
+
+    @classmethod
+    def desde_intervalos(cls, intervalos: Iterable[Intervalo]) -> 'VentanasCotizacion':
+        """Intervalos cerrados [inicio, fin] en días ordinales, con o sin empalmes"""
+        return cls(unir_intervalos(intervalos))
+
+    @classmethod
+    def desde_mapa(cls, mapa) -> 'VentanasCotizacion':
+        """Mismos días que un MapaDiasCarrera"""
+        return cls([(inicio.toordinal(), fin.toordinal()) for inicio, fin in mapa.tramos()])
+
+    def __len__(self) -> int:
+        return len(self.inicios)
+
+    def __bool__(self) -> bool:
+        return bool(self.inicios)
+
+    def tramos(self) -> List[Intervalo]:
+        return list(zip(self.inicios, self.fines))
+
+    def posteriores_a(self, dia: int) -> 'VentanasCotizacion':
+        """Solo los días cotizados después de `dia` (p. ej. tras la última baja)"""
+        k = bisect_left(self.fines, dia + 1)
+        tramos = [(max(inicio, dia + 1), fin) for inicio, fin in zip(self.inicios[k:], self.fines[k:])]
+        return VentanasCotizacion(tramos)
+
+    # ------------------------------------------------------------------
+    # Consultas puntuales
+    # ------------------------------------------------------------------
+
+    def dias_antes_de(self, dia: int) -> int:
+        """Días cotizados estrictamente antes de `dia`"""
+        k = bisect_left(self.inicios, dia) - 1
+        if k < 0:
+            return 0
+        return self.acumulados[k] + min(self.fines[k] + 1, dia) - self.inicios[k]
+
+    def cotiza_en(self, dia: int) -> bool:
+        k = bisect_left(self.inicios, dia + 1) - 1
+        return k >= 0 and dia <= self.fines[k]
+
+    def dias_en(self, desde: int, hasta: int) -> int:
+        """Días cotizados en [desde, hasta)"""
+        if hasta <= desde:
+            return 0
+        return self.dias_antes_de(hasta) - self.dias_antes_de(desde)
+
+    def semanas_en(self, desde: int, hasta: int) -> int:
+        """Semanas completas cotizadas en [desde, hasta)"""
+        return self.dias_en(desde, hasta) // 7
+
+    def dias_ventana(self, fin: int, dias_ventana: int = DIAS_5_AÑOS) -> int:
+        """Días cotizados en la ventana de `dias_ventana` días que termina en `fin` (inclusive)"""
+        return self.dias_en(fin - dias_ventana + 1, fin + 1)
+
+    def semanas_ventana(self, fin: int, dias_ventana: int = DIAS_5_AÑOS) -> int:
+        return self.dias_ventana(fin, dias_ventana) // 7
+
+    def semanas_entre(self, inicio: Fecha, fin: Fecha) -> int:
+        """Semanas completas en [inicio, fin], ambos inclusive (misma consulta que MapaDiasCarrera)"""
+        return self.dias_en(inicio.toordinal(), fin.toordinal() + 1) // 7
+
+    # ------------------------------------------------------------------
+    # Búsquedas sobre todas las ventanas
+    # ------------------------------------------------------------------
+
+    def mejor_ventana(self, dias_ventana: int = DIAS_5_AÑOS) -> Optional[Ventana]:
+        """
+        Ventana de `dias_ventana` días con más días cotizados
+
+        Returns:
+            (primer día, último día, días cotizados), o None si no hay días
+            cotizados. Con empate gana la que empieza antes entre las que
+            empiezan en un alta o terminan en una baja.
+        """
+        if not self.inicios:
+            return None
+        candidatos = sorted(set(self.inicios) | {fin - dias_ventana + 1 for fin in self.fines})
+        mejor: Optional[Ventana] = None
+        for inicio in candidatos:
+            dias = self.dias_en(inicio, inicio + dias_ventana)
+            if mejor is None or dias > mejor[2]:
+                mejor = (inicio, inicio + dias_ventana - 1, dias)
+        return mejor
+
+    def primer_dia_con(self, semanas: int, dias_ventana: int = DIAS_5_AÑOS,
+                       desde: Optional[int] = None) -> Optional[int]:
+        """
+        Primer día (desde `desde` si se indica) en que la ventana de
+        `dias_ventana` días que termina ese día suma al menos `semanas`
+
+        Returns:
+            Día ordinal, o None si ninguna ventana llega
+        """
+        if not self.inicios:
+            return None
+        requeridos = semanas * 7
+        if requeridos > dias_ventana:
+            return None
+        primero = self.inicios[0] if desde is None else desde
+        if requeridos <= 0:
+            return primero
+
+        # La cobertura g(d) = dias_ventana(d) avanza de a -1, 0 o +1 por día y
+        # solo cambia de ritmo cuando el día d + 1 o el d - L + 1 entra o sale de un tramo
+        cortes = set()
+        for inicio, fin in zip(self.inicios, self.fines):
+            cortes.update((inicio - 1, fin, inicio - 1 + dias_ventana, fin + dias_ventana))
+        cortes = sorted(c for c in cortes if c > primero)
+
+        anterior = primero
+        dias_anterior = self.dias_ventana(anterior, dias_ventana)
+        for corte in cortes:
+            if dias_anterior >= requeridos:
+                return anterior
+            dias_corte = self.dias_ventana(corte, dias_ventana)
+            if dias_corte >= requeridos:
+                # Entre dos cortes g es lineal: el cruce es exacto
+                ritmo = (dias_corte - dias_anterior) // (corte - anterior)
+                return anterior + -(-(requeridos - dias_anterior) // ritmo)
+            anterior, dias_anterior = corte, dias_corte
+        return anterior if dias_anterior >= requeridos else None
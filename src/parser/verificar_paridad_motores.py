@@ -0,0 +1,93 @@
+"""
+Verificación de paridad entre motores de texto (pdfplumber vs pdfium)
+
+Procesa cada constancia del corpus con ambos motores y compara lo que el
+parser extrae: datos básicos y períodos laborales. El texto crudo no tiene
+que coincidir (pdfium no hace análisis de layout); los datos sí.
+
+USO: python verificar_paridad_motores.py carpeta_corpus
+Sale con código 1 si alguna constancia difiere.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.modulo2.historial_laboral import HistorialLaboralExtractor
+from extraccion_texto_pdf import extraer_texto_serial, extraer_texto_pdfium, validar_texto_constancia
+
+CAMPOS_BASICOS = [
+    'nombre', 'nss', 'curp', 'fecha_emision', 'fecha_nacimiento',
+    'semanas_cotizadas_imss', 'semanas_descontadas', 'semanas_reintegradas',
+    'total_semanas_cotizadas', 'ley_aplicable', 'fecha_primer_alta'
+]
+CAMPOS_PERIODO = [
+    'patron', 'registro_patronal', 'entidad_federativa',
+    'fecha_inicio', 'fecha_fin', 'salario_diario', 'semanas_cotizadas'
+]
+
+
+def resumir(resultado):
+    """Reduce el resultado del parser a los campos comparables"""
+    datos = resultado.get('datos_basicos', {})
+    periodos = resultado.get('historial_laboral', {}).get('periodos', [])
+    return (
+        {campo: datos.get(campo) for campo in CAMPOS_BASICOS},
+        [tuple(p.get(campo) for campo in CAMPOS_PERIODO) for p in periodos]
+    )
+
+
+def comparar_constancia(ruta):
+    """Devuelve la lista de diferencias entre ambos motores para un PDF"""
+    extractor = HistorialLaboralExtractor()
+    texto_plumber = extraer_texto_serial(ruta)
+    texto_pdfium = extraer_texto_pdfium(ruta)
+
+    problemas = validar_texto_constancia(texto_pdfium)
+    if problemas:
+        return [f"pdfium no pasa validación (usaría respaldo): {'; '.join(problemas)}"]
+
+    basicos_plumber, periodos_plumber = resumir(extractor.procesar_constancia(texto_plumber))
+    basicos_pdfium, periodos_pdfium = resumir(extractor.procesar_constancia(texto_pdfium))
+
+    diferencias = []
+    for campo in CAMPOS_BASICOS:
+        if basicos_plumber[campo] != basicos_pdfium[campo]:
+            diferencias.append(f"{campo}: {basicos_plumber[campo]!r} != {basicos_pdfium[campo]!r}")
+
+    if len(periodos_plumber) != len(periodos_pdfium):
+        diferencias.append(f"períodos: {len(periodos_plumber)} != {len(periodos_pdfium)}")
+    else:
+        for i, (a, b) in enumerate(zip(periodos_plumber, periodos_pdfium)):
+            if a != b:
+                diferencias.append(f"período {i}: {a} != {b}")
+
+    return diferencias
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(2)
+
+    carpeta = sys.argv[1]
+    pdfs = sorted(n for n in os.listdir(carpeta) if n.lower().endswith('.pdf'))
+    con_diferencias = 0
+
+    for nombre in pdfs:
+        diferencias = comparar_constancia(os.path.join(carpeta, nombre))
+        if diferencias:
+            con_diferencias += 1
+            print(f"❌ {nombre}")
+            for diferencia in diferencias:
+                print(f"   - {diferencia}")
+        else:
+            print(f"✅ {nombre}")
+
+    print(f"\n{len(pdfs) - con_diferencias}/{len(pdfs)} constancias con paridad completa")
+    sys.exit(1 if con_diferencias else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Verificación de paridad entre motores de períodos laborales
+
+Extrae los períodos de cada constancia del corpus con el motor original
+("regex") y con el motor a comparar ("lineal" o "coordenadas") y reporta
+cualquier diferencia en los períodos o sus movimientos salariales.
+
+El corpus puede tener PDFs o textos ya extraídos (.txt); "coordenadas"
+necesita el PDF.
+
+USO: python verificar_paridad_periodos.py carpeta_corpus [--motor lineal|coordenadas]
+Sale con código 1 si alguna constancia difiere.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from modules.modulo2.historial_laboral import (
+    HistorialLaboralExtractor, MOTOR_REGEX, MOTOR_LINEAL, MOTOR_COORDENADAS
+)
+
+CAMPOS_PERIODO = [
+    'patron', 'registro_patronal', 'entidad_federativa', 'fecha_inicio',
+    'fecha_fin', 'salario_diario', 'esta_vigente', 'semanas_cotizadas',
+    'total_movimientos', 'cambios_salario'
+]
+
+
+def cargar_constancia(ruta):
+    """Devuelve (texto, fuente_pdf) de un PDF o de un .txt"""
+    if ruta.lower().endswith('.pdf'):
+        from extraccion_texto_pdf import extraer_texto_serial
+        return extraer_texto_serial(ruta), ruta
+    with open(ruta, encoding='utf-8') as archivo:
+        return archivo.read(), None
+
+
+def comparar_constancia(ruta, motor):
+    """Lista de diferencias entre el motor regex y `motor` para una constancia"""
+    texto, fuente_pdf = cargar_constancia(ruta)
+    if motor == MOTOR_COORDENADAS and fuente_pdf is None:
+        return ["el motor por coordenadas requiere el PDF"]
+
+    referencia = [p.to_dict() for p in HistorialLaboralExtractor(MOTOR_REGEX).extraer_periodos(texto)]
+    candidato = [p.to_dict() for p in HistorialLaboralExtractor(motor).extraer_periodos(texto, fuente_pdf)]
+
+    diferencias = []
+    if len(referencia) != len(candidato):
+        diferencias.append(f"períodos: {len(referencia)} (regex) != {len(candidato)} ({motor})")
+
+    for i, (a, b) in enumerate(zip(referencia, candidato)):
+        for campo in CAMPOS_PERIODO:
+            if a.get(campo) != b.get(campo):
+                diferencias.append(f"período {i} {campo}: {a.get(campo)!r} != {b.get(campo)!r}")
+
+    return diferencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("corpus", help="Carpeta con constancias (.pdf o .txt)")
+    parser.add_argument("--motor", choices=[MOTOR_LINEAL, MOTOR_COORDENADAS], default=MOTOR_LINEAL)
+    args = parser.parse_args()
+
+    archivos = sorted(
+        n for n in os.listdir(args.corpus)
+        if n.lower().endswith(('.pdf', '.txt'))
+    )
+    con_diferencias = 0
+
+    for nombre in archivos:
+        diferencias = comparar_constancia(os.path.join(args.corpus, nombre), args.motor)
+        if diferencias:
+            con_diferencias += 1
+            print(f"❌ {nombre}")
+            for diferencia in diferencias:
+                print(f"   - {diferencia}")
+        else:
+            print(f"✅ {nombre}")
+
+    print(f"\n{len(archivos) - con_diferencias}/{len(archivos)} constancias con paridad completa (regex vs {args.motor})")
+    sys.exit(1 if con_diferencias else 0)
+
+
+if __name__ == "__main__":
+    main()